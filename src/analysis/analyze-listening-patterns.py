@@ -3,154 +3,144 @@
 Script d'analyse des patterns d'écoute dans chk-roon.json
 Détecte les sessions, albums complets, corrélations et transitions.
 
+L'historique est chargé en colonnes (src.models.history_store): les
+distributions temporelles, albums complets et statistiques sont calculés
+de façon vectorisée. L'historique n'est trié et découpé en sessions qu'une
+seule fois par rapport (src.models.sessions).
+
 Auteur: Patrick Ostertag
 Date: 20 janvier 2026
 """
 
+import calendar
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
 
 # Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
-def load_tracks() -> List[Dict]:
-    """Charge les pistes depuis chk-roon.json."""
-    with open(os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json"), 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data['tracks']
+sys.path.insert(0, PROJECT_ROOT)
+from src.models.repository import open_repository
+from src.models.history_store import ColumnarHistory, as_history, first_seen_counts, load_history, most_common_order
+from src.models.sessions import DEFAULT_GAP_MINUTES, key_transitions
 
-def detect_listening_sessions(tracks: List[Dict], gap_minutes: int = 30) -> List[List[Dict]]:
-    """
-    Détecte les sessions d'écoute continues.
-    Une session se termine si le gap entre deux pistes dépasse gap_minutes.
-    """
-    if not tracks:
-        return []
-    
-    # Trier par timestamp (du plus ancien au plus récent)
-    sorted_tracks = sorted(tracks, key=lambda t: t['timestamp'])
-    
-    sessions = []
-    current_session = [sorted_tracks[0]]
-    
-    for i in range(1, len(sorted_tracks)):
-        prev_time = sorted_tracks[i-1]['timestamp']
-        curr_time = sorted_tracks[i]['timestamp']
-        
-        # Calculer le gap en minutes
-        gap = (curr_time - prev_time) / 60
-        
-        if gap <= gap_minutes:
-            # Même session
-            current_session.append(sorted_tracks[i])
-        else:
-            # Nouvelle session
-            sessions.append(current_session)
-            current_session = [sorted_tracks[i]]
-    
-    # Ajouter la dernière session
-    if current_session:
-        sessions.append(current_session)
-    
-    return sessions
+def load_tracks() -> ColumnarHistory:
+    """Charge l'historique en colonnes depuis la base SQLite si elle est migrée, sinon depuis chk-roon.json."""
+    return load_history(json_path=os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json"),
+                        with_details=False)
 
-def estimate_session_duration(session: List[Dict], avg_track_duration: int = 4) -> int:
+def load_hour_counts() -> Optional[Dict[Tuple[str, int], int]]:
+    """Charge les comptages (jour, heure) pré-agrégés de la base SQLite, None si non migrée."""
+    repository = open_repository()
+    if repository and repository.has_plays():
+        return repository.play_counts_by_hour()
+    return None
+
+def estimate_session_duration(session, avg_track_duration: int = 4) -> int:
     """
     Estime la durée d'une session en minutes.
+    session: écoutes de la session (positions, liste ou historique)
     avg_track_duration: durée moyenne d'une piste en minutes (défaut: 4 min)
     """
-    if not session:
+    if len(session) == 0:
         return 0
     
     # Durée = nombre de pistes × durée moyenne
     return len(session) * avg_track_duration
 
-def detect_complete_albums(tracks: List[Dict], min_tracks: int = 5) -> Dict[str, int]:
+def album_keys(history: ColumnarHistory):
+    """Clé entière (artiste, album) de chaque écoute."""
+    return history.artist_ids.astype('int64') * len(history.albums) + history.album_ids
+
+def detect_complete_albums(tracks, min_tracks: int = 5) -> Dict[str, int]:
     """
     Détecte les albums potentiellement écoutés en entier.
     Un album est considéré "complet" s'il a au moins min_tracks écoutes.
     """
-    album_plays = Counter()
-    
-    for track in tracks:
-        album_key = f"{track['artist']} - {track['album']}"
-        album_plays[album_key] += 1
-    
-    # Filtrer les albums avec au moins min_tracks
-    complete_albums = {album: count for album, count in album_plays.items() 
-                      if count >= min_tracks}
-    
-    return dict(sorted(complete_albums.items(), key=lambda x: x[1], reverse=True))
+    history = as_history(tracks)
+    _, first, counts = first_seen_counts(album_keys(history))
+    
+    # Filtrer les albums avec au moins min_tracks, du plus écouté au moins écouté
+    complete_albums = {}
+    for i in most_common_order(counts):
+        if counts[i] < min_tracks:
+            break
+        play = first[i]
+        artist = history.artists.values[history.artist_ids[play]] or ''
+        album = history.albums.values[history.album_ids[play]] or ''
+        complete_albums[f"{artist} - {album}"] = int(counts[i])
+    
+    return complete_albums
 
-def analyze_artist_correlations(tracks: List[Dict]) -> Dict[str, List[Tuple[str, int]]]:
+def analyze_artist_correlations(tracks, gap_minutes: int = DEFAULT_GAP_MINUTES) -> Dict[str, List[Tuple[str, int]]]:
     """
     Analyse les corrélations entre artistes.
     Retourne pour chaque artiste, les artistes souvent écoutés dans la même session.
+    Les sessions sont celles, mises en cache, de l'historique (history.sessions()).
     """
-    sessions = detect_listening_sessions(tracks)
+    history = as_history(tracks)
+    pair_counts = history.sessions(gap_minutes).pair_counts(history.artist_ids)
     
     # Dictionnaire: artiste -> {autre_artiste: count}
     correlations = defaultdict(lambda: defaultdict(int))
-    
-    for session in sessions:
-        # Récupérer tous les artistes uniques de cette session
-        session_artists = list(set(t['artist'] for t in session))
-        
-        # Pour chaque paire d'artistes dans la session
-        for i, artist1 in enumerate(session_artists):
-            for artist2 in session_artists[i+1:]:
-                correlations[artist1][artist2] += 1
-                correlations[artist2][artist1] += 1
+    for (artist1, artist2), count in pair_counts.items():
+        correlations[artist1][artist2] += count
+        correlations[artist2][artist1] += count
     
     # Convertir en liste triée par fréquence
+    names = history.artists.values
     result = {}
     for artist, related in correlations.items():
-        result[artist] = sorted(related.items(), key=lambda x: x[1], reverse=True)[:5]
+        top = sorted(related.items(), key=lambda x: x[1], reverse=True)[:5]
+        result[names[artist] or ''] = [(names[other] or '', count) for other, count in top]
     
     return result
 
-def analyze_transitions(tracks: List[Dict]) -> Dict[str, List[Tuple[str, int]]]:
+def analyze_transitions(tracks) -> Dict[str, List[Tuple[str, int]]]:
     """
     Analyse les transitions fréquentes entre artistes.
     Retourne pour chaque artiste, les artistes écoutés juste après.
+    L'ordre chronologique est celui, mis en cache, de l'historique.
     """
-    # Trier par timestamp
-    sorted_tracks = sorted(tracks, key=lambda t: t['timestamp'])
-    
-    # Dictionnaire: artiste -> {artiste_suivant: count}
-    transitions = defaultdict(lambda: defaultdict(int))
-    
-    for i in range(len(sorted_tracks) - 1):
-        current_artist = sorted_tracks[i]['artist']
-        next_artist = sorted_tracks[i+1]['artist']
-        
-        # Ne compter que si l'artiste change
-        if current_artist != next_artist:
-            transitions[current_artist][next_artist] += 1
+    history = as_history(tracks)
+    transitions = key_transitions(history.artist_ids, history.time_order)
     
     # Convertir en liste triée par fréquence
+    names = history.artists.values
     result = {}
     for artist, nexts in transitions.items():
-        result[artist] = sorted(nexts.items(), key=lambda x: x[1], reverse=True)[:5]
+        top = sorted(nexts.items(), key=lambda x: x[1], reverse=True)[:5]
+        result[names[artist] or ''] = [(names[other] or '', count) for other, count in top]
     
     return result
 
-def analyze_time_patterns(tracks: List[Dict]) -> Dict[str, any]:
-    """Analyse les patterns temporels d'écoute."""
-    hours = []
-    days = []
-    
-    for track in tracks:
-        dt = datetime.fromtimestamp(track['timestamp'])
-        hours.append(dt.hour)
-        days.append(dt.strftime('%A'))
+def analyze_time_patterns(tracks,
+                          hour_counts: Optional[Dict[Tuple[str, int], int]] = None) -> Dict[str, any]:
+    """
+    Analyse les patterns temporels d'écoute.
+    hour_counts: comptages (jour, heure) pré-agrégés (tables rollup_* de la base
+    SQLite); s'ils sont fournis, les pistes ne sont pas parcourues.
+    """
+    hour_distribution = Counter()
+    day_distribution = Counter()
     
-    hour_distribution = Counter(hours)
-    day_distribution = Counter(days)
+    if hour_counts is not None:
+        for (day, hour), count in hour_counts.items():
+            hour_distribution[hour] += count
+            day_distribution[datetime.strptime(day, '%Y-%m-%d').strftime('%A')] += count
+    else:
+        history = as_history(tracks)
+        for hour, _, count in zip(*first_seen_counts(history.hours)):
+            hour_distribution[int(hour)] = int(count)
+        for weekday, _, count in zip(*first_seen_counts(history.weekdays)):
+            day_distribution[calendar.day_name[weekday]] = int(count)
     
     return {
         'peak_hour': hour_distribution.most_common(1)[0] if hour_distribution else None,
@@ -159,8 +149,10 @@ def analyze_time_patterns(tracks: List[Dict]) -> Dict[str, any]:
         'day_distribution': day_distribution
     }
 
-def generate_report(tracks: List[Dict]) -> str:
+def generate_report(tracks,
+                    hour_counts: Optional[Dict[Tuple[str, int], int]] = None) -> str:
     """Génère un rapport complet d'analyse des patterns."""
+    tracks = as_history(tracks)
     report = []
     report.append("=" * 80)
     report.append("📊 ANALYSE DES PATTERNS D'ÉCOUTE")
@@ -170,19 +162,19 @@ def generate_report(tracks: List[Dict]) -> str:
     # 1. Sessions d'écoute
     report.append("🎵 SESSIONS D'ÉCOUTE")
     report.append("-" * 80)
-    sessions = detect_listening_sessions(tracks)
+    sessions = tracks.sessions()
     report.append(f"Nombre total de sessions : {len(sessions)}")
-    report.append(f"Sessions de plus de 10 pistes : {sum(1 for s in sessions if len(s) >= 10)}")
+    report.append(f"Sessions de plus de 10 pistes : {int((sessions.lengths >= 10).sum())}")
     
     # Top 5 plus longues sessions
-    sorted_sessions = sorted(sessions, key=len, reverse=True)[:5]
     report.append("\nTop 5 sessions les plus longues :")
-    for i, session in enumerate(sorted_sessions, 1):
+    for i, number in enumerate(sessions.longest(5), 1):
+        session = sessions.positions(number)
         duration = estimate_session_duration(session)
-        start_time = datetime.fromtimestamp(session[0]['timestamp']).strftime('%Y-%m-%d %H:%M')
+        start_time = datetime.fromtimestamp(int(tracks.timestamps[session[0]])).strftime('%Y-%m-%d %H:%M')
         report.append(f"  {i}. {len(session)} pistes (~{duration} min) - Début: {start_time}")
         # Afficher les 3 premiers artistes de la session
-        artists = [t['artist'] for t in session[:3]]
+        artists = [tracks.artists.values[artist_id] or '' for artist_id in tracks.artist_ids[session[:3]]]
         report.append(f"     Artistes: {', '.join(set(artists))[:70]}...")
     
     report.append("")
@@ -202,7 +194,7 @@ def generate_report(tracks: List[Dict]) -> str:
     # 3. Patterns temporels
     report.append("⏰ PATTERNS TEMPORELS")
     report.append("-" * 80)
-    time_patterns = analyze_time_patterns(tracks)
+    time_patterns = analyze_time_patterns(tracks, hour_counts)
     
     if time_patterns['peak_hour']:
         peak_hour, count = time_patterns['peak_hour']
@@ -277,9 +269,9 @@ def generate_report(tracks: List[Dict]) -> str:
     report.append("📈 RÉSUMÉ STATISTIQUE")
     report.append("-" * 80)
     total_duration = estimate_session_duration(tracks)
-    avg_session_length = sum(len(s) for s in sessions) / len(sessions) if sessions else 0
-    unique_artists = len(set(t['artist'] for t in tracks))
-    unique_albums = len(set(f"{t['artist']} - {t['album']}" for t in tracks))
+    avg_session_length = int(sessions.lengths.sum()) / len(sessions) if len(sessions) else 0
+    unique_artists = len(np.unique(tracks.artist_ids))
+    unique_albums = len(np.unique(album_keys(tracks)))
     
     report.append(f"Durée totale estimée : ~{total_duration} minutes (~{total_duration//60}h{total_duration%60}min)")
     report.append(f"Durée moyenne par session : ~{int(avg_session_length * 4)} minutes")
@@ -308,7 +300,7 @@ def main():
     print("🔍 Analyse des patterns en cours...\n")
     
     # Générer le rapport
-    report = generate_report(tracks)
+    report = generate_report(tracks, load_hour_counts())
     
     # Afficher le rapport
     print(report)
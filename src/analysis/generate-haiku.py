@@ -48,6 +48,7 @@ Date: 21 janvier 2026
 
 import random
 import os
+import sys
 import requests
 import time
 import json
@@ -307,6 +308,9 @@ def generate_haiku_from_artist_and_album(artist: str, album: str) -> str:
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+from models.history_log import load_history_file
+
 # Charger les variables d'environnement
 load_dotenv(os.path.join(PROJECT_ROOT, "data", "config", ".env"))
 
@@ -320,9 +324,8 @@ DEFAULT_ERROR_MESSAGE = os.getenv("default_error_message", "Aucune information d
 with open(os.path.join(PROJECT_ROOT, "data", "collection", "discogs-collection.json"), 'r', encoding='utf-8') as f:
     data = json.load(f)
 
-# Charger le fichier JSON Roon
-with open(os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json"), 'r', encoding='utf-8') as f:
-    roon_data = json.load(f)
+# Charger l'historique Roon (chk-roon.json, ou son journal chk-roon.log/)
+roon_data = load_history_file(os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json"))
 
 # Sélectionner 10 albums aléatoires de Discogs
 random_albums_discogs = secrets.SystemRandom().sample(data, 10)
@@ -60,8 +60,14 @@ Utilisation:
     # (automatique via chk-roon.py)
 
 Auteur: Patrick Ostertag
-Version: 1.2.0
-Date: 27 janvier 2026
+Version: 1.3.0
+Date: 28 janvier 2026
+
+Changelog v1.3.0:
+    - Historique chargé en colonnes (src.models.history_store): mémoire réduite
+    - Filtres horaires, albums complets et redécouverte vectorisés
+    - Sessions et ordre chronologique partagés (src.models.sessions): calculés
+      une seule fois par historique pour tous les algorithmes
 
 Changelog v1.2.0:
     - Ajout de la détection et suppression automatique des doublons
@@ -79,6 +85,8 @@ from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from collections import Counter, defaultdict
 
+import numpy as np
+
 # Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
@@ -87,6 +95,9 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 sys.path.insert(0, PROJECT_ROOT)
 from src.services.ai_service import generate_ai_playlist
 from src.services.metadata_cleaner import normalize_string_for_comparison
+from src.models.repository import COLLECTION_SOURCES, open_repository
+from src.models.history_store import ColumnarHistory, as_history, first_seen_counts, load_history, most_common_order
+from src.models.sessions import key_transitions
 
 # Chemins des fichiers
 ROON_HISTORY_PATH = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")
@@ -99,15 +110,16 @@ DEFAULT_ALGORITHM = "top_sessions"
 DEFAULT_OUTPUT_FORMATS = ["json", "m3u", "csv", "roon-txt"]
 
 
-def load_tracks() -> List[Dict]:
-    """Charge les pistes depuis chk-roon.json."""
-    with open(ROON_HISTORY_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data.get('tracks', [])
+def load_tracks() -> ColumnarHistory:
+    """Charge l'historique en colonnes depuis la base SQLite si elle est migrée, sinon depuis chk-roon.json."""
+    return load_history(json_path=ROON_HISTORY_PATH)
 
 
 def load_discogs_collection() -> List[Dict]:
-    """Charge la collection Discogs (optionnel)."""
+    """Charge la collection Discogs (optionnel), depuis SQLite si elle est migrée et à jour."""
+    repository = open_repository(sources=COLLECTION_SOURCES)
+    if repository and repository.count_albums():
+        return repository.get_albums()
     if os.path.exists(DISCOGS_COLLECTION_PATH):
         with open(DISCOGS_COLLECTION_PATH, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -155,139 +167,92 @@ def remove_duplicate_tracks(tracks: List[Dict]) -> List[Dict]:
     return unique_tracks
 
 
-def detect_listening_sessions(tracks: List[Dict], gap_minutes: int = 30) -> List[List[Dict]]:
-    """
-    Détecte les sessions d'écoute continues.
-    Une session se termine si le gap entre deux pistes dépasse gap_minutes.
-    """
-    if not tracks:
-        return []
-    
-    sorted_tracks = sorted(tracks, key=lambda t: t['timestamp'])
-    sessions = []
-    current_session = [sorted_tracks[0]]
-    
-    for i in range(1, len(sorted_tracks)):
-        prev_time = sorted_tracks[i-1]['timestamp']
-        curr_time = sorted_tracks[i]['timestamp']
-        gap = (curr_time - prev_time) / 60
-        
-        if gap <= gap_minutes:
-            current_session.append(sorted_tracks[i])
-        else:
-            sessions.append(current_session)
-            current_session = [sorted_tracks[i]]
-    
-    if current_session:
-        sessions.append(current_session)
-    
-    return sessions
-
-
-def generate_top_sessions_playlist(tracks: List[Dict], max_tracks: int) -> List[Dict]:
+def generate_top_sessions_playlist(tracks, max_tracks: int) -> List[Dict]:
     """
     Algorithme: TOP_SESSIONS
     Génère une playlist des pistes les plus fréquentes dans les sessions longues.
     """
-    sessions = detect_listening_sessions(tracks)
-    
-    # Trier les sessions par longueur (nombre de pistes)
-    long_sessions = sorted(sessions, key=len, reverse=True)[:10]
+    history = as_history(tracks)
+    sessions = history.sessions()
     
-    # Compter la fréquence des pistes dans ces sessions
-    track_frequency = Counter()
-    track_data = {}
-    
-    for session in long_sessions:
-        for track in session:
-            track_key = f"{track['artist']}||{track['title']}||{track['album']}"
-            track_frequency[track_key] += 1
-            if track_key not in track_data:
-                track_data[track_key] = track
-    
-    # Sélectionner les pistes les plus fréquentes
-    most_common = track_frequency.most_common(max_tracks)
-    playlist_tracks = [track_data[track_key] for track_key, _ in most_common]
+    # Les 10 sessions les plus longues, parcourues dans l'ordre
+    long_sessions = [sessions.positions(number) for number in sessions.longest(10)]
+    if not long_sessions:
+        return []
     
-    return playlist_tracks
+    # Sélectionner les pistes les plus fréquentes dans ces sessions
+    positions = np.concatenate(long_sessions)
+    return history.to_dicts(history.most_frequent_tracks(positions, max_tracks))
 
 
-def generate_artist_correlations_playlist(tracks: List[Dict], max_tracks: int) -> List[Dict]:
+def generate_artist_correlations_playlist(tracks, max_tracks: int) -> List[Dict]:
     """
     Algorithme: ARTIST_CORRELATIONS
     Génère une playlist d'artistes souvent écoutés ensemble.
     """
-    sessions = detect_listening_sessions(tracks)
+    history = as_history(tracks)
+    names = history.artists.values
     
-    # Analyser les corrélations entre artistes
+    # Analyser les corrélations entre artistes (sessions partagées)
     artist_pairs = defaultdict(int)
-    artist_tracks = defaultdict(list)
-    
-    for session in sessions:
-        session_artists = list(set(t['artist'] for t in session))
-        for track in session:
-            artist_tracks[track['artist']].append(track)
-        
-        # Compter les paires d'artistes
-        for i, artist1 in enumerate(session_artists):
-            for artist2 in session_artists[i+1:]:
-                pair = tuple(sorted([artist1, artist2]))
-                artist_pairs[pair] += 1
+    for (artist1, artist2), count in history.sessions().pair_counts(history.artist_ids).items():
+        pair = tuple(sorted([names[artist1] or '', names[artist2] or '']))
+        artist_pairs[pair] += count
     
     # Trouver les artistes les plus corrélés
     top_pairs = sorted(artist_pairs.items(), key=lambda x: x[1], reverse=True)[:5]
     
+    # Écoutes de chaque artiste par ordre chronologique
+    artist_ids = {name: artist_id for artist_id, name in enumerate(names) if name}
+    ordered_artists = history.artist_ids[history.time_order]
+    
+    def artist_tracks(artist: str, limit: int) -> List[Dict]:
+        artist_id = artist_ids.get(artist, 0)
+        return history.to_dicts(history.time_order[ordered_artists == artist_id][:limit])
+    
     # Sélectionner des pistes de ces artistes corrélés
     playlist_tracks = []
     for (artist1, artist2), _ in top_pairs:
         # Prendre quelques pistes de chaque artiste
         tracks_per_artist = max_tracks // (len(top_pairs) * 2)
-        playlist_tracks.extend(artist_tracks[artist1][:tracks_per_artist])
-        playlist_tracks.extend(artist_tracks[artist2][:tracks_per_artist])
+        playlist_tracks.extend(artist_tracks(artist1, tracks_per_artist))
+        playlist_tracks.extend(artist_tracks(artist2, tracks_per_artist))
     
     return playlist_tracks[:max_tracks]
 
 
-def generate_artist_flow_playlist(tracks: List[Dict], max_tracks: int) -> List[Dict]:
+def generate_artist_flow_playlist(tracks, max_tracks: int) -> List[Dict]:
     """
     Algorithme: ARTIST_FLOW
     Génère une playlist basée sur les transitions naturelles entre artistes.
     """
-    sorted_tracks = sorted(tracks, key=lambda t: t['timestamp'])
+    history = as_history(tracks)
     
-    # Analyser les transitions
-    transitions = defaultdict(lambda: defaultdict(int))
-    for i in range(len(sorted_tracks) - 1):
-        current_artist = sorted_tracks[i]['artist']
-        next_artist = sorted_tracks[i+1]['artist']
-        if current_artist != next_artist:
-            transitions[current_artist][next_artist] += 1
+    # Analyser les transitions (ordre chronologique mis en cache)
+    transitions = key_transitions(history.artist_ids, history.time_order)
     
     # Construire un flow naturel
     if not transitions:
-        return sorted_tracks[:max_tracks]
+        return history.to_dicts(history.time_order[:max_tracks])
     
     # Commencer avec l'artiste le plus fréquent
-    artist_counts = Counter(t['artist'] for t in tracks)
-    current_artist = artist_counts.most_common(1)[0][0]
+    artists, _, counts = first_seen_counts(history.artist_ids)
+    current_artist = int(artists[most_common_order(counts, 1)[0]])
     
     # Construire la playlist en suivant les transitions
     playlist_tracks = []
     used_artists = set()
-    artist_track_map = defaultdict(list)
-    for track in tracks:
-        artist_track_map[track['artist']].append(track)
     
     while len(playlist_tracks) < max_tracks and current_artist not in used_artists:
-        # Ajouter une piste de l'artiste actuel
-        if artist_track_map[current_artist]:
-            playlist_tracks.append(artist_track_map[current_artist][0])
-            artist_track_map[current_artist] = artist_track_map[current_artist][1:]
+        # Ajouter la première piste de l'artiste actuel (ordre de l'historique)
+        artist_positions = np.flatnonzero(history.artist_ids == current_artist)
+        if len(artist_positions):
+            playlist_tracks.append(history.play(int(artist_positions[0])))
         
         used_artists.add(current_artist)
         
         # Trouver le prochain artiste (transition la plus fréquente)
-        if current_artist in transitions and transitions[current_artist]:
+        if transitions.get(current_artist):
             next_artist = max(transitions[current_artist].items(), key=lambda x: x[1])[0]
             if next_artist not in used_artists:
                 current_artist = next_artist
@@ -310,42 +275,25 @@ def generate_time_based_playlist(tracks: List[Dict], max_tracks: int, time_filte
         - evening: Pistes du soir (18h-23h)
         - morning: Pistes du matin (6h-12h)
     """
-    time_filtered_tracks = []
-    
-    for track in tracks:
-        dt = datetime.fromtimestamp(track['timestamp'])
-        hour = dt.hour
-        weekday = dt.weekday()  # 0=Monday, 6=Sunday
-        
-        if time_filter == "peak_hours":
-            # Heures de pic (typiquement 18h-22h)
-            if 18 <= hour <= 22:
-                time_filtered_tracks.append(track)
-        elif time_filter == "weekend":
-            # Weekend
-            if weekday >= 5:  # Saturday=5, Sunday=6
-                time_filtered_tracks.append(track)
-        elif time_filter == "evening":
-            # Soirée (18h-23h)
-            if 18 <= hour <= 23:
-                time_filtered_tracks.append(track)
-        elif time_filter == "morning":
-            # Matin (6h-12h)
-            if 6 <= hour <= 12:
-                time_filtered_tracks.append(track)
+    history = as_history(tracks)
+    
+    if time_filter == "peak_hours":
+        # Heures de pic (typiquement 18h-22h)
+        mask = history.hour_mask(range(18, 23))
+    elif time_filter == "weekend":
+        # Weekend (Saturday=5, Sunday=6)
+        mask = history.weekday_mask((5, 6))
+    elif time_filter == "evening":
+        # Soirée (18h-23h)
+        mask = history.hour_mask(range(18, 24))
+    elif time_filter == "morning":
+        # Matin (6h-12h)
+        mask = history.hour_mask(range(6, 13))
+    else:
+        return []
     
     # Trier par fréquence
-    track_frequency = Counter()
-    track_data = {}
-    
-    for track in time_filtered_tracks:
-        track_key = f"{track['artist']}||{track['title']}||{track['album']}"
-        track_frequency[track_key] += 1
-        if track_key not in track_data:
-            track_data[track_key] = track
-    
-    most_common = track_frequency.most_common(max_tracks)
-    return [track_data[track_key] for track_key, _ in most_common]
+    return history.to_dicts(history.most_frequent_tracks(mask, max_tracks))
 
 
 def generate_complete_albums_playlist(tracks: List[Dict], max_tracks: int, min_album_tracks: int = 5) -> List[Dict]:
@@ -353,27 +301,19 @@ def generate_complete_albums_playlist(tracks: List[Dict], max_tracks: int, min_a
     Algorithme: COMPLETE_ALBUMS
     Génère une playlist d'albums écoutés en entier.
     """
-    album_plays = defaultdict(list)
-    
-    for track in tracks:
-        album_key = f"{track['artist']}||{track['album']}"
-        album_plays[album_key].append(track)
+    history = as_history(tracks)
+    album_keys = history.artist_ids.astype('int64') * len(history.albums) + history.album_ids
+    keys, _, counts = first_seen_counts(album_keys)
     
-    # Filtrer les albums avec au moins min_album_tracks
-    complete_albums = {album: tracks_list for album, tracks_list in album_plays.items() 
-                       if len(tracks_list) >= min_album_tracks}
-    
-    # Trier par nombre de pistes (albums les plus écoutés)
-    sorted_albums = sorted(complete_albums.items(), key=lambda x: len(x[1]), reverse=True)
-    
-    # Construire la playlist
+    # Construire la playlist, des albums les plus écoutés aux moins écoutés
     playlist_tracks = []
-    for album_key, album_tracks in sorted_albums:
-        if len(playlist_tracks) >= max_tracks:
+    for i in most_common_order(counts):
+        # Filtrer les albums avec au moins min_album_tracks
+        if counts[i] < min_album_tracks or len(playlist_tracks) >= max_tracks:
             break
         # Ajouter les premières pistes de l'album
         remaining = max_tracks - len(playlist_tracks)
-        playlist_tracks.extend(album_tracks[:remaining])
+        playlist_tracks.extend(history.to_dicts(np.flatnonzero(album_keys == keys[i])[:remaining]))
     
     return playlist_tracks
 
@@ -389,21 +329,11 @@ def generate_rediscovery_playlist(tracks: List[Dict], max_tracks: int, days_ago:
     cutoff_timestamp = cutoff_date.timestamp()
     
     # Trouver les pistes écoutées avant la date limite
-    old_tracks = [t for t in tracks if t['timestamp'] < cutoff_timestamp]
-    
-    # Trouver celles qui étaient fréquentes
-    track_frequency = Counter()
-    track_data = {}
-    
-    for track in old_tracks:
-        track_key = f"{track['artist']}||{track['title']}||{track['album']}"
-        track_frequency[track_key] += 1
-        if track_key not in track_data:
-            track_data[track_key] = track
+    history = as_history(tracks)
+    old_tracks = history.between(end=cutoff_timestamp)
     
     # Sélectionner les plus fréquentes
-    most_common = track_frequency.most_common(max_tracks)
-    return [track_data[track_key] for track_key, _ in most_common]
+    return history.to_dicts(history.most_frequent_tracks(old_tracks, max_tracks))
 
 
 def calculate_playlist_duration(playlist_tracks: List[Dict], avg_track_duration: int = 4) -> int:
@@ -13,6 +13,11 @@ Fonctionnalités principales:
     - Export Markdown avec images et liens
     - Détection de doublons pour éviter les réimports
     - Normalisation des formats de support (Vinyle/CD)
+    - Synchronisation en pipeline: pages, détails Discogs, recherche Spotify
+      et résumé IA sont des étapes parallèles, chacune limitée à sa propre
+      concurrence (DISCOGS_MAX_WORKERS, SPOTIFY_MAX_WORKERS, EURIA_MAX_WORKERS)
+    - Point de reprise (discogs-sync-checkpoint.json): après une interruption,
+      les étapes déjà terminées des releases en cours ne sont pas refaites
 
 Dépendances:
     - requests: Client HTTP pour appels API
@@ -32,33 +37,54 @@ Configuration requise (.env):
 Fichiers générés:
     - discogs-collection.json: Collection complète avec métadonnées
     - discogs-collection.md: Export Markdown formaté
+    - discogs-sync-checkpoint.json: Point de reprise (supprimé en fin de synchronisation)
 
 Exemple d'utilisation:
     $ python3 Read-discogs-ia.py
     # Synchronise la collection et génère les fichiers
 
 Auteur: Patrick Ostertag
-Date: 21 janvier 2026
-Version: 1.0
+Date: 28 janvier 2026
+Version: 1.1
 """
 
 # pip3 install requests
 import os
+import sys
 import requests
 import time
 import json
-import base64
 import re
-from typing import Tuple, Optional, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterator, Tuple, Optional, List
 from dotenv import load_dotenv
 
 # Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
-# Charger les variables d'environnement
+# Charger les variables d'environnement (avant constants: URLs des API lues à l'import)
 load_dotenv(os.path.join(PROJECT_ROOT, "data", "config", ".env"))
 
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+from constants import (
+    DISCOGS_API_BASE_URL,
+    DISCOGS_RATE_LIMIT,
+    DISCOGS_RATE_BURST,
+    DISCOGS_MAX_WORKERS,
+    DISCOGS_MAX_RETRIES,
+    DISCOGS_SYNC_WINDOW,
+    DISCOGS_CHECKPOINT_INTERVAL,
+    DISCOGS_SYNC_CHECKPOINT_FILENAME,
+    DISCOGS_WRITE_BATCH_SIZE,
+    EURIA_MAX_WORKERS,
+    SPOTIFY_MAX_WORKERS,
+    DEFAULT_HTTP_TIMEOUT,
+    DEFAULT_RETRY_DELAY,
+)
+from services.spotify_service import TokenBucket, get_shared_client
+
 # Vérifier les valeurs chargées
 URL = os.getenv("URL")
 BEARER = os.getenv("bearer")
@@ -66,8 +92,12 @@ MAX_ATTEMPTS = int(os.getenv("max_attempts", "5"))
 DEFAULT_ERROR_MESSAGE = os.getenv("default_error_message", "Aucune information disponible")
 DISCOGS_API_KEY = os.getenv("DISCOGS_API_KEY")
 DISCOGS_USERNAME = os.getenv("DISCOGS_USERNAME")
-SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+
+# Limiteur partagé par toutes les requêtes Discogs du processus (pages et détails)
+discogs_limiter = TokenBucket(DISCOGS_RATE_LIMIT, DISCOGS_RATE_BURST)
+
+# Pause imposée à toutes les requêtes Discogs après un HTTP 429 sans Retry-After (secondes)
+DISCOGS_RATE_LIMIT_PAUSE = 10
 
 def nettoyer_nom_artiste(nom_artiste: str) -> str:
     """Nettoie un nom d'artiste en supprimant les suffixes numériques Discogs.
@@ -90,71 +120,18 @@ def nettoyer_nom_artiste(nom_artiste: str) -> str:
     # Utilise une expression régulière pour supprimer le motif "(chiffre)" à la fin de la chaîne
     return re.sub(r'\s*\(\d+\)$', '', nom_artiste)
 
-# Identifiants Spotify
-def get_spotify_access_token() -> Optional[str]:
-    """Récupère un token d'accès Spotify via OAuth 2.0 Client Credentials Flow.
-    
-    Utilise les credentials SPOTIFY_CLIENT_ID et SPOTIFY_CLIENT_SECRET
-    pour obtenir un token d'accès via l'API Spotify. Le token est nécessaire
-    pour effectuer des recherches d'albums et récupérer les métadonnées.
-    
-    Returns:
-        Token d'accès Spotify (string) si succès, None en cas d'échec.
-        
-    Raises:
-        Aucune - Les exceptions sont capturées et None est retourné.
-        
-    Note:
-        - Nécessite SPOTIFY_CLIENT_ID et SPOTIFY_CLIENT_SECRET dans .env
-        - Le token expire après 1 heure (géré par Spotify)
-        - Affiche les erreurs sur stdout en cas de problème
-        
-    Examples:
-        >>> token = get_spotify_access_token()
-        >>> if token:
-        ...     print("Token obtenu avec succès")
-    """
-    url = 'https://accounts.spotify.com/api/token'
-    headers = {}
-    data = {'grant_type': "client_credentials"}
-    auth_string = f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}"
-    auth_bytes = auth_string.encode('utf-8')
-    auth_base64 = str(base64.b64encode(auth_bytes), 'utf-8')
-    headers['Authorization'] = "Basic " + auth_base64
-    try:
-        response = requests.post(url, headers=headers, data=data)
-        response.raise_for_status()
-        response_data = response.json()
-        if 'access_token' not in response_data:
-            print("Erreur : La réponse ne contient pas 'access_token'.")
-            print("Réponse complète :", response_data)
-            return None
-        return response_data['access_token']
-    except requests.exceptions.RequestException as e:
-        print(f"Erreur lors de la requête : {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print("Réponse d'erreur :", e.response.text)
-        return None
-
-def spotify_search_album(
-    artist: str,
-    album: str,
-    access_token: str,
-    max_retries: int = 5,
-    retry_delay: float = 1.0
-) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+def spotify_search_album(artist: str, album: str) -> Tuple[Optional[str], Optional[int], Optional[str]]:
     """Recherche un album sur Spotify et retourne ses métadonnées.
     
-    Effectue une recherche d'album sur Spotify avec validation de l'artiste,
-    gestion des retries et fallback. Retourne l'URL Spotify, l'année de sortie
-    et l'URL de la pochette.
+    Passe par le client Spotify partagé du processus (src/services/spotify_service.py):
+    token, cache persistant, limiteur de débit et connexions sont communs à
+    toutes les recherches. La recherche valide l'artiste et note la
+    correspondance du titre, avec fallback sur le titre seul; l'identifiant
+    de l'album trouvé est mémorisé pour les relectures suivantes.
     
     Args:
         artist: Nom de l'artiste à rechercher.
         album: Titre de l'album à rechercher.
-        access_token: Token d'accès Spotify valide.
-        max_retries: Nombre maximum de tentatives en cas d'échec (défaut: 5).
-        retry_delay: Délai en secondes entre les tentatives (défaut: 1.0).
         
     Returns:
         Tuple de 3 éléments:
@@ -163,83 +140,24 @@ def spotify_search_album(
             - URL de la pochette (str ou None)
         Retourne (None, None, None) si aucun résultat trouvé.
         
-    Note:
-        - Effectue d'abord une recherche avec artiste + album
-        - Fallback sur recherche album seul si échec
-        - Valide que l'artiste correspond (sauf "Various Artists")
-        - Gère automatiquement les retries en cas d'erreur réseau
-        
     Examples:
-        >>> token = get_spotify_access_token()
-        >>> url, year, cover = spotify_search_album("Miles Davis", "Kind of Blue", token)
+        >>> url, year, cover = spotify_search_album("Miles Davis", "Kind of Blue")
         >>> print(f"Album trouvé: {url}, année {year}")
     """
-    if not access_token:
-        print("Erreur : Impossible de rechercher sans jeton d'accès.")
+    album_data = get_shared_client().album_details(artist, album)
+    if not album_data:
+        print(f"Aucun résultat Spotify pour {artist} - {album}.")
         return None, None, None
-    url = "https://api.spotify.com/v1/search"
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    def _search(query: str) -> Tuple[Optional[str], Optional[int], Optional[str]]:
-        search_url = f"{url}?{query}"
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(search_url, headers=headers)
-                response.raise_for_status()
-                response_data = response.json()
-                albums = response_data.get('albums', {}).get('items', [])
-                if albums:
-                    album_data = albums[0]
-                    album_artists = album_data.get('artists', [])
-                    
-                    if not album_artists :
-                        print(f"Erreur : L'artiste de l'album trouvé ({album_artists[0]['name']}) ne correspond pas à {artist}.")
-                        return None, None, None
-                    
-                    if album_artists[0]['name'].lower() != artist.lower():
-                         
-                        if artist.lower().startswith("various"):
-                            pass
-                        else:
-                            print(f"Erreur : L'artiste de l'album trouvé ({album_artists[0]['name']}) ne correspond pas à {artist}.")
-                            return None, None, None
-
-                    album_url = album_data['external_urls']['spotify']
-                    album_date = album_data.get('release_date', '')
-                    
-                    if not album_date:
-                        print("Erreur : Date de sortie non disponible.")
-                        return None, None, None
-                    try:
-                        album_annee = int(album_date.split('-')[0])
-                    except (ValueError, IndexError):
-                        print(f"Erreur : Format de date invalide pour {album_date}.")
-                        return None, None, None
-                    images = album_data.get('images', [])
-                    spotify_cover_url = images[0]['url'] if images else None
-                    return album_url, album_annee, spotify_cover_url
-                return None, None, None
-            except requests.exceptions.RequestException as e:
-                if attempt < max_retries - 1:
-                    print(f"Tentative {attempt + 1}/{max_retries} échouée. Nouvelle tentative dans {retry_delay} secondes...")
-                    time.sleep(retry_delay)
-                    continue
-                else:
-                    print(f"Erreur lors de la recherche (tentative {attempt + 1}/{max_retries}) : {e}")
-                    if hasattr(e, 'response') and e.response is not None:
-                        print("Réponse d'erreur :", e.response.text)
-                    return None, None, None
-            except (KeyError, IndexError, ValueError) as e:
-                print(f"Erreur de traitement des données : {e}")
-                return None, None, None
-
-    query = f"q=artist:{artist}%20album:{album}&type=album&limit=1"
-    result = _search(query)
-    if result[0] is not None:
-        return result
-    print(f"Aucun résultat trouvé pour {artist} - {album}. Recherche uniquement sur le nom de l'album...")
-    query = f"q=album:{album}&type=album&limit=1"
-    return _search(query)
+    
+    album_url = album_data.get('external_urls', {}).get('spotify')
+    try:
+        album_annee = int(album_data.get('release_date', '').split('-')[0])
+    except ValueError:
+        print(f"Erreur : Date de sortie non disponible pour {artist} - {album}.")
+        return None, None, None
+    images = album_data.get('images', [])
+    spotify_cover_url = images[0]['url'] if images else None
+    return album_url, album_annee, spotify_cover_url
 
 def generate_markdown_from_json(json_path: str = None, output_md_path: str = None) -> bool:
     """Génère un fichier Markdown formaté depuis la collection JSON.
@@ -398,6 +316,133 @@ def album_existe(albums: List[dict], release_id: int) -> bool:
     """
     return any(str(album.get('release_id')) == str(release_id) for album in albums)
 
+def nouvel_album(
+    release_id: int,
+    titre: str,
+    artiste: List[str],
+    annee: int,
+    labels: List[str],
+    support: str,
+    pochette: str,
+    resume: str,
+    spotify_url: Optional[str] = None,
+    spotify_date: Optional[int] = None,
+    spotify_cover_url: Optional[str] = None
+) -> dict:
+    """Construit l'entrée d'un album au format de discogs-collection.json.
+    
+    Returns:
+        Dictionnaire de l'album (ordre des clés attendu par la GUI).
+    """
+    return {
+        "release_id": release_id,
+        "Titre": titre,
+        "Artiste": artiste,
+        "Année": annee,
+        "Labels": labels,
+        "Support": support,
+        "Pochette": pochette,
+        "Resume": resume,
+        "Spotify_URL": spotify_url,
+        "Spotify_Date": spotify_date,
+        "Spotify_Cover_URL": spotify_cover_url
+    }
+
+class CollectionWriter:
+    """Écriture groupée et atomique de discogs-collection.json.
+    
+    La collection est lue une seule fois; les release_id connus sont gardés
+    dans un ensemble (test de doublon en O(1)) et les nouveaux albums sont
+    accumulés puis écrits tous les batch_size albums, ou à la fin (flush,
+    sortie du bloc with). Chaque écriture passe par un fichier temporaire
+    renommé sur la collection: un arrêt brutal laisse l'ancienne ou la
+    nouvelle version, jamais un fichier tronqué.
+    
+    Le format reste celui de ajouter_album (indent=4, ensure_ascii=False):
+    le fichier produit est identique octet pour octet.
+    
+    Attributes:
+        fichier: Chemin de discogs-collection.json.
+        batch_size: Nombre d'albums accumulés avant écriture.
+        albums: Albums de la collection (écrits et en attente).
+        release_ids: release_id (str) de tous les albums.
+        pending: Albums ajoutés depuis la dernière écriture.
+    
+    Examples:
+        >>> with CollectionWriter() as writer:
+        ...     if 123456 not in writer:
+        ...         writer.ajouter(nouvel_album(123456, "Kind of Blue", ["Miles Davis"], ...))
+    """
+    
+    def __init__(self, fichier: str = None, batch_size: int = DISCOGS_WRITE_BATCH_SIZE):
+        """Charge la collection existante.
+        
+        Args:
+            fichier: Chemin du fichier JSON (défaut: 'discogs-collection.json').
+            batch_size: Nombre d'albums accumulés avant écriture.
+        """
+        if fichier is None:
+            fichier = os.path.join(PROJECT_ROOT, "data", "collection", "discogs-collection.json")
+        self.fichier = fichier
+        self.batch_size = max(1, batch_size)
+        self.albums = lire_albums(fichier)
+        self.release_ids = {str(album.get('release_id')) for album in self.albums}
+        self.pending: List[dict] = []
+    
+    def __contains__(self, release_id) -> bool:
+        return str(release_id) in self.release_ids
+    
+    def ajouter(self, album: dict) -> bool:
+        """Ajoute un album (écrit avec le lot en cours).
+        
+        Args:
+            album: Entrée construite par nouvel_album().
+            
+        Returns:
+            True si l'album a été ajouté, False s'il existe déjà.
+        """
+        if album["release_id"] in self:
+            print(f"L'album avec l'ID {album['release_id']} existe déjà. Aucun ajout effectué.")
+            return False
+        self.albums.append(album)
+        self.release_ids.add(str(album["release_id"]))
+        self.pending.append(album)
+        print(f"L'album '{album['Titre']}' a été ajouté avec succès.")
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return True
+    
+    def flush(self) -> bool:
+        """Écrit la collection si des albums sont en attente.
+        
+        Returns:
+            True si la collection est à jour sur disque, False si l'écriture
+            a échoué (les albums restent en attente).
+        """
+        if not self.pending:
+            return True
+        temp_path = f"{self.fichier}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.albums, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.fichier)
+        except PermissionError:
+            print(f"Erreur : Permission refusée pour écrire dans le fichier {self.fichier}.")
+            return False
+        except Exception as e:
+            print(f"Erreur inattendue lors de l'écriture du fichier : {e}")
+            return False
+        self.pending = []
+        return True
+    
+    def __enter__(self) -> 'CollectionWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
 def ajouter_album(
     release_id: int,
     titre: str,
@@ -417,6 +462,10 @@ def ajouter_album(
     Vérifie d'abord si l'album existe déjà (via release_id), puis l'ajoute
     au fichier JSON avec toutes ses métadonnées.
     
+    Note:
+        Relit et réécrit toute la collection: pour plusieurs albums, utiliser
+        CollectionWriter (une lecture, écritures groupées).
+    
     Args:
         release_id: ID unique Discogs de l'album.
         titre: Titre de l'album.
@@ -447,37 +496,10 @@ def ajouter_album(
         ...     resume="Album emblématique..."
         ... )
     """
-    if fichier is None:
-        fichier = os.path.join(PROJECT_ROOT, "data", "collection", "discogs-collection.json")
-    albums = lire_albums(fichier)
-    if album_existe(albums, release_id):
-        print(f"L'album avec l'ID {release_id} existe déjà. Aucun ajout effectué.")
-        return False
-    nouvel_album = {
-        "release_id": release_id,
-        "Titre": titre,
-        "Artiste": artiste,
-        "Année": annee,
-        "Labels": labels,
-        "Support": support,
-        "Pochette": pochette,
-        "Resume": resume,
-        "Spotify_URL": spotify_url,
-        "Spotify_Date": spotify_date,
-        "Spotify_Cover_URL": spotify_cover_url
-    }
-    albums.append(nouvel_album)
-    try:
-        with open(fichier, 'w', encoding='utf-8') as f:
-            json.dump(albums, f, indent=4, ensure_ascii=False)
-        print(f"L'album '{titre}' a été ajouté avec succès.")
-        return True
-    except PermissionError:
-        print(f"Erreur : Permission refusée pour écrire dans le fichier {fichier}.")
-        return False
-    except Exception as e:
-        print(f"Erreur inattendue lors de l'écriture du fichier : {e}")
-        return False
+    writer = CollectionWriter(fichier, batch_size=1)
+    album = nouvel_album(release_id, titre, artiste, annee, labels, support, pochette, resume,
+                         spotify_url, spotify_date, spotify_cover_url)
+    return writer.ajouter(album) and not writer.pending
     
 def ask_for_ia(prompt: str, max_attempts: int = 3, timeout: int = 60) -> str:
     """
@@ -559,6 +581,50 @@ def askForResume(artist: str, album: str, annee: int) -> str:
         """
     return (ask_for_ia(prompt_for_ia))
 
+def discogs_get(url: str, api_key: str, description: str) -> Optional[dict]:
+    """GET Discogs limité, avec délai maximal et nombre de tentatives borné.
+    
+    Args:
+        url: URL complète de l'API Discogs.
+        api_key: Clé API Discogs.
+        description: Ressource demandée, pour les messages d'erreur.
+        
+    Returns:
+        Réponse JSON, ou None si erreur ou après DISCOGS_MAX_RETRIES tentatives.
+        
+    Note:
+        - Sur HTTP 429, suspend toutes les requêtes Discogs pendant la durée
+          de l'en-tête Retry-After (DISCOGS_RATE_LIMIT_PAUSE s'il est absent)
+        - Les erreurs réseau (dont le délai dépassé) sont réessayées avec
+          un délai croissant
+    """
+    headers = {
+        "Authorization": f"Discogs key={api_key}",
+        "User-Agent": "YourAppName/1.0"
+    }
+    for attempt in range(DISCOGS_MAX_RETRIES):
+        discogs_limiter.acquire()
+        try:
+            response = requests.get(url, headers=headers, timeout=DEFAULT_HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"Erreur réseau pour {description} ({attempt + 1}/{DISCOGS_MAX_RETRIES}) : {e}")
+            time.sleep(DEFAULT_RETRY_DELAY * 2 ** attempt)
+            continue
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code != 429:
+            print(f"Erreur {response.status_code} pour {description}")
+            return None
+        try:
+            delay = max(0.0, float(response.headers.get("Retry-After")))
+        except (TypeError, ValueError):
+            delay = DISCOGS_RATE_LIMIT_PAUSE
+        print(f"Limite de taux atteinte. Attente de {delay:.0f}s avant nouvelle tentative "
+              f"({attempt + 1}/{DISCOGS_MAX_RETRIES})...")
+        discogs_limiter.pause(delay)
+    print(f"Abandon après {DISCOGS_MAX_RETRIES} tentatives pour {description}")
+    return None
+
 def get_collection(username: str, api_key: str, page: int = 1) -> Optional[dict]:
     """Récupère une page de la collection Discogs d'un utilisateur.
     
@@ -573,23 +639,17 @@ def get_collection(username: str, api_key: str, page: int = 1) -> Optional[dict]
     Note:
         - Récupère 100 albums par page maximum
         - Nécessite authentification via clé API
+        - Débit limité par discogs_limiter (partagé entre threads)
+        - Sur HTTP 429, suspend toutes les requêtes Discogs puis réessaye
+          (au plus DISCOGS_MAX_RETRIES tentatives, voir discogs_get)
         
     Examples:
         >>> data = get_collection("username", "api_key", page=1)
         >>> if data:
         ...     print(f"{len(data['releases'])} albums sur cette page")
     """
-    url = f"https://api.discogs.com/users/{username}/collection/folders/0/releases?page={page}&per_page=100"
-    headers = {
-        "Authorization": f"Discogs key={api_key}",
-        "User-Agent": "YourAppName/1.0"
-    }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Erreur {response.status_code} lors de la récupération de la collection.")
-        return None
+    url = f"{DISCOGS_API_BASE_URL}/users/{username}/collection/folders/0/releases?page={page}&per_page=100"
+    return discogs_get(url, api_key, f"la page {page} de la collection")
 
 def get_release_details(release_id: int, api_key: str) -> Optional[dict]:
     """Récupère les détails complets d'une release Discogs.
@@ -602,8 +662,9 @@ def get_release_details(release_id: int, api_key: str) -> Optional[dict]:
         Dictionnaire contenant les détails complets, ou None si erreur.
         
     Note:
-        - Gère automatiquement le rate limiting (HTTP 429)
-        - Attend 10 secondes et réessaye si limite atteinte
+        - Débit limité par discogs_limiter (partagé entre threads)
+        - Sur HTTP 429, suspend toutes les requêtes Discogs (Retry-After) et
+          réessaye, au plus DISCOGS_MAX_RETRIES tentatives (voir discogs_get)
         - Inclut les images, tracklist, crédits, etc.
         
     Examples:
@@ -611,28 +672,14 @@ def get_release_details(release_id: int, api_key: str) -> Optional[dict]:
         >>> if details:
         ...     print(details.get('title'))
     """
-    url = f"https://api.discogs.com/releases/{release_id}"
-    headers = {
-        "Authorization": f"Discogs key={api_key}",
-        "User-Agent": "YourAppName/1.0"
-    }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    elif response.status_code == 429:
-        print("Limite de taux atteinte. Attente avant nouvelle tentative...")
-        time.sleep(10)
-        return get_release_details(release_id, api_key)
-    else:
-        print(f"Erreur {response.status_code} pour l'ID {release_id}")
-        return None
+    url = f"{DISCOGS_API_BASE_URL}/releases/{release_id}"
+    return discogs_get(url, api_key, f"l'ID {release_id}")
 
 def get_all_releases(username: str, api_key: str) -> List[dict]:
     """Récupère l'intégralité de la collection Discogs d'un utilisateur.
     
-    Parcourt toutes les pages de la collection jusqu'à épuisement.
-    Ajoute un délai de 1 seconde entre chaque page pour respecter
-    les limites de taux de l'API Discogs.
+    Parcourt toutes les pages de la collection jusqu'à épuisement, une
+    par une. Le débit est régulé par discogs_limiter.
     
     Args:
         username: Nom d'utilisateur Discogs.
@@ -644,7 +691,7 @@ def get_all_releases(username: str, api_key: str) -> List[dict]:
     Note:
         - Peut prendre plusieurs minutes pour les grandes collections
         - Affiche la progression dans la fonction appelante
-        - Respecte le rate limiting avec sleep(1) entre pages
+        - DiscogsSync.releases() récupère les pages en parallèle
         
     Examples:
         >>> releases = get_all_releases("username", "api_key")
@@ -661,7 +708,6 @@ def get_all_releases(username: str, api_key: str) -> List[dict]:
             break
         all_releases.extend(releases)
         page += 1
-        time.sleep(1)
     return all_releases
 
 def support_from_basic_info(basic_info: dict) -> str:
@@ -700,13 +746,306 @@ def support_from_basic_info(basic_info: dict) -> str:
         support = f"{support} (x{qty})"
     return support
 
+class DiscogsSync:
+    """Synchronisation en pipeline de la collection Discogs.
+    
+    Les pages de la collection sont récupérées en parallèle; chaque release
+    absente de la collection locale passe par trois étapes indépendantes,
+    chacune exécutée par le pool de son API:
+    
+        - details: détails Discogs (pochette)        → pool Discogs
+        - spotify: recherche de l'album sur Spotify  → pool Spotify
+        - resume: résumé de l'album par l'IA         → pool EurIA
+    
+    Au plus window releases sont en cours à la fois (contre-pression sur la
+    lecture des pages). Dès que les trois étapes d'une release sont
+    terminées, l'album est ajouté à la collection (CollectionWriter: écritures
+    groupées par lots de write_batch_size albums).
+    
+    Le point de reprise mémorise le résultat des étapes terminées des
+    releases en cours et des albums pas encore écrits: après une
+    interruption, une nouvelle exécution ne refait que les étapes manquantes
+    (les albums déjà écrits sont ignorés via la collection). Il est supprimé
+    en fin de synchronisation.
+    
+    Attributes:
+        username: Utilisateur Discogs.
+        api_key: Clé API Discogs.
+        collection_path: Fichier discogs-collection.json.
+        checkpoint_path: Fichier du point de reprise.
+        stats: Compteurs de la dernière exécution (total, existing, added,
+            failed, resumed_stages).
+    """
+    
+    STAGES = ('details', 'spotify', 'resume')
+    
+    def __init__(
+        self,
+        username: str,
+        api_key: str,
+        collection_path: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        discogs_workers: int = DISCOGS_MAX_WORKERS,
+        spotify_workers: int = SPOTIFY_MAX_WORKERS,
+        ai_workers: int = EURIA_MAX_WORKERS,
+        window: int = DISCOGS_SYNC_WINDOW,
+        write_batch_size: int = DISCOGS_WRITE_BATCH_SIZE
+    ):
+        """Prépare la synchronisation.
+        
+        Args:
+            username: Utilisateur Discogs.
+            api_key: Clé API Discogs.
+            collection_path: Collection JSON (défaut: data/collection/discogs-collection.json).
+            checkpoint_path: Point de reprise (défaut: data/collection/discogs-sync-checkpoint.json).
+            discogs_workers: Requêtes Discogs simultanées.
+            spotify_workers: Recherches Spotify simultanées.
+            ai_workers: Résumés IA simultanés.
+            window: Nombre maximal de releases en cours.
+            write_batch_size: Albums accumulés avant réécriture de la collection.
+        """
+        collection_dir = os.path.join(PROJECT_ROOT, "data", "collection")
+        self.username = username
+        self.api_key = api_key
+        self.collection_path = collection_path or os.path.join(collection_dir, "discogs-collection.json")
+        self.checkpoint_path = checkpoint_path or os.path.join(collection_dir, DISCOGS_SYNC_CHECKPOINT_FILENAME)
+        self.workers = {'discogs': discogs_workers, 'spotify': spotify_workers, 'ai': ai_workers}
+        self.window = window
+        self.write_batch_size = write_batch_size
+        self.unflushed: List[str] = []
+        self.partial: Dict[str, dict] = {}
+        self.stats: Dict[str, int] = {}
+        self.expected = 0
+        self._last_save = 0.0
+    
+    # ===== Point de reprise =====
+    
+    def load_checkpoint(self) -> Dict[str, dict]:
+        """Charge les résultats d'étapes d'une exécution interrompue.
+        
+        Returns:
+            Dictionnaire release_id (str) → {étape: résultat}. Vide si aucun
+            point de reprise, s'il est illisible ou s'il concerne un autre
+            utilisateur Discogs.
+        """
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if checkpoint.get('username') != self.username:
+            return {}
+        return checkpoint.get('partial', {})
+    
+    def save_checkpoint(self, force: bool = False):
+        """Écrit le point de reprise (fichier temporaire puis renommage atomique).
+        
+        Args:
+            force: Écrire même si la dernière sauvegarde date de moins de
+                DISCOGS_CHECKPOINT_INTERVAL secondes.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_save < DISCOGS_CHECKPOINT_INTERVAL:
+            return
+        checkpoint = {
+            'username': self.username,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'partial': self.partial,
+        }
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(temp_path, self.checkpoint_path)
+        self._last_save = now
+    
+    # ===== Étapes =====
+    
+    def releases(self, pool: ThreadPoolExecutor) -> Iterator[dict]:
+        """Releases de la collection Discogs, dans l'ordre des pages.
+        
+        La première page donne le nombre de pages; les suivantes sont
+        demandées toutes ensemble au pool Discogs (débit régulé par
+        discogs_limiter) et lues dans l'ordre. Une page en erreur (après
+        DISCOGS_MAX_RETRIES tentatives) est comptée dans stats['failed']:
+        la synchronisation n'est pas complète et le point de reprise est gardé.
+        
+        Args:
+            pool: Pool de threads Discogs.
+            
+        Yields:
+            Release Discogs (avec basic_information).
+        """
+        first = get_collection(self.username, self.api_key, 1)
+        if not first:
+            print("Page 1 de la collection Discogs en erreur : synchronisation incomplète")
+            self.stats['failed'] += 1
+            return
+        pages = first.get('pagination', {}).get('pages', 1)
+        self.expected = first.get('pagination', {}).get('items', len(first.get('releases', [])))
+        futures = [pool.submit(get_collection, self.username, self.api_key, page) for page in range(2, pages + 1)]
+        yield from first.get('releases', [])
+        for page, future in enumerate(futures, start=2):
+            collection = future.result()
+            if collection:
+                yield from collection.get('releases', [])
+            else:
+                print(f"Page {page}/{pages} de la collection Discogs en erreur : "
+                      f"ses releases seront examinées à la prochaine exécution")
+                self.stats['failed'] += 1
+    
+    def _details(self, basic_info: dict) -> str:
+        release_details = get_release_details(basic_info['id'], self.api_key)
+        if not release_details:
+            return 'Aucune image disponible'
+        return release_details.get('images', [{}])[0].get('uri', 'Aucune image disponible')
+    
+    def _spotify(self, basic_info: dict) -> list:
+        artist_name = nettoyer_nom_artiste(basic_info['artists'][0]['name'])
+        return list(spotify_search_album(artist_name, basic_info['title']))
+    
+    def _resume(self, basic_info: dict) -> str:
+        return askForResume(
+            ', '.join(artist['name'] for artist in basic_info['artists']),
+            basic_info['title'],
+            basic_info['year']
+        )
+    
+    def _album(self, basic_info: dict, results: dict) -> dict:
+        """Album d'une release dont toutes les étapes sont terminées."""
+        spotify_url, spotify_date, spotify_cover_url = results['spotify']
+        return nouvel_album(
+            release_id=basic_info['id'],
+            titre=basic_info['title'],
+            artiste=[nettoyer_nom_artiste(artist['name']) for artist in basic_info['artists']],
+            annee=basic_info['year'],
+            labels=[label['name'] for label in basic_info['labels']],
+            support=support_from_basic_info(basic_info),
+            pochette=results['details'],
+            resume=results['resume'],
+            spotify_url=spotify_url,
+            spotify_date=spotify_date,
+            spotify_cover_url=spotify_cover_url
+        )
+    
+    # ===== Orchestration =====
+    
+    def run(self) -> Dict[str, int]:
+        """Synchronise la collection (reprend un point de reprise existant).
+        
+        Returns:
+            Compteurs: total (releases Discogs), existing (déjà présentes),
+            added, failed (étape ou page de la collection en erreur, à refaire
+            à la prochaine exécution) et resumed_stages (étapes reprises du
+            point de reprise).
+        """
+        writer = CollectionWriter(self.collection_path, self.write_batch_size)
+        self.partial = {rid: done for rid, done in self.load_checkpoint().items() if rid not in writer}
+        self.unflushed = []
+        self.stats = {'total': 0, 'existing': 0, 'added': 0, 'failed': 0, 'resumed_stages': 0}
+        pools = {api: ThreadPoolExecutor(max_workers=count) for api, count in self.workers.items()}
+        stage_work = {
+            'details': (pools['discogs'], self._details),
+            'spotify': (pools['spotify'], self._spotify),
+            'resume': (pools['ai'], self._resume),
+        }
+        pending = {}
+        in_progress: Dict[str, dict] = {}
+        try:
+            releases = self.releases(pools['discogs'])
+            exhausted = False
+            while True:
+                # Alimenter le pipeline jusqu'à window releases en cours
+                while not exhausted and len(in_progress) < self.window:
+                    release = next(releases, None)
+                    if release is None:
+                        exhausted = True
+                        break
+                    basic_info = release['basic_information']
+                    rid = str(basic_info['id'])
+                    self.stats['total'] += 1
+                    if rid in writer or rid in in_progress:
+                        self.stats['existing'] += 1
+                        self._progress()
+                        continue
+                    done = self.partial.setdefault(rid, {})
+                    self.stats['resumed_stages'] += len(done)
+                    in_progress[rid] = basic_info
+                    for stage in self.STAGES:
+                        if stage not in done:
+                            pool, work = stage_work[stage]
+                            pending[pool.submit(work, basic_info)] = (rid, stage)
+                    if len(done) == len(self.STAGES):
+                        self._finish(rid, in_progress, writer)
+                if not pending:
+                    break
+                
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    rid, stage = pending.pop(future)
+                    try:
+                        # Conservé même si une autre étape a échoué: reprise à la prochaine exécution
+                        self.partial[rid][stage] = future.result()
+                    except Exception as e:
+                        print(f"Erreur ({stage}) pour l'ID {rid} : {e}")
+                        if in_progress.pop(rid, None):
+                            self.stats['failed'] += 1
+                            self._progress()
+                        continue
+                    if rid in in_progress and len(self.partial[rid]) == len(self.STAGES):
+                        self._finish(rid, in_progress, writer)
+                self.save_checkpoint()
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True, cancel_futures=True)
+            # Point de reprise d'abord: les albums en attente y figurent si l'écriture échoue
+            self.save_checkpoint(force=True)
+            if writer.flush():
+                self._flushed()
+                self.save_checkpoint(force=True)
+            else:
+                self.stats['added'] -= len(self.unflushed)
+                self.stats['failed'] += len(self.unflushed)
+        
+        if not self.stats['failed'] and not self.partial:
+            os.remove(self.checkpoint_path)
+        return self.stats
+    
+    def _finish(self, rid: str, in_progress: Dict[str, dict], writer: CollectionWriter):
+        """Ajoute l'album d'une release terminée à la collection.
+        
+        Ses résultats restent dans le point de reprise jusqu'à l'écriture
+        effective du lot (un arrêt avant l'écriture ne refait aucune étape).
+        """
+        basic_info = in_progress.pop(rid)
+        writer.ajouter(self._album(basic_info, self.partial[rid]))
+        self.stats['added'] += 1
+        self.unflushed.append(rid)
+        if not writer.pending:
+            self._flushed()
+            self.save_checkpoint(force=True)
+        self._progress()
+    
+    def _flushed(self):
+        """Retire du point de reprise les albums désormais écrits."""
+        for rid in self.unflushed:
+            self.partial.pop(rid, None)
+        self.unflushed = []
+    
+    def _progress(self):
+        """Affiche l'avancement (releases traitées / taille de la collection Discogs)."""
+        processed = self.stats['existing'] + self.stats['added'] + self.stats['failed']
+        total = max(self.expected, processed)
+        print(f"{processed}/{total} albums traités ({round(processed / total * 100, 1)}%)")
+        print("-" * 40)
+
+
 def main():
     """Fonction principale de synchronisation de la collection Discogs.
     
     Orchestre le processus complet:
-    1. Récupération de la collection Discogs complète
+    1. Récupération de la collection Discogs (pages en parallèle)
     2. Chargement de la collection locale existante
-    3. Pour chaque album non présent localement:
+    3. Pour chaque album non présent localement, en pipeline:
        - Récupération des détails Discogs
        - Recherche des métadonnées Spotify
        - Génération du résumé via IA
@@ -714,59 +1053,23 @@ def main():
     4. Génération du fichier Markdown final
     
     Note:
-        - Affiche la progression en temps réel
         - Saute les albums déjà présents
-        - Peut prendre plusieurs heures pour les grandes collections
-        - Respecte les limites de taux des APIs
+        - Reprend une synchronisation interrompue (discogs-sync-checkpoint.json)
+        - Respecte les limites de taux des APIs (limiteurs et pools par API)
         
     Raises:
         Aucune - Les erreurs sont capturées et affichées.
     """
-
-    all_releases = get_all_releases(DISCOGS_USERNAME, DISCOGS_API_KEY)
-    albums = lire_albums()
-    if not all_releases:
-        print("Aucun album trouvé.")
+    sync = DiscogsSync(DISCOGS_USERNAME, DISCOGS_API_KEY)
+    if sync.load_checkpoint():
+        print(f"Reprise de la synchronisation interrompue ({sync.checkpoint_path})")
+    stats = sync.run()
+    if not stats['total']:
+        print("Collection Discogs inaccessible." if stats['failed'] else "Aucun album trouvé.")
         return
-    access_token = get_spotify_access_token()
-    nombre_albums = len(all_releases)
-    print(f"Nombre d'albums dans la collection : {nombre_albums}")
-    nbre_item = 0
-    for release in all_releases:
-        basic_info = release['basic_information']
-        release_id = basic_info['id']
-        support = support_from_basic_info(basic_info)
-        if album_existe(albums, release_id):
-            print(f"L'album {release_id} existe déjà. Passage au suivant.")
-            nbre_item += 1
-            print(f"{nbre_item}/{nombre_albums} albums traités ({round(nbre_item/nombre_albums*100, 1)}%)")
-            print("-" * 40)
-            continue
-        release_details = get_release_details(release_id, DISCOGS_API_KEY)
-        cover_image = release_details.get('images', [{}])[0].get('uri', 'Aucune image disponible') if release_details else 'Aucune image disponible'
-        album_resume = askForResume(
-            ', '.join(artist['name'] for artist in basic_info['artists']),
-            basic_info['title'],
-            basic_info['year']
-        )
-        artist_name = [nettoyer_nom_artiste(artist['name']) for artist in basic_info['artists']]
-        spotify_url, spotify_date, spotify_cover_url = spotify_search_album(artist_name[0], basic_info['title'], access_token)
-        ajouter_album(
-            release_id=release_id,
-            titre=basic_info['title'],
-            artiste=artist_name,
-            annee=basic_info['year'],
-            labels=[label['name'] for label in basic_info['labels']],
-            support=support,
-            pochette=cover_image,
-            resume=album_resume,
-            spotify_url=spotify_url,
-            spotify_date=spotify_date,
-            spotify_cover_url=spotify_cover_url
-        )
-        nbre_item += 1
-        print(f"{nbre_item}/{nombre_albums} albums traités ({round(nbre_item/nombre_albums*100, 1)}%)")
-        print("-" * 40)
+    print(f"Nombre d'albums dans la collection Discogs : {stats['total']}")
+    print(f"{stats['existing']} déjà présents, {stats['added']} ajoutés, {stats['failed']} en erreur"
+          f" ({stats['resumed_stages']} étapes reprises du point de reprise)")
     generate_markdown_from_json()
 
 if __name__ == "__main__":
@@ -3,10 +3,18 @@
 Ce module centralise toutes les valeurs constantes utilisées à travers
 le projet pour éviter la duplication et faciliter la maintenance.
 
-Version: 1.0.0
-Date: 24 janvier 2026
+Les URLs de base des APIs externes (Spotify, Last.fm, Discogs) peuvent être
+redirigées par variables d'environnement, par exemple vers le serveur de
+simulation local (src/utils/mock_api_server.py) pour les benchmarks:
+SPOTIFY_ACCOUNTS_BASE_URL, SPOTIFY_API_BASE_URL, LASTFM_API_URL,
+DISCOGS_API_BASE_URL.
+
+Version: 1.1.0
+Date: 28 janvier 2026
 """
 
+import os
+
 # ===== Valeurs par défaut pour métadonnées =====
 UNKNOWN_ARTIST = "Inconnu"
 UNKNOWN_ALBUM = "Inconnu"
@@ -27,10 +35,26 @@ SUPPORT_UNKNOWN = "Inconnu"
 VALID_SUPPORTS = [SUPPORT_VINYL, SUPPORT_CD, SUPPORT_DIGITAL, SUPPORT_UNKNOWN]
 
 # ===== Configuration Spotify API =====
-SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
-SPOTIFY_SEARCH_URL = "https://api.spotify.com/v1/search"
+SPOTIFY_ACCOUNTS_BASE_URL = os.getenv("SPOTIFY_ACCOUNTS_BASE_URL", "https://accounts.spotify.com")
+SPOTIFY_API_BASE_URL = os.getenv("SPOTIFY_API_BASE_URL", "https://api.spotify.com/v1")
+SPOTIFY_TOKEN_URL = f"{SPOTIFY_ACCOUNTS_BASE_URL}/api/token"
+SPOTIFY_SEARCH_URL = f"{SPOTIFY_API_BASE_URL}/search"
+SPOTIFY_ARTISTS_URL = f"{SPOTIFY_API_BASE_URL}/artists"  # Endpoint multi-ID (?ids=...)
+SPOTIFY_ALBUMS_URL = f"{SPOTIFY_API_BASE_URL}/albums"    # Endpoint multi-ID (?ids=...)
+SPOTIFY_ARTISTS_BATCH_SIZE = 50  # Identifiants max par requête /artists
+SPOTIFY_ALBUMS_BATCH_SIZE = 20   # Identifiants max par requête /albums
 SPOTIFY_TOKEN_REFRESH_MARGIN = 60  # Rafraîchir 60s avant expiration
 
+# ===== Cache persistant Spotify =====
+SPOTIFY_CACHE_FILENAME = "spotify-cache.db"
+SPOTIFY_CACHE_HIT_TTL = 30 * 24 * 3600   # Image trouvée: 30 jours
+SPOTIFY_CACHE_MISS_TTL = 7 * 24 * 3600   # Aucun résultat: 7 jours
+SPOTIFY_CACHE_MAX_ENTRIES = 50000        # Au-delà: éviction LRU
+
+# ===== Client Spotify concurrent =====
+SPOTIFY_RATE_LIMIT = 10   # Requêtes par seconde (limiteur partagé entre threads)
+SPOTIFY_MAX_WORKERS = 8   # Recherches simultanées
+
 # ===== Configuration de recherche Spotify =====
 # Seuils de scoring pour la correspondance d'albums
 SPOTIFY_SCORE_EXACT_MATCH = 100  # Correspondance exacte du nom d'album
@@ -43,7 +67,18 @@ SPOTIFY_MIN_SCORE_FALLBACK = 30  # Seuil minimum pour recherche fallback
 SPOTIFY_ARTIST_SEARCH_LIMIT = 1
 SPOTIFY_ALBUM_SEARCH_LIMIT = 5
 
+# ===== Synchronisation Discogs (Read-discogs-ia.py) =====
+DISCOGS_RATE_LIMIT = 1.0    # Requêtes par seconde (60/min pour un client authentifié)
+DISCOGS_RATE_BURST = 3      # Rafale maximale du limiteur Discogs
+DISCOGS_MAX_WORKERS = 3     # Requêtes Discogs simultanées (pages et détails)
+DISCOGS_MAX_RETRIES = 5     # Tentatives par requête Discogs (429, erreurs réseau)
+EURIA_MAX_WORKERS = 4       # Résumés IA générés simultanément
+DISCOGS_SYNC_WINDOW = 16    # Releases en cours de traitement (toutes étapes confondues)
+DISCOGS_CHECKPOINT_INTERVAL = 5  # Secondes minimum entre deux sauvegardes du point de reprise
+DISCOGS_WRITE_BATCH_SIZE = 20    # Albums accumulés avant réécriture de discogs-collection.json
+
 # ===== Configuration Last.fm API =====
+LASTFM_API_URL = os.getenv("LASTFM_API_URL", "https://ws.audioscrobbler.com/2.0/")
 LASTFM_IMAGE_SIZE_LARGE = 3  # Index pour grande image (extralarge)
 LASTFM_IMAGE_SIZE_XLARGE = 4  # Index pour très grande image (mega)
 
@@ -86,11 +121,12 @@ ROON_HISTORY_FILENAME = "chk-roon.json"
 ROON_LOCK_FILENAME = "chk-roon.lock"
 LASTFM_HISTORY_FILENAME = "chk-last-fm.json"
 DISCOGS_COLLECTION_FILENAME = "discogs-collection.json"
+DISCOGS_SYNC_CHECKPOINT_FILENAME = "discogs-sync-checkpoint.json"
 SOUNDTRACK_FILENAME = "soundtrack.json"
 ENV_FILENAME = ".env"
 
 # ===== URLs des APIs =====
-DISCOGS_API_BASE_URL = "https://api.discogs.com"
+DISCOGS_API_BASE_URL = os.getenv("DISCOGS_API_BASE_URL", "https://api.discogs.com")
 EURIA_API_URL = "https://api.infomaniak.com/2/ai/106561/openai/v1/chat/completions"
 
 # ===== User Agents =====
@@ -3,16 +3,36 @@
 Script pour compléter les images manquantes dans chk-roon.json
 Utilise les APIs Spotify et Last.fm pour récupérer les images.
 
+Les recherches Spotify passent par le client partagé du processus
+(get_shared_client, src/services/spotify_service.py):
+elles sont lancées en parallèle, limitées par un seau à jetons partagé
+(Retry-After respecté sur 429), fusionnées quand plusieurs pistes demandent
+la même clé, et mises en cache sur disque entre deux exécutions.
+
+L'historique est d'abord réduit aux clés distinctes (artiste, ou artiste +
+album) dont une image manque: chaque clé est résolue une seule fois, puis le
+résultat est reporté sur toutes les pistes concernées en une passe.
+
+L'historique est lu au fil du fichier (src/models/json_stream.py), sans
+liste complète en mémoire: une lecture pour la file de travail, une pour
+relire les seules pistes à compléter, puis une réécriture en continu (ou
+des ajouts au journal s'il existe, voir src/models/history_log.py).
+
+Usage:
+    python3 complete-images-roon.py             # Compléter les images
+    python3 complete-images-roon.py --dry-run   # Recherches nécessaires et évitées
+    python3 complete-images-roon.py --refresh   # Relire aussi les images Spotify présentes
+
 Auteur: Patrick Ostertag
-Date: 20 janvier 2026
+Date: 28 janvier 2026
 """
 
+import argparse
 import json
 import os
-import time
+import sys
 import urllib.request
 import urllib.parse
-import base64
 import re
 from dotenv import load_dotenv
 
@@ -20,19 +40,19 @@ from dotenv import load_dotenv
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
-# Charger les variables d'environnement
+# Charger les variables d'environnement (avant constants: URLs des API lues à l'import)
 load_dotenv(os.path.join(PROJECT_ROOT, "data", "config", ".env"))
 
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+from constants import LASTFM_API_URL
+from services.spotify_service import CACHE_MISS, PersistentSpotifyCache, SpotifyClient, get_shared_client
+from models.history_log import iter_history_file, play_key, read_history_meta, save_history
+
 # Configuration
-SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 API_KEY = os.getenv("API_KEY")
 
-# Cache pour éviter les requêtes répétées
-cache_artist_images_spotify = {}
-cache_album_images_spotify = {}
+# Cache pour éviter les requêtes Last.fm répétées
 cache_album_images_lastfm = {}
-spotify_token_cache = {"access_token": None, "expires_at": 0}
 
 def clean_artist_name(artist_name: str) -> str:
     """Nettoie le nom d'artiste pour améliorer les recherches."""
@@ -58,111 +78,6 @@ def clean_album_name(album_name: str) -> str:
     
     return album_name.strip()
 
-def get_spotify_token() -> str | None:
-    """Récupère un token d'accès Spotify via OAuth 2.0."""
-    if spotify_token_cache["access_token"] and time.time() < spotify_token_cache["expires_at"] - 60:
-        return spotify_token_cache["access_token"]
-
-    if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
-        return None
-
-    token_url = "https://accounts.spotify.com/api/token"
-    data = urllib.parse.urlencode({"grant_type": "client_credentials"}).encode("utf-8")
-    credentials = f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode("utf-8")
-    auth_header = base64.b64encode(credentials).decode("utf-8")
-    req = urllib.request.Request(token_url, data=data, method="POST")
-    req.add_header("Authorization", f"Basic {auth_header}")
-    req.add_header("Content-Type", "application/x-www-form-urlencoded")
-
-    try:
-        with urllib.request.urlopen(req) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-        spotify_token_cache["access_token"] = payload.get("access_token")
-        expires_in = payload.get("expires_in", 3600)
-        spotify_token_cache["expires_at"] = time.time() + expires_in
-        return spotify_token_cache["access_token"]
-    except Exception as exc:
-        print(f"⚠️ Erreur token Spotify: {exc}")
-        return None
-
-def search_spotify_artist_image(token: str | None, artist_name: str) -> str | None:
-    """Recherche l'image d'artiste sur Spotify."""
-    if artist_name in cache_artist_images_spotify:
-        return cache_artist_images_spotify[artist_name]
-
-    if not token:
-        cache_artist_images_spotify[artist_name] = None
-        return None
-
-    cleaned_artist = clean_artist_name(artist_name)
-    
-    try:
-        query = urllib.parse.quote(f"artist:{cleaned_artist}")
-        url = f"https://api.spotify.com/v1/search?q={query}&type=artist&limit=1"
-        req = urllib.request.Request(url)
-        req.add_header("Authorization", f"Bearer {token}")
-
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        
-        items = data.get("artists", {}).get("items", [])
-        image_url = items[0]["images"][0]["url"] if items and items[0].get("images") else None
-        
-        cache_artist_images_spotify[artist_name] = image_url
-        return image_url
-    except Exception:
-        cache_artist_images_spotify[artist_name] = None
-        return None
-
-def search_spotify_album_image(token: str | None, artist_name: str, album_name: str) -> str | None:
-    """Recherche l'image d'album sur Spotify avec fallback."""
-    cache_key = (artist_name, album_name)
-    if cache_key in cache_album_images_spotify:
-        return cache_album_images_spotify[cache_key]
-
-    if not token:
-        cache_album_images_spotify[cache_key] = None
-        return None
-
-    cleaned_artist = clean_artist_name(artist_name)
-    cleaned_album = clean_album_name(album_name)
-    
-    # Essai 1: avec artiste et album
-    try:
-        query = urllib.parse.quote(f"album:{cleaned_album} artist:{cleaned_artist}")
-        url = f"https://api.spotify.com/v1/search?q={query}&type=album&limit=1"
-        req = urllib.request.Request(url)
-        req.add_header("Authorization", f"Bearer {token}")
-
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        items = data.get("albums", {}).get("items", [])
-        image_url = items[0]["images"][0]["url"] if items and items[0].get("images") else None
-        
-        if image_url:
-            cache_album_images_spotify[cache_key] = image_url
-            return image_url
-    except Exception:
-        pass
-    
-    # Essai 2: fallback sans artiste
-    try:
-        query = urllib.parse.quote(cleaned_album)
-        url = f"https://api.spotify.com/v1/search?q={query}&type=album&limit=1"
-        req = urllib.request.Request(url)
-        req.add_header("Authorization", f"Bearer {token}")
-        
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        items = data.get("albums", {}).get("items", [])
-        image_url = items[0]["images"][0]["url"] if items and items[0].get("images") else None
-        
-        cache_album_images_spotify[cache_key] = image_url
-        return image_url
-    except Exception:
-        cache_album_images_spotify[cache_key] = None
-        return None
-
 def search_lastfm_album_image(artist_name: str, album_name: str) -> str | None:
     """Recherche l'image d'album via l'API Last.fm."""
     cache_key = (artist_name, album_name)
@@ -180,7 +95,7 @@ def search_lastfm_album_image(artist_name: str, album_name: str) -> str | None:
         artist_encoded = urllib.parse.quote(cleaned_artist)
         album_encoded = urllib.parse.quote(cleaned_album)
         url = (
-            f"https://ws.audioscrobbler.com/2.0/?method=album.getinfo"
+            f"{LASTFM_API_URL}?method=album.getinfo"
             f"&api_key={API_KEY}&artist={artist_encoded}&album={album_encoded}&format=json"
         )
         with urllib.request.urlopen(url) as response:
@@ -194,14 +109,191 @@ def search_lastfm_album_image(artist_name: str, album_name: str) -> str | None:
         cache_album_images_lastfm[cache_key] = None
         return None
 
+# Champ image → clé de recherche (une seule recherche par clé distincte)
+IMAGE_FIELDS = {
+    'artist_spotify_image': lambda track: track.get('artist', ''),
+    'album_spotify_image': lambda track: (track.get('artist', ''), track.get('album', '')),
+    'album_lastfm_image': lambda track: (track.get('artist', ''), track.get('album', '')),
+}
+SPOTIFY_FIELDS = ('artist_spotify_image', 'album_spotify_image')
+FIELD_LABELS = {
+    'artist_spotify_image': "Artistes Spotify",
+    'album_spotify_image': "Albums Spotify",
+    'album_lastfm_image': "Albums Last.fm",
+}
+
+
+def build_work_queue(tracks: list, refresh: bool = False) -> dict:
+    """Réduit l'historique aux clés distinctes dont une image manque.
+    
+    Args:
+        tracks: Pistes de chk-roon.json.
+        refresh: Si True, inclut aussi les images Spotify déjà présentes.
+        
+    Returns:
+        Dictionnaire champ image → {clé: indices des pistes concernées},
+        clés dans l'ordre de première apparition.
+    """
+    queue = {field: {} for field in IMAGE_FIELDS}
+    for index, track in enumerate(tracks):
+        for field, key_of in IMAGE_FIELDS.items():
+            if not track.get(field) or (refresh and field in SPOTIFY_FIELDS):
+                queue[field].setdefault(key_of(track), []).append(index)
+    return queue
+
+
+def resolve_work_queue(queue: dict, client: SpotifyClient | None, refresh: bool = False) -> dict:
+    """Résout chaque clé une seule fois.
+    
+    Les recherches Spotify sont lancées en parallèle via le client (limiteur
+    partagé); les recherches Last.fm sont faites à la suite. En mode refresh,
+    les artistes et albums dont l'identifiant Spotify est connu sont relus
+    par lots (endpoints multi-ID) au lieu d'être recherchés un par un.
+    
+    Args:
+        queue: File de travail (voir build_work_queue).
+        client: Client Spotify, ou None sans token Spotify.
+        refresh: Ignorer le cache Spotify et relire les images.
+        
+    Returns:
+        Dictionnaire champ image → {clé: URL ou None}.
+    """
+    futures = {field: {} for field in SPOTIFY_FIELDS}
+    if client is not None and not refresh:
+        for artist in queue['artist_spotify_image']:
+            futures['artist_spotify_image'][artist] = client.submit_artist_image(artist)
+        for artist, album in queue['album_spotify_image']:
+            futures['album_spotify_image'][(artist, album)] = client.submit_album_image(artist, album)
+    
+    lastfm = {key: search_lastfm_album_image(*key) for key in queue['album_lastfm_image']}
+    if client is not None and refresh:
+        results = {
+            'artist_spotify_image': client.refresh_artist_images(queue['artist_spotify_image']),
+            'album_spotify_image': client.refresh_album_images(queue['album_spotify_image']),
+        }
+    else:
+        results = {field: {key: future.result() for key, future in futures[field].items()}
+                   for field in SPOTIFY_FIELDS}
+    results['album_lastfm_image'] = lastfm
+    return results
+
+
+def load_rows(json_file: str, queue: dict, results: dict) -> dict:
+    """Relit uniquement les pistes qui recevront une image trouvée.
+    
+    Args:
+        json_file: Historique chk-roon.json (ou son journal).
+        queue: File de travail (voir build_work_queue).
+        results: Images trouvées (voir resolve_work_queue).
+        
+    Returns:
+        Dictionnaire indice → piste, pour apply_results.
+    """
+    wanted = {}
+    for field, keys in queue.items():
+        for key, indices in keys.items():
+            if results.get(field, {}).get(key):
+                for index in indices:
+                    wanted.setdefault(index, []).append((IMAGE_FIELDS[field], key))
+    # Une piste dont la clé a changé depuis la première lecture (historique modifié entre-temps) est ignorée
+    return {
+        index: track for index, track in enumerate(iter_history_file(json_file))
+        if index in wanted and all(key_of(track) == key for key_of, key in wanted[index])
+    }
+
+
+def apply_results(tracks, queue: dict, results: dict, changed_rows: set | None = None) -> dict:
+    """Reporte les images trouvées sur toutes les pistes concernées (une passe).
+    
+    Args:
+        tracks: Pistes de chk-roon.json, liste ou dictionnaire indice → piste
+            (voir load_rows), modifiées sur place.
+        queue: File de travail (voir build_work_queue).
+        results: Images trouvées (voir resolve_work_queue).
+        changed_rows: Ensemble complété avec les indices des pistes modifiées (optionnel).
+        
+    Returns:
+        Dictionnaire champ image → nombre de pistes complétées ou modifiées.
+    """
+    completed = {field: 0 for field in IMAGE_FIELDS}
+    present = tracks.__contains__ if isinstance(tracks, dict) else (lambda index: index < len(tracks))
+    for field, keys in queue.items():
+        for key, indices in keys.items():
+            image = results.get(field, {}).get(key)
+            if not image:
+                continue
+            changed = [index for index in indices if present(index) and tracks[index].get(field) != image]
+            for index in changed:
+                tracks[index][field] = image
+            if changed_rows is not None:
+                changed_rows.update(changed)
+            if changed:
+                completed[field] += len(changed)
+                label = key if isinstance(key, str) else key[1]
+                print(f"✅ {FIELD_LABELS[field]}: {label[:50]} ({len(changed)} pistes)")
+    return completed
+
+
+def dry_run_report(queue: dict, cache: PersistentSpotifyCache | None = None) -> dict:
+    """Estime les recherches évitées par la déduplication, sans appel réseau.
+    
+    Sans déduplication, chaque piste dont une image manque déclenche une
+    recherche. Avec la file de travail, chaque clé distincte est recherchée
+    une fois, et pas du tout si le cache Spotify persistant la connaît déjà.
+    
+    Args:
+        queue: File de travail (voir build_work_queue).
+        cache: Cache Spotify persistant à consulter (optionnel).
+        
+    Returns:
+        Dictionnaire champ image → {'rows', 'keys', 'cached', 'lookups', 'saved'}.
+    """
+    report = {}
+    for field, keys in queue.items():
+        cached = 0
+        if cache is not None and field in SPOTIFY_FIELDS:
+            for key in keys:
+                if field == 'artist_spotify_image':
+                    value = cache.get_artist_image(key, default=CACHE_MISS)
+                else:
+                    value = cache.get_album_image(*key, default=CACHE_MISS)
+                cached += value is not CACHE_MISS
+        rows = sum(len(indices) for indices in keys.values())
+        lookups = len(keys) - cached
+        report[field] = {
+            'rows': rows,
+            'keys': len(keys),
+            'cached': cached,
+            'lookups': lookups,
+            'saved': rows - lookups,
+        }
+    
+    print(f"\n{'Image':<18} {'Pistes':>8} {'Clés':>8} {'En cache':>9} {'Recherches':>11} {'Évitées':>8}")
+    print("-" * 66)
+    for field, stats in report.items():
+        print(f"{FIELD_LABELS[field]:<18} {stats['rows']:>8} {stats['keys']:>8} {stats['cached']:>9} "
+              f"{stats['lookups']:>11} {stats['saved']:>8}")
+    total_rows = sum(stats['rows'] for stats in report.values())
+    total_saved = sum(stats['saved'] for stats in report.values())
+    print(f"\n💡 Recherches évitées: {total_saved} sur {total_rows}")
+    return report
+
+
 def main():
     """Fonction principale pour compléter les images manquantes."""
+    parser = argparse.ArgumentParser(description="Compléter les images manquantes de chk-roon.json")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Afficher les recherches nécessaires sans appeler les APIs")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Relire aussi les images Spotify présentes (lots multi-ID si identifiant connu)")
+    args = parser.parse_args()
+    
     json_file = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")
     
-    print("📂 Chargement de chk-roon.json...")
+    print("📂 Lecture de chk-roon.json...")
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Lecture en continu: seuls les indices des pistes à compléter sont gardés
+        queue = build_work_queue(iter_history_file(json_file), refresh=args.refresh)
     except FileNotFoundError:
         print(f"❌ Erreur : Le fichier {json_file} n'existe pas.")
         return
@@ -209,77 +301,49 @@ def main():
         print(f"❌ Erreur : Le fichier {json_file} n'est pas un JSON valide.")
         return
     
-    tracks = data.get('tracks', [])
-    
-    # Identifier les pistes avec images manquantes
-    missing_artist = [t for t in tracks if not t.get('artist_spotify_image')]
-    missing_album_spotify = [t for t in tracks if not t.get('album_spotify_image')]
-    missing_album_lastfm = [t for t in tracks if not t.get('album_lastfm_image')]
-    
     print(f"\n🔍 Analyse des images manquantes:")
-    print(f"  - Artistes Spotify : {len(missing_artist)}")
-    print(f"  - Albums Spotify   : {len(missing_album_spotify)}")
-    print(f"  - Albums Last.fm   : {len(missing_album_lastfm)}")
+    for field, keys in queue.items():
+        rows = sum(len(indices) for indices in keys.values())
+        print(f"  - {FIELD_LABELS[field]:<17}: {rows} pistes, {len(keys)} recherches")
     
-    if not missing_artist and not missing_album_spotify and not missing_album_lastfm:
+    if not any(queue.values()):
         print("\n✅ Toutes les images sont déjà présentes !")
         return
     
+    client = get_shared_client()
+    if args.dry_run:
+        dry_run_report(queue, None if args.refresh else client.cache)
+        return
+    
     # Récupérer le token Spotify
     print("\n🔑 Récupération du token Spotify...")
-    spotify_token = get_spotify_token()
+    spotify_token = client.get_token()
     if not spotify_token:
         print("⚠️ Impossible de récupérer le token Spotify")
     
     print(f"\n🚀 Complétion des images en cours...\n")
     
-    completed_artist = 0
-    completed_album_spotify = 0
-    completed_album_lastfm = 0
+    # Résoudre chaque clé une fois, puis reporter sur toutes les pistes
+    results = resolve_work_queue(queue, client if spotify_token else None, refresh=args.refresh)
+    tracks = load_rows(json_file, queue, results)
+    changed_rows = set()
+    completed = apply_results(tracks, queue, results, changed_rows)
+    completed_artist = completed['artist_spotify_image']
+    completed_album_spotify = completed['album_spotify_image']
+    completed_album_lastfm = completed['album_lastfm_image']
     
-    # Compléter les images manquantes
-    for i, track in enumerate(tracks, 1):
-        modified = False
-        artist = track.get('artist', '')
-        album = track.get('album', '')
-        
-        # Image artiste manquante
-        if not track.get('artist_spotify_image') and spotify_token:
-            image = search_spotify_artist_image(spotify_token, artist)
-            if image:
-                track['artist_spotify_image'] = image
-                completed_artist += 1
-                modified = True
-                print(f"[{i}/{len(tracks)}] ✅ Artiste: {artist[:50]}")
-        
-        # Image album Spotify manquante
-        if not track.get('album_spotify_image') and spotify_token:
-            image = search_spotify_album_image(spotify_token, artist, album)
-            if image:
-                track['album_spotify_image'] = image
-                completed_album_spotify += 1
-                modified = True
-                print(f"[{i}/{len(tracks)}] ✅ Album Spotify: {album[:50]}")
-        
-        # Image album Last.fm manquante
-        if not track.get('album_lastfm_image'):
-            image = search_lastfm_album_image(artist, album)
-            if image:
-                track['album_lastfm_image'] = image
-                completed_album_lastfm += 1
-                modified = True
-                print(f"[{i}/{len(tracks)}] ✅ Album Last.fm: {album[:50]}")
-        
-        # Pause pour éviter le rate limiting
-        if modified and i < len(tracks):
-            time.sleep(0.3)
+    print(f"\n📡 Requêtes Spotify: {client.request_count} (cache: {client.cache.stats()['hits']} hits)")
     
     # Sauvegarder les modifications
     if completed_artist or completed_album_spotify or completed_album_lastfm:
         print(f"\n💾 Sauvegarde des modifications...")
         try:
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            data = read_history_meta(json_file)
+            data['tracks'] = (
+                tracks[index] if index in tracks and play_key(tracks[index]) == play_key(track) else track
+                for index, track in enumerate(iter_history_file(json_file))
+            )
+            save_history(json_file, data, updated=[tracks[index] for index in sorted(changed_rows)])
             
             print(f"\n✅ Complétion terminée !")
             print(f"\n📊 Résultats:")
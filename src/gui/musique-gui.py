@@ -15,7 +15,7 @@ Architecture:
 
 Fonctionnalités principales:
     Collection Discogs:
-        - Recherche et filtrage d'albums (titre, artiste)
+        - Recherche plein texte d'albums (titre, artiste, label, résumé, pistes; accents ignorés)
         - Filtre spécifique pour bandes originales de films
         - Affichage métadonnées complètes (année, support, labels, résumé)
         - Visualisation images (pochettes Discogs et Spotify)
@@ -180,7 +180,7 @@ import requests
 from io import BytesIO
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -189,6 +189,10 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 # Ajouter le répertoire racine au path pour l'import du scheduler
 sys.path.insert(0, PROJECT_ROOT)
 from src.utils.scheduler import TaskScheduler
+from src.models.repository import MusicRepository, is_current, open_repository
+from src.models.history_store import history_version
+from src.models.history_log import HistoryLog, iter_history_file
+from src.models.search_index import SearchIndex
 
 # Charger les variables d'environnement
 load_dotenv(os.path.join(PROJECT_ROOT, "data", "config", ".env"))
@@ -337,6 +341,8 @@ st.markdown("""
 # Fichiers JSON sources - Configuration centrale des chemins de données
 JSON_FILE = os.path.join(PROJECT_ROOT, "data", "collection", "discogs-collection.json")  # Collection principale Discogs
 LASTFM_FILE = os.path.join(PROJECT_ROOT, "data", "history", "chk-lastfm.json")  # Historique lectures Roon/Last.fm
+ROON_FILE = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")  # Historique complet (fallback si base non migrée)
+DB_FILE = os.path.join(PROJECT_ROOT, "data", "musique.db")  # Base SQLite (migrate_to_sqlite.py)
 SOUNDTRACK_FILE = os.path.join(PROJECT_ROOT, "data", "collection", "soundtrack.json")  # Métadonnées films (BOF)
 
 # Configuration API EurIA
@@ -463,6 +469,126 @@ def load_data() -> List[Dict]:
         st.error(f"❌ Erreur lors du chargement : {e}")
         return []
 
+def get_history_repository() -> Optional[MusicRepository]:
+    """Ouvre le repository SQLite de l'historique s'il est à jour.
+    
+    Vérifié à chaque appel (le moteur SQLite reste partagé, voir get_engine):
+    les trackers n'écrivent que les fichiers JSON, la base n'est utilisée que
+    si elle a été migrée après leur dernière écriture.
+    
+    Returns:
+        Optional[MusicRepository]: Repository si la base musique.db est migrée,
+            à jour et contient des écoutes, sinon None (repli sur les fichiers JSON).
+    """
+    repository = open_repository(DB_FILE)
+    if repository and repository.has_plays():
+        return repository
+    return None
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_search_index(kind: str, version: tuple, _documents: List[Dict]) -> SearchIndex:
+    """Construit (une fois par version des données) l'index FTS5 d'une liste.
+    
+    Args:
+        kind: 'albums' (collection) ou 'plays' (journal d'écoute).
+        version: Empreinte légère des données (date de modification, taille...):
+            l'index est reconstruit uniquement lorsqu'elle change.
+        _documents: Documents indexés (non hachés par Streamlit).
+    
+    Returns:
+        SearchIndex: Index dont les positions correspondent à `_documents`.
+    """
+    if kind == 'albums':
+        # Titres des écoutes de la version de l'historique incluse dans la clé (filter_albums)
+        return SearchIndex.for_albums(_documents, load_roon_data_version(version[-1]))
+    return SearchIndex.for_plays(_documents)
+
+def get_history_version() -> tuple:
+    """Empreinte de l'historique affiché (clé des caches de données et d'index).
+    
+    Returns:
+        tuple: Base SQLite à jour ou non (is_current), puis date de
+            modification et taille de la base, de chk-roon.json, chk-last-fm.json
+            et de leurs journaux (voir history_version).
+    """
+    return (is_current(DB_FILE), history_version(DB_FILE, [ROON_FILE]))
+
+def load_roon_data() -> List[Dict]:
+    """Charge l'historique complet des lectures (Roon + Last.fm), rechargé à chaque modification.
+    
+    Lit la base SQLite via le repository lorsqu'elle est migrée (écoutes avec
+    images et ai_info, plus récentes en premier), sinon chk-roon.json (ou
+    son journal chk-roon.log/, voir iter_history_file).
+    
+    Returns:
+        List[Dict]: Liste des pistes au format chk-roon.json. Liste vide si erreur.
+    
+    See Also:
+        display_lastfm_journal(): Journal d'écoute
+        display_lastfm_timeline(): Timeline horaire
+        migrate_to_sqlite.py: Alimentation de la base SQLite
+    """
+    return load_roon_data_version(get_history_version())
+
+@st.cache_data(max_entries=2)
+def load_roon_data_version(version: tuple) -> List[Dict]:
+    """Historique complet pour une version des sources (voir load_roon_data).
+    
+    Args:
+        version: Empreinte des sources (get_history_version): les positions
+            des écoutes sont celles des index de recherche de même version.
+    
+    Returns:
+        List[Dict]: Liste des pistes au format chk-roon.json. Liste vide si erreur.
+    """
+    repository = get_history_repository()
+    if repository:
+        return repository.get_plays(with_details=True)
+    
+    if not os.path.exists(ROON_FILE) and not HistoryLog.for_json(ROON_FILE).exists():
+        st.error(f"❌ Le fichier {ROON_FILE} n'existe pas.")
+        return []
+    
+    try:
+        return list(iter_history_file(ROON_FILE))
+    except json.JSONDecodeError:
+        st.error(f"❌ Erreur de format JSON dans {ROON_FILE}")
+        return []
+    except Exception as e:
+        st.error(f"❌ Erreur lors du chargement : {e}")
+        return []
+
+@st.cache_data(ttl=60)  # Cache de 60 secondes
+def load_daily_play_counts() -> Dict[str, int]:
+    """Charge le nombre d'écoutes par jour depuis la table d'agrégats rollup_daily.
+    
+    Returns:
+        Dict[str, int]: "YYYY-MM-DD" → nombre d'écoutes. Vide si la base n'est pas migrée.
+    """
+    repository = get_history_repository()
+    return repository.daily_play_counts() if repository else {}
+
+@st.cache_data(ttl=60)  # Cache de 60 secondes
+def load_day_plays(day: str) -> List[Dict]:
+    """Charge les écoutes d'un seul jour (heure locale) depuis la base SQLite.
+    
+    Args:
+        day: Jour au format "YYYY-MM-DD".
+    
+    Returns:
+        List[Dict]: Écoutes du jour au format chk-roon.json (avec images), plus récentes en premier.
+    """
+    repository = get_history_repository()
+    if repository is None:
+        return []
+    day_start = datetime.strptime(day, '%Y-%m-%d')
+    next_day = day_start + timedelta(days=1)
+    return repository.get_plays(
+        start=int(day_start.timestamp()),
+        end=int(next_day.timestamp()),
+        with_details=True,
+    )
+
 @st.cache_data(ttl=60)  # Cache de 60 secondes
 def load_lastfm_data() -> List[Dict]:
     """Charge l'historique des lectures Roon/Last.fm avec mise en cache auto-rafraîchie.
@@ -528,14 +654,16 @@ def load_lastfm_data() -> List[Dict]:
         chk-last-fm.py: Script source (surveillance temps réel)
         complete-images-roon.py: Réparation images manquantes
     """
-    if not os.path.exists(LASTFM_FILE):
+    repository = get_history_repository()
+    if repository:
+        return repository.get_plays(source='lastfm', with_details=True)
+    
+    if not os.path.exists(LASTFM_FILE) and not HistoryLog.for_json(LASTFM_FILE).exists():
         st.error(f"❌ Le fichier {LASTFM_FILE} n'existe pas.")
         return []
     
     try:
-        with open(LASTFM_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('tracks', [])
+        return list(iter_history_file(LASTFM_FILE))
     except json.JSONDecodeError:
         st.error(f"❌ Erreur de format JSON dans {LASTFM_FILE}")
         return []
@@ -948,25 +1076,28 @@ def get_artist_display(artist) -> str:
     return str(artist)
 
 def filter_albums(albums: List[Dict], search_term: str) -> List[Dict]:
-    """Filtre les albums selon un terme de recherche (titre ou artiste).
+    """Filtre les albums selon un terme de recherche (index plein texte FTS5).
     
-    Recherche insensible à la casse dans les champs Titre et Artiste.
+    Recherche insensible à la casse et aux accents dans le titre, les artistes,
+    les labels, le résumé et les titres des pistes écoutées de chaque album.
     Utilisé pour la barre de recherche de la collection Discogs.
     
     Args:
         albums: Liste complète des albums à filtrer.
         search_term: Terme de recherche saisi par l'utilisateur.
             Vide → retourne tous les albums.
-            Non-vide → filtre par correspondance partielle.
+            Non-vide → filtre par préfixe de mots.
     
     Returns:
         List[Dict]: Sous-ensemble d'albums correspondants.
             Ordre préservé de la liste originale.
     
     Algorithm:
-        - Normalisation lowercase du terme ET des champs
-        - Recherche "contains" (pas d'égalité stricte)
-        - OU logique: match titre OU artiste suffit
+        - Index SearchIndex (SQLite FTS5 en mémoire), mis en cache par
+          get_search_index() tant que discogs-collection.json et l'historique
+          (titres des pistes écoutées) ne changent pas
+        - Chaque mot saisi est un préfixe: "dav" trouve "Davis"
+        - ET logique entre les mots, dans n'importe quel champ
         - Pas de recherche floue (fuzzy matching)
     
     Examples:
@@ -984,17 +1115,17 @@ def filter_albums(albums: List[Dict], search_term: str) -> List[Dict]:
         True
     
     Performance:
-        - O(n) linéaire sur nombre d'albums
-        - 500 albums: ~5-10ms
-        - Pas de cache (terme change fréquemment)
+        - Recherche indexée: ~1ms, indépendante de la taille de la collection
+        - Construction de l'index: une fois par modification du fichier
     
     Search Quality:
         ✅ Case-insensitive: "MILES" = "miles" = "Miles"
-        ✅ Partial match: "Dav" trouve "Davis"
+        ✅ Prefix match: "Dav" trouve "Davis"
         ✅ Multi-artistes: Cherche dans tous les noms
-        ❌ Pas d'accents normalisés: "Môme" ≠ "Mome"
+        ✅ Accents normalisés: "Môme" = "Mome"
+        ✅ Champs secondaires: labels, résumé, titres de pistes
+        ❌ Pas de recherche au milieu d'un mot: "avis" ≠ "Davis"
         ❌ Pas de typo tolerance: "Miels" ≠ "Miles"
-        ❌ Pas de recherche album: Ne cherche pas dans champs secondaires
     
     Usage patterns:
         # Sidebar avec recherche live
@@ -1007,29 +1138,23 @@ def filter_albums(albums: List[Dict], search_term: str) -> List[Dict]:
             filtered = [a for a in filtered if is_soundtrack(a['Titre'], soundtracks)]
     
     Future improvements:
-        - Normalisation unicode (unicodedata.normalize)
-        - Recherche dans labels, support, résumé
-        - Scoring de pertinence (exact match > partial)
+        - Scoring de pertinence (bm25 de FTS5)
         - Fuzzy matching (Levenshtein distance)
     
     See Also:
-        get_artist_display(): Conversion artiste en string recherchable
+        SearchIndex: Index plein texte (src/models/search_index.py)
         display_discogs_collection(): Utilisation dans interface
     """
     if not search_term:
         return albums
     
-    search_lower = search_term.lower()
-    filtered = []
-    
-    for album in albums:
-        title = album.get('Titre', '').lower()
-        artist = get_artist_display(album.get('Artiste', '')).lower()
-        
-        if search_lower in title or search_lower in artist:
-            filtered.append(album)
-    
-    return filtered
+    # Titres des pistes écoutées indexés aussi: l'historique fait partie de la version
+    try:
+        version = (os.path.getmtime(JSON_FILE), len(albums), get_history_version())
+    except OSError:
+        version = (None, len(albums), get_history_version())
+    index = get_search_index('albums', version, albums)
+    return [albums[i] for i in index.search(search_term)]
 
 # ============================================================================
 # VUES PRINCIPALES - JOURNAL ROON
@@ -1157,11 +1282,12 @@ def display_lastfm_journal():
         st.title("📻 Journal d'écoute Roon")
     with col_refresh:
         if st.button("🔄 Actualiser", key="refresh_roon"):
-            load_roon_data.clear()
+            load_roon_data_version.clear()
             st.rerun()
     
-    # Charger les données Roon
-    tracks = load_roon_data()
+    # Charger les données Roon (une seule version pour les écoutes affichées et l'index)
+    history_key = get_history_version()
+    tracks = load_roon_data_version(history_key)
     
     if not tracks:
         st.info("📁 Aucune lecture trouvée dans chk-lastfm.json")
@@ -1199,13 +1325,10 @@ def display_lastfm_journal():
     filtered_tracks = tracks.copy()
     
     if search_term:
-        search_lower = search_term.lower()
-        filtered_tracks = [
-            t for t in filtered_tracks 
-            if search_lower in t.get('artist', '').lower()
-            or search_lower in t.get('title', '').lower()
-            or search_lower in t.get('album', '').lower()
-        ]
+        # Index FTS5 reconstruit seulement quand les sources de l'historique changent
+        # (même version que les écoutes affichées: history_key)
+        index = get_search_index('plays', history_key, tracks)
+        filtered_tracks = [tracks[i] for i in index.search(search_term)]
     
     if source_filter != "Toutes":
         source_value = 'roon' if source_filter == "Roon" else 'lastfm'
@@ -1398,33 +1521,41 @@ def display_lastfm_timeline():
         st.title("📈 Timeline d'écoute Roon")
     with col_refresh:
         if st.button("🔄 Actualiser", key="refresh_timeline"):
-            load_roon_data.clear()
+            load_roon_data_version.clear()
+            load_daily_play_counts.clear()
+            load_day_plays.clear()
             st.rerun()
     
-    # Charger les données
-    tracks = load_roon_data()
-    
-    if not tracks:
-        st.info("📁 Aucune lecture trouvée dans chk-lastfm.json")
-        return
-    
-    # Grouper les tracks par date
     from collections import defaultdict
     from datetime import datetime as dt
     
-    tracks_by_date = defaultdict(list)
-    for track in tracks:
-        try:
-            # Parse date format "YYYY-MM-DD HH:MM"
-            date_str = track.get('date', '')
-            if date_str:
-                date_part = date_str.split()[0]  # Get YYYY-MM-DD
-                tracks_by_date[date_part].append(track)
-        except:
-            pass
+    # Charger les données: comptages quotidiens pré-agrégés (SQLite) ou
+    # historique complet groupé par date (repli JSON)
+    repository = get_history_repository()
+    if repository is not None:
+        day_counts = load_daily_play_counts()
+    else:
+        tracks = load_roon_data()
+        
+        if not tracks:
+            st.info("📁 Aucune lecture trouvée dans chk-lastfm.json")
+            return
+        
+        # Grouper les tracks par date
+        tracks_by_date = defaultdict(list)
+        for track in tracks:
+            try:
+                # Parse date format "YYYY-MM-DD HH:MM"
+                date_str = track.get('date', '')
+                if date_str:
+                    date_part = date_str.split()[0]  # Get YYYY-MM-DD
+                    tracks_by_date[date_part].append(track)
+            except:
+                pass
+        day_counts = {day: len(day_tracks) for day, day_tracks in tracks_by_date.items()}
     
     # Trier les dates (plus récentes en premier)
-    sorted_dates = sorted(tracks_by_date.keys(), reverse=True)
+    sorted_dates = sorted(day_counts.keys(), reverse=True)
     
     if not sorted_dates:
         st.info("📁 Aucune lecture avec date valide trouvée")
@@ -1439,15 +1570,18 @@ def display_lastfm_timeline():
             format_func=lambda d: dt.strptime(d, '%Y-%m-%d').strftime('%A %d %B %Y')
         )
     with col2:
-        st.metric("Lectures ce jour", len(tracks_by_date[selected_date]))
+        st.metric("Lectures ce jour", day_counts[selected_date])
     with col3:
         # Toggle pour affichage compact
         compact_mode = st.checkbox("Compact", value=True, key="timeline_compact")
     
     st.divider()
     
-    # Afficher la timeline pour le jour sélectionné
-    day_tracks = tracks_by_date[selected_date]
+    # Afficher la timeline pour le jour sélectionné (seules ses écoutes sont lues en base)
+    if repository is not None:
+        day_tracks = load_day_plays(selected_date)
+    else:
+        day_tracks = tracks_by_date[selected_date]
     
     # Grouper par heure
     tracks_by_hour = defaultdict(list)
@@ -1904,7 +2038,7 @@ def display_discogs_collection():
         # Barre de recherche
         search_term = st.text_input(
             "🔍 Rechercher",
-            placeholder="Titre ou artiste...",
+            placeholder="Titre, artiste, label, piste...",
             key="search"
         )
         
@@ -2259,6 +2393,15 @@ def display_configuration():
                 # Afficher le résumé
                 st.caption(f"⏰ Exécution: tous les {frequency_count} {frequency_unit.lower()}")
                 
+                # Délai maximal d'une exécution (la tâche est arrêtée au-delà)
+                timeout_minutes = st.number_input(
+                    "Délai maximal (minutes)",
+                    min_value=1,
+                    max_value=1440,
+                    value=max(1, int(round(status['timeout_seconds'] / 60))),
+                    key=f"timeout_{task_name}"
+                )
+                
                 # Paramètres spécifiques pour generate_playlist
                 playlist_type = None
                 max_tracks = None
@@ -2338,14 +2481,14 @@ def display_configuration():
                 col_save, col_exec = st.columns(2)
                 with col_save:
                     if st.button("💾 Sauvegarder", key=f"save_{task_name}"):
-                        # Préparer les paramètres supplémentaires pour generate_playlist
-                        extra_params = {}
+                        # Préparer les paramètres supplémentaires (délai, puis generate_playlist)
+                        extra_params = {'timeout_minutes': timeout_minutes}
                         if task_name == "generate_playlist":
-                            extra_params = {
+                            extra_params.update({
                                 'playlist_type': playlist_type,
                                 'max_tracks': max_tracks,
                                 'output_formats': output_formats
-                            }
+                            })
                             # Ajouter le prompt IA si disponible
                             if ai_prompt:
                                 extra_params['ai_prompt'] = ai_prompt
@@ -2377,11 +2520,30 @@ def display_configuration():
                 # Statut et historique
                 st.subheader("📊 Statut")
                 
+                # Exécution en cours (heartbeats enregistrés par le scheduler)
+                progress = status.get('progress')
+                if progress:
+                    st.info(f"🔄 En cours depuis {progress['elapsed_seconds']:.0f}s "
+                            f"({progress['output_lines']} lignes)")
+                    if progress.get('last_line'):
+                        st.caption(f"💬 {progress['last_line']}")
+                    if progress.get('cancel_requested'):
+                        st.caption("⏹️ Annulation en cours...")
+                    elif task_name != "ai_optimize_system":
+                        if st.button("⏹️ Annuler", key=f"cancel_{task_name}"):
+                            success, message = scheduler.cancel_task(task_name)
+                            if success:
+                                st.warning(f"⏹️ {message}")
+                            else:
+                                st.error(f"❌ {message}")
+                
                 # Badge de statut
                 if status['last_status'] == 'success':
                     st.success("✅ Succès")
                 elif status['last_status'] == 'error':
                     st.error("❌ Erreur")
+                elif status['last_status'] == 'cancelled':
+                    st.warning("⏹️ Annulée")
                 else:
                     st.info("⏳ Jamais exécutée")
                 
@@ -2414,6 +2576,9 @@ def display_configuration():
                     duration = status['last_duration_seconds']
                     st.caption(f"⏱️ Durée: {duration:.1f}s")
                 
+                # Journal de la sortie des exécutions
+                st.caption(f"📄 Journal: {status['log_file']}")
+                
                 # Afficher l'erreur si présente
                 if status['last_error']:
                     with st.expander("⚠️ Détails erreur"):
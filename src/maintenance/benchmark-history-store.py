@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Benchmark de l'historique en colonnes (src/models/history_store.py).
+
+Compare, sur un historique synthétique au format chk-roon.json, la liste de
+dictionnaires issue de json.load() et ColumnarHistory:
+
+Mesures:
+    1. Mémoire conservée après chargement (tracemalloc)
+    2. Filtre par plage de dates (30 derniers jours)
+    3. Filtre horaire (18h-23h) sur tout l'historique
+    4. Top 25 des pistes les plus écoutées le soir
+
+Exemple d'utilisation:
+    $ python3 benchmark-history-store.py
+    $ python3 benchmark-history-store.py --plays 200000
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+# Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+sys.path.insert(0, PROJECT_ROOT)
+from src.models.history_store import ColumnarHistory
+
+BASE_TIMESTAMP = 1700000000
+ARTIST_COUNT = 2000
+ALBUM_COUNT = 6000
+TRACK_COUNT = 40000
+SOURCES = ('roon', 'lastfm')
+
+
+def synthetic_history_json(plays: int) -> str:
+    """Historique synthétique sérialisé (format chk-roon.json), écoutes toutes les 3 minutes."""
+    tracks = []
+    for i in range(plays):
+        track = (i * 7919) % TRACK_COUNT
+        album = track % ALBUM_COUNT
+        artist = album % ARTIST_COUNT
+        timestamp = BASE_TIMESTAMP + i * 180
+        tracks.append({
+            'timestamp': timestamp,
+            'date': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M'),
+            'artist': f"Artiste numéro {artist}",
+            'title': f"Titre de la piste {track}",
+            'album': f"Album {album} (Remastered)",
+            'loved': i % 17 == 0,
+            'artist_spotify_image': f"https://i.scdn.co/image/artist{artist:032d}",
+            'album_spotify_image': f"https://i.scdn.co/image/album{album:033d}",
+            'album_lastfm_image': f"https://lastfm.freetls.fastly.net/i/u/300x300/{album:032d}.png",
+            'source': SOURCES[i % 2],
+        })
+    return json.dumps({'tracks': tracks}, ensure_ascii=False)
+
+
+def retained_memory(loader: Callable[[], object]) -> Tuple[object, int]:
+    """Mémoire conservée (octets) par l'objet retourné par loader()."""
+    gc.collect()
+    tracemalloc.start()
+    result = loader()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def timed(function: Callable[[], object], rounds: int = 3) -> Tuple[object, float]:
+    """Meilleur temps (secondes) sur plusieurs exécutions."""
+    best = float('inf')
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def bench_dicts(plays: List[Dict], since: int) -> Dict[str, float]:
+    """Filtres sur la liste de dictionnaires (implémentation historique)."""
+    def recent():
+        return [t for t in plays if t['timestamp'] >= since]
+
+    def evening():
+        return [t for t in plays if 18 <= datetime.fromtimestamp(t['timestamp']).hour <= 23]
+
+    def top_evening():
+        frequency = Counter(f"{t['artist']}||{t['title']}||{t['album']}" for t in evening())
+        return frequency.most_common(25)
+
+    return {
+        'recent': timed(recent)[1],
+        'evening': timed(evening)[1],
+        'top': timed(top_evening)[1],
+    }
+
+
+def bench_columns(history: ColumnarHistory, since: int) -> Dict[str, float]:
+    """Filtres vectorisés sur ColumnarHistory (heures locales calculées une fois)."""
+    history.hours
+    return {
+        'recent': timed(lambda: history.between(start=since))[1],
+        'evening': timed(lambda: history.hour_mask(range(18, 24)))[1],
+        'top': timed(lambda: history.most_frequent_tracks(history.hour_mask(range(18, 24)), 25))[1],
+    }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmark de l'historique en colonnes")
+    parser.add_argument('--plays', type=int, default=100000, help="Écoutes synthétiques (défaut: 100000)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  Benchmark historique: liste de dictionnaires vs ColumnarHistory")
+    print("=" * 70)
+
+    print(f"\n🔄 Génération de {args.plays:,} écoutes synthétiques...")
+    text = synthetic_history_json(args.plays)
+
+    plays, dicts_bytes = retained_memory(lambda: json.loads(text)['tracks'])
+    history, columns_bytes = retained_memory(lambda: ColumnarHistory.from_plays(json.loads(text)['tracks']))
+    del text
+
+    since = BASE_TIMESTAMP + (args.plays - 30 * 480) * 180
+    started = time.perf_counter()
+    history.hours
+    local_time = time.perf_counter() - started
+    before = bench_dicts(plays, since)
+    after = bench_columns(history, since)
+
+    print(f"\n{'Mesure':<34} {'Dicts':>12} {'Colonnes':>12} {'Gain':>8}")
+    print("-" * 70)
+    print(f"{'Mémoire conservée (Mo)':<34} {dicts_bytes / 1e6:>12,.1f} {columns_bytes / 1e6:>12,.1f} "
+          f"{'x' + format(dicts_bytes / columns_bytes, '.1f'):>8}")
+    rows = [
+        ("Filtre 30 derniers jours (ms)", 'recent'),
+        ("Filtre 18h-23h (ms)", 'evening'),
+        ("Top 25 du soir (ms)", 'top'),
+    ]
+    for label, key in rows:
+        print(f"{label:<34} {before[key] * 1000:>12,.1f} {after[key] * 1000:>12,.1f} "
+              f"{'x' + format(before[key] / after[key], '.0f'):>8}")
+    print(f"\n💡 Calcul initial des heures locales: {local_time * 1000:.1f} ms (une fois par historique)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Benchmark de la lecture en continu de l'historique (src/models/json_stream.py).
+
+Compare, sur un historique synthétique au format chk-roon.json, json.load()
+et iter_tracks() pour deux filtres typiques des scripts:
+
+Mesures (chaque mode dans un processus séparé):
+    1. Pic de mémoire résidente (ru_maxrss) du processus
+    2. Temps des filtres "30 derniers jours" et "images manquantes"
+
+Le fichier synthétique est lui-même écrit en continu (write_json_stream),
+dans un répertoire temporaire supprimé à la fin.
+
+Exemple d'utilisation:
+    $ python3 benchmark-json-stream.py
+    $ python3 benchmark-json-stream.py --plays 100000
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Dict, Iterator
+
+# Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+sys.path.insert(0, PROJECT_ROOT)
+from src.models.json_stream import iter_tracks, write_json_stream
+
+BASE_TIMESTAMP = 1700000000
+ARTIST_COUNT = 2000
+ALBUM_COUNT = 6000
+TRACK_COUNT = 40000
+SOURCES = ('roon', 'lastfm')
+MODES = ('json.load', 'stream')
+
+
+def synthetic_plays(plays: int) -> Iterator[Dict]:
+    """Écoutes synthétiques (format chk-roon.json), plus récentes en premier, toutes les 3 minutes."""
+    for i in reversed(range(plays)):
+        track = (i * 7919) % TRACK_COUNT
+        album = track % ALBUM_COUNT
+        artist = album % ARTIST_COUNT
+        timestamp = BASE_TIMESTAMP + i * 180
+        yield {
+            'timestamp': timestamp,
+            'date': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M'),
+            'artist': f"Artiste numéro {artist}",
+            'title': f"Titre de la piste {track}",
+            'album': f"Album {album} (Remastered)",
+            'loved': i % 17 == 0,
+            'artist_spotify_image': f"https://i.scdn.co/image/artist{artist:032d}",
+            'album_spotify_image': None if i % 11 == 0 else f"https://i.scdn.co/image/album{album:033d}",
+            'album_lastfm_image': f"https://lastfm.freetls.fastly.net/i/u/300x300/{album:032d}.png",
+            'source': SOURCES[i % 2],
+        }
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus (Mo); ru_maxrss est en Ko sous Linux, en octets sous macOS."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def count_filters(tracks) -> Dict[str, int]:
+    """Écoutes des 30 derniers jours et pistes sans image d'album, en une passe."""
+    since = None
+    recent = missing = 0
+    for track in tracks:
+        if since is None:
+            since = track['timestamp'] - 30 * 86400
+        recent += track['timestamp'] >= since
+        missing += not track.get('album_spotify_image')
+    return {'recent': recent, 'missing': missing}
+
+
+def run_mode(mode: str, path: str) -> Dict:
+    """Filtres sur le fichier, dans le processus courant."""
+    started = time.perf_counter()
+    if mode == 'json.load':
+        with open(path, 'r', encoding='utf-8') as f:
+            counts = count_filters(json.load(f)['tracks'])
+    else:
+        counts = count_filters(iter_tracks(path))
+    counts['seconds'] = time.perf_counter() - started
+    counts['peak_mb'] = peak_rss_mb()
+    return counts
+
+
+def measure(mode: str, path: str) -> Dict:
+    """Exécute un mode dans un processus séparé (pic mémoire indépendant)."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run', mode, '--file', path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmark de la lecture en continu de l'historique")
+    parser.add_argument('--plays', type=int, default=500000, help="Écoutes synthétiques (défaut: 500000)")
+    parser.add_argument('--run', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_mode(args.run, args.file)))
+        return 0
+
+    print("=" * 70)
+    print("⏱️  Benchmark historique: json.load vs lecture en continu")
+    print("=" * 70)
+
+    directory = tempfile.mkdtemp(prefix="benchmark-json-stream-")
+    try:
+        path = os.path.join(directory, "chk-roon.json")
+        print(f"\n🔄 Génération de {args.plays:,} écoutes synthétiques...")
+        write_json_stream(path, {'tracks': synthetic_plays(args.plays)})
+        print(f"   Fichier: {os.path.getsize(path) / 1e6:,.1f} Mo")
+
+        results = {mode: measure(mode, path) for mode in MODES}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    before, after = results['json.load'], results['stream']
+    if (before['recent'], before['missing']) != (after['recent'], after['missing']):
+        print("❌ Résultats différents entre les deux modes")
+        return 1
+
+    print(f"\n{'Mesure':<34} {'json.load':>12} {'Continu':>12} {'Gain':>8}")
+    print("-" * 70)
+    print(f"{'Pic mémoire résidente (Mo)':<34} {before['peak_mb']:>12,.1f} {after['peak_mb']:>12,.1f} "
+          f"{'x' + format(before['peak_mb'] / after['peak_mb'], '.1f'):>8}")
+    print(f"{'Filtres 30 jours + images (s)':<34} {before['seconds']:>12,.2f} {after['seconds']:>12,.2f} "
+          f"{'x' + format(before['seconds'] / after['seconds'], '.2f'):>8}")
+    print(f"\n💡 {after['recent']:,} écoutes sur 30 jours, {after['missing']:,} sans image d'album")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Benchmark de AIOptimizer.analyze_listening_patterns (calcul vectorisé).
+
+Compare, sur un historique synthétique, l'ancienne implémentation (boucle
+Python: datetime.fromtimestamp par écoute, dictionnaires, tri complet des
+heures pour les percentiles) et le calcul vectorisé sur ColumnarHistory
+(conversion des heures locales une seule fois, np.bincount, percentiles
+sur l'histogramme cumulé). Les deux résultats doivent être identiques.
+
+Exemple d'utilisation:
+    $ python3 benchmark-listening-patterns.py
+    $ python3 benchmark-listening-patterns.py --plays 200000 --days 30 365
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+from models.history_store import ColumnarHistory
+from services.ai_optimizer import AIOptimizer
+
+# Une écoute toutes les 40 secondes en moyenne sur la période couverte
+PLAY_INTERVAL = 40
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def synthetic_plays(count: int) -> List[Dict]:
+    """Écoutes synthétiques (plus récentes en premier), artistes et titres variés."""
+    now = int(time.time())
+    return [
+        {
+            'timestamp': now - i * PLAY_INTERVAL - (i * 7919) % PLAY_INTERVAL,
+            'artist': f"Artiste {i % 1500}",
+            'title': f"Titre {i % 30000}",
+            'album': f"Album {i % 4000}",
+            'source': 'roon',
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_listening_patterns(plays: List[Dict], days: int) -> Dict:
+    """Ancienne implémentation (une conversion datetime par écoute)."""
+    cutoff_date = datetime.now() - timedelta(days=days)
+    recent = []
+    for track in plays:
+        track_date = datetime.fromtimestamp(track['timestamp'])
+        if track_date >= cutoff_date:
+            recent.append({'datetime': track_date, 'hour': track_date.hour, 'weekday': track_date.weekday()})
+
+    hour_counts, weekday_counts, daily_tracks = {}, {}, {}
+    for track in recent:
+        hour_counts[track['hour']] = hour_counts.get(track['hour'], 0) + 1
+        weekday_counts[track['weekday']] = weekday_counts.get(track['weekday'], 0) + 1
+        day_key = track['datetime'].strftime('%Y-%m-%d')
+        daily_tracks[day_key] = daily_tracks.get(day_key, 0) + 1
+
+    sorted_hours = sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)
+    active_hours = sorted(track['hour'] for track in recent)
+    total_tracks = len(recent)
+    daily_volume = total_tracks / days
+    regularity_score = len(daily_tracks) / days
+    return {
+        'peak_hours': [hour for hour, _ in sorted_hours[:4]],
+        'typical_start': active_hours[max(0, int(total_tracks * 0.05))],
+        'typical_end': active_hours[min(total_tracks - 1, int(total_tracks * 0.95))],
+        'daily_volume': round(daily_volume, 1),
+        'weekly_distribution': {
+            WEEKDAY_NAMES[w]: round(weekday_counts.get(w, 0) / total_tracks * 100, 1) for w in range(7)
+        },
+        'activity_score': round(0.6 * min(1.0, daily_volume / 50.0) + 0.4 * regularity_score, 2),
+        'analysis_period_days': days,
+        'total_tracks': total_tracks,
+        'active_days': len(daily_tracks),
+    }
+
+
+def make_optimizer(history: ColumnarHistory, work_dir: str) -> AIOptimizer:
+    """Optimiseur sur une configuration vide, avec l'historique fourni."""
+    config_path = os.path.join(work_dir, 'roon-config.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump({}, f)
+    optimizer = AIOptimizer(config_path, os.path.join(work_dir, 'state.json'),
+                            os.path.join(work_dir, 'chk-roon.json'))
+    optimizer.history = history
+    return optimizer
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmark de analyze_listening_patterns")
+    parser.add_argument('--plays', type=int, default=1000000, help="Écoutes synthétiques (défaut: 1000000)")
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365],
+                        help="Périodes d'analyse en jours (défaut: 30 365)")
+    args = parser.parse_args()
+    logging.getLogger('services.ai_optimizer').setLevel(logging.WARNING)
+
+    print("=" * 70)
+    print("⏱️  Benchmark analyze_listening_patterns: boucle Python vs NumPy")
+    print("=" * 70)
+
+    print(f"\n🔄 Génération de {args.plays:,} écoutes synthétiques...")
+    plays = synthetic_plays(args.plays)
+    started = time.perf_counter()
+    history = ColumnarHistory.from_plays(plays)
+    build_time = time.perf_counter() - started
+    started = time.perf_counter()
+    history.hours
+    local_time = time.perf_counter() - started
+
+    print(f"   Construction ColumnarHistory: {build_time:.2f}s (une fois au chargement)")
+    print(f"   Conversion des heures locales: {local_time * 1000:.0f} ms (une fois par historique)")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        optimizer = make_optimizer(history, work_dir)
+
+        print(f"\n{'Période':<12} {'Écoutes':>10} {'Boucle (s)':>12} {'NumPy (ms)':>12} {'Gain':>8} {'Identique':>10}")
+        print("-" * 70)
+        identical_everywhere = True
+        for days in args.days:
+            started = time.perf_counter()
+            expected = legacy_listening_patterns(plays, days)
+            legacy_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            result = optimizer.analyze_listening_patterns(days=days)
+            vector_time = time.perf_counter() - started
+
+            identical = result == expected
+            identical_everywhere &= identical
+            print(f"{days:>4} jours   {result['total_tracks']:>10,} {legacy_time:>12.2f} "
+                  f"{vector_time * 1000:>12.1f} {'x' + format(legacy_time / vector_time, '.0f'):>8} "
+                  f"{'✅' if identical else '❌':>10}")
+
+    return 0 if identical_everywhere else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
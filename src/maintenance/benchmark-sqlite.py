@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Benchmark du profil de réglages SQLite (src/models/database.py).
+
+Compare, sur deux bases temporaires identiques, un moteur SQLAlchemy brut
+(réglages SQLite par défaut) et le moteur configuré par get_engine()
+(WAL, synchronous=NORMAL, mmap, cache, busy_timeout).
+
+Mesures:
+    1. Insertion en masse: N écoutes dans une seule transaction
+    2. Insertions unitaires: une transaction par écoute (comportement du tracker)
+    3. Requêtes: comptage par source + page de 100 écoutes (repository)
+    4. Lecture concurrente: requêtes d'un lecteur pendant que l'écrivain commite,
+       avec le nombre d'erreurs "database is locked"
+
+Exemple d'utilisation:
+    $ python3 benchmark-sqlite.py
+    $ python3 benchmark-sqlite.py --plays 100000 --commits 1000
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 27 janvier 2026
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+# Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+sys.path.insert(0, PROJECT_ROOT)
+from src.models.schema import Base, Artist, Album, Track, ListeningHistory
+from src.models.database import create_sqlite_engine
+from src.models.repository import MusicRepository
+
+BASE_TIMESTAMP = 1700000000
+TRACK_COUNT = 500
+QUERY_ROUNDS = 200
+SOURCES = ('roon', 'lastfm')
+
+
+def prepare_database(engine) -> None:
+    """Crée le schéma et un catalogue minimal (artistes, albums, pistes)."""
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Artist.__table__), [
+            {'id': i, 'name': f"Artiste {i}"} for i in range(1, 51)
+        ])
+        conn.execute(insert(Album.__table__), [
+            {'id': i, 'title': f"Album {i}"} for i in range(1, 101)
+        ])
+        conn.execute(insert(Track.__table__), [
+            {'id': i, 'album_id': (i % 100) + 1, 'artist_id': (i % 50) + 1, 'title': f"Piste {i}"}
+            for i in range(1, TRACK_COUNT + 1)
+        ])
+
+
+def play_rows(start: int, count: int) -> List[Dict]:
+    """Génère des écoutes synthétiques espacées de 3 minutes."""
+    return [
+        {
+            'track_id': (i % TRACK_COUNT) + 1,
+            'timestamp': BASE_TIMESTAMP + i * 180,
+            'date': '2023-11-14 22:13',
+            'source': SOURCES[i % 2],
+            'loved': i % 17 == 0,
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def bench_bulk_insert(engine, plays: int) -> float:
+    """Insère `plays` écoutes dans une seule transaction; retourne lignes/s."""
+    rows = play_rows(0, plays)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(ListeningHistory.__table__), rows)
+    return plays / (time.perf_counter() - started)
+
+
+def bench_single_commits(engine, commits: int, offset: int) -> float:
+    """Une transaction par écoute; retourne transactions/s."""
+    rows = play_rows(offset, commits)
+    started = time.perf_counter()
+    for row in rows:
+        with engine.begin() as conn:
+            conn.execute(insert(ListeningHistory.__table__), row)
+    return commits / (time.perf_counter() - started)
+
+
+def bench_queries(engine) -> float:
+    """Requêtes typiques de la GUI; retourne requêtes/s."""
+    repository = MusicRepository(engine)
+    started = time.perf_counter()
+    for i in range(QUERY_ROUNDS):
+        repository.count_plays_by_source()
+        repository.get_plays(limit=100, offset=(i % 10) * 100)
+    return (QUERY_ROUNDS * 2) / (time.perf_counter() - started)
+
+
+def bench_concurrent_reads(engine, commits: int, offset: int) -> Dict[str, float]:
+    """Lecteur en parallèle d'un écrivain à transactions courtes."""
+    repository = MusicRepository(engine)
+    stop = threading.Event()
+    stats = {'reads': 0, 'locked': 0}
+
+    def reader():
+        while not stop.is_set():
+            try:
+                repository.count_plays(source='roon')
+                stats['reads'] += 1
+            except OperationalError:
+                stats['locked'] += 1
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    started = time.perf_counter()
+    writer_locked = 0
+    for row in play_rows(offset, commits):
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(ListeningHistory.__table__), row)
+        except OperationalError:
+            writer_locked += 1
+    elapsed = time.perf_counter() - started
+    stop.set()
+    thread.join()
+
+    return {
+        'reads_per_second': stats['reads'] / elapsed,
+        'locked': stats['locked'] + writer_locked,
+    }
+
+
+def run_profile(label: str, tuned: bool, plays: int, commits: int, work_dir: str) -> Dict[str, float]:
+    """Exécute toutes les mesures pour un profil."""
+    db_path = os.path.join(work_dir, f"bench-{label}.db")
+    engine = create_sqlite_engine(db_path, tuned=tuned)
+    try:
+        prepare_database(engine)
+        results = {
+            'bulk': bench_bulk_insert(engine, plays),
+            'commits': bench_single_commits(engine, commits, plays),
+            'queries': bench_queries(engine),
+        }
+        concurrent = bench_concurrent_reads(engine, commits, plays + commits)
+        results['concurrent_reads'] = concurrent['reads_per_second']
+        results['locked'] = concurrent['locked']
+        return results
+    finally:
+        engine.dispose()
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmark du profil SQLite")
+    parser.add_argument('--plays', type=int, default=20000, help="Écoutes insérées en masse (défaut: 20000)")
+    parser.add_argument('--commits', type=int, default=300, help="Transactions unitaires (défaut: 300)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  Benchmark SQLite: réglages par défaut vs profil get_engine()")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        baseline = run_profile('default', False, args.plays, args.commits, work_dir)
+        tuned = run_profile('tuned', True, args.plays, args.commits, work_dir)
+
+    rows = [
+        ("Insertion en masse (lignes/s)", 'bulk'),
+        ("Transactions unitaires (tx/s)", 'commits'),
+        ("Requêtes GUI (req/s)", 'queries'),
+        ("Lectures concurrentes (req/s)", 'concurrent_reads'),
+        ("Erreurs 'database is locked'", 'locked'),
+    ]
+
+    print(f"\n{'Mesure':<34} {'Défaut':>12} {'Profil':>12} {'Gain':>8}")
+    print("-" * 70)
+    for label, key in rows:
+        before, after = baseline[key], tuned[key]
+        gain = f"x{after / before:.1f}" if before and key != 'locked' else ""
+        print(f"{label:<34} {before:>12,.0f} {after:>12,.0f} {gain:>8}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
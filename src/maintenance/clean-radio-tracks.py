@@ -3,18 +3,26 @@
 Script pour nettoyer les écoutes de radio invalides dans chk-roon.json
 Supprime les écoutes où l'artiste, l'album ou le titre n'ont pas pu être détectés.
 
+Si l'historique a été converti en journal (data/history/chk-roon.log/),
+les écoutes y sont supprimées par enregistrements de suppression; sinon
+chk-roon.json est réécrit atomiquement.
+
 Auteur: Patrick Ostertag
-Date: 21 janvier 2026
+Date: 28 janvier 2026
 """
 
 import json
 import os
+import sys
 from datetime import datetime
 
 # Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+from models.history_log import load_history_file, save_history
+
 def load_radio_stations() -> list:
     """Charge la liste des stations de radio depuis roon-config.json.
     
@@ -108,8 +116,7 @@ def clean_radio_tracks(json_file: str = None, backup: bool = True) -> None:
     # Charger le fichier
     print(f"📂 Chargement de {json_file}...")
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_history_file(json_file)
     except FileNotFoundError:
         print(f"❌ Erreur : Le fichier {json_file} n'existe pas.")
         return
@@ -184,12 +191,12 @@ def clean_radio_tracks(json_file: str = None, backup: bool = True) -> None:
         if track.get('timestamp') not in invalid_timestamps
     ]
     
+    removed_tracks = [track for track in tracks if track.get('timestamp') in invalid_timestamps]
     data['tracks'] = cleaned_tracks
     
     # Sauvegarder
     try:
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        save_history(json_file, data, deleted=removed_tracks)
         
         final_count = len(cleaned_tracks)
         removed_count = initial_count - final_count
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Conversion de l'historique JSON en journal en ajout seul (et retour).
+
+Convertit chk-roon.json (ou chk-last-fm.json) en journal JSON Lines
+(data/history/chk-roon.log/), compacte un journal existant, ou réexporte
+le journal au format JSON d'origine pour les outils qui lisent encore le
+fichier complet (GUI Streamlit, analyses).
+
+Une fois le journal créé, les scripts de maintenance et d'enrichissement
+(complete-images-roon, clean-radio-tracks, fix-radio-tracks,
+remove-consecutive-duplicates, chk-last-fm) y ajoutent leurs modifications
+au lieu de réécrire tout l'historique, puis réexportent le fichier JSON.
+
+chk-roon.json ne peut pas être converti (JSON_ONLY_HISTORIES): le tracker
+Roon y ajoute ses écoutes directement, elles seraient ignorées par les
+lecteurs du journal puis écrasées par la réexportation.
+
+Exemple d'utilisation:
+    $ python3 convert-history-log.py convert --json data/history/chk-last-fm.json
+    $ python3 convert-history-log.py compact --json data/history/chk-last-fm.json
+    $ python3 convert-history-log.py export --json data/history/chk-last-fm.json --output /tmp/chk-last-fm.json
+
+Code de sortie:
+    0: opération réussie
+    1: fichier ou journal introuvable, journal déjà présent, ou historique
+       non convertible
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+sys.path.insert(0, PROJECT_ROOT)
+from src.models.history_log import JSON_ONLY_HISTORIES, HistoryLog, convert_json, write_json_export
+
+DEFAULT_JSON_PATH = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")
+
+
+def main(argv=None):
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Journal d'historique en ajout seul")
+    parser.add_argument('action', choices=['convert', 'compact', 'export'],
+                        help="convert: JSON → journal, compact: fusion des segments, export: journal → JSON")
+    parser.add_argument('--json', default=DEFAULT_JSON_PATH,
+                        help="Historique JSON (défaut: data/history/chk-roon.json)")
+    parser.add_argument('--output', help="Fichier JSON produit par export (défaut: --json)")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="Remplacer un journal existant (convert)")
+    args = parser.parse_args(argv)
+
+    log = HistoryLog.for_json(args.json)
+    started = time.perf_counter()
+
+    if args.action == 'convert':
+        if os.path.basename(args.json) in JSON_ONLY_HISTORIES:
+            print(f"❌ {os.path.basename(args.json)} est écrit directement par le tracker: "
+                  f"conversion impossible tant qu'il n'utilise pas le journal")
+            return 1
+        if not os.path.exists(args.json):
+            print(f"❌ Fichier introuvable: {args.json}")
+            return 1
+        if log.exists() and not args.overwrite:
+            print(f"❌ Journal déjà présent: {log.path} (utilisez --overwrite)")
+            return 1
+        print(f"🔄 Conversion de {os.path.basename(args.json)}...")
+        log = convert_json(args.json, overwrite=args.overwrite)
+        print(f"✅ {log.count()} écoutes converties dans {log.path} "
+              f"en {time.perf_counter() - started:.2f}s")
+        return 0
+
+    if not log.exists():
+        print(f"❌ Journal introuvable: {log.path} (lancez d'abord convert)")
+        return 1
+
+    if args.action == 'compact':
+        segments = len(log.segments())
+        print(f"🗜️  Compactage de {segments} segment(s)...")
+        count = log.compact()
+        print(f"✅ {count} écoutes dans l'instantané en {time.perf_counter() - started:.2f}s")
+        return 0
+
+    output = args.output or args.json
+    print(f"📤 Export vers {output}...")
+    count = write_json_export(log, output)
+    print(f"✅ {count} écoutes exportées en {time.perf_counter() - started:.2f}s")
+    if log.skipped_lines:
+        print(f"⚠️  {log.skipped_lines} ligne(s) incomplète(s) ignorée(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
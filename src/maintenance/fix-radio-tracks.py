@@ -5,15 +5,12 @@ Identifie les morceaux de musique joués sur les radios et extrait correctement
 l'artiste, le titre et l'album.
 
 Auteur: Patrick Ostertag
-Date: 21 janvier 2026
+Date: 28 janvier 2026
 """
 
 import json
 import os
-import time
-import urllib.request
-import urllib.parse
-import base64
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -21,12 +18,12 @@ from dotenv import load_dotenv
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
-# Charger les variables d'environnement
+# Charger les variables d'environnement (avant constants: URLs des API lues à l'import)
 load_dotenv(os.path.join(PROJECT_ROOT, "data", "config", ".env"))
 
-# Configuration Spotify
-SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+from services.spotify_service import get_shared_client
+from models.history_log import load_history_file, save_history
 
 # Stations de radio à détecter
 RADIO_STATIONS = [
@@ -37,88 +34,6 @@ RADIO_STATIONS = [
     "Radio Nova"
 ]
 
-# Cache pour le token Spotify
-spotify_token_cache = {"access_token": None, "expires_at": 0}
-
-
-def get_spotify_token() -> str | None:
-    """Récupère un token d'accès Spotify via OAuth 2.0."""
-    if spotify_token_cache["access_token"] and time.time() < spotify_token_cache["expires_at"] - 60:
-        return spotify_token_cache["access_token"]
-
-    if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
-        return None
-
-    token_url = "https://accounts.spotify.com/api/token"
-    data = urllib.parse.urlencode({"grant_type": "client_credentials"}).encode("utf-8")
-    credentials = f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode("utf-8")
-    auth_header = base64.b64encode(credentials).decode("utf-8")
-    req = urllib.request.Request(token_url, data=data, method="POST")
-    req.add_header("Authorization", f"Basic {auth_header}")
-    req.add_header("Content-Type", "application/x-www-form-urlencoded")
-
-    try:
-        with urllib.request.urlopen(req) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-        spotify_token_cache["access_token"] = payload.get("access_token")
-        expires_in = payload.get("expires_in", 3600)
-        spotify_token_cache["expires_at"] = time.time() + expires_in
-        return spotify_token_cache["access_token"]
-    except Exception as exc:
-        print(f"⚠️ Erreur token Spotify: {exc}")
-        return None
-
-
-def search_spotify_track_album(token: str, artist_name: str, track_title: str) -> str | None:
-    """
-    Recherche l'album d'une piste sur Spotify.
-    
-    Args:
-        token: Token d'accès Spotify
-        artist_name: Nom de l'artiste
-        track_title: Titre de la piste
-        
-    Returns:
-        Nom de l'album ou None si non trouvé
-    """
-    if not token:
-        return None
-
-    try:
-        # Recherche de la piste
-        query = urllib.parse.quote(f"track:{track_title} artist:{artist_name}")
-        url = f"https://api.spotify.com/v1/search?q={query}&type=track&limit=1"
-        req = urllib.request.Request(url)
-        req.add_header("Authorization", f"Bearer {token}")
-
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        
-        tracks = data.get("tracks", {}).get("items", [])
-        if tracks and tracks[0].get("album"):
-            album_name = tracks[0]["album"]["name"]
-            return album_name
-        
-        # Fallback : recherche sans artiste
-        query = urllib.parse.quote(f"track:{track_title}")
-        url = f"https://api.spotify.com/v1/search?q={query}&type=track&limit=1"
-        req = urllib.request.Request(url)
-        req.add_header("Authorization", f"Bearer {token}")
-
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        
-        tracks = data.get("tracks", {}).get("items", [])
-        if tracks and tracks[0].get("album"):
-            album_name = tracks[0]["album"]["name"]
-            return album_name
-            
-        return None
-    except Exception as e:
-        print(f"⚠️ Erreur recherche Spotify pour {artist_name} - {track_title}: {e}")
-        return None
-
-
 def is_radio_track(track: dict) -> bool:
     """
     Détermine si un enregistrement provient d'une radio.
@@ -171,8 +86,7 @@ def fix_radio_tracks(json_file: str = None) -> None:
     
     # Charger le fichier
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_history_file(json_file)
     except FileNotFoundError:
         print(f"❌ Erreur : Le fichier {json_file} n'existe pas.")
         return
@@ -218,7 +132,8 @@ def fix_radio_tracks(json_file: str = None) -> None:
     
     # Récupérer le token Spotify
     print("\n🔑 Récupération du token Spotify...")
-    spotify_token = get_spotify_token()
+    spotify = get_shared_client()
+    spotify_token = spotify.get_token()
     if not spotify_token:
         print("⚠️ Impossible de récupérer le token Spotify")
         print("   Les albums ne seront pas recherchés.")
@@ -228,8 +143,12 @@ def fix_radio_tracks(json_file: str = None) -> None:
     # Appliquer les corrections
     corrected_count = 0
     albums_found = 0
+    corrected = []
+    replaced = []
     
     for track, (artist, title) in radio_tracks:
+        replaced.append(dict(track))
+        corrected.append(track)
         original_artist = track['artist']
         station = track['title']
         
@@ -241,14 +160,13 @@ def fix_radio_tracks(json_file: str = None) -> None:
         album = None
         if spotify_token:
             print(f"🔍 Recherche album pour: {artist} - {title}...", end=" ")
-            album = search_spotify_track_album(spotify_token, artist, title)
+            album = spotify.track_album(artist, title)
             if album:
                 track['album'] = album
                 albums_found += 1
                 print(f"✅ {album}")
             else:
                 print("⚠️ Album non trouvé")
-            time.sleep(0.3)  # Éviter le rate limiting
         
         corrected_count += 1
     
@@ -266,10 +184,9 @@ def fix_radio_tracks(json_file: str = None) -> None:
     except Exception as e:
         print(f"⚠️ Erreur lors de la création du backup : {e}")
     
-    # Sauvegarder le fichier corrigé
+    # Sauvegarder le fichier corrigé (journal: remplacement des écoutes corrigées)
     try:
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        save_history(json_file, data, updated=corrected, deleted=replaced)
         
         print(f"\n✅ Correction terminée !")
         print(f"\n📊 Résultats:")
@@ -15,7 +15,7 @@ Stratégie de migration:
     Phase 2: Import Historique Roon (data/history/chk-roon.json)
         - Créer artistes manquants
         - Créer albums manquants
-        - Créer tracks (dédupliquer par album + titre)
+        - Créer tracks (dédupliquer par album + interprète + titre)
         - Créer listening_history (timestamp, source, loved)
         - Créer images (Spotify + Last.fm)
         - Compléter metadata.ai_info si présent
@@ -39,13 +39,26 @@ Exemple d'utilisation:
     
     $ python3 migrate_to_sqlite.py --db-path custom.db
     # Utilise un chemin personnalisé pour la base
+    
+    $ python3 migrate_to_sqlite.py --since 2026-01-01
+    # N'importe que les écoutes postérieures à une date
+    
+    $ python3 migrate_to_sqlite.py --full
+    # Ignore le marqueur de synchronisation et ré-importe tout l'historique
+
+Synchronisation incrémentale:
+    Le plus grand timestamp importé est mémorisé par source dans la table
+    sync_state. Sans option, seules les écoutes plus récentes que ce marqueur
+    sont importées, ce qui permet d'exécuter le script périodiquement. Les
+    écoutes sont écrites par upsert (track, timestamp, source): un ré-import
+    met à jour loved/date sans créer de doublon.
 
 Dépendances:
     - sqlalchemy: ORM
     - python-dotenv: Variables d'environnement
     
 Auteur: Patrick Ostertag
-Version: 1.0.0
+Version: 1.2.0
 Date: 27 janvier 2026
 """
 
@@ -54,11 +67,13 @@ import sys
 import json
 import argparse
 import shutil
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, func, insert, inspect, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
@@ -77,6 +92,22 @@ from src.models.schema import (
     ListeningHistory,
     Image,
     Metadata,
+    SyncState,
+    RollupDaily,
+    album_artist,
+)
+from src.models.database import get_engine
+from src.models.rollups import rebuild_rollups
+from src.models.history_log import HistoryLog, iter_history_file
+from src.constants import (
+    UNKNOWN_ARTIST,
+    UNKNOWN_ALBUM,
+    UNKNOWN_TITLE,
+    SOURCE_ROON,
+    SOURCE_LASTFM,
+    SOURCE_SPOTIFY,
+    SOURCE_DISCOGS,
+    DATE_FORMAT_DISPLAY,
 )
 
 # Charger les variables d'environnement
@@ -88,6 +119,16 @@ ROON_JSON = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")
 SOUNDTRACK_JSON = os.path.join(PROJECT_ROOT, "data", "collection", "soundtrack.json")
 DEFAULT_DB_PATH = os.path.join(PROJECT_ROOT, "data", "musique.db")
 BACKUP_DIR = os.path.join(PROJECT_ROOT, "backups", "json")
+DISCOGS_RELEASE_URL = "https://www.discogs.com/release"
+
+# Taille des lots pour les insertions executemany
+BATCH_SIZE = 5000
+
+# Index remplacés par des index couvrants (supprimés lors de la mise à niveau)
+OBSOLETE_INDEXES = ('ix_listening_history_source',)
+
+# Clés de statistiques qui ne sont pas des compteurs de lignes insérées
+NON_ROW_STATS = ('rows', 'seconds', 'skipped')
 
 
 def backup_json_files() -> str:
@@ -128,9 +169,22 @@ def create_database(db_path: str) -> Tuple[any, any]:
     """
     print(f"🗄️  Création de la base de données: {db_path}")
     
-    engine = create_engine(f'sqlite:///{db_path}', echo=False)
+    engine = get_engine(db_path)
+    rollups_missing = not inspect(engine).has_table(RollupDaily.__tablename__)
     Base.metadata.create_all(engine)
     
+    for column in upgrade_schema(engine):
+        print(f"  ✓ Colonne ajoutée: {column}")
+    
+    backfilled = backfill_history_keys(engine)
+    if backfilled:
+        print(f"  ✓ {backfilled} écoutes complétées (artist_id/album_id)")
+    
+    if rollups_missing:
+        # Tables d'agrégats ajoutées à une base existante: calcul initial depuis l'historique
+        rebuild_rollups(engine)
+        print("  ✓ Agrégats d'écoutes initialisés (rollup_*)")
+    
     Session = sessionmaker(bind=engine)
     session = Session()
     
@@ -139,86 +193,603 @@ def create_database(db_path: str) -> Tuple[any, any]:
     return engine, session
 
 
-def migrate_discogs_collection(session: any, dry_run: bool = False) -> Dict:
+def upgrade_schema(engine: Any) -> List[str]:
+    """Met à niveau une base existante vers le schéma courant.
+    
+    create_all() ne crée que les tables absentes: les colonnes nullable et les
+    index ajoutés au schéma depuis la création de la base sont ajoutés ici
+    (ALTER TABLE ... ADD COLUMN, CREATE INDEX IF NOT EXISTS) et les index
+    remplacés (OBSOLETE_INDEXES) sont supprimés.
+    
+    Args:
+        engine: Moteur SQLAlchemy.
+        
+    Returns:
+        List[str]: Colonnes ajoutées ("table.colonne").
+    """
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        for index_name in OBSOLETE_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS {index_name}'))
+    return added
+
+
+def backfill_history_keys(engine: Any) -> int:
+    """Renseigne artist_id/album_id des écoutes importées avant leur ajout au schéma.
+    
+    Args:
+        engine: Moteur SQLAlchemy.
+        
+    Returns:
+        int: Nombre d'écoutes mises à jour.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(text(
+            "UPDATE listening_history SET "
+            "artist_id = (SELECT artist_id FROM tracks WHERE tracks.id = listening_history.track_id), "
+            "album_id = (SELECT album_id FROM tracks WHERE tracks.id = listening_history.track_id) "
+            "WHERE album_id IS NULL"
+        ))
+        return result.rowcount or 0
+
+
+class MigrationIdMaps:
+    """Tables de correspondance clé naturelle → identifiant pour l'import en masse.
+    
+    Chargées une seule fois depuis la base au début de la migration, elles
+    évitent toute requête SELECT par ligne: les identifiants des nouvelles
+    lignes sont attribués en mémoire puis insérés par lots (executemany).
+    
+    Attributes:
+        artists: Nom d'artiste → artists.id
+        albums_by_discogs: discogs_id → albums.id
+        albums_by_key: (artiste normalisé, titre normalisé) → albums.id
+        album_artists: Couples (album_id, artist_id) déjà liés
+        tracks: (album_id, artist_id, titre) → tracks.id
+        images: Clés (artist_id, album_id, image_type, source) déjà présentes
+        metadata: album_id → True si ai_info est déjà renseigné
+    """
+    
+    def __init__(self, session: Any):
+        """Charge les correspondances existantes depuis la base.
+        
+        Args:
+            session: Session SQLAlchemy ouverte sur la base cible.
+        """
+        self.artists = {
+            name: artist_id
+            for artist_id, name in session.execute(select(Artist.id, Artist.name))
+        }
+        self.albums_by_discogs = {}
+        self.albums_by_key = {}
+        album_titles = {}
+        for album_id, title, discogs_id in session.execute(
+            select(Album.id, Album.title, Album.discogs_id)
+        ):
+            album_titles[album_id] = title
+            if discogs_id:
+                self.albums_by_discogs[discogs_id] = album_id
+        
+        artist_names = {artist_id: name for name, artist_id in self.artists.items()}
+        self.album_artists = set()
+        for album_id, artist_id in session.execute(
+            select(album_artist.c.album_id, album_artist.c.artist_id)
+        ):
+            self.album_artists.add((album_id, artist_id))
+            key = album_key(artist_names.get(artist_id, ''), album_titles.get(album_id, ''))
+            self.albums_by_key.setdefault(key, album_id)
+        
+        self.tracks = {
+            (album_id, artist_id, title): track_id
+            for track_id, album_id, artist_id, title in session.execute(
+                select(Track.id, Track.album_id, Track.artist_id, Track.title)
+            )
+        }
+        self.images = set(session.execute(
+            select(Image.artist_id, Image.album_id, Image.image_type, Image.source)
+        ).all())
+        self.metadata = {
+            album_id: bool(ai_info)
+            for album_id, ai_info in session.execute(select(Metadata.album_id, Metadata.ai_info))
+        }
+        
+        self.next_artist_id = _max_id(session, Artist) + 1
+        self.next_album_id = _max_id(session, Album) + 1
+        self.next_track_id = _max_id(session, Track) + 1
+    
+    def artist_id(self, name: str, new_rows: List[Dict]) -> int:
+        """Retourne l'id d'un artiste, en le créant en mémoire si nécessaire."""
+        artist_id = self.artists.get(name)
+        if artist_id is None:
+            artist_id = self.next_artist_id
+            self.next_artist_id += 1
+            self.artists[name] = artist_id
+            new_rows.append({'id': artist_id, 'name': name})
+        return artist_id
+    
+    def new_album_id(self) -> int:
+        """Réserve un nouvel identifiant d'album."""
+        album_id = self.next_album_id
+        self.next_album_id += 1
+        return album_id
+    
+    def track_id(self, album_id: int, artist_id: int, title: str, new_rows: List[Dict]) -> int:
+        """Retourne l'id d'une piste (album + interprète + titre), en la créant si nécessaire."""
+        key = (album_id, artist_id, title)
+        track_id = self.tracks.get(key)
+        if track_id is None:
+            track_id = self.next_track_id
+            self.next_track_id += 1
+            self.tracks[key] = track_id
+            new_rows.append({'id': track_id, 'album_id': album_id, 'artist_id': artist_id, 'title': title})
+        return track_id
+    
+    def add_image(self, rows: List[Dict], url: Optional[str], image_type: str, source: str,
+                  artist_id: Optional[int] = None, album_id: Optional[int] = None) -> None:
+        """Ajoute une image si aucune image du même type/source n'existe déjà."""
+        if not url:
+            return
+        key = (artist_id, album_id, image_type, source)
+        if key in self.images:
+            return
+        self.images.add(key)
+        rows.append({
+            'url': url,
+            'image_type': image_type,
+            'source': source,
+            'artist_id': artist_id,
+            'album_id': album_id,
+        })
+
+
+def album_key(artist_name: str, album_title: str) -> Tuple[str, str]:
+    """Construit la clé de rapprochement d'un album (artiste, titre) insensible à la casse.
+    
+    Args:
+        artist_name: Nom de l'artiste principal.
+        album_title: Titre de l'album.
+        
+    Returns:
+        Tuple[str, str]: Clé normalisée utilisée par les tables de correspondance.
+    """
+    return ((artist_name or '').strip().lower(), (album_title or '').strip().lower())
+
+
+def _max_id(session: Any, model: Any) -> int:
+    """Retourne le plus grand id d'une table (0 si vide)."""
+    return session.execute(select(func.max(model.id))).scalar() or 0
+
+
+def _bulk_insert(session: Any, table: Any, rows: List[Dict]) -> int:
+    """Insère des lignes par lots via executemany (SQLAlchemy Core).
+    
+    Args:
+        session: Session SQLAlchemy.
+        table: Table SQLAlchemy cible.
+        rows: Lignes à insérer (dictionnaires colonne → valeur).
+        
+    Returns:
+        int: Nombre de lignes soumises.
+    """
+    if not rows:
+        return 0
+    stmt = insert(table)
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(stmt, rows[start:start + BATCH_SIZE])
+    return len(rows)
+
+
+def _load_soundtracks(json_path: str) -> Dict[str, Dict]:
+    """Charge soundtrack.json indexé par titre d'album en minuscules."""
+    if not os.path.exists(json_path):
+        return {}
+    with open(json_path, 'r', encoding='utf-8') as f:
+        soundtracks = json.load(f)
+    return {
+        (entry.get('album_title') or '').strip().lower(): entry
+        for entry in soundtracks
+    }
+
+
+def _parse_year(value: Any) -> Optional[int]:
+    """Convertit une année éventuellement textuelle en entier (None si invalide)."""
+    try:
+        year = int(value)
+    except (TypeError, ValueError):
+        return None
+    return year or None
+
+
+def _upsert_history(session: Any, rows: List[Dict]) -> int:
+    """Écrit les écoutes par lots avec un upsert clé (track, timestamp, source).
+    
+    Une écoute déjà présente pour la même source voit loved/date mis à jour;
+    une écoute de la même piste au même instant provenant d'une autre source
+    est ignorée (contrainte d'unicité track_id + timestamp).
+    
+    Args:
+        session: Session SQLAlchemy.
+        rows: Lignes listening_history à écrire.
+        
+    Returns:
+        int: Nombre de lignes soumises.
+    """
+    if not rows:
+        return 0
+    table = ListeningHistory.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['track_id', 'timestamp'],
+        set_={'loved': stmt.excluded.loved, 'date': stmt.excluded.date},
+        where=table.c.source == stmt.excluded.source,
+    )
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(stmt, rows[start:start + BATCH_SIZE])
+    return len(rows)
+
+
+def load_high_water_marks(session: Any) -> Dict[str, int]:
+    """Charge le dernier timestamp importé pour chaque source.
+    
+    Args:
+        session: Session SQLAlchemy.
+        
+    Returns:
+        Dict[str, int]: Source → dernier timestamp importé.
+    """
+    return dict(session.execute(select(SyncState.source, SyncState.last_timestamp)).all())
+
+
+def save_high_water_marks(session: Any, marks: Dict[str, Tuple[int, int]]) -> None:
+    """Enregistre les marqueurs de synchronisation (sans jamais les faire reculer).
+    
+    Args:
+        session: Session SQLAlchemy.
+        marks: Source → (plus grand timestamp vu, nombre d'écoutes écrites).
+    """
+    if not marks:
+        return
+    table = SyncState.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['source'],
+        set_={
+            'last_timestamp': func.max(table.c.last_timestamp, stmt.excluded.last_timestamp),
+            'rows_imported': stmt.excluded.rows_imported,
+            'updated_at': func.now(),
+        },
+    )
+    session.execute(stmt, [
+        {'source': source, 'last_timestamp': last_timestamp, 'rows_imported': rows}
+        for source, (last_timestamp, rows) in marks.items()
+    ])
+
+
+def parse_since(value: str) -> int:
+    """Convertit l'argument --since en timestamp Unix.
+    
+    Args:
+        value: Timestamp Unix, date "YYYY-MM-DD" ou "YYYY-MM-DD HH:MM".
+        
+    Returns:
+        int: Timestamp Unix correspondant (heure locale).
+        
+    Raises:
+        argparse.ArgumentTypeError: Si le format n'est pas reconnu.
+    """
+    if value.isdigit():
+        return int(value)
+    for fmt in (DATE_FORMAT_DISPLAY, '%Y-%m-%d'):
+        try:
+            return int(datetime.strptime(value, fmt).timestamp())
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(
+        f"Format invalide pour --since: {value} (attendu: timestamp, YYYY-MM-DD ou 'YYYY-MM-DD HH:MM')"
+    )
+
+
+def _finish_phase(session: Any, stats: Dict, started: float, dry_run: bool) -> Dict:
+    """Termine une phase: commit (ou simple flush en dry-run) et calcul du débit.
+    
+    En dry-run la transaction reste ouverte pour que la phase suivante voie les
+    lignes simulées; l'appelant doit effectuer le rollback final.
+    """
+    if dry_run:
+        session.flush()
+    else:
+        session.commit()
+    
+    elapsed = time.perf_counter() - started
+    rows = sum(value for key, value in stats.items() if key not in NON_ROW_STATS)
+    stats['rows'] = rows
+    stats['seconds'] = round(elapsed, 3)
+    return stats
+
+
+def migrate_discogs_collection(
+    session: Any,
+    dry_run: bool = False,
+    json_path: Optional[str] = None,
+    soundtrack_path: Optional[str] = None,
+) -> Dict:
     """Migre la collection Discogs vers SQLite.
     
+    Toutes les lignes sont construites en mémoire (tables de correspondance
+    d'identifiants) puis insérées par lots dans une seule transaction.
+    
     Args:
         session: Session SQLAlchemy.
         dry_run: Si True, ne modifie pas la base.
+        json_path: Chemin de discogs-collection.json (défaut: DISCOGS_JSON).
+        soundtrack_path: Chemin de soundtrack.json (défaut: SOUNDTRACK_JSON).
         
     Returns:
-        Dict: Statistiques de migration {albums, artists, images, metadata}.
+        Dict: Statistiques de migration {albums, artists, album_artists, images,
+            metadata, rows, seconds}.
     """
     print("\n📚 Phase 1: Migration Collection Discogs")
     
-    if not os.path.exists(DISCOGS_JSON):
-        print(f"  ⚠️  Fichier non trouvé: {DISCOGS_JSON}")
+    json_path = json_path or DISCOGS_JSON
+    soundtrack_path = soundtrack_path or SOUNDTRACK_JSON
+    
+    if not os.path.exists(json_path):
+        print(f"  ⚠️  Fichier non trouvé: {json_path}")
         return {}
     
-    with open(DISCOGS_JSON, 'r', encoding='utf-8') as f:
+    started = time.perf_counter()
+    
+    with open(json_path, 'r', encoding='utf-8') as f:
         discogs_data = json.load(f)
     
-    stats = {
-        'albums': 0,
-        'artists': 0,
-        'images': 0,
-        'metadata': 0,
-    }
+    soundtracks = _load_soundtracks(soundtrack_path)
+    maps = MigrationIdMaps(session)
     
-    # TODO: Implémenter la logique de migration
-    # 1. Créer ou récupérer artistes
-    # 2. Créer albums avec relations
-    # 3. Créer images
-    # 4. Créer metadata
+    artist_rows: List[Dict] = []
+    album_rows: List[Dict] = []
+    link_rows: List[Dict] = []
+    image_rows: List[Dict] = []
+    metadata_rows: List[Dict] = []
     
-    print(f"  📊 Statistiques: {len(discogs_data)} albums à migrer")
-    print("  ⚠️  TODO: Logique de migration à implémenter")
+    for entry in discogs_data:
+        release_id = entry.get('release_id')
+        title = (entry.get('Titre') or '').strip()
+        if not release_id or not title:
+            continue
+        
+        discogs_id = str(release_id)
+        if discogs_id in maps.albums_by_discogs:
+            continue
+        
+        artists = entry.get('Artiste') or []
+        if isinstance(artists, str):
+            artists = [artists]
+        artists = [name.strip() for name in artists if name and name.strip()] or [UNKNOWN_ARTIST]
+        
+        album_id = maps.new_album_id()
+        maps.albums_by_discogs[discogs_id] = album_id
+        album_rows.append({
+            'id': album_id,
+            'title': title,
+            'year': _parse_year(entry.get('Année')),
+            'support': entry.get('Support'),
+            'discogs_id': discogs_id,
+            'spotify_url': entry.get('Spotify_URL'),
+            'discogs_url': f"{DISCOGS_RELEASE_URL}/{discogs_id}",
+        })
+        
+        for name in artists:
+            artist_id = maps.artist_id(name, artist_rows)
+            if (album_id, artist_id) not in maps.album_artists:
+                maps.album_artists.add((album_id, artist_id))
+                link_rows.append({'album_id': album_id, 'artist_id': artist_id})
+            maps.albums_by_key.setdefault(album_key(name, title), album_id)
+        
+        maps.add_image(image_rows, entry.get('Pochette'), 'album_cover', SOURCE_DISCOGS, album_id=album_id)
+        maps.add_image(image_rows, entry.get('Spotify_Cover_URL'), 'album_cover', SOURCE_SPOTIFY, album_id=album_id)
+        
+        soundtrack = soundtracks.get(title.lower())
+        if entry.get('Resume') or soundtrack:
+            maps.metadata[album_id] = False
+            metadata_rows.append({
+                'album_id': album_id,
+                'ai_info': None,
+                'resume': entry.get('Resume'),
+                'is_soundtrack': soundtrack is not None,
+                'film_title': soundtrack.get('film_title') if soundtrack else None,
+                'film_year': _parse_year(soundtrack.get('year')) if soundtrack else None,
+                'film_director': soundtrack.get('director') if soundtrack else None,
+            })
     
-    if not dry_run:
-        session.commit()
+    stats = {
+        'artists': _bulk_insert(session, Artist.__table__, artist_rows),
+        'albums': _bulk_insert(session, Album.__table__, album_rows),
+        'album_artists': _bulk_insert(session, album_artist, link_rows),
+        'images': _bulk_insert(session, Image.__table__, image_rows),
+        'metadata': _bulk_insert(session, Metadata.__table__, metadata_rows),
+    }
     
-    return stats
+    print(f"  📊 {len(discogs_data)} albums lus, {stats['albums']} nouveaux albums importés")
+    
+    return _finish_phase(session, stats, started, dry_run)
 
 
-def migrate_roon_history(session: any, dry_run: bool = False) -> Dict:
+def migrate_roon_history(
+    session: Any,
+    dry_run: bool = False,
+    json_path: Optional[str] = None,
+    since: Optional[int] = None,
+    full: bool = False,
+) -> Dict:
     """Migre l'historique Roon vers SQLite.
     
+    Les artistes, albums et pistes manquants sont créés à la volée via les
+    tables de correspondance en mémoire; les écoutes sont écrites par lots
+    avec un upsert (track, timestamp, source).
+    
+    Par défaut la migration est incrémentale: seules les écoutes plus récentes
+    que le marqueur sync_state de leur source sont traitées.
+    
     Args:
         session: Session SQLAlchemy.
         dry_run: Si True, ne modifie pas la base.
+        json_path: Chemin de chk-roon.json (défaut: ROON_JSON); son journal
+            (chk-roon.log/) est lu à la place s'il existe.
+        since: Si fourni, traite les écoutes dont le timestamp est >= since
+            (remplace les marqueurs).
+        full: Si True, ignore les marqueurs et traite tout l'historique.
         
     Returns:
-        Dict: Statistiques de migration {tracks, listening_history, images}.
+        Dict: Statistiques de migration {artists, albums, album_artists, tracks,
+            listening_history, images, metadata, skipped, rows, seconds}.
     """
     print("\n🎵 Phase 2: Migration Historique Roon")
     
-    if not os.path.exists(ROON_JSON):
-        print(f"  ⚠️  Fichier non trouvé: {ROON_JSON}")
+    json_path = json_path or ROON_JSON
+    
+    if not os.path.exists(json_path) and not HistoryLog.for_json(json_path).exists():
+        print(f"  ⚠️  Fichier non trouvé: {json_path}")
         return {}
     
-    with open(ROON_JSON, 'r', encoding='utf-8') as f:
-        roon_data = json.load(f)
+    started = time.perf_counter()
+    
+    maps = MigrationIdMaps(session)
+    
+    high_water_marks = {} if full or since is not None else load_high_water_marks(session)
+    min_timestamp = since or 0
+    new_marks: Dict[str, Tuple[int, int]] = {}
+    skipped = 0
+    
+    artist_rows: List[Dict] = []
+    album_rows: List[Dict] = []
+    link_rows: List[Dict] = []
+    track_rows: List[Dict] = []
+    history_rows: List[Dict] = []
+    image_rows: List[Dict] = []
+    metadata_rows: List[Dict] = []
+    metadata_updates: List[Dict] = []
+    seen_plays = set()
+    read = 0
+    
+    for play in iter_history_file(json_path):
+        read += 1
+        timestamp = play.get('timestamp')
+        if timestamp is None:
+            continue
+        timestamp = int(timestamp)
+        
+        source = play.get('source') or SOURCE_ROON
+        if timestamp < min_timestamp or timestamp <= high_water_marks.get(source, -1):
+            skipped += 1
+            continue
+        
+        artist_name = (play.get('artist') or '').strip() or UNKNOWN_ARTIST
+        album_title = (play.get('album') or '').strip() or UNKNOWN_ALBUM
+        title = (play.get('title') or '').strip() or UNKNOWN_TITLE
+        
+        artist_id = maps.artist_id(artist_name, artist_rows)
+        
+        key = album_key(artist_name, album_title)
+        album_id = maps.albums_by_key.get(key)
+        if album_id is None:
+            album_id = maps.new_album_id()
+            maps.albums_by_key[key] = album_id
+            album_rows.append({'id': album_id, 'title': album_title})
+        if (album_id, artist_id) not in maps.album_artists:
+            maps.album_artists.add((album_id, artist_id))
+            link_rows.append({'album_id': album_id, 'artist_id': artist_id})
+        
+        track_id = maps.track_id(album_id, artist_id, title, track_rows)
+        
+        if (track_id, timestamp) not in seen_plays:
+            seen_plays.add((track_id, timestamp))
+            history_rows.append({
+                'track_id': track_id,
+                'artist_id': artist_id,
+                'album_id': album_id,
+                'timestamp': timestamp,
+                'date': play.get('date') or datetime.fromtimestamp(timestamp).strftime(DATE_FORMAT_DISPLAY),
+                'source': source,
+                'loved': bool(play.get('loved')),
+            })
+            last_timestamp, count = new_marks.get(source, (0, 0))
+            new_marks[source] = (max(last_timestamp, timestamp), count + 1)
+        
+        maps.add_image(image_rows, play.get('artist_spotify_image'), 'artist_image', SOURCE_SPOTIFY, artist_id=artist_id)
+        maps.add_image(image_rows, play.get('album_spotify_image'), 'album_cover', SOURCE_SPOTIFY, album_id=album_id)
+        maps.add_image(image_rows, play.get('album_lastfm_image'), 'album_cover', SOURCE_LASTFM, album_id=album_id)
+        
+        ai_info = play.get('ai_info')
+        if ai_info and not maps.metadata.get(album_id):
+            if album_id in maps.metadata:
+                metadata_updates.append({'b_album_id': album_id, 'ai_info': ai_info})
+            else:
+                metadata_rows.append({'album_id': album_id, 'ai_info': ai_info})
+            maps.metadata[album_id] = True
     
     stats = {
-        'tracks': 0,
-        'listening_history': 0,
-        'images': 0,
+        'artists': _bulk_insert(session, Artist.__table__, artist_rows),
+        'albums': _bulk_insert(session, Album.__table__, album_rows),
+        'album_artists': _bulk_insert(session, album_artist, link_rows),
+        'tracks': _bulk_insert(session, Track.__table__, track_rows),
+        'listening_history': _upsert_history(session, history_rows),
+        'images': _bulk_insert(session, Image.__table__, image_rows),
+        'metadata': _bulk_insert(session, Metadata.__table__, metadata_rows),
     }
     
-    # TODO: Implémenter la logique de migration
-    # 1. Créer artistes/albums manquants
-    # 2. Créer tracks
-    # 3. Créer listening_history
-    # 4. Créer images (Spotify + Last.fm)
+    if metadata_updates:
+        metadata_table = Metadata.__table__
+        session.execute(
+            update(metadata_table)
+            .where(metadata_table.c.album_id == bindparam('b_album_id'))
+            .values(ai_info=bindparam('ai_info')),
+            metadata_updates,
+        )
+        stats['metadata'] += len(metadata_updates)
     
-    tracks = roon_data.get('tracks', [])
-    print(f"  📊 Statistiques: {len(tracks)} écoutes à migrer")
-    print("  ⚠️  TODO: Logique de migration à implémenter")
+    save_high_water_marks(session, new_marks)
+    stats['skipped'] = skipped
     
-    if not dry_run:
-        session.commit()
+    print(f"  📊 {read} écoutes lues, {stats['listening_history']} écoutes importées, "
+          f"{skipped} déjà synchronisées")
     
-    return stats
+    return _finish_phase(session, stats, started, dry_run)
+
+
+def print_throughput_report(phases: Dict[str, Dict]) -> None:
+    """Affiche le débit d'import (lignes/s) de chaque phase.
+    
+    Args:
+        phases: Nom de phase → statistiques retournées par la migration.
+    """
+    print("\n📈 Débit de migration")
+    total_rows = 0
+    total_seconds = 0.0
+    for name, stats in phases.items():
+        if not stats:
+            continue
+        rows = stats.get('rows', 0)
+        seconds = stats.get('seconds', 0.0)
+        total_rows += rows
+        total_seconds += seconds
+        rate = rows / seconds if seconds > 0 else 0
+        print(f"  {name:<12} {rows:>8} lignes en {seconds:>7.2f}s ({rate:,.0f} lignes/s)")
+    
+    rate = total_rows / total_seconds if total_seconds > 0 else 0
+    print(f"  {'Total':<12} {total_rows:>8} lignes en {total_seconds:>7.2f}s ({rate:,.0f} lignes/s)")
 
 
 def validate_migration(session: any) -> bool:
@@ -272,6 +843,17 @@ def main():
         action='store_true',
         help="Ne pas créer de sauvegarde des JSON"
     )
+    sync_group = parser.add_mutually_exclusive_group()
+    sync_group.add_argument(
+        '--since',
+        type=parse_since,
+        help="N'importer que les écoutes depuis cette date (timestamp, YYYY-MM-DD ou 'YYYY-MM-DD HH:MM')"
+    )
+    sync_group.add_argument(
+        '--full',
+        action='store_true',
+        help="Ignorer le marqueur de synchronisation et ré-importer tout l'historique"
+    )
     
     args = parser.parse_args()
     
@@ -295,7 +877,12 @@ def main():
         discogs_stats = migrate_discogs_collection(session, args.dry_run)
         
         # Phase 2: Historique Roon
-        roon_stats = migrate_roon_history(session, args.dry_run)
+        roon_stats = migrate_roon_history(session, args.dry_run, since=args.since, full=args.full)
+        
+        print_throughput_report({'Discogs': discogs_stats, 'Roon': roon_stats})
+        
+        if args.dry_run:
+            session.rollback()
         
         # Phase 3: Validation
         if not args.dry_run:
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Reconstruction et contrôle des agrégats d'écoutes (tables rollup_*).
+
+Les tables d'agrégats (écoutes par jour, par heure, par artiste et par album
+et par jour) sont maintenues automatiquement par des triggers SQLite à chaque
+insertion dans listening_history. Ce script permet:
+    - de vérifier leur cohérence avec l'historique brut (--check)
+    - de les reconstruire entièrement (défaut), par exemple après un
+      changement de fuseau horaire ou une modification manuelle de la base
+
+Exemple d'utilisation:
+    $ python3 rebuild-rollups.py --check
+    $ python3 rebuild-rollups.py
+    $ python3 rebuild-rollups.py --db-path /tmp/musique.db
+
+Code de sortie:
+    0: agrégats cohérents (--check) ou reconstruits
+    1: incohérences détectées (--check) ou base introuvable
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+sys.path.insert(0, PROJECT_ROOT)
+from src.models.database import DEFAULT_DB_PATH, get_engine
+from src.models.rollups import check_rollups, ensure_rollups, rebuild_rollups
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Reconstruction des agrégats d'écoutes")
+    parser.add_argument('--check', action='store_true',
+                        help="Vérifier la cohérence sans rien modifier")
+    parser.add_argument('--db-path', default=DEFAULT_DB_PATH,
+                        help="Chemin de la base SQLite (défaut: data/musique.db)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Base introuvable: {args.db_path}")
+        return 1
+
+    engine = get_engine(args.db_path)
+
+    if args.check:
+        if ensure_rollups(engine):
+            print("⚠️  Tables d'agrégats absentes: créées vides, reconstruction nécessaire")
+        print("🔍 Contrôle des agrégats...")
+        mismatches = check_rollups(engine)
+        for table, count in mismatches.items():
+            status = "✅" if count == 0 else "❌"
+            print(f"  {status} {table}: {count} ligne(s) divergente(s)")
+        if any(mismatches.values()):
+            print("\n💡 Relancez sans --check pour reconstruire les agrégats")
+            return 1
+        print("\n✅ Agrégats cohérents avec l'historique")
+        return 0
+
+    print("🔄 Reconstruction des agrégats...")
+    started = time.perf_counter()
+    counts = rebuild_rollups(engine)
+    for table, count in counts.items():
+        print(f"  ✓ {table}: {count} ligne(s)")
+    print(f"\n✅ Agrégats reconstruits en {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,43 +4,56 @@ Script pour supprimer les doublons consécutifs dans chk-roon.json
 Un doublon est défini comme une piste identique (artiste, titre, album) 
 qui apparaît immédiatement après la même piste sans autre piste entre les deux.
 
+Si l'historique a été converti en journal (data/history/chk-roon.log/),
+les doublons y sont supprimés par enregistrements de suppression, sans
+réécrire l'historique; sinon chk-roon.json est réécrit atomiquement.
+
+L'historique est lu au fil du fichier (src/models/json_stream.py): seuls
+les doublons trouvés sont gardés en mémoire, et la réécriture filtre une
+seconde lecture en continu.
+
 Auteur: Patrick Ostertag
-Date: 23 janvier 2026
+Date: 28 janvier 2026
 """
 
 import json
 import os
+import sys
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
-def load_tracks() -> Tuple[Dict, List[Dict]]:
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+from models.history_log import HistoryLog, iter_history_file, play_key, read_history_meta, save_history
+
+HISTORY_FILE = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")
+
+def load_tracks(json_file: str = HISTORY_FILE) -> Tuple[Optional[Dict], Iterator[Dict]]:
     """
-    Charge les pistes depuis chk-roon.json.
+    Ouvre les pistes de chk-roon.json (ou de son journal) en lecture continue.
     
+    Args:
+        json_file: Historique à lire
+        
     Returns:
-        Tuple contenant les données complètes et la liste des tracks
+        Tuple contenant les champs hors 'tracks' et un itérateur des pistes
+        (None et un itérateur vide si le fichier est introuvable ou invalide)
     """
-    json_file = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")
-    
-    if not os.path.exists(json_file):
+    if not os.path.exists(json_file) and not HistoryLog.for_json(json_file).exists():
         print(f"❌ Erreur : Le fichier {json_file} n'existe pas.")
-        return None, []
+        return None, iter(())
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        tracks = data.get('tracks', [])
-        return data, tracks
+        return read_history_meta(json_file), iter_history_file(json_file)
     except json.JSONDecodeError:
         print(f"❌ Erreur : Le fichier {json_file} n'est pas un JSON valide.")
-        return None, []
+        return None, iter(())
     except Exception as e:
         print(f"❌ Erreur lors du chargement : {e}")
-        return None, []
+        return None, iter(())
 
 def are_tracks_identical(track1: Dict, track2: Dict) -> bool:
     """
@@ -59,44 +72,54 @@ def are_tracks_identical(track1: Dict, track2: Dict) -> bool:
         track1.get('album') == track2.get('album')
     )
 
-def remove_consecutive_duplicates(tracks: List[Dict]) -> Tuple[List[Dict], int]:
+def find_consecutive_duplicates(tracks: Iterable[Dict]) -> Tuple[int, List[Dict]]:
     """
-    Supprime les doublons consécutifs de la liste de pistes.
+    Repère les doublons consécutifs en une lecture (seuls les doublons sont gardés).
     
     Args:
-        tracks: Liste des pistes
+        tracks: Pistes, dans l'ordre du fichier (liste ou itérateur)
         
     Returns:
-        Tuple contenant la liste nettoyée et le nombre de doublons supprimés
+        Tuple contenant le nombre total de pistes et les détails des doublons
+        (indice dans le fichier, piste complète)
     """
-    if not tracks:
-        return [], 0
-    
-    cleaned_tracks = [tracks[0]]  # Garder la première piste
-    duplicates_count = 0
+    total = 0
     duplicates_details = []
+    previous_track = None
     
-    for i in range(1, len(tracks)):
-        current_track = tracks[i]
-        previous_track = tracks[i-1]
-        
+    for i, current_track in enumerate(tracks):
+        total += 1
         # Vérifier si la piste actuelle est identique à la précédente
-        if are_tracks_identical(current_track, previous_track):
-            # C'est un doublon consécutif - on le saute
-            duplicates_count += 1
+        if previous_track is not None and are_tracks_identical(current_track, previous_track):
             duplicates_details.append({
                 'index': i,
                 'artist': current_track.get('artist'),
                 'title': current_track.get('title'),
                 'album': current_track.get('album'),
                 'date': current_track.get('date'),
-                'timestamp': current_track.get('timestamp')
+                'timestamp': current_track.get('timestamp'),
+                'track': current_track
             })
-        else:
-            # Piste différente - on la garde
-            cleaned_tracks.append(current_track)
+        previous_track = current_track
+    
+    return total, duplicates_details
+
+def remove_consecutive_duplicates(tracks: Iterable[Dict]) -> Tuple[List[Dict], int, List[Dict]]:
+    """
+    Supprime les doublons consécutifs de la liste de pistes.
     
-    return cleaned_tracks, duplicates_count, duplicates_details
+    Args:
+        tracks: Liste des pistes
+        
+    Returns:
+        Tuple contenant la liste nettoyée, le nombre de doublons supprimés
+        et leurs détails
+    """
+    tracks = list(tracks)
+    _, duplicates_details = find_consecutive_duplicates(tracks)
+    duplicate_indices = {dup['index'] for dup in duplicates_details}
+    cleaned_tracks = [track for i, track in enumerate(tracks) if i not in duplicate_indices]
+    return cleaned_tracks, len(duplicates_details), duplicates_details
 
 def backup_file(filename: str) -> str:
     """
@@ -125,26 +148,35 @@ def backup_file(filename: str) -> str:
     
     return backup_filename
 
-def save_tracks(data: Dict, tracks: List[Dict], filename: str = None) -> bool:
+def save_tracks(meta: Dict, duplicates_details: List[Dict], filename: str = None) -> bool:
     """
-    Sauvegarde les pistes dans le fichier JSON.
+    Sauvegarde l'historique sans les doublons.
+    
+    Le fichier JSON est réécrit en continu depuis une seconde lecture, sans
+    les pistes des doublons; si l'historique est en journal, seuls des
+    enregistrements de suppression y sont ajoutés. Une piste n'est retirée
+    que si elle est toujours la même écoute (play_key) qu'à la première
+    lecture: une écoute ajoutée entre-temps décale les indices.
     
     Args:
-        data: Données complètes du fichier
-        tracks: Liste des pistes nettoyées
+        meta: Champs du fichier hors 'tracks'
+        duplicates_details: Doublons repérés (voir find_consecutive_duplicates)
         filename: Nom du fichier de sortie
         
     Returns:
         True si la sauvegarde a réussi, False sinon
     """    
     if filename is None:
-        filename = os.path.join(PROJECT_ROOT, "data", "history", "chk-roon.json")    
+        filename = HISTORY_FILE
     try:
-        # Mettre à jour les tracks dans data
-        data['tracks'] = tracks
+        duplicate_keys = {dup['index']: play_key(dup['track']) for dup in duplicates_details}
+        data = dict(meta)
+        data['tracks'] = (
+            track for i, track in enumerate(iter_history_file(filename))
+            if duplicate_keys.get(i) != play_key(track)
+        )
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        save_history(filename, data, deleted=[dup['track'] for dup in duplicates_details])
         return True
     except Exception as e:
         print(f"❌ Erreur lors de la sauvegarde : {e}")
@@ -159,17 +191,25 @@ def main():
     
     # Charger les données
     print("📂 Chargement de chk-roon.json...")
-    data, tracks = load_tracks()
+    meta, tracks = load_tracks()
     
-    if not data or not tracks:
+    if meta is None:
         return
     
-    print(f"✅ {len(tracks)} piste(s) chargée(s)")
-    print()
-    
-    # Identifier et supprimer les doublons
+    # Identifier les doublons (lecture en continu)
     print("🔍 Recherche des doublons consécutifs...")
-    cleaned_tracks, duplicates_count, duplicates_details = remove_consecutive_duplicates(tracks)
+    try:
+        total, duplicates_details = find_consecutive_duplicates(tracks)
+    except json.JSONDecodeError:
+        print(f"❌ Erreur : Le fichier {HISTORY_FILE} n'est pas un JSON valide.")
+        return
+    duplicates_count = len(duplicates_details)
+    
+    if total == 0:
+        return
+    
+    print(f"✅ {total} piste(s) lue(s)")
+    print()
     
     if duplicates_count == 0:
         print("✅ Aucun doublon consécutif détecté !")
@@ -189,8 +229,8 @@ def main():
     
     print()
     print(f"📊 Résultat:")
-    print(f"  - Pistes avant  : {len(tracks)}")
-    print(f"  - Pistes après  : {len(cleaned_tracks)}")
+    print(f"  - Pistes avant  : {total}")
+    print(f"  - Pistes après  : {total - duplicates_count}")
     print(f"  - Doublons      : {duplicates_count}")
     print()
     
@@ -210,7 +250,7 @@ def main():
     # Sauvegarder les données nettoyées
     print()
     print("💾 Sauvegarde des données nettoyées...")
-    if save_tracks(data, cleaned_tracks):
+    if save_tracks(meta, duplicates_details):
         print("✅ Doublons supprimés avec succès !")
         print()
         print(f"📄 Fichier mis à jour : chk-roon.json")
@@ -5,6 +5,13 @@ vers une base de données relationnelle SQLite.
 
 Modules:
     schema: Définitions SQLAlchemy des tables et relations
+    database: Fabrique de moteurs SQLite (profil WAL, pool partagé)
+    repository: Requêtes de lecture paginées/filtrées (historique, collection)
+    search_index: Index de recherche plein texte FTS5 (accents, préfixes)
+    history_store: Historique d'écoute en colonnes NumPy pour les analyses
+    sessions: Découpage vectorisé en sessions d'écoute (index mis en cache)
+    history_log: Journal d'écoutes en ajout seul (segments JSON Lines, compaction)
+    json_stream: Lecture et écriture en continu des historiques et de la collection JSON
     
 Auteur: Patrick Ostertag
 Version: 1.0.0
@@ -19,8 +26,16 @@ from .schema import (
     ListeningHistory,
     Image,
     Metadata,
+    SyncState,
     AlbumArtist,
 )
+from .database import get_engine, dispose_engines
+from .repository import MusicRepository, is_current, open_repository
+from .search_index import SearchIndex
+from .history_store import ColumnarHistory, history_version, load_history
+from .sessions import SessionIndex
+from .history_log import HistoryLog, convert_json, iter_history_file, load_history_file, save_history
+from .json_stream import iter_collection, iter_tracks, write_json_stream
 
 __all__ = [
     'Base',
@@ -30,5 +45,24 @@ __all__ = [
     'ListeningHistory',
     'Image',
     'Metadata',
+    'SyncState',
     'AlbumArtist',
+    'get_engine',
+    'dispose_engines',
+    'MusicRepository',
+    'open_repository',
+    'is_current',
+    'SearchIndex',
+    'ColumnarHistory',
+    'load_history',
+    'history_version',
+    'SessionIndex',
+    'HistoryLog',
+    'convert_json',
+    'iter_history_file',
+    'load_history_file',
+    'save_history',
+    'iter_tracks',
+    'iter_collection',
+    'write_json_stream',
 ]
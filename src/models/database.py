@@ -0,0 +1,139 @@
+"""Fabrique centrale des moteurs SQLAlchemy pour la base musique.db.
+
+Toutes les connexions à la base SQLite passent par get_engine(), qui applique
+un profil de réglages (PRAGMA) adapté à un usage concurrent: l'interface
+Streamlit lit pendant que le tracker et le scheduler écrivent.
+
+Profil appliqué à chaque nouvelle connexion:
+    - journal_mode=WAL: lecteurs et écrivain ne se bloquent plus mutuellement
+    - synchronous=NORMAL: sûr en mode WAL, évite un fsync par transaction
+    - mmap_size: lecture des pages via mémoire partagée
+    - cache_size: cache de pages par connexion (valeur négative = Kio)
+    - busy_timeout: attente au lieu d'une erreur "database is locked"
+    - temp_store=MEMORY: tris et index temporaires en mémoire
+
+Les moteurs sont mis en cache par chemin de base: un même processus partage
+un seul pool de connexions par fichier.
+
+Exemple d'utilisation:
+    >>> from src.models.database import get_engine
+    >>> from sqlalchemy.orm import sessionmaker
+    >>>
+    >>> engine = get_engine()  # data/musique.db avec le profil par défaut
+    >>> Session = sessionmaker(bind=engine)
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 27 janvier 2026
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+# Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce module)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DB_PATH = os.path.join(PROJECT_ROOT, "data", "musique.db")
+
+# Profil de réglages SQLite (ordre d'application conservé)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,   # 256 Mio
+    'cache_size': -65536,     # 64 Mio
+    'busy_timeout': 5000,     # millisecondes
+    'temp_store': 'MEMORY',
+}
+
+# Dimensionnement du pool partagé (GUI multi-thread + tâches planifiées)
+POOL_SIZE = 5
+POOL_MAX_OVERFLOW = 10
+
+_engines: Dict[Tuple[str, bool], Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def apply_pragmas(dbapi_connection, pragmas: Dict[str, object]) -> None:
+    """Applique une série de PRAGMA sur une connexion sqlite3.
+
+    Args:
+        dbapi_connection: Connexion DB-API (sqlite3.Connection).
+        pragmas: Nom du PRAGMA → valeur.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_sqlite_engine(db_path: str, tuned: bool = True, echo: bool = False) -> Engine:
+    """Crée un nouveau moteur SQLite (non mis en cache).
+
+    Args:
+        db_path: Chemin du fichier SQLite, ou ':memory:'.
+        tuned: Si True, applique SQLITE_PRAGMAS à chaque connexion.
+        echo: Journalisation SQL de SQLAlchemy.
+
+    Returns:
+        Engine: Moteur SQLAlchemy.
+    """
+    if db_path == ':memory:':
+        # Une seule connexion partagée, sinon chaque connexion verrait une base vide
+        engine = create_engine(
+            'sqlite://',
+            echo=echo,
+            connect_args={'check_same_thread': False},
+            poolclass=StaticPool,
+        )
+        pragmas = {k: v for k, v in SQLITE_PRAGMAS.items() if k != 'journal_mode'}
+    else:
+        engine = create_engine(
+            f'sqlite:///{db_path}',
+            echo=echo,
+            connect_args={'check_same_thread': False},
+            pool_size=POOL_SIZE,
+            max_overflow=POOL_MAX_OVERFLOW,
+        )
+        pragmas = SQLITE_PRAGMAS
+
+    if tuned:
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, pragmas)
+
+    return engine
+
+
+def get_engine(db_path: Optional[str] = None, tuned: bool = True) -> Engine:
+    """Retourne le moteur partagé d'une base SQLite.
+
+    Args:
+        db_path: Chemin du fichier SQLite (défaut: data/musique.db).
+        tuned: Si True, applique le profil SQLITE_PRAGMAS.
+
+    Returns:
+        Engine: Moteur mis en cache pour ce chemin (pool de connexions partagé).
+    """
+    db_path = db_path or DEFAULT_DB_PATH
+    key = (db_path if db_path == ':memory:' else os.path.abspath(db_path), tuned)
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_sqlite_engine(db_path, tuned=tuned)
+            _engines[key] = engine
+        return engine
+
+
+def dispose_engines() -> None:
+    """Ferme tous les moteurs mis en cache (fin de processus, tests)."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
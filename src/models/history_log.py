@@ -0,0 +1,544 @@
+"""Journal d'historique en ajout seul (JSON Lines), résistant aux interruptions.
+
+chk-roon.json et chk-last-fm.json étaient réécrits en entier à chaque
+modification: ajouter une écoute coûtait une réécriture de tout
+l'historique, et un arrêt pendant l'écriture pouvait tronquer des années
+d'écoutes. Le journal remplace ces réécritures par des ajouts:
+
+    <historique>.log/
+        meta.json               champs du JSON d'origine hors 'tracks' (username, month...)
+        base.jsonl              instantané compacté: une écoute par ligne, ordre chronologique
+        segment-000001.jsonl    enregistrements ajoutés depuis le dernier compactage
+        segment-000002.jsonl    ...
+
+Chaque enregistrement est une ligne JSON écrite en une seule fois en fin
+de segment (fsync): soit une écoute complète (ajout, ou remplacement de
+l'écoute de même clé), soit {"op": "delete", "key": [...]}. La clé d'une
+écoute est (timestamp, artist, title, album). Une ligne incomplète laissée
+par un arrêt brutal est ignorée à la lecture et tronquée avant l'ajout
+suivant: seules les données en cours d'écriture peuvent être perdues.
+
+Le compactage fusionne base et segments dans un nouvel instantané (fichier
+temporaire renommé atomiquement), puis supprime les segments. Rejouer un
+segment déjà compacté est sans effet (remplacements et suppressions par
+clé): un arrêt pendant le compactage ne perd rien.
+
+La lecture (iter_plays) parcourt l'instantané ligne par ligne et le
+fusionne avec les enregistrements des segments (seuls ceux-ci sont gardés
+en mémoire), dans l'ordre chronologique ou inverse.
+
+Le journal est la référence d'un historique converti; save_history
+réexporte le fichier JSON après chaque modification (write_json_export),
+qui reste ainsi à jour pour les lecteurs du fichier complet. Les lecteurs
+du projet passent par iter_history_file / load_history_file. Un historique
+encore écrit directement en JSON par un programme externe (JSON_ONLY_HISTORIES:
+le tracker Roon) ne doit pas être converti: ses ajouts seraient ignorés
+puis écrasés par la réexportation.
+
+Exemple d'utilisation:
+    >>> from src.models.history_log import HistoryLog, convert_json
+    >>>
+    >>> convert_json("data/history/chk-roon.json")   # crée data/history/chk-roon.log/
+    >>> log = HistoryLog.for_json("data/history/chk-roon.json")
+    >>> log.append({'timestamp': 1769518340, 'artist': "Talking Heads", 'title': "Swamp", ...})
+    >>> for play in log.iter_plays(newest_first=True):
+    ...     print(play['date'], play['artist'])
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .json_stream import _fsync_directory, iter_tracks, read_json_meta, write_json_stream
+
+# Suffixe du répertoire de journal d'un historique JSON (chk-roon.json → chk-roon.log/)
+LOG_SUFFIX = ".log"
+BASE_FILENAME = "base.jsonl"
+META_FILENAME = "meta.json"
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{6})\.jsonl$")
+
+# Taille d'un segment avant d'en ouvrir un nouveau
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+# Nombre de segments au-delà duquel un ajout déclenche le compactage
+DEFAULT_COMPACT_SEGMENTS = 8
+
+# Taille des blocs lus depuis la fin d'un fichier (lecture en ordre inverse)
+REVERSE_READ_BLOCK = 64 * 1024
+
+# Historiques écrits directement en JSON par un programme externe (tracker
+# Roon): pas de journal tant que ce programme ne passe pas par save_history
+JSON_ONLY_HISTORIES = ("chk-roon.json",)
+
+_DELETED = object()
+
+PlayKey = Tuple
+
+
+def play_key(play: Dict) -> PlayKey:
+    """Clé d'identité d'une écoute: (timestamp, artist, title, album)."""
+    return (play.get('timestamp'), play.get('artist'), play.get('title'), play.get('album'))
+
+
+def _encode(record: Dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def atomic_write_json(path: str, data, indent: Optional[int] = 4):
+    """Écrit un fichier JSON via un fichier temporaire renommé atomiquement.
+
+    Un arrêt pendant l'écriture laisse l'ancien fichier intact.
+
+    Args:
+        path: Fichier de destination.
+        data: Données sérialisables.
+        indent: Indentation JSON (4 comme les historiques existants).
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def _read_lines(path: str) -> Iterator[bytes]:
+    """Lignes complètes d'un fichier (une dernière ligne sans fin de ligne est ignorée)."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if line.endswith(b"\n"):
+                yield line
+
+
+def _last_newline(f, size: int) -> int:
+    """Position du dernier saut de ligne d'un fichier binaire (-1 si aucun)."""
+    position = size
+    while position > 0:
+        step = min(REVERSE_READ_BLOCK, position)
+        position -= step
+        f.seek(position)
+        newline = f.read(step).rfind(b"\n")
+        if newline >= 0:
+            return position + newline
+    return -1
+
+
+def _read_lines_reversed(path: str) -> Iterator[bytes]:
+    """Lignes complètes d'un fichier, de la dernière à la première."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        # Zone des lignes complètes, sans le dernier saut de ligne
+        position = _last_newline(f, f.seek(0, os.SEEK_END))
+        if position < 0:
+            return
+        remainder = b""
+        while position > 0:
+            size = min(REVERSE_READ_BLOCK, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                yield line + b"\n"
+        yield remainder + b"\n"
+
+
+class HistoryLog:
+    """Historique d'écoute en journal d'ajouts JSON Lines.
+
+    Un seul processus écrit à la fois dans un journal (le tracker détient
+    déjà chk-roon.lock); les écritures d'un même processus sont protégées
+    par un verrou.
+
+    Attributes:
+        path: Répertoire du journal.
+        segment_bytes: Taille d'un segment avant rotation.
+        compact_segments: Nombre de segments déclenchant le compactage.
+        durable: fsync après chaque ajout.
+        skipped_lines: Lignes illisibles ignorées lors des lectures.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        compact_segments: int = DEFAULT_COMPACT_SEGMENTS,
+        durable: bool = True,
+    ):
+        """Ouvre (sans le créer) le journal d'un historique.
+
+        Args:
+            path: Répertoire du journal (ex: data/history/chk-roon.log).
+            segment_bytes: Taille d'un segment avant rotation.
+            compact_segments: Nombre de segments déclenchant le compactage
+                (0 = compactage manuel uniquement).
+            durable: fsync après chaque ajout (désactivable pour les imports).
+        """
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.compact_segments = compact_segments
+        self.durable = durable
+        self.skipped_lines = 0
+        self._lock = threading.RLock()
+        self._tail_checked = False
+
+    @classmethod
+    def for_json(cls, json_path: str, **kwargs) -> 'HistoryLog':
+        """Journal associé à un historique JSON (chk-roon.json → chk-roon.log/)."""
+        root, _ = os.path.splitext(json_path)
+        return cls(root + LOG_SUFFIX, **kwargs)
+
+    def exists(self) -> bool:
+        """True si le journal a été créé (par convert_json ou create)."""
+        return os.path.exists(os.path.join(self.path, BASE_FILENAME))
+
+    def create(self, meta: Optional[Dict] = None):
+        """Crée un journal vide.
+
+        Args:
+            meta: Champs du JSON d'origine hors 'tracks'.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self._write_meta(meta or {})
+        base_path = os.path.join(self.path, BASE_FILENAME)
+        if not os.path.exists(base_path):
+            open(base_path, 'wb').close()
+            _fsync_directory(self.path)
+
+    # ===== Métadonnées =====
+
+    @property
+    def meta(self) -> Dict:
+        """Champs du JSON d'origine hors 'tracks' (username, month...)."""
+        try:
+            with open(os.path.join(self.path, META_FILENAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_meta(self, meta: Dict):
+        atomic_write_json(os.path.join(self.path, META_FILENAME), meta)
+
+    def set_meta(self, **fields):
+        """Met à jour des champs hors 'tracks' (ex: month pour chk-last-fm)."""
+        with self._lock:
+            meta = self.meta
+            meta.update(fields)
+            self._write_meta(meta)
+
+    # ===== Segments =====
+
+    def segments(self) -> List[str]:
+        """Chemins des segments, du plus ancien au plus récent."""
+        try:
+            names = sorted(n for n in os.listdir(self.path) if SEGMENT_PATTERN.match(n))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.path, name) for name in names]
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.path, f"segment-{number:06d}.jsonl")
+
+    def _current_segment(self, incoming: int) -> str:
+        """Segment recevant le prochain ajout (rotation si le segment courant est plein)."""
+        segments = self.segments()
+        if not segments:
+            return self._segment_path(1)
+        current = segments[-1]
+        if os.path.getsize(current) + incoming > self.segment_bytes and os.path.getsize(current) > 0:
+            number = int(SEGMENT_PATTERN.match(os.path.basename(current)).group(1))
+            return self._segment_path(number + 1)
+        return current
+
+    def _repair_tail(self):
+        """Tronque une ligne incomplète laissée en fin de segment par un arrêt brutal."""
+        segments = self.segments()
+        if not segments:
+            return
+        with open(segments[-1], 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            complete = _last_newline(f, size) + 1
+            if complete < size:
+                f.truncate(complete)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _append_records(self, records: Iterable[Dict]) -> int:
+        data = b"".join(_encode(record) for record in records)
+        if not data:
+            return 0
+        if not self.exists():
+            raise FileNotFoundError(f"Journal absent: {self.path} (voir convert_json ou create)")
+        with self._lock:
+            if not self._tail_checked:
+                self._repair_tail()
+                self._tail_checked = True
+            segment = self._current_segment(len(data))
+            created = not os.path.exists(segment)
+            with open(segment, 'ab') as f:
+                f.write(data)
+                f.flush()
+                if self.durable:
+                    os.fsync(f.fileno())
+            if created and self.durable:
+                _fsync_directory(self.path)
+            if self.compact_segments and len(self.segments()) > self.compact_segments:
+                self.compact()
+        return data.count(b"\n")
+
+    def append(self, play: Dict):
+        """Ajoute une écoute (ou remplace l'écoute de même clé)."""
+        self._append_records([play])
+
+    def extend(self, plays: Iterable[Dict]) -> int:
+        """Ajoute ou remplace plusieurs écoutes en une seule écriture.
+
+        Returns:
+            int: Nombre d'enregistrements écrits.
+        """
+        return self._append_records(plays)
+
+    def delete(self, plays: Iterable[Dict]) -> int:
+        """Supprime des écoutes (identifiées par leur clé).
+
+        Returns:
+            int: Nombre d'enregistrements de suppression écrits.
+        """
+        return self._append_records({'op': 'delete', 'key': list(play_key(play))} for play in plays)
+
+    # ===== Lecture =====
+
+    def _decode(self, line: bytes) -> Optional[Dict]:
+        if not line.strip():
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            self.skipped_lines += 1
+            return None
+        return record if isinstance(record, dict) else None
+
+    def _segment_changes(self) -> Dict[PlayKey, object]:
+        """Dernier état de chaque clé modifiée dans les segments (écoute ou suppression)."""
+        changes: Dict[PlayKey, object] = {}
+        for segment in self.segments():
+            for line in _read_lines(segment):
+                record = self._decode(line)
+                if record is None:
+                    continue
+                if record.get('op') == 'delete':
+                    changes[tuple(record.get('key', ()))] = _DELETED
+                else:
+                    changes[play_key(record)] = record
+        return changes
+
+    def iter_plays(self, newest_first: bool = False) -> Iterator[Dict]:
+        """Écoutes de l'historique, dans l'ordre chronologique.
+
+        Seuls les enregistrements des segments sont gardés en mémoire;
+        l'instantané est lu ligne par ligne (depuis la fin si newest_first).
+        À timestamp égal, l'ordre d'ajout est conservé (inversé si newest_first).
+
+        Args:
+            newest_first: Plus récentes en premier (ordre de chk-roon.json).
+
+        Yields:
+            Dict: Écoute au format chk-roon.json.
+        """
+        changes = self._segment_changes()
+        base_path = os.path.join(self.path, BASE_FILENAME)
+        lines = _read_lines_reversed(base_path) if newest_first else _read_lines(base_path)
+        base = (
+            play for play in map(self._decode, lines)
+            if play is not None and play_key(play) not in changes
+        )
+        updates = [record for record in changes.values() if record is not _DELETED]
+        if newest_first:
+            updates.reverse()
+        updates.sort(key=lambda play: play.get('timestamp') or 0, reverse=newest_first)
+        yield from heapq.merge(base, updates, key=lambda play: play.get('timestamp') or 0,
+                               reverse=newest_first)
+
+    def count(self) -> int:
+        """Nombre d'écoutes (parcours complet)."""
+        return sum(1 for _ in self.iter_plays())
+
+    # ===== Compactage =====
+
+    def compact(self) -> int:
+        """Fusionne instantané et segments dans un nouvel instantané.
+
+        Le nouvel instantané est écrit dans un fichier temporaire puis
+        renommé atomiquement; les segments sont supprimés ensuite.
+
+        Returns:
+            int: Nombre d'écoutes de l'instantané.
+        """
+        with self._lock:
+            segments = self.segments()
+            base_path = os.path.join(self.path, BASE_FILENAME)
+            temp_path = f"{base_path}.tmp"
+            count = 0
+            with open(temp_path, 'wb') as f:
+                for play in self.iter_plays():
+                    f.write(_encode(play))
+                    count += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, base_path)
+            _fsync_directory(self.path)
+            for segment in segments:
+                os.remove(segment)
+            self._tail_checked = False
+            return count
+
+
+def write_json_export(log: HistoryLog, json_path: str) -> int:
+    """Exporte le journal au format JSON d'origine (plus récentes en premier).
+
+    Le fichier est identique octet pour octet à json.dump(data, indent=4,
+    ensure_ascii=False) sur les mêmes données, mais écrit écoute par
+    écoute (sans liste complète en mémoire), puis renommé atomiquement.
+
+    Args:
+        log: Journal source.
+        json_path: Fichier JSON produit (ex: chk-roon.json pour la GUI).
+
+    Returns:
+        int: Nombre d'écoutes exportées.
+    """
+    data = {name: value for name, value in log.meta.items() if name != 'tracks'}
+    data['tracks'] = log.iter_plays(newest_first=True)
+    return write_json_stream(json_path, data)
+
+
+def convert_json(json_path: str, log_path: Optional[str] = None, overwrite: bool = False) -> HistoryLog:
+    """Convertit un historique JSON (chk-roon.json, chk-last-fm.json) en journal.
+
+    Args:
+        json_path: Historique JSON ({"tracks": [...]} ou liste d'écoutes).
+        log_path: Répertoire du journal (défaut: même nom avec .log).
+        overwrite: Remplacer un journal existant.
+
+    Returns:
+        HistoryLog: Journal créé.
+
+    Raises:
+        FileExistsError: Journal déjà présent et overwrite=False.
+    """
+    log = HistoryLog(log_path) if log_path else HistoryLog.for_json(json_path)
+    if log.exists() and not overwrite:
+        raise FileExistsError(f"Journal déjà présent: {log.path}")
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    plays = data.get('tracks', []) if isinstance(data, dict) else data
+    meta = {k: v for k, v in data.items() if k != 'tracks'} if isinstance(data, dict) else {}
+
+    # Ordre chronologique; à timestamp égal, ordre du fichier le plus récent en premier inversé
+    ordered = sorted(reversed(plays), key=lambda play: play.get('timestamp') or 0)
+    log.create(meta)
+    for segment in log.segments():
+        os.remove(segment)
+    base_path = os.path.join(log.path, BASE_FILENAME)
+    temp_path = f"{base_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        for play in ordered:
+            f.write(_encode(play))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, base_path)
+    _fsync_directory(log.path)
+    return log
+
+
+def iter_history_file(json_path: str) -> Iterator[Dict]:
+    """Écoutes d'un historique, plus récentes en premier, sans le charger en entier.
+
+    Lit le journal s'il existe, sinon le fichier JSON en continu.
+
+    Args:
+        json_path: Historique JSON (chk-roon.json, chk-last-fm.json).
+
+    Yields:
+        Dict: Écoute au format chk-roon.json.
+    """
+    log = HistoryLog.for_json(json_path)
+    if log.exists():
+        return log.iter_plays(newest_first=True)
+    return iter_tracks(json_path)
+
+
+def read_history_meta(json_path: str) -> Dict:
+    """Champs d'un historique hors 'tracks' (username, month...), depuis le journal s'il existe."""
+    log = HistoryLog.for_json(json_path)
+    if log.exists():
+        return log.meta
+    return read_json_meta(json_path)
+
+
+def load_history_file(json_path: str) -> Dict:
+    """Charge un historique au format JSON d'origine, depuis son journal s'il existe.
+
+    Args:
+        json_path: Historique JSON (chk-roon.json, chk-last-fm.json).
+
+    Returns:
+        Dict: {"tracks": [...], ...} avec les écoutes les plus récentes en premier.
+
+    Raises:
+        FileNotFoundError: Ni journal ni fichier JSON.
+        json.JSONDecodeError: Fichier JSON invalide.
+    """
+    log = HistoryLog.for_json(json_path)
+    if log.exists():
+        data = log.meta
+        data['tracks'] = list(log.iter_plays(newest_first=True))
+        return data
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(json_path: str, data: Dict, updated: Iterable[Dict] = (), deleted: Iterable[Dict] = ()) -> str:
+    """Enregistre les modifications d'un historique chargé depuis JSON.
+
+    Si l'historique a été converti en journal, seules les écoutes modifiées
+    et supprimées y sont ajoutées, les champs hors 'tracks' de data mis à
+    jour, puis le fichier JSON est réexporté depuis le journal pour ses
+    lecteurs; sinon le fichier JSON est réécrit atomiquement (fichier
+    temporaire + renommage).
+
+    Args:
+        json_path: Historique JSON d'origine.
+        data: Contenu complet modifié ({"tracks": [...]}), écrit en mode JSON;
+            'tracks' peut être un itérateur (voir iter_history_file).
+        updated: Écoutes ajoutées ou modifiées.
+        deleted: Écoutes supprimées.
+
+    Returns:
+        str: 'log' ou 'json' selon le format mis à jour.
+    """
+    log = HistoryLog.for_json(json_path)
+    if log.exists():
+        log.delete(deleted)
+        log.extend(updated)
+        meta = {name: value for name, value in data.items() if name != 'tracks'}
+        if meta and meta != log.meta:
+            log.set_meta(**meta)
+        write_json_export(log, json_path)
+        return 'log'
+    write_json_stream(json_path, data)
+    return 'json'
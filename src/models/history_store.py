@@ -0,0 +1,665 @@
+"""Stockage colonnaire compact de l'historique d'écoute pour les analyses.
+
+Les analyses (patterns d'écoute, playlists, optimiseur IA) manipulaient
+l'historique sous forme de listes de dictionnaires: plusieurs centaines
+d'octets par écoute (dictionnaire + chaînes dupliquées à chaque écoute).
+ColumnarHistory stocke la même information en colonnes NumPy:
+
+    - timestamps: int64, un timestamp Unix par écoute
+    - artist_ids, title_ids, album_ids: int32, index dans des tables de chaînes
+      partagées (chaque nom n'est stocké qu'une fois)
+    - track_ids: int32, identifiant du triplet (artiste, titre, album)
+    - date_offsets: int32, écart en minutes entre le champ date (fuseau de
+      l'enregistrement) et le timestamp
+    - detail_ids: int32 par champ de détail (URLs d'images, ai_info), partagés
+      entre les écoutes d'un même album ou artiste
+    - flags: uint8, bit 0 = loved, bits 1-7 = index de la source
+
+Les filtres par plage de dates, heure ou jour de semaine sont vectorisés
+(masques booléens NumPy). Les heures et jours locaux, l'ordre chronologique
+et les sessions d'écoute (voir sessions.py) sont calculés une seule fois par
+historique.
+
+Pour la compatibilité avec le code existant, ColumnarHistory se comporte
+aussi comme une séquence en lecture seule de dictionnaires au format
+chk-roon.json (history[0], history[-10:], len(history), itération), les
+dictionnaires étant reconstruits à la demande.
+
+Dans un processus de travail préchauffé du scheduler (voir
+src/utils/task_runner.py), enable_history_cache() garde les historiques
+chargés: une tâche suivante relit les mêmes colonnes tant que la base,
+le fichier JSON et le journal n'ont pas changé (taille, date de modification).
+
+Exemple d'utilisation:
+    >>> from src.models.history_store import load_history
+    >>>
+    >>> history = load_history()
+    >>> evening = history.take(history.between(start=1769000000) & history.hour_mask(range(18, 24)))
+    >>> evening[0]['artist']
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import calendar
+import os
+import sys
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .database import DEFAULT_DB_PATH
+from .history_log import LOG_SUFFIX, iter_history_file
+from .repository import HISTORY_SOURCES, open_repository
+from .sessions import DEFAULT_GAP_MINUTES, SessionIndex
+
+# Champs de détail conservés (valeurs partagées entre écoutes)
+IMAGE_FIELDS = ('artist_spotify_image', 'album_spotify_image', 'album_lastfm_image')
+DETAIL_FIELDS = IMAGE_FIELDS + ('ai_info',)
+
+# Colonnes principales: nom → (code array, dtype NumPy)
+COLUMNS = {
+    'timestamps': ('q', np.int64),
+    'date_offsets': ('i', np.int32),
+    'artist_ids': ('i', np.int32),
+    'title_ids': ('i', np.int32),
+    'album_ids': ('i', np.int32),
+    'track_ids': ('i', np.int32),
+    'flags': ('B', np.uint8),
+}
+DTYPES = {name: dtype for name, (_, dtype) in COLUMNS.items()}
+DTYPES.update({field: np.int32 for field in DETAIL_FIELDS})
+
+# Nombre de dates converties ensemble lors de la construction
+DATE_BATCH_SIZE = 65536
+
+# Disposition des indicateurs compactés dans la colonne flags
+LOVED_BIT = 1
+SOURCE_SHIFT = 1
+MAX_SOURCES = 127
+
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+# Le 1er janvier 1970 était un jeudi (lundi = 0)
+EPOCH_WEEKDAY = 3
+
+# Historiques chargés gardés par processus (activé par enable_history_cache)
+HISTORY_CACHE_SIZE = 4
+_history_cache: Dict[tuple, tuple] = {}
+_history_cache_lock = threading.Lock()
+_history_cache_enabled = False
+
+
+class StringPool:
+    """Table de chaînes internées: chaque valeur distincte reçoit un entier.
+
+    L'identifiant 0 est réservé à l'absence de valeur (None).
+
+    Attributes:
+        values: Valeurs par identifiant (values[0] = None).
+    """
+
+    def __init__(self):
+        """Crée une table vide."""
+        self.values: List[Optional[str]] = [None]
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        """Retourne l'identifiant d'une valeur, en l'ajoutant si nécessaire.
+
+        Args:
+            value: Chaîne à interner (None ou vide → 0).
+
+        Returns:
+            int: Identifiant de la valeur.
+        """
+        if not value:
+            return 0
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def nbytes(self) -> int:
+        """Mémoire approximative occupée par les chaînes et l'index."""
+        return sys.getsizeof(self.values) + sys.getsizeof(self._ids) + sum(
+            sys.getsizeof(value) for value in self.values if value is not None
+        )
+
+
+def _parse_date(date) -> Optional[np.datetime64]:
+    """Date "YYYY-MM-DD HH:MM" en datetime64[m], None si invalide."""
+    try:
+        return np.datetime64(date, 'm')
+    except (TypeError, ValueError):
+        return None
+
+
+def local_time_offsets(timestamps: np.ndarray) -> np.ndarray:
+    """Décalage UTC → heure locale (secondes) de chaque timestamp.
+
+    Le décalage est calculé une fois par jour UTC distinct; seuls les jours
+    contenant un changement d'heure (été/hiver) sont traités écoute par écoute.
+
+    Args:
+        timestamps: Timestamps Unix (int64).
+
+    Returns:
+        np.ndarray: Décalages en secondes (int64), même forme que timestamps.
+    """
+    if len(timestamps) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    def offset(timestamp: int) -> int:
+        return calendar.timegm(time.localtime(timestamp)) - timestamp
+
+    days, inverse = np.unique(timestamps // SECONDS_PER_DAY, return_inverse=True)
+    starts = np.array([offset(int(day) * SECONDS_PER_DAY) for day in days], dtype=np.int64)
+    ends = np.array([offset(int(day) * SECONDS_PER_DAY + SECONDS_PER_DAY - 1) for day in days], dtype=np.int64)
+    offsets = starts[inverse]
+
+    for day_index in np.flatnonzero(starts != ends):
+        positions = np.flatnonzero(inverse == day_index)
+        offsets[positions] = [offset(int(ts)) for ts in timestamps[positions]]
+    return offsets
+
+
+def day_strings(local_days: np.ndarray) -> np.ndarray:
+    """Convertit des numéros de jour local (jours depuis 1970-01-01) en "YYYY-MM-DD"."""
+    return np.asarray(local_days, dtype=np.int64).astype('datetime64[D]').astype(str)
+
+
+def first_seen_counts(keys: np.ndarray):
+    """Valeurs distinctes d'une colonne, dans l'ordre de première apparition.
+
+    Équivalent vectorisé d'un Counter rempli en parcourant la colonne: l'ordre
+    retourné est celui des clés du Counter.
+
+    Args:
+        keys: Colonne de clés entières.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (valeurs, indice de première
+            apparition, nombre d'occurrences).
+    """
+    values, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first, kind='stable')
+    return values[order], first[order], counts[order]
+
+
+def most_common_order(counts: np.ndarray, limit: Optional[int] = None) -> np.ndarray:
+    """Ordre de Counter.most_common() pour des comptes en ordre de première apparition.
+
+    Args:
+        counts: Comptes (ordre de première apparition, voir first_seen_counts).
+        limit: Nombre d'éléments retournés (None = tous).
+
+    Returns:
+        np.ndarray: Indices dans counts, par compte décroissant (tri stable).
+    """
+    order = np.argsort(-counts, kind='stable')
+    return order if limit is None else order[:limit]
+
+
+class ColumnarHistory(Sequence):
+    """Historique d'écoute en colonnes NumPy (voir la documentation du module).
+
+    Attributes:
+        timestamps: Timestamps Unix (int64).
+        artist_ids, title_ids, album_ids: Index dans artists/titles/albums (int32).
+        track_ids: Index du triplet (artiste, titre, album) (int32).
+        date_offsets: Écart champ date - timestamp en minutes (int32).
+        detail_ids: Champ de détail → index dans details (int32).
+        flags: Bit 0 loved, bits 1-7 index de source (uint8).
+        artists, titles, albums, sources, details: Tables de chaînes partagées.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], pools: Dict[str, StringPool]):
+        """Assemble un historique à partir de colonnes déjà construites.
+
+        Args:
+            columns: Nom de colonne (COLUMNS et DETAIL_FIELDS) → tableau NumPy.
+            pools: Tables partagées (artists, titles, albums, sources, details).
+        """
+        self.timestamps = columns['timestamps']
+        self.date_offsets = columns['date_offsets']
+        self.artist_ids = columns['artist_ids']
+        self.title_ids = columns['title_ids']
+        self.album_ids = columns['album_ids']
+        self.track_ids = columns['track_ids']
+        self.flags = columns['flags']
+        self.detail_ids = {field: columns[field] for field in DETAIL_FIELDS}
+        self._pools = pools
+        self.artists = pools['artists']
+        self.titles = pools['titles']
+        self.albums = pools['albums']
+        self.sources = pools['sources']
+        self.details = pools['details']
+        self._local = None
+        self._time_order = None
+        self._sessions: Dict[int, SessionIndex] = {}
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Toutes les colonnes par nom."""
+        columns = {name: getattr(self, name) for name in COLUMNS}
+        columns.update(self.detail_ids)
+        return columns
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_plays(cls, plays: Iterable[Dict]) -> 'ColumnarHistory':
+        """Construit l'historique depuis des écoutes au format chk-roon.json.
+
+        Les écoutes sans timestamp ni date exploitable sont ignorées; une date
+        "YYYY-MM-DD HH:MM" sans timestamp est interprétée en heure locale.
+
+        Args:
+            plays: Écoutes (liste JSON, itérateur du repository...).
+
+        Returns:
+            ColumnarHistory: Historique dans l'ordre des écoutes fournies.
+        """
+        pools = {name: StringPool() for name in ('artists', 'titles', 'albums', 'sources', 'details')}
+        track_keys: Dict[tuple, int] = {}
+        buffers = {name: array(code) for name, (code, _) in COLUMNS.items()}
+        buffers.update({field: array('i') for field in DETAIL_FIELDS})
+        # Dates d'origine converties par lots (datetime64 vectorisé)
+        dates: List[Optional[str]] = []
+
+        for play in plays:
+            timestamp = play.get('timestamp')
+            if timestamp is None:
+                try:
+                    timestamp = int(time.mktime(time.strptime(play['date'], '%Y-%m-%d %H:%M')))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            source_id = pools['sources'].intern(play.get('source'))
+            if source_id > MAX_SOURCES:
+                raise ValueError(f"Trop de sources distinctes (max {MAX_SOURCES})")
+
+            key = (
+                pools['artists'].intern(play.get('artist')),
+                pools['titles'].intern(play.get('title')),
+                pools['albums'].intern(play.get('album')),
+            )
+            buffers['timestamps'].append(int(timestamp))
+            buffers['artist_ids'].append(key[0])
+            buffers['title_ids'].append(key[1])
+            buffers['album_ids'].append(key[2])
+            buffers['track_ids'].append(track_keys.setdefault(key, len(track_keys)))
+            for field in DETAIL_FIELDS:
+                buffers[field].append(pools['details'].intern(play.get(field)))
+            buffers['flags'].append((LOVED_BIT if play.get('loved') else 0) | (source_id << SOURCE_SHIFT))
+
+            dates.append(play.get('date'))
+            if len(dates) == DATE_BATCH_SIZE:
+                cls._append_date_offsets(buffers, dates)
+                dates = []
+        cls._append_date_offsets(buffers, dates)
+
+        columns = {
+            name: np.frombuffer(values, dtype=DTYPES[name]) if len(values) else np.zeros(0, dtype=DTYPES[name])
+            for name, values in buffers.items()
+        }
+        return cls(columns, pools)
+
+    @staticmethod
+    def _append_date_offsets(buffers: Dict[str, array], dates: List[Optional[str]]) -> None:
+        """Ajoute l'écart (minutes) entre le champ date et le timestamp des dernières écoutes.
+
+        Le champ date de chk-roon.json est écrit dans le fuseau de l'enregistrement,
+        qui peut différer du fuseau courant: il est restitué tel quel à partir
+        du timestamp et de cet écart (0 si la date est absente ou invalide).
+        """
+        if not dates:
+            return
+        try:
+            minutes = np.array(dates, dtype='datetime64[m]')
+        except ValueError:
+            minutes = np.array([_parse_date(date) for date in dates], dtype='datetime64[m]')
+        timestamps = np.frombuffer(buffers['timestamps'], dtype=np.int64)[-len(dates):]
+        offsets = minutes.astype(np.int64) - timestamps // 60
+        offsets[np.isnat(minutes)] = 0
+        buffers['date_offsets'].extend(offsets.astype(np.int32).tolist())
+
+    def take(self, selection) -> 'ColumnarHistory':
+        """Sous-ensemble d'écoutes (masque booléen ou tableau d'indices).
+
+        Les tables de chaînes sont partagées avec l'historique d'origine.
+
+        Args:
+            selection: Masque booléen ou indices NumPy.
+
+        Returns:
+            ColumnarHistory: Nouvel historique.
+        """
+        subset = ColumnarHistory(
+            {name: column[selection] for name, column in self.columns.items()},
+            self._pools,
+        )
+        if self._local is not None:
+            subset._local = tuple(column[selection] for column in self._local)
+        return subset
+
+    def sorted_by_time(self) -> 'ColumnarHistory':
+        """Historique trié du plus ancien au plus récent (tri stable)."""
+        if len(self) < 2 or bool(np.all(self.timestamps[1:] >= self.timestamps[:-1])):
+            return self
+        return self.take(self.time_order)
+
+    @property
+    def time_order(self) -> np.ndarray:
+        """Positions des écoutes par ordre chronologique (tri stable, calculé une fois)."""
+        if self._time_order is None:
+            self._time_order = self._sort_by_time()
+        return self._time_order
+
+    def _sort_by_time(self) -> np.ndarray:
+        """Tri stable des positions par timestamp croissant."""
+        return np.argsort(self.timestamps, kind='stable')
+
+    def sessions(self, gap_minutes: int = DEFAULT_GAP_MINUTES) -> SessionIndex:
+        """Sessions d'écoute (calculées une fois par écart, puis mises en cache).
+
+        Args:
+            gap_minutes: Écart maximal (minutes) entre deux écoutes d'une session.
+
+        Returns:
+            SessionIndex: Index des sessions, dans l'ordre chronologique.
+        """
+        if gap_minutes not in self._sessions:
+            self._sessions[gap_minutes] = SessionIndex.build(self.timestamps, self.time_order, gap_minutes)
+        return self._sessions[gap_minutes]
+
+    # ------------------------------------------------------------------
+    # Colonnes dérivées et filtres vectorisés
+    # ------------------------------------------------------------------
+
+    @property
+    def loved(self) -> np.ndarray:
+        """Masque des écoutes marquées favorites."""
+        return (self.flags & LOVED_BIT).astype(bool)
+
+    @property
+    def source_ids(self) -> np.ndarray:
+        """Index de source de chaque écoute (dans sources.values)."""
+        return self.flags >> SOURCE_SHIFT
+
+    def _local_columns(self):
+        """(jour local, heure locale, jour de semaine) calculés une seule fois."""
+        if self._local is None:
+            local_seconds = self.timestamps + local_time_offsets(self.timestamps)
+            local_days = local_seconds // SECONDS_PER_DAY
+            hours = ((local_seconds % SECONDS_PER_DAY) // 3600).astype(np.int8)
+            weekdays = ((local_days + EPOCH_WEEKDAY) % 7).astype(np.int8)
+            self._local = (local_days, hours, weekdays)
+        return self._local
+
+    @property
+    def local_days(self) -> np.ndarray:
+        """Jour local de chaque écoute (nombre de jours depuis 1970-01-01)."""
+        return self._local_columns()[0]
+
+    @property
+    def hours(self) -> np.ndarray:
+        """Heure locale (0-23) de chaque écoute."""
+        return self._local_columns()[1]
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        """Jour de semaine local (0 = lundi) de chaque écoute."""
+        return self._local_columns()[2]
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Masque des écoutes dans [start, end[ (bornes optionnelles)."""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.timestamps >= start
+        if end is not None:
+            mask &= self.timestamps < end
+        return mask
+
+    def hour_mask(self, hours: Iterable[int]) -> np.ndarray:
+        """Masque des écoutes dont l'heure locale est dans `hours`."""
+        return np.isin(self.hours, np.fromiter(hours, dtype=np.int8))
+
+    def weekday_mask(self, weekdays: Iterable[int]) -> np.ndarray:
+        """Masque des écoutes dont le jour de semaine local (0 = lundi) est dans `weekdays`."""
+        return np.isin(self.weekdays, np.fromiter(weekdays, dtype=np.int8))
+
+    def source_mask(self, source: str) -> np.ndarray:
+        """Masque des écoutes d'une source donnée."""
+        try:
+            source_id = self.sources.values.index(source)
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        return self.source_ids == source_id
+
+    def most_frequent_tracks(self, selection: Optional[np.ndarray] = None,
+                             limit: Optional[int] = None) -> np.ndarray:
+        """Pistes (artiste, titre, album) les plus écoutées.
+
+        L'ordre est celui de Counter.most_common() sur les écoutes parcourues
+        dans l'ordre: fréquence décroissante, puis première apparition.
+
+        Args:
+            selection: Écoutes prises en compte: masque booléen, positions
+                (parcourues dans l'ordre donné) ou None pour toutes.
+            limit: Nombre de pistes retournées (None = toutes).
+
+        Returns:
+            np.ndarray: Indice de la première écoute de chaque piste retenue.
+        """
+        if selection is None:
+            positions = np.arange(len(self))
+        elif selection.dtype == bool:
+            positions = np.flatnonzero(selection)
+        else:
+            positions = selection
+        if len(positions) == 0:
+            return positions
+        _, first, counts = first_seen_counts(self.track_ids[positions])
+        return positions[first[most_common_order(counts, limit)]]
+
+    # ------------------------------------------------------------------
+    # Interface séquence (dictionnaires au format chk-roon.json)
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, ColumnarHistory)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.play(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index d'écoute hors limites")
+        return self.play(index)
+
+    def play(self, index: int) -> Dict:
+        """Reconstruit le dictionnaire d'une écoute (format chk-roon.json).
+
+        Args:
+            index: Position de l'écoute.
+
+        Returns:
+            Dict: timestamp, date, artist, title, album, loved, source, images
+                et ai_info (si renseigné).
+        """
+        timestamp = int(self.timestamps[index])
+        date_minutes = timestamp // 60 + int(self.date_offsets[index])
+        play = {
+            'timestamp': timestamp,
+            'date': (EPOCH + timedelta(minutes=date_minutes)).strftime('%Y-%m-%d %H:%M'),
+            'artist': self.artists.values[self.artist_ids[index]] or '',
+            'title': self.titles.values[self.title_ids[index]] or '',
+            'album': self.albums.values[self.album_ids[index]] or '',
+            'loved': bool(self.flags[index] & LOVED_BIT),
+            'source': self.sources.values[self.flags[index] >> SOURCE_SHIFT],
+        }
+        for field in IMAGE_FIELDS:
+            play[field] = self.details.values[self.detail_ids[field][index]]
+        ai_info = self.details.values[self.detail_ids['ai_info'][index]]
+        if ai_info is not None:
+            play['ai_info'] = ai_info
+        return play
+
+    def to_dicts(self, indices: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Reconstruit les dictionnaires d'écoutes (toutes ou une sélection)."""
+        if indices is None:
+            indices = range(len(self))
+        return [self.play(int(i)) for i in indices]
+
+    def nbytes(self) -> int:
+        """Mémoire occupée par les colonnes et les tables de chaînes (octets)."""
+        pools = sum(pool.nbytes() for pool in self._pools.values())
+        return sum(column.nbytes for column in self.columns.values()) + pools
+
+
+def as_history(plays) -> ColumnarHistory:
+    """Retourne `plays` en colonnes (sans copie s'il s'agit déjà d'un ColumnarHistory).
+
+    Args:
+        plays: ColumnarHistory ou liste d'écoutes au format chk-roon.json.
+
+    Returns:
+        ColumnarHistory: Historique en colonnes.
+    """
+    if isinstance(plays, ColumnarHistory):
+        return plays
+    return ColumnarHistory.from_plays(plays)
+
+
+def load_history(
+    db_path: Optional[str] = None,
+    json_path: Optional[str] = None,
+    start: Optional[int] = None,
+    with_details: bool = True,
+) -> ColumnarHistory:
+    """Charge l'historique en colonnes depuis SQLite, ou à défaut depuis chk-roon.json.
+
+    Les écoutes sont lues page par page (SQLite) ou au fil du fichier
+    (journal ou JSON, voir json_stream): aucune liste complète de
+    dictionnaires n'est construite en mémoire.
+
+    Args:
+        db_path: Chemin vers musique.db (défaut: data/musique.db).
+        json_path: Chemin vers chk-roon.json (repli si la base n'est pas migrée).
+        start: Timestamp Unix minimal inclus (optionnel).
+        with_details: Lit aussi images et ai_info depuis SQLite.
+
+    Returns:
+        ColumnarHistory: Historique, dans l'ordre du fichier JSON (ou plus
+            récentes en premier depuis SQLite). Vide si aucune source n'est fournie.
+
+    Raises:
+        FileNotFoundError: Base non migrée et fichier JSON introuvable.
+    """
+    if _history_cache_enabled:
+        key = (os.path.abspath(db_path or DEFAULT_DB_PATH), json_path and os.path.abspath(json_path),
+               start, with_details)
+        version = history_version(key[0], [key[1]] if key[1] else ())
+        with _history_cache_lock:
+            cached = _history_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        history = _load_history(db_path, json_path, start, with_details)
+        with _history_cache_lock:
+            _history_cache.pop(key, None)
+            _history_cache[key] = (version, history)
+            while len(_history_cache) > HISTORY_CACHE_SIZE:
+                del _history_cache[next(iter(_history_cache))]
+        return history
+    return _load_history(db_path, json_path, start, with_details)
+
+
+def _load_history(db_path: Optional[str], json_path: Optional[str], start: Optional[int],
+                  with_details: bool) -> ColumnarHistory:
+    # La base n'est lue que si elle est plus récente que les fichiers écrits par les trackers
+    sources = HISTORY_SOURCES + ((json_path,) if json_path else ())
+    repository = open_repository(db_path, sources)
+    if repository and repository.has_plays():
+        return ColumnarHistory.from_plays(repository.iter_plays(start=start, with_details=with_details))
+
+    if json_path is None:
+        return ColumnarHistory.from_plays([])
+    # Lecture en continu (journal ou JSON): pas de liste complète de dictionnaires
+    plays = iter_history_file(json_path)
+    if start is not None:
+        plays = (play for play in plays if play.get('timestamp') is None or play['timestamp'] >= start)
+    return ColumnarHistory.from_plays(plays)
+
+
+def _file_version(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def history_version(db_path: Optional[str] = None, json_paths: Iterable[str] = ()) -> tuple:
+    """Signature des sources de l'historique: base (et WAL), JSON, fichiers du journal.
+
+    Les sources de la base (HISTORY_SOURCES) sont toujours incluses: leur
+    modification rend la base obsolète (voir repository.is_current).
+
+    Args:
+        db_path: Chemin vers musique.db (défaut: data/musique.db).
+        json_paths: Historiques JSON lus en repli (chk-roon.json...).
+
+    Returns:
+        tuple: (chemin, (date de modification, taille) ou None) par fichier.
+    """
+    db_path = os.path.abspath(db_path or DEFAULT_DB_PATH)
+    base_dir = os.path.dirname(db_path)
+    json_paths = list(dict.fromkeys(
+        [os.path.join(base_dir, source) for source in HISTORY_SOURCES] + [os.path.abspath(p) for p in json_paths]
+    ))
+    paths = [db_path, db_path + "-wal"]
+    for json_path in json_paths:
+        paths.append(json_path)
+        log_dir = os.path.splitext(json_path)[0] + LOG_SUFFIX
+        if os.path.isdir(log_dir):
+            paths.extend(os.path.join(log_dir, name) for name in sorted(os.listdir(log_dir)))
+    return tuple((path, _file_version(path)) for path in paths)
+
+
+def enable_history_cache(enabled: bool = True) -> None:
+    """Garde (ou non) les historiques chargés par load_history dans ce processus.
+
+    Les historiques sont partagés entre les appels: ils ne doivent pas être
+    modifiés par l'appelant. Une modification d'une source (taille ou date
+    de modification) invalide l'entrée correspondante.
+
+    Args:
+        enabled: Activer le cache (False le désactive et le vide).
+    """
+    global _history_cache_enabled
+    with _history_cache_lock:
+        _history_cache_enabled = enabled
+        if not enabled:
+            _history_cache.clear()
@@ -0,0 +1,288 @@
+"""Lecture et écriture en continu des historiques et de la collection JSON.
+
+chk-roon.json, chk-last-fm.json et discogs-collection.json étaient lus par
+json.load(): tout le fichier, puis une liste complète de dictionnaires, en
+mémoire en même temps. Ce module parcourt la liste 'tracks' (ou la liste de
+premier niveau de la collection) élément par élément: le fichier est lu par
+blocs et chaque élément est décodé dès qu'il est complet (raw_decode de la
+bibliothèque standard), sans garder les éléments déjà rendus. Un filtre
+("30 derniers jours", "images manquantes") s'exécute ainsi en mémoire
+constante.
+
+En écriture, write_json_stream() produit exactement le même fichier que
+json.dump(data, indent=4, ensure_ascii=False), mais à partir d'un itérateur
+d'éléments (fichier temporaire renommé atomiquement).
+
+Exemple d'utilisation:
+    >>> from src.models.json_stream import iter_tracks, write_json_stream
+    >>>
+    >>> recent = (t for t in iter_tracks("data/history/chk-roon.json") if t['timestamp'] >= since)
+    >>> missing = sum(1 for t in iter_tracks("data/history/chk-roon.json") if not t.get('album_spotify_image'))
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Taille des blocs lus (caractères)
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = " \t\n\r,]}"
+
+
+class _Reader:
+    """Tampon de lecture incrémentale d'un fichier JSON."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Lit un bloc de plus (en oubliant la partie déjà décodée)."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        """Prochain caractère significatif ('' en fin de fichier)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self.error(f"'{char}' attendu")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Décode la valeur suivante, en lisant des blocs jusqu'à ce qu'elle soit complète."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Un nombre coupé par la fin du tampon ("-7." de "-7.5e3") continue dans le bloc suivant
+            if (end == len(self.buffer) or self._truncated_number(value, end)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _truncated_number(self, value: Any, end: int) -> bool:
+        return (isinstance(value, (int, float)) and not isinstance(value, bool)
+                and self.buffer[end] not in _DELIMITERS)
+
+    def separator(self, closing: str) -> bool:
+        """Consomme ',' (True) ou le caractère fermant (False)."""
+        char = self.peek()
+        if char == ",":
+            self.pos += 1
+            return True
+        if char == closing:
+            self.pos += 1
+            return False
+        raise self.error(f"',' ou '{closing}' attendu")
+
+
+def _iter_array(reader: _Reader) -> Iterator[Any]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if not reader.separator("]"):
+            return
+
+
+def _iter_members(reader: _Reader) -> Iterator[str]:
+    """Noms des champs d'un objet; l'appelant consomme chaque valeur."""
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        if reader.peek() != '"':
+            raise reader.error("nom de champ attendu")
+        name = reader.value()
+        reader.expect(":")
+        yield name
+        if not reader.separator("}"):
+            return
+
+
+def _walk(path: str, key: str, meta: Optional[Dict], chunk_size: int) -> Iterator[Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        first = reader.peek()
+        if first == "[":
+            yield from _iter_array(reader)
+        elif first == "{":
+            for name in _iter_members(reader):
+                if name == key and reader.peek() == "[":
+                    yield from _iter_array(reader)
+                elif meta is not None:
+                    meta[name] = reader.value()
+                else:
+                    reader.value()
+        else:
+            raise reader.error("liste ou objet JSON attendu")
+        if reader.peek():
+            raise reader.error("données en trop après la valeur JSON")
+
+
+def iter_json_array(path: str, key: str = "tracks", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """Éléments d'une liste JSON, lus au fil du fichier.
+
+    Args:
+        path: Fichier JSON: liste de premier niveau, ou objet contenant la liste.
+        key: Champ de la liste si le fichier est un objet (les autres champs sont ignorés).
+        chunk_size: Taille des blocs lus.
+
+    Yields:
+        Éléments de la liste, dans l'ordre du fichier.
+
+    Raises:
+        FileNotFoundError: Fichier introuvable.
+        json.JSONDecodeError: JSON invalide ou tronqué (après les éléments déjà rendus).
+    """
+    return _walk(path, key, None, chunk_size)
+
+
+def iter_tracks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """Écoutes d'un historique ({"tracks": [...]} ou [...]), dans l'ordre du fichier.
+
+    Args:
+        path: chk-roon.json ou chk-last-fm.json.
+        chunk_size: Taille des blocs lus.
+
+    Yields:
+        Dict: Écoute (plus récentes en premier pour chk-roon.json).
+    """
+    return iter_json_array(path, "tracks", chunk_size)
+
+
+def iter_collection(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """Albums de discogs-collection.json, dans l'ordre du fichier.
+
+    Args:
+        path: discogs-collection.json.
+        chunk_size: Taille des blocs lus.
+
+    Yields:
+        Dict: Album au format de discogs-collection.json.
+    """
+    return iter_json_array(path, "albums", chunk_size)
+
+
+def read_json_meta(path: str, key: str = "tracks", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """Champs de premier niveau hors liste (username, month...), sans charger la liste.
+
+    Args:
+        path: Fichier JSON.
+        key: Champ de la liste à ignorer.
+        chunk_size: Taille des blocs lus.
+
+    Returns:
+        Dict: Champs hors key, dans l'ordre du fichier ({} pour une liste de premier niveau).
+    """
+    meta: Dict = {}
+    for _ in _walk(path, key, meta, chunk_size):
+        pass
+    return meta
+
+
+def _indent_lines(text: str, prefix: str) -> str:
+    return text.replace("\n", "\n" + prefix)
+
+
+def _fsync_directory(path: str):
+    """Rend durable un renommage ou une création dans un répertoire (POSIX)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_items(f, items: Iterable, prefix: str) -> int:
+    count = 0
+    f.write("[")
+    for item in items:
+        encoded = _indent_lines(json.dumps(item, indent=4, ensure_ascii=False), prefix + "    ")
+        f.write(("," if count else "") + "\n" + prefix + "    " + encoded)
+        count += 1
+    f.write("\n" + prefix + "]" if count else "]")
+    return count
+
+
+def write_json_stream(path: str, data, key: str = "tracks") -> int:
+    """Écrit un fichier JSON identique à json.dump(data, indent=4, ensure_ascii=False).
+
+    La liste peut être un itérateur (lecture en continu d'un autre fichier,
+    du journal...): elle est écrite élément par élément dans un fichier
+    temporaire, renommé atomiquement à la fin. La source peut être le
+    fichier remplacé lui-même.
+
+    Args:
+        path: Fichier produit.
+        data: Objet dont data[key] est un itérable, ou itérable d'éléments
+            (liste de premier niveau, comme discogs-collection.json).
+        key: Champ de la liste dans data.
+
+    Returns:
+        int: Nombre d'éléments écrits.
+    """
+    temp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            if isinstance(data, dict):
+                f.write("{")
+                for position, (name, value) in enumerate(data.items()):
+                    f.write(("," if position else "") + "\n    " + json.dumps(name, ensure_ascii=False) + ": ")
+                    if name == key:
+                        count = _write_items(f, value, "    ")
+                    else:
+                        f.write(_indent_lines(json.dumps(value, indent=4, ensure_ascii=False), "    "))
+                f.write("\n}" if data else "}")
+            else:
+                count = _write_items(f, data, "")
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+    return count
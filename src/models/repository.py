@@ -0,0 +1,708 @@
+"""Couche d'accès aux données SQLite (repository) pour l'historique et la collection.
+
+Ce module centralise les requêtes de lecture sur la base musique.db afin que
+l'interface Streamlit et les scripts d'analyse ne chargent plus l'intégralité
+des fichiers JSON à chaque exécution. Chaque consommateur demande uniquement
+les lignes dont il a besoin (plage de dates, artiste, source, favoris) avec
+pagination.
+
+Les résultats sont retournés sous forme de dictionnaires au format historique
+des fichiers JSON (chk-roon.json, discogs-collection.json) pour rester
+compatibles avec le code existant.
+
+Les analyses (top artistes/albums, timeline quotidienne, distribution horaire)
+agrègent les colonnes dénormalisées artist_id/album_id de listening_history et
+sont servies uniquement par ses index couvrants (voir test_query_plans.py).
+Les comptages par jour et par heure sont lus dans les tables d'agrégats
+rollup_* maintenues par triggers (O(jours) au lieu de O(écoutes)).
+
+La base n'est alimentée que par migrate_to_sqlite.py, alors que les trackers
+et les scripts de maintenance continuent d'écrire les fichiers JSON (et le
+journal .log). open_repository() ne renvoie donc la base que si elle a été
+écrite après la dernière modification de ces fichiers (HISTORY_SOURCES, ou
+COLLECTION_SOURCES pour la collection); sinon les appelants se replient sur
+les JSON, toujours à jour.
+
+Exemple d'utilisation:
+    >>> from src.models.repository import open_repository
+    >>>
+    >>> repository = open_repository()
+    >>> if repository and repository.has_plays():
+    ...     plays = repository.get_plays(source='roon', loved=True, limit=50)
+    ...     total = repository.count_plays(start=1769000000)
+
+Auteur: Patrick Ostertag
+Version: 1.2.0
+Date: 28 janvier 2026
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, inspect, select, and_, or_
+from sqlalchemy.engine import Engine
+
+from .database import DEFAULT_DB_PATH, get_engine
+from .history_log import LOG_SUFFIX
+from .schema import (
+    Artist,
+    Album,
+    Track,
+    ListeningHistory,
+    Image,
+    Metadata,
+    RollupDaily,
+    RollupHourly,
+    album_artist,
+)
+
+# Taille de page par défaut pour le parcours itératif de l'historique
+DEFAULT_PAGE_SIZE = 5000
+
+# Fichiers écrits hors de la base (relatifs à son répertoire, data/): la base
+# n'est lue que si elle est plus récente qu'eux
+HISTORY_SOURCES = (
+    os.path.join("history", "chk-roon.json"),
+    os.path.join("history", "chk-last-fm.json"),
+)
+COLLECTION_SOURCES = (os.path.join("collection", "discogs-collection.json"),)
+
+# Correspondance (type, source) d'image → clé du format JSON historique
+PLAY_IMAGE_KEYS = {
+    ('artist_image', 'spotify'): 'artist_spotify_image',
+    ('album_cover', 'spotify'): 'album_spotify_image',
+    ('album_cover', 'lastfm'): 'album_lastfm_image',
+}
+ALBUM_IMAGE_KEYS = {
+    ('album_cover', 'discogs'): 'Pochette',
+    ('album_cover', 'spotify'): 'Spotify_Cover_URL',
+}
+
+
+class MusicRepository:
+    """Accès en lecture à l'historique d'écoute et à la collection.
+
+    Attributes:
+        engine: Moteur SQLAlchemy connecté à la base SQLite.
+    """
+
+    def __init__(self, engine: Engine):
+        """Initialise le repository.
+
+        Args:
+            engine: Moteur SQLAlchemy (voir open_repository()).
+        """
+        self.engine = engine
+        self._has_rollups = None
+
+    # ------------------------------------------------------------------
+    # Historique d'écoute
+    # ------------------------------------------------------------------
+
+    def has_plays(self) -> bool:
+        """Indique si la table listening_history contient au moins une écoute."""
+        with self.engine.connect() as conn:
+            return conn.execute(select(ListeningHistory.id).limit(1)).first() is not None
+
+    def get_plays(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        artist: Optional[str] = None,
+        source: Optional[str] = None,
+        loved: Optional[bool] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        newest_first: bool = True,
+        with_details: bool = False,
+    ) -> List[Dict]:
+        """Retourne une page d'écoutes filtrées.
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+            artist: Nom exact de l'artiste (nullable).
+            source: Source de l'écoute, 'roon' ou 'lastfm' (nullable).
+            loved: Filtre sur le marqueur favori (nullable).
+            limit: Nombre maximum d'écoutes (None = toutes).
+            offset: Nombre d'écoutes à sauter (pagination).
+            newest_first: Ordre chronologique inverse (comme chk-roon.json).
+            with_details: Ajoute images et ai_info (requêtes supplémentaires).
+
+        Returns:
+            List[Dict]: Écoutes au format chk-roon.json (timestamp, date, artist,
+                title, album, loved, source, plus images et ai_info si demandé).
+        """
+        stmt = self._plays_query(start, end, artist, source, loved)
+        stmt = stmt.order_by(*self._play_order(newest_first))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).all()
+            plays = [self._play_to_dict(row) for row in rows]
+            if with_details and rows:
+                self._attach_play_details(conn, rows, plays)
+        return plays
+
+    def iter_plays(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        artist: Optional[str] = None,
+        source: Optional[str] = None,
+        loved: Optional[bool] = None,
+        newest_first: bool = True,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        with_details: bool = False,
+    ) -> Iterator[Dict]:
+        """Parcourt les écoutes filtrées page par page (pagination par clé).
+
+        La pagination utilise la position (timestamp, id) de la dernière ligne
+        lue plutôt qu'un OFFSET, ce qui garde un coût constant par page.
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+            artist: Nom exact de l'artiste (nullable).
+            source: Source de l'écoute (nullable).
+            loved: Filtre sur le marqueur favori (nullable).
+            newest_first: Ordre chronologique inverse.
+            page_size: Nombre de lignes lues par requête.
+            with_details: Ajoute images et ai_info (deux requêtes par page).
+
+        Yields:
+            Dict: Écoute au format chk-roon.json.
+        """
+        last_key = None
+        while True:
+            stmt = self._plays_query(start, end, artist, source, loved)
+            if last_key is not None:
+                timestamp, play_id = last_key
+                if newest_first:
+                    stmt = stmt.where(or_(
+                        ListeningHistory.timestamp < timestamp,
+                        and_(ListeningHistory.timestamp == timestamp, ListeningHistory.id < play_id),
+                    ))
+                else:
+                    stmt = stmt.where(or_(
+                        ListeningHistory.timestamp > timestamp,
+                        and_(ListeningHistory.timestamp == timestamp, ListeningHistory.id > play_id),
+                    ))
+            stmt = stmt.order_by(*self._play_order(newest_first)).limit(page_size)
+
+            with self.engine.connect() as conn:
+                rows = conn.execute(stmt).all()
+                plays = [self._play_to_dict(row) for row in rows]
+                if with_details and rows:
+                    self._attach_play_details(conn, rows, plays)
+
+            yield from plays
+
+            if len(rows) < page_size:
+                return
+            last_key = (rows[-1].timestamp, rows[-1].id)
+
+    def count_plays(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        artist: Optional[str] = None,
+        source: Optional[str] = None,
+        loved: Optional[bool] = None,
+    ) -> int:
+        """Compte les écoutes correspondant aux filtres.
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+            artist: Nom exact de l'artiste (nullable).
+            source: Source de l'écoute (nullable).
+            loved: Filtre sur le marqueur favori (nullable).
+
+        Returns:
+            int: Nombre d'écoutes.
+        """
+        stmt = select(func.count(ListeningHistory.id))
+        stmt = self._apply_play_filters(stmt, start, end, artist, source, loved)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).scalar() or 0
+
+    def count_plays_by_source(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, int]:
+        """Compte les écoutes par source.
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+
+        Returns:
+            Dict[str, int]: Source → nombre d'écoutes.
+        """
+        stmt = select(ListeningHistory.source, func.count(ListeningHistory.id))
+        stmt = self._apply_play_filters(stmt, start, end, None, None, None)
+        stmt = stmt.group_by(ListeningHistory.source)
+        with self.engine.connect() as conn:
+            return dict(conn.execute(stmt).all())
+
+    # ------------------------------------------------------------------
+    # Analyses (servies par les index couvrants de listening_history)
+    # ------------------------------------------------------------------
+
+    def top_artists(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        source: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Tuple[str, int]]:
+        """Classement des artistes les plus écoutés.
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+            source: Source de l'écoute (nullable).
+            limit: Nombre d'artistes retournés.
+
+        Returns:
+            List[Tuple[str, int]]: (nom d'artiste, nombre d'écoutes) par ordre décroissant.
+        """
+        stmt = self._top_stmt(ListeningHistory.artist_id, Artist.id, Artist.name, start, end, source, limit)
+        with self.engine.connect() as conn:
+            return [(row.name, row.plays) for row in conn.execute(stmt)]
+
+    def top_albums(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        source: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Tuple[str, int]]:
+        """Classement des albums les plus écoutés.
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+            source: Source de l'écoute (nullable).
+            limit: Nombre d'albums retournés.
+
+        Returns:
+            List[Tuple[str, int]]: (titre d'album, nombre d'écoutes) par ordre décroissant.
+        """
+        stmt = self._top_stmt(ListeningHistory.album_id, Album.id, Album.title, start, end, source, limit)
+        with self.engine.connect() as conn:
+            return [(row.title, row.plays) for row in conn.execute(stmt)]
+
+    def plays_per_day(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        source: Optional[str] = None,
+    ) -> List[Tuple[str, int]]:
+        """Timeline quotidienne des écoutes (heure locale).
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+            source: Source de l'écoute (nullable).
+
+        Returns:
+            List[Tuple[str, int]]: ("YYYY-MM-DD", nombre d'écoutes) par ordre chronologique.
+        """
+        stmt = self._per_day_stmt(start, end, source)
+        with self.engine.connect() as conn:
+            return [(row.day, row.plays) for row in conn.execute(stmt)]
+
+    def plays_per_hour(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        source: Optional[str] = None,
+    ) -> Dict[int, int]:
+        """Distribution des écoutes par heure de la journée (heure locale).
+
+        Args:
+            start: Timestamp Unix minimal inclus (nullable).
+            end: Timestamp Unix maximal exclu (nullable).
+            source: Source de l'écoute (nullable).
+
+        Returns:
+            Dict[int, int]: Heure (0-23) → nombre d'écoutes.
+        """
+        stmt = self._per_hour_stmt(start, end, source)
+        with self.engine.connect() as conn:
+            return {int(row.hour): row.plays for row in conn.execute(stmt)}
+
+    @classmethod
+    def _top_stmt(cls, key_column, id_column, label_column, start, end, source, limit):
+        """Agrégation sur la colonne dénormalisée puis jointure sur les seuls gagnants."""
+        plays = func.count().label('plays')
+        counts = select(key_column.label('key'), plays).where(key_column.is_not(None))
+        counts = cls._apply_play_filters(counts, start, end, None, source, None)
+        counts = (
+            counts.group_by(key_column)
+            .order_by(plays.desc(), key_column)
+            .limit(limit)
+            .subquery()
+        )
+        return (
+            select(label_column, counts.c.plays)
+            .join(counts, id_column == counts.c.key)
+            .order_by(counts.c.plays.desc(), label_column)
+        )
+
+    @classmethod
+    def _per_day_stmt(cls, start, end, source):
+        """Requête de la timeline quotidienne."""
+        day = func.date(ListeningHistory.timestamp, 'unixepoch', 'localtime')
+        stmt = select(day.label('day'), func.count().label('plays'))
+        stmt = cls._apply_play_filters(stmt, start, end, None, source, None)
+        return stmt.group_by(day).order_by(day)
+
+    @classmethod
+    def _per_hour_stmt(cls, start, end, source):
+        """Requête de distribution horaire."""
+        hour = func.strftime('%H', ListeningHistory.timestamp, 'unixepoch', 'localtime')
+        stmt = select(hour.label('hour'), func.count().label('plays'))
+        stmt = cls._apply_play_filters(stmt, start, end, None, source, None)
+        return stmt.group_by(hour).order_by(hour)
+
+    # ------------------------------------------------------------------
+    # Agrégats pré-calculés (tables rollup_*, voir models/rollups.py)
+    # ------------------------------------------------------------------
+
+    def has_rollups(self) -> bool:
+        """Indique si les tables d'agrégats existent (base migrée en version récente)."""
+        if self._has_rollups is None:
+            self._has_rollups = inspect(self.engine).has_table(RollupDaily.__tablename__)
+        return self._has_rollups
+
+    def daily_play_counts(self, source: Optional[str] = None) -> Dict[str, int]:
+        """Nombre d'écoutes par jour local, lu dans rollup_daily (O(jours)).
+
+        Args:
+            source: Source de l'écoute (nullable).
+
+        Returns:
+            Dict[str, int]: "YYYY-MM-DD" → nombre d'écoutes, par ordre chronologique.
+        """
+        if not self.has_rollups():
+            return dict(self.plays_per_day(source=source))
+
+        stmt = select(RollupDaily.day, func.sum(RollupDaily.plays))
+        if source is not None:
+            stmt = stmt.where(RollupDaily.source == source)
+        stmt = stmt.group_by(RollupDaily.day).order_by(RollupDaily.day)
+        with self.engine.connect() as conn:
+            return {day: plays for day, plays in conn.execute(stmt)}
+
+    def play_counts_by_hour(
+        self,
+        since: Optional[int] = None,
+        source: Optional[str] = None,
+    ) -> Dict[Tuple[str, int], int]:
+        """Nombre d'écoutes par (jour local, heure locale) depuis un instant donné.
+
+        Les heures entièrement postérieures à `since` sont lues dans
+        rollup_hourly; seule l'heure entamée par `since` est comptée sur
+        l'historique brut (index couvrant), ce qui donne un résultat exact
+        pour un instant quelconque.
+
+        Args:
+            since: Timestamp Unix minimal inclus (None = tout l'historique).
+            source: Source de l'écoute (nullable).
+
+        Returns:
+            Dict[Tuple[str, int], int]: ("YYYY-MM-DD", heure 0-23) → nombre d'écoutes.
+        """
+        if not self.has_rollups():
+            return self._raw_counts_by_hour(since, None, source)
+
+        stmt = select(RollupHourly.day, RollupHourly.hour, func.sum(RollupHourly.plays))
+        counts = {}
+        if since is not None:
+            hour_start = datetime.fromtimestamp(since).replace(minute=0, second=0, microsecond=0)
+            boundary = int((hour_start + timedelta(hours=1)).timestamp())
+            counts = self._raw_counts_by_hour(since, boundary, source)
+            day, hour = hour_start.strftime('%Y-%m-%d'), hour_start.hour
+            stmt = stmt.where(or_(
+                RollupHourly.day > day,
+                and_(RollupHourly.day == day, RollupHourly.hour > hour),
+            ))
+        if source is not None:
+            stmt = stmt.where(RollupHourly.source == source)
+        stmt = stmt.group_by(RollupHourly.day, RollupHourly.hour)
+        with self.engine.connect() as conn:
+            for day, hour, plays in conn.execute(stmt):
+                counts[(day, hour)] = counts.get((day, hour), 0) + plays
+        return counts
+
+    def _raw_counts_by_hour(self, start, end, source) -> Dict[Tuple[str, int], int]:
+        """Comptage (jour, heure) directement sur listening_history."""
+        day = func.date(ListeningHistory.timestamp, 'unixepoch', 'localtime')
+        hour = func.strftime('%H', ListeningHistory.timestamp, 'unixepoch', 'localtime')
+        stmt = select(day, hour, func.count())
+        stmt = self._apply_play_filters(stmt, start, end, None, source, None)
+        stmt = stmt.group_by(day, hour)
+        with self.engine.connect() as conn:
+            return {(row[0], int(row[1])): row[2] for row in conn.execute(stmt)}
+
+    def _plays_query(self, start, end, artist, source, loved):
+        """Construit la requête de base des écoutes (colonnes du format JSON)."""
+        stmt = (
+            select(
+                ListeningHistory.id,
+                ListeningHistory.timestamp,
+                ListeningHistory.date,
+                ListeningHistory.source,
+                ListeningHistory.loved,
+                Track.title.label('title'),
+                Album.id.label('album_id'),
+                Album.title.label('album'),
+                Artist.id.label('artist_id'),
+                Artist.name.label('artist'),
+            )
+            .select_from(ListeningHistory)
+            .join(Track, ListeningHistory.track_id == Track.id)
+            .join(Album, Track.album_id == Album.id)
+            .outerjoin(Artist, Track.artist_id == Artist.id)
+        )
+        return self._apply_play_filters(stmt, start, end, artist, source, loved, joined=True)
+
+    @staticmethod
+    def _apply_play_filters(stmt, start, end, artist, source, loved, joined: bool = False):
+        """Ajoute les clauses WHERE communes aux requêtes d'écoutes."""
+        if start is not None:
+            stmt = stmt.where(ListeningHistory.timestamp >= start)
+        if end is not None:
+            stmt = stmt.where(ListeningHistory.timestamp < end)
+        if source is not None:
+            stmt = stmt.where(ListeningHistory.source == source)
+        if loved is not None:
+            stmt = stmt.where(ListeningHistory.loved == loved)
+        if artist is not None:
+            if not joined:
+                stmt = (
+                    stmt.join(Track, ListeningHistory.track_id == Track.id)
+                    .join(Artist, Track.artist_id == Artist.id)
+                )
+            stmt = stmt.where(Artist.name == artist)
+        return stmt
+
+    @staticmethod
+    def _play_order(newest_first: bool):
+        """Clés de tri stables (timestamp puis id)."""
+        if newest_first:
+            return (ListeningHistory.timestamp.desc(), ListeningHistory.id.desc())
+        return (ListeningHistory.timestamp.asc(), ListeningHistory.id.asc())
+
+    @staticmethod
+    def _play_to_dict(row: Any) -> Dict:
+        """Convertit une ligne SQL en dictionnaire au format chk-roon.json."""
+        return {
+            'timestamp': row.timestamp,
+            'date': row.date,
+            'artist': row.artist,
+            'title': row.title,
+            'album': row.album,
+            'loved': bool(row.loved),
+            'source': row.source,
+        }
+
+    @staticmethod
+    def _attach_play_details(conn: Any, rows: List[Any], plays: List[Dict]) -> None:
+        """Complète les écoutes avec images et ai_info en deux requêtes groupées."""
+        artist_ids = {row.artist_id for row in rows if row.artist_id is not None}
+        album_ids = {row.album_id for row in rows}
+
+        artist_images = {}
+        album_images = defaultdict(dict)
+        image_rows = conn.execute(
+            select(Image.artist_id, Image.album_id, Image.image_type, Image.source, Image.url)
+            .where(or_(Image.artist_id.in_(artist_ids), Image.album_id.in_(album_ids)))
+        )
+        for artist_id, album_id, image_type, source, url in image_rows:
+            key = PLAY_IMAGE_KEYS.get((image_type, source))
+            if key is None:
+                continue
+            if artist_id is not None:
+                artist_images.setdefault(artist_id, url)
+            elif album_id is not None:
+                album_images[album_id].setdefault(key, url)
+
+        ai_infos = dict(conn.execute(
+            select(Metadata.album_id, Metadata.ai_info).where(Metadata.album_id.in_(album_ids))
+        ).all())
+
+        for row, play in zip(rows, plays):
+            play['artist_spotify_image'] = artist_images.get(row.artist_id)
+            play['album_spotify_image'] = album_images[row.album_id].get('album_spotify_image')
+            play['album_lastfm_image'] = album_images[row.album_id].get('album_lastfm_image')
+            play['ai_info'] = ai_infos.get(row.album_id)
+
+    # ------------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------------
+
+    def get_albums(
+        self,
+        artist: Optional[str] = None,
+        support: Optional[str] = None,
+        collection_only: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict]:
+        """Retourne une page d'albums au format discogs-collection.json.
+
+        Args:
+            artist: Nom exact d'un des artistes de l'album (nullable).
+            support: Format (Vinyle, CD...) (nullable).
+            collection_only: Si True, uniquement les albums Discogs (discogs_id renseigné).
+            limit: Nombre maximum d'albums (None = tous).
+            offset: Nombre d'albums à sauter (pagination).
+
+        Returns:
+            List[Dict]: Albums avec clés release_id, Titre, Artiste, Année,
+                Support, Pochette, Resume, Spotify_URL, Spotify_Cover_URL.
+        """
+        stmt = select(
+            Album.id, Album.title, Album.year, Album.support,
+            Album.discogs_id, Album.spotify_url,
+        )
+        if collection_only:
+            stmt = stmt.where(Album.discogs_id.is_not(None))
+        if support is not None:
+            stmt = stmt.where(Album.support == support)
+        if artist is not None:
+            stmt = stmt.where(Album.id.in_(
+                select(album_artist.c.album_id)
+                .join(Artist, album_artist.c.artist_id == Artist.id)
+                .where(Artist.name == artist)
+            ))
+        stmt = stmt.order_by(Album.title, Album.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).all()
+            album_ids = [row.id for row in rows]
+            if not album_ids:
+                return []
+
+            artists = defaultdict(list)
+            for album_id, name in conn.execute(
+                select(album_artist.c.album_id, Artist.name)
+                .join(Artist, album_artist.c.artist_id == Artist.id)
+                .where(album_artist.c.album_id.in_(album_ids))
+                .order_by(album_artist.c.album_id, Artist.id)
+            ):
+                artists[album_id].append(name)
+
+            images = defaultdict(dict)
+            for album_id, image_type, source, url in conn.execute(
+                select(Image.album_id, Image.image_type, Image.source, Image.url)
+                .where(Image.album_id.in_(album_ids))
+            ):
+                key = ALBUM_IMAGE_KEYS.get((image_type, source))
+                if key:
+                    images[album_id].setdefault(key, url)
+
+            resumes = dict(conn.execute(
+                select(Metadata.album_id, Metadata.resume).where(Metadata.album_id.in_(album_ids))
+            ).all())
+
+        return [
+            {
+                'release_id': int(row.discogs_id) if row.discogs_id and row.discogs_id.isdigit() else row.discogs_id,
+                'Titre': row.title,
+                'Artiste': artists.get(row.id, []),
+                'Année': row.year,
+                'Support': row.support,
+                'Pochette': images[row.id].get('Pochette'),
+                'Resume': resumes.get(row.id),
+                'Spotify_URL': row.spotify_url,
+                'Spotify_Cover_URL': images[row.id].get('Spotify_Cover_URL'),
+            }
+            for row in rows
+        ]
+
+    def count_albums(self, collection_only: bool = True) -> int:
+        """Compte les albums (par défaut ceux de la collection Discogs)."""
+        stmt = select(func.count(Album.id))
+        if collection_only:
+            stmt = stmt.where(Album.discogs_id.is_not(None))
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).scalar() or 0
+
+
+def _mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _source_mtime_ns(path: str) -> int:
+    """Dernière écriture d'un fichier JSON ou des segments de son journal (.log)."""
+    latest = _mtime_ns(path)
+    log_dir = os.path.splitext(path)[0] + LOG_SUFFIX
+    if os.path.isdir(log_dir):
+        for name in os.listdir(log_dir):
+            latest = max(latest, _mtime_ns(os.path.join(log_dir, name)))
+    return latest
+
+
+def is_current(db_path: Optional[str] = None, sources: Sequence[str] = HISTORY_SOURCES) -> bool:
+    """Indique si la base a été écrite après la dernière modification des fichiers sources.
+
+    Args:
+        db_path: Chemin vers la base (défaut: data/musique.db).
+        sources: Fichiers JSON alimentant la base, relatifs à son répertoire
+            (ou absolus); leur journal .log éventuel est aussi pris en compte.
+
+    Returns:
+        bool: True si aucune source n'a été modifiée depuis la dernière
+            écriture de la base (fichier principal, ou WAL non vide).
+    """
+    db_path = db_path or DEFAULT_DB_PATH
+    db_written = _mtime_ns(db_path)
+    wal_path = db_path + "-wal"
+    # Un WAL vide est créé à l'ouverture par un simple lecteur: seul un WAL non vide compte
+    if os.path.exists(wal_path) and os.path.getsize(wal_path) > 0:
+        db_written = max(db_written, _mtime_ns(wal_path))
+    base_dir = os.path.dirname(os.path.abspath(db_path))
+    return all(_source_mtime_ns(os.path.join(base_dir, source)) <= db_written for source in sources)
+
+
+def open_repository(db_path: Optional[str] = None,
+                    sources: Sequence[str] = HISTORY_SOURCES) -> Optional[MusicRepository]:
+    """Ouvre le repository sur une base SQLite existante et à jour.
+
+    Args:
+        db_path: Chemin vers la base (défaut: data/musique.db).
+        sources: Fichiers dont la base est une copie (voir is_current);
+            HISTORY_SOURCES pour l'historique, COLLECTION_SOURCES pour la
+            collection, () pour ignorer la vérification.
+
+    Returns:
+        Optional[MusicRepository]: Repository prêt à l'emploi, ou None si la
+            base n'existe pas, n'a pas encore été migrée, ou est plus ancienne
+            que ses sources (les appelants se replient alors sur les fichiers
+            JSON).
+    """
+    db_path = db_path or DEFAULT_DB_PATH
+    if not os.path.exists(db_path):
+        return None
+    # Avant get_engine(): l'ouverture peut créer le WAL
+    if not is_current(db_path, sources):
+        return None
+
+    engine = get_engine(db_path)
+    if not inspect(engine).has_table(ListeningHistory.__tablename__):
+        return None
+    return MusicRepository(engine)
@@ -0,0 +1,100 @@
+"""Reconstruction et contrôle des tables d'agrégats d'écoutes (rollups).
+
+Les tables rollup_daily, rollup_hourly, rollup_artist_daily et
+rollup_album_daily sont maintenues incrémentalement par des triggers SQLite
+sur listening_history (voir schema.rollup_trigger_ddl). Ce module permet:
+    - de les reconstruire entièrement depuis l'historique brut (base migrée
+      avant leur création, changement de fuseau horaire, réparation)
+    - de vérifier leur cohérence avec l'historique brut
+
+Exemple d'utilisation:
+    >>> from src.models.database import get_engine
+    >>> from src.models.rollups import check_rollups, rebuild_rollups
+    >>>
+    >>> engine = get_engine()
+    >>> if any(check_rollups(engine).values()):
+    ...     rebuild_rollups(engine)
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+from typing import Dict
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .schema import ROLLUP_KEYS, RollupDaily, rollup_trigger_ddl
+
+
+def _aggregate_sql(table: str) -> str:
+    """Requête calculant le contenu attendu d'un agrégat depuis listening_history."""
+    keys = ROLLUP_KEYS[table]
+    expressions = [expression.format(row='lh') for _, expression in keys]
+    not_null = ' AND '.join(f"({expression}) IS NOT NULL" for expression in expressions)
+    return (
+        f"SELECT {', '.join(expressions)}, count(*) FROM listening_history AS lh "
+        f"WHERE {not_null} GROUP BY {', '.join(str(i) for i in range(1, len(keys) + 1))}"
+    )
+
+
+def ensure_rollups(engine: Engine) -> bool:
+    """Crée les tables et triggers d'agrégats manquants sur une base existante.
+
+    Args:
+        engine: Moteur SQLAlchemy.
+
+    Returns:
+        bool: True si les tables viennent d'être créées (reconstruction nécessaire).
+    """
+    created = not inspect(engine).has_table(RollupDaily.__tablename__)
+    tables = [RollupDaily.metadata.tables[name] for name in ROLLUP_KEYS]
+    with engine.begin() as conn:
+        for table in tables:
+            table.create(conn, checkfirst=True)
+        for statement in rollup_trigger_ddl():
+            conn.exec_driver_sql(statement)
+    return created
+
+
+def rebuild_rollups(engine: Engine) -> Dict[str, int]:
+    """Reconstruit tous les agrégats depuis l'historique brut (une transaction).
+
+    Args:
+        engine: Moteur SQLAlchemy.
+
+    Returns:
+        Dict[str, int]: Table d'agrégat → nombre de lignes écrites.
+    """
+    ensure_rollups(engine)
+    counts = {}
+    with engine.begin() as conn:
+        for table, keys in ROLLUP_KEYS.items():
+            columns = ', '.join(name for name, _ in keys)
+            conn.exec_driver_sql(f"DELETE FROM {table}")
+            conn.exec_driver_sql(f"INSERT INTO {table} ({columns}, plays) {_aggregate_sql(table)}")
+            counts[table] = conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+    return counts
+
+
+def check_rollups(engine: Engine) -> Dict[str, int]:
+    """Compare chaque agrégat au résultat recalculé depuis l'historique brut.
+
+    Args:
+        engine: Moteur SQLAlchemy.
+
+    Returns:
+        Dict[str, int]: Table d'agrégat → nombre de lignes divergentes
+            (absentes, en trop ou avec un compte différent). 0 partout = cohérent.
+    """
+    mismatches = {}
+    with engine.connect() as conn:
+        for table, keys in ROLLUP_KEYS.items():
+            stored = f"SELECT {', '.join(name for name, _ in keys)}, plays FROM {table}"
+            expected = _aggregate_sql(table)
+            mismatches[table] = conn.exec_driver_sql(
+                f"SELECT count(*) FROM (SELECT * FROM ({stored} EXCEPT {expected}) "
+                f"UNION ALL SELECT * FROM ({expected} EXCEPT {stored}))"
+            ).scalar()
+    return mismatches
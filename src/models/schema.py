@@ -11,6 +11,9 @@ Tables principales:
     - images: URLs d'images (artiste, album) avec source
     - metadata: Métadonnées supplémentaires (résumés IA, BOF, etc.)
     - album_artist: Table de liaison Many-to-Many pour artistes/albums
+    - sync_state: Marqueurs de synchronisation incrémentale par source
+    - rollup_daily, rollup_hourly, rollup_artist_daily, rollup_album_daily:
+      Agrégats d'écoutes maintenus par triggers SQLite (voir models/rollups.py)
 
 Relations:
     - Artist <-> Album: Many-to-Many via album_artist
@@ -59,6 +62,8 @@ from sqlalchemy import (
     Table,
     Index,
     UniqueConstraint,
+    event,
+    select,
 )
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
@@ -91,6 +96,7 @@ class Artist(Base):
     Relations:
         albums: Liste des albums via album_artist (Many-to-Many)
         images: Liste des images d'artiste (One-to-Many)
+        tracks: Pistes interprétées (One-to-Many)
     """
     __tablename__ = 'artists'
     
@@ -104,6 +110,7 @@ class Artist(Base):
     # Relations
     albums = relationship('Album', secondary=album_artist, back_populates='artists')
     images = relationship('Image', back_populates='artist', cascade='all, delete-orphan')
+    tracks = relationship('Track', back_populates='artist')
     
     def __repr__(self):
         return f"<Artist(id={self.id}, name='{self.name}')>"
@@ -163,6 +170,7 @@ class Track(Base):
     Attributes:
         id: Clé primaire auto-incrémentée
         album_id: Clé étrangère vers albums
+        artist_id: Clé étrangère vers artists - interprète de la piste (nullable)
         title: Titre de la piste
         track_number: Numéro de piste (nullable)
         duration_seconds: Durée en secondes (nullable)
@@ -172,12 +180,14 @@ class Track(Base):
         
     Relations:
         album: Album parent (Many-to-One)
+        artist: Interprète de la piste (Many-to-One)
         listening_history: Historique d'écoute (One-to-Many)
     """
     __tablename__ = 'tracks'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     album_id = Column(Integer, ForeignKey('albums.id'), nullable=False)
+    artist_id = Column(Integer, ForeignKey('artists.id'), nullable=True, index=True)
     title = Column(String(500), nullable=False)
     track_number = Column(Integer, nullable=True)
     duration_seconds = Column(Integer, nullable=True)
@@ -187,6 +197,7 @@ class Track(Base):
     
     # Relations
     album = relationship('Album', back_populates='tracks')
+    artist = relationship('Artist', back_populates='tracks')
     listening_history = relationship('ListeningHistory', back_populates='track', cascade='all, delete-orphan')
     
     # Index composite pour recherche rapide
@@ -204,6 +215,8 @@ class ListeningHistory(Base):
     Attributes:
         id: Clé primaire auto-incrémentée
         track_id: Clé étrangère vers tracks
+        artist_id: Interprète de la piste (dénormalisé depuis tracks)
+        album_id: Album de la piste (dénormalisé depuis tracks)
         timestamp: Timestamp Unix de l'écoute (indexé)
         date: Date formatée lisible (YYYY-MM-DD HH:MM)
         source: Source de l'écoute (roon/lastfm) (indexé)
@@ -215,14 +228,25 @@ class ListeningHistory(Base):
         
     Contraintes:
         - Unicité sur (track_id, timestamp) pour éviter doublons
+    
+    Index couvrants (analyses sans lecture de la table):
+        - idx_history_time_keys: plages de dates → artiste/album/source/loved
+        - idx_history_source_time: filtre par source (remplace l'index simple sur source)
+        - idx_history_artist_time: classement des artistes
+        - idx_history_album_time: classement des albums
+    
+    artist_id et album_id sont renseignés automatiquement à l'insertion ORM
+    (voir _fill_history_keys) et par migrate_to_sqlite.py pour les imports en masse.
     """
     __tablename__ = 'listening_history'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     track_id = Column(Integer, ForeignKey('tracks.id'), nullable=False)
+    artist_id = Column(Integer, ForeignKey('artists.id'), nullable=True)
+    album_id = Column(Integer, ForeignKey('albums.id'), nullable=True)
     timestamp = Column(Integer, nullable=False, index=True)
     date = Column(String(20), nullable=False)  # Format: "2026-01-27 15:30"
-    source = Column(String(20), nullable=False, index=True)  # roon ou lastfm
+    source = Column(String(20), nullable=False)  # roon ou lastfm (voir idx_history_source_time)
     loved = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     
@@ -233,12 +257,31 @@ class ListeningHistory(Base):
     __table_args__ = (
         UniqueConstraint('track_id', 'timestamp', name='uq_track_timestamp'),
         Index('idx_timestamp_source', 'timestamp', 'source'),
+        Index('idx_history_time_keys', 'timestamp', 'source', 'artist_id', 'album_id', 'loved'),
+        Index('idx_history_source_time', 'source', 'timestamp', 'artist_id', 'album_id', 'loved'),
+        Index('idx_history_artist_time', 'artist_id', 'timestamp', 'source'),
+        Index('idx_history_album_time', 'album_id', 'timestamp', 'source'),
     )
     
     def __repr__(self):
         return f"<ListeningHistory(id={self.id}, track_id={self.track_id}, date='{self.date}', source='{self.source}')>"
 
 
+@event.listens_for(ListeningHistory, 'before_insert')
+def _fill_history_keys(mapper, connection, target):
+    """Recopie artist_id/album_id de la piste sur l'écoute (colonnes dénormalisées)."""
+    if target.track_id is None or (target.artist_id is not None and target.album_id is not None):
+        return
+    row = connection.execute(
+        select(Track.artist_id, Track.album_id).where(Track.id == target.track_id)
+    ).first()
+    if row is not None:
+        if target.artist_id is None:
+            target.artist_id = row.artist_id
+        if target.album_id is None:
+            target.album_id = row.album_id
+
+
 class Image(Base):
     """Table des URLs d'images.
     
@@ -322,5 +365,174 @@ class Metadata(Base):
         return f"<Metadata(id={self.id}, album_id={self.album_id}, is_soundtrack={self.is_soundtrack})>"
 
 
+class SyncState(Base):
+    """Table des marqueurs de synchronisation incrémentale (high-water mark).
+    
+    Enregistre, pour chaque source d'écoute, le plus grand timestamp importé
+    afin que les migrations suivantes n'importent que les écoutes plus récentes.
+    
+    Attributes:
+        source: Source de l'écoute (roon/lastfm) - clé primaire
+        last_timestamp: Timestamp Unix de la dernière écoute importée
+        rows_imported: Nombre d'écoutes insérées lors de la dernière synchronisation
+        updated_at: Date de la dernière synchronisation
+    """
+    __tablename__ = 'sync_state'
+    
+    source = Column(String(20), primary_key=True)
+    last_timestamp = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<SyncState(source='{self.source}', last_timestamp={self.last_timestamp})>"
+
+
+# ============================================================================
+# Tables d'agrégats (rollups) maintenues par triggers sur listening_history
+# ============================================================================
+
+class RollupDaily(Base):
+    """Nombre d'écoutes par jour (heure locale) et par source.
+    
+    Attributes:
+        day: Jour local "YYYY-MM-DD"
+        source: Source de l'écoute (roon/lastfm)
+        plays: Nombre d'écoutes
+    """
+    __tablename__ = 'rollup_daily'
+    
+    day = Column(String(10), primary_key=True)
+    source = Column(String(20), primary_key=True)
+    plays = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+
+
+class RollupHourly(Base):
+    """Nombre d'écoutes par jour, heure (0-23, heure locale) et source.
+    
+    Attributes:
+        day: Jour local "YYYY-MM-DD"
+        hour: Heure locale (0-23)
+        source: Source de l'écoute (roon/lastfm)
+        plays: Nombre d'écoutes
+    """
+    __tablename__ = 'rollup_hourly'
+    
+    day = Column(String(10), primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    source = Column(String(20), primary_key=True)
+    plays = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+
+
+class RollupArtistDaily(Base):
+    """Nombre d'écoutes par jour, interprète et source.
+    
+    Attributes:
+        day: Jour local "YYYY-MM-DD"
+        artist_id: Interprète de la piste
+        source: Source de l'écoute (roon/lastfm)
+        plays: Nombre d'écoutes
+    """
+    __tablename__ = 'rollup_artist_daily'
+    
+    day = Column(String(10), primary_key=True)
+    artist_id = Column(Integer, ForeignKey('artists.id'), primary_key=True)
+    source = Column(String(20), primary_key=True)
+    plays = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+
+
+class RollupAlbumDaily(Base):
+    """Nombre d'écoutes par jour, album et source.
+    
+    Attributes:
+        day: Jour local "YYYY-MM-DD"
+        album_id: Album de la piste
+        source: Source de l'écoute (roon/lastfm)
+        plays: Nombre d'écoutes
+    """
+    __tablename__ = 'rollup_album_daily'
+    
+    day = Column(String(10), primary_key=True)
+    album_id = Column(Integer, ForeignKey('albums.id'), primary_key=True)
+    source = Column(String(20), primary_key=True)
+    plays = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+
+
+# Expressions SQL des clés d'agrégation, en fonction d'une ligne de listening_history
+# ({row} = NEW/OLD dans les triggers, alias de table dans les reconstructions).
+# artist_id/album_id sont relus depuis tracks si la ligne ne les porte pas encore.
+_DAY_SQL = "date({row}.timestamp, 'unixepoch', 'localtime')"
+_HOUR_SQL = "CAST(strftime('%H', {row}.timestamp, 'unixepoch', 'localtime') AS INTEGER)"
+_SOURCE_SQL = "{row}.source"
+_ARTIST_SQL = "COALESCE({row}.artist_id, (SELECT artist_id FROM tracks WHERE tracks.id = {row}.track_id))"
+_ALBUM_SQL = "COALESCE({row}.album_id, (SELECT album_id FROM tracks WHERE tracks.id = {row}.track_id))"
+
+# Table d'agrégat → colonnes de clé et leur expression
+ROLLUP_KEYS = {
+    RollupDaily.__tablename__: (('day', _DAY_SQL), ('source', _SOURCE_SQL)),
+    RollupHourly.__tablename__: (('day', _DAY_SQL), ('hour', _HOUR_SQL), ('source', _SOURCE_SQL)),
+    RollupArtistDaily.__tablename__: (('day', _DAY_SQL), ('artist_id', _ARTIST_SQL), ('source', _SOURCE_SQL)),
+    RollupAlbumDaily.__tablename__: (('day', _DAY_SQL), ('album_id', _ALBUM_SQL), ('source', _SOURCE_SQL)),
+}
+
+# Colonnes dont la modification déplace une écoute d'un agrégat à l'autre
+ROLLUP_SOURCE_COLUMNS = ('timestamp', 'source', 'track_id', 'artist_id', 'album_id')
+
+
+def _rollup_increment_sql(table: str, row: str) -> str:
+    """Instruction d'ajout d'une écoute à un agrégat (UPSERT)."""
+    keys = ROLLUP_KEYS[table]
+    columns = ', '.join(name for name, _ in keys)
+    values = ', '.join(expression.format(row=row) for _, expression in keys)
+    not_null = ' AND '.join(f"({expression.format(row=row)}) IS NOT NULL" for _, expression in keys)
+    # La clause WHERE lève l'ambiguïté syntaxique entre SELECT et ON CONFLICT
+    return (
+        f"INSERT INTO {table} ({columns}, plays) SELECT {values}, 1 WHERE {not_null} "
+        f"ON CONFLICT({columns}) DO UPDATE SET plays = plays + 1;"
+    )
+
+
+def _rollup_decrement_sql(table: str, row: str) -> str:
+    """Instructions de retrait d'une écoute d'un agrégat (ligne supprimée à zéro)."""
+    match = ' AND '.join(f"{name} = {expression.format(row=row)}" for name, expression in ROLLUP_KEYS[table])
+    return (
+        f"UPDATE {table} SET plays = plays - 1 WHERE {match}; "
+        f"DELETE FROM {table} WHERE {match} AND plays <= 0;"
+    )
+
+
+def rollup_trigger_ddl() -> list:
+    """Instructions CREATE TRIGGER maintenant les agrégats à chaque écriture.
+    
+    Returns:
+        list: Trois instructions (INSERT, DELETE, UPDATE des colonnes de clé).
+    """
+    increments = ' '.join(_rollup_increment_sql(table, 'NEW') for table in ROLLUP_KEYS)
+    decrements = ' '.join(_rollup_decrement_sql(table, 'OLD') for table in ROLLUP_KEYS)
+    return [
+        "CREATE TRIGGER IF NOT EXISTS trg_rollups_insert AFTER INSERT ON listening_history "
+        f"BEGIN {increments} END",
+        "CREATE TRIGGER IF NOT EXISTS trg_rollups_delete AFTER DELETE ON listening_history "
+        f"BEGIN {decrements} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_rollups_update AFTER UPDATE OF {', '.join(ROLLUP_SOURCE_COLUMNS)} "
+        f"ON listening_history BEGIN {decrements} {increments} END",
+    ]
+
+
+@event.listens_for(Base.metadata, 'after_create')
+def _create_rollup_triggers(target, connection, **kw):
+    """Crée les triggers d'agrégats avec le schéma (create_all)."""
+    for statement in rollup_trigger_ddl():
+        connection.exec_driver_sql(statement)
+
+
 # Export de la table de liaison pour faciliter les imports
 AlbumArtist = album_artist
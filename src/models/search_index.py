@@ -0,0 +1,200 @@
+"""Index de recherche plein texte (SQLite FTS5) pour la collection et l'historique.
+
+Remplace le parcours linéaire en minuscules de l'interface Streamlit par un
+index inversé FTS5 construit en mémoire (module sqlite3 de la bibliothèque
+standard): la latence d'une recherche reste de l'ordre de la milliseconde
+quelle que soit la taille de la collection.
+
+Fonctionnalités:
+    - Accents ignorés: "Mome" trouve "La Môme" (tokenizer unicode61, remove_diacritics)
+    - Recherche par préfixe: "dav" trouve "Davis" (index de préfixes 1 à 3 caractères)
+    - Plusieurs mots: tous doivent être présents, dans n'importe quel champ
+    - Ordre de la liste d'origine conservé
+
+Champs indexés:
+    - Albums: titre, artistes, labels, résumé, titres des pistes écoutées
+    - Écoutes: artiste, titre, album
+
+Exemple d'utilisation:
+    >>> from src.models.search_index import SearchIndex
+    >>>
+    >>> index = SearchIndex.for_albums(albums, plays)
+    >>> results = [albums[i] for i in index.search("mome")]
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Champs indexés par type de document
+ALBUM_FIELDS = ('title', 'artists', 'labels', 'resume', 'tracks')
+PLAY_FIELDS = ('artist', 'title', 'album')
+
+# unicode61 + remove_diacritics 2: repli des accents, y compris sur les caractères composés
+FTS_TOKENIZER = 'unicode61 remove_diacritics 2'
+FTS_PREFIXES = '1 2 3'
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def _as_text(value) -> str:
+    """Convertit une valeur de champ (chaîne, liste, None) en texte indexable."""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple, set)):
+        return ' '.join(str(item) for item in value if item)
+    return str(value)
+
+
+def build_match_query(search_term: str) -> Optional[str]:
+    """Traduit une saisie utilisateur en requête FTS5 (préfixes, ET logique).
+
+    Les mots sont extraits puis entourés de guillemets: la ponctuation et les
+    opérateurs FTS5 (AND, NEAR, *, ...) saisis par l'utilisateur sont neutralisés.
+
+    Args:
+        search_term: Terme saisi dans la barre de recherche.
+
+    Returns:
+        Optional[str]: Requête MATCH (ex: '"miles"* "kind"*'), None si aucun mot.
+    """
+    tokens = _TOKEN_PATTERN.findall(search_term or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class SearchIndex:
+    """Index FTS5 en mémoire sur une liste de documents.
+
+    Chaque document est identifié par sa position dans la liste d'origine
+    (rowid FTS5), ce qui permet de retourner les résultats dans l'ordre initial.
+
+    Attributes:
+        fields: Noms des colonnes indexées.
+        size: Nombre de documents indexés.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        """Crée un index vide.
+
+        Args:
+            fields: Noms des colonnes indexées (identifiants SQL simples).
+        """
+        self.fields = tuple(fields)
+        self.size = 0
+        # Connexion partagée entre les threads Streamlit, protégée par un verrou
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+        columns = ', '.join(self.fields)
+        self._conn.execute(
+            f"CREATE VIRTUAL TABLE documents USING fts5("
+            f"{columns}, tokenize='{FTS_TOKENIZER}', prefix='{FTS_PREFIXES}')"
+        )
+
+    def add_documents(self, documents: Iterable[Dict[str, object]]) -> int:
+        """Indexe des documents à la suite des précédents.
+
+        Args:
+            documents: Dictionnaires champ → valeur (chaîne, liste ou None).
+
+        Returns:
+            int: Nombre de documents ajoutés.
+        """
+        placeholders = ', '.join('?' for _ in self.fields)
+        start = self.size
+        rows = [
+            (start + offset, *(_as_text(document.get(field)) for field in self.fields))
+            for offset, document in enumerate(documents)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO documents (rowid, {', '.join(self.fields)}) VALUES (?, {placeholders})",
+                rows,
+            )
+            self._conn.commit()
+        self.size += len(rows)
+        return len(rows)
+
+    def search(self, search_term: str, limit: Optional[int] = None) -> List[int]:
+        """Recherche les documents contenant tous les mots (par préfixe).
+
+        Args:
+            search_term: Terme saisi par l'utilisateur.
+            limit: Nombre maximal de résultats (None = tous).
+
+        Returns:
+            List[int]: Positions des documents trouvés, dans l'ordre d'indexation.
+                Terme vide (ou sans mot) → tous les documents.
+        """
+        query = build_match_query(search_term)
+        if query is None:
+            positions = range(self.size)
+            return list(positions if limit is None else positions[:limit])
+
+        sql = "SELECT rowid FROM documents WHERE documents MATCH ? ORDER BY rowid"
+        params = [query]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def close(self) -> None:
+        """Libère la base en mémoire."""
+        with self._lock:
+            self._conn.close()
+
+    @classmethod
+    def for_albums(cls, albums: Sequence[Dict], plays: Optional[Iterable[Dict]] = None) -> 'SearchIndex':
+        """Construit l'index de la collection (format discogs-collection.json).
+
+        Args:
+            albums: Albums de la collection.
+            plays: Écoutes (format chk-roon.json) dont les titres de pistes sont
+                rattachés aux albums de même titre (optionnel).
+
+        Returns:
+            SearchIndex: Index dont les positions correspondent à `albums`.
+        """
+        tracks_by_album = defaultdict(set)
+        for play in plays or ():
+            album_title = (play.get('album') or '').casefold()
+            if album_title and play.get('title'):
+                tracks_by_album[album_title].add(play['title'])
+
+        index = cls(ALBUM_FIELDS)
+        index.add_documents(
+            {
+                'title': album.get('Titre'),
+                'artists': album.get('Artiste'),
+                'labels': album.get('Labels'),
+                'resume': album.get('Resume'),
+                'tracks': sorted(tracks_by_album.get((album.get('Titre') or '').casefold(), ())),
+            }
+            for album in albums
+        )
+        return index
+
+    @classmethod
+    def for_plays(cls, plays: Sequence[Dict]) -> 'SearchIndex':
+        """Construit l'index du journal d'écoute (format chk-roon.json).
+
+        Args:
+            plays: Écoutes à indexer.
+
+        Returns:
+            SearchIndex: Index dont les positions correspondent à `plays`.
+        """
+        index = cls(PLAY_FIELDS)
+        index.add_documents(
+            {field: play.get(field) for field in PLAY_FIELDS}
+            for play in plays
+        )
+        return index
@@ -0,0 +1,159 @@
+"""Découpage de l'historique en sessions d'écoute et analyses séquentielles.
+
+Une session est une suite d'écoutes consécutives (ordre chronologique) dont
+les écarts ne dépassent pas gap_minutes. Le découpage est vectorisé: les
+frontières sont les positions où np.diff des timestamps triés dépasse
+l'écart maximal.
+
+L'index de sessions est calculé une seule fois par historique et par écart,
+puis mis en cache par ColumnarHistory.sessions(): le rapport d'analyse et
+tous les algorithmes de playlist d'une même exécution le partagent.
+
+Exemple d'utilisation:
+    >>> from src.models.history_store import load_history
+    >>>
+    >>> history = load_history()
+    >>> sessions = history.sessions()
+    >>> for number in sessions.longest(5):
+    ...     plays = history.to_dicts(sessions.positions(number))
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+# Écart maximal par défaut entre deux écoutes d'une même session
+DEFAULT_GAP_MINUTES = 30
+
+
+class SessionIndex:
+    """Frontières des sessions d'écoute d'un historique.
+
+    Attributes:
+        order: Positions des écoutes dans l'historique, par ordre chronologique.
+        starts: Début de chaque session (indice dans order).
+        lengths: Nombre d'écoutes de chaque session.
+        gap_minutes: Écart maximal utilisé pour le découpage.
+    """
+
+    def __init__(self, order: np.ndarray, starts: np.ndarray, total: int, gap_minutes: int):
+        """Crée l'index à partir de l'ordre chronologique et des débuts de session.
+
+        Args:
+            order: Positions des écoutes par ordre chronologique.
+            starts: Début de chaque session (indice dans order).
+            total: Nombre total d'écoutes.
+            gap_minutes: Écart maximal utilisé pour le découpage.
+        """
+        self.order = order
+        self.starts = starts
+        self.lengths = np.diff(np.append(starts, total))
+        self.gap_minutes = gap_minutes
+
+    @classmethod
+    def build(cls, timestamps: np.ndarray, order: np.ndarray,
+              gap_minutes: int = DEFAULT_GAP_MINUTES) -> 'SessionIndex':
+        """Découpe un historique trié en sessions (une seule passe vectorisée).
+
+        Args:
+            timestamps: Timestamps de l'historique (ordre d'origine).
+            order: Positions triées par timestamp croissant (tri stable).
+            gap_minutes: Une nouvelle session commence quand l'écart avec
+                l'écoute précédente dépasse cette durée.
+
+        Returns:
+            SessionIndex: Index des sessions, dans l'ordre chronologique.
+        """
+        if len(order) == 0:
+            return cls(order, np.zeros(0, dtype=np.int64), 0, gap_minutes)
+        gaps = np.diff(timestamps[order])
+        starts = np.concatenate(([0], np.flatnonzero(gaps > gap_minutes * 60) + 1))
+        return cls(order, starts, len(order), gap_minutes)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def positions(self, number: int) -> np.ndarray:
+        """Positions (dans l'historique) des écoutes d'une session, chronologiquement."""
+        start = self.starts[number]
+        return self.order[start:start + self.lengths[number]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for number in range(len(self)):
+            yield self.positions(number)
+
+    @property
+    def session_ids(self) -> np.ndarray:
+        """Numéro de session de chaque écoute, dans l'ordre chronologique (order)."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def longest(self, limit: Optional[int] = None) -> np.ndarray:
+        """Numéros des sessions les plus longues.
+
+        Même ordre que sorted(sessions, key=len, reverse=True): à longueur
+        égale, la session la plus ancienne d'abord.
+
+        Args:
+            limit: Nombre de sessions retournées (None = toutes).
+
+        Returns:
+            np.ndarray: Numéros de session.
+        """
+        ranking = np.argsort(-self.lengths, kind='stable')
+        return ranking if limit is None else ranking[:limit]
+
+    def pair_counts(self, keys: np.ndarray) -> Counter:
+        """Nombre de sessions où chaque paire de clés distinctes apparaît ensemble.
+
+        Args:
+            keys: Clé entière de chaque écoute (ex: artist_ids), ordre d'origine.
+
+        Returns:
+            Counter: (clé1, clé2) avec clé1 < clé2 → nombre de sessions communes.
+        """
+        counts = Counter()
+        if len(self) == 0:
+            return counts
+        # Couples (session, clé) distincts, triés par session puis par clé
+        width = int(keys.max()) + 1
+        combined = np.unique(self.session_ids * width + keys[self.order].astype(np.int64))
+        sessions, members = np.divmod(combined, width)
+        bounds = np.flatnonzero(np.diff(sessions)) + 1
+        for group in np.split(members, bounds):
+            if len(group) > 1:
+                counts.update(combinations(group.tolist(), 2))
+        return counts
+
+
+def key_transitions(keys: np.ndarray, order: np.ndarray) -> Dict[int, Dict[int, int]]:
+    """Transitions entre clés consécutives différentes (ex: artiste → artiste suivant).
+
+    Les dictionnaires sont remplis dans l'ordre où chaque transition apparaît
+    pour la première fois, comme un parcours chronologique écoute par écoute.
+
+    Args:
+        keys: Clé entière de chaque écoute (ordre d'origine).
+        order: Positions triées par timestamp croissant.
+
+    Returns:
+        Dict[int, Dict[int, int]]: clé → {clé suivante: nombre de transitions}.
+    """
+    ordered = keys[order].astype(np.int64)
+    current, following = ordered[:-1], ordered[1:]
+    changes = current != following
+    if not changes.any():
+        return {}
+    width = int(ordered.max()) + 1
+    pairs = current[changes] * width + following[changes]
+    values, first, counts = np.unique(pairs, return_index=True, return_counts=True)
+    transitions: Dict[int, Dict[int, int]] = {}
+    for pair in np.argsort(first, kind='stable'):
+        source, target = divmod(int(values[pair]), width)
+        transitions.setdefault(source, {})[target] = int(counts[pair])
+    return transitions
@@ -13,7 +13,10 @@ from .spotify_service import (
     get_spotify_token,
     search_spotify_artist_image,
     search_spotify_album_image,
-    SpotifyCache
+    SpotifyCache,
+    PersistentSpotifyCache,
+    SpotifyClient,
+    get_shared_client
 )
 
 from .metadata_cleaner import (
@@ -28,6 +31,9 @@ __all__ = [
     'search_spotify_artist_image',
     'search_spotify_album_image',
     'SpotifyCache',
+    'PersistentSpotifyCache',
+    'SpotifyClient',
+    'get_shared_client',
     'clean_artist_name',
     'clean_album_name',
     'normalize_string_for_comparison',
@@ -37,10 +37,25 @@ Usage:
     optimizer.apply_recommendations(recommendations, auto_apply=True)
 
 Auteur: Patrick Ostertag
-**Version**: 1.0.3  
+**Version**: 1.2.0  
 **Date**: 28 janvier 2026  
 **Module**: `src/services/ai_optimizer.py`
 
+**Changelog v1.2.0**:
+- analyze_task_performance lit les coûts mesurés par le scheduler (profile_history)
+  - Taux de succès et durée moyenne sur les dernières exécutions réelles
+  - CPU, pic mémoire, octets lus/écrits, requêtes HTTP par exécution et par jour
+  - Part d'exécutions utiles (sorties modifiées) → ratio valeur/coût mesuré
+  - Heuristique _estimate_value_ratio conservée sans historique profilé
+- Recommandation d'espacement des tâches coûteuses dont les sorties changent rarement
+
+**Changelog v1.1.0**:
+- Historique chargé en colonnes (models.history_store.ColumnarHistory)
+  - Empreinte mémoire réduite (identifiants entiers, timestamps int64)
+- analyze_listening_patterns vectorisé (NumPy)
+  - Heures/jours locaux convertis une seule fois, histogrammes par np.bincount
+  - Percentiles lus sur l'histogramme cumulé (plus de tri des écoutes)
+
 **Changelog v1.0.3**:
 - Fix #47 (partie finale): Correction du chargement de l'historique
   - Correction du bug "Total tracks analysés: 0" malgré présence de données
@@ -67,11 +82,15 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
-from collections import defaultdict
 import statistics
 
+import numpy as np
+
 # Import du service IA existant
 from services.ai_service import ask_for_ia, ensure_env_loaded
+from models.repository import HISTORY_SOURCES, open_repository
+from models.history_store import EPOCH_WEEKDAY, ColumnarHistory, first_seen_counts
+from models.history_log import HistoryLog, iter_history_file
 
 # Confidence score calculation constants
 CONFIDENCE_BASE = 0.5
@@ -80,6 +99,16 @@ CONFIDENCE_CHANGE_FACTOR = 0.15
 CONFIDENCE_MAX = 0.95
 CONFIDENCE_HOUR_REFERENCE = 6
 
+# Fenêtre d'historique chargée depuis SQLite (couvre les analyses sur 30 jours)
+HISTORY_WINDOW_DAYS = 90
+
+# Recommandations de fréquence sur coûts mesurés (profile_history du scheduler)
+COST_MIN_PROFILED_RUNS = 5       # Exécutions profilées nécessaires
+COST_USEFUL_RATE_MAX = 0.25      # Part d'exécutions utiles en dessous de laquelle espacer
+
+# Exécutions par jour pour une fréquence de 1 (unités du scheduler)
+RUNS_PER_DAY = {'hour': 24.0, 'day': 1.0, 'month': 1 / 30, 'year': 1 / 365}
+
 
 # Configuration du logger
 logging.basicConfig(
@@ -149,13 +178,16 @@ class AIOptimizer:
     l'expérience utilisateur.
     """
     
-    def __init__(self, config_path: str, state_path: str, history_path: str):
+    def __init__(self, config_path: str, state_path: str, history_path: str,
+                 db_path: Optional[str] = None):
         """Initialise l'optimiseur IA.
         
         Args:
             config_path: Chemin vers roon-config.json
             state_path: Chemin vers scheduler-state.json
             history_path: Chemin vers chk-roon.json
+            db_path: Chemin vers musique.db (optionnel). Si la base est migrée,
+                seules les écoutes des HISTORY_WINDOW_DAYS derniers jours y sont lues.
         """
         self.config_path = Path(config_path)
         self.state_path = Path(state_path)
@@ -164,22 +196,45 @@ class AIOptimizer:
         # Charger les données
         self.config = self._load_json(self.config_path)
         self.state = self._load_json(self.state_path) if self.state_path.exists() else {}
-        
-        # Charger l'historique avec gestion du format
-        # Format attendu: {"tracks": [...]} mais supporte aussi [...] pour compatibilité
-        history_data = self._load_json(self.history_path) if self.history_path.exists() else []
-        if isinstance(history_data, dict) and 'tracks' in history_data:
-            self.history = history_data['tracks']
-        elif isinstance(history_data, list):
-            self.history = history_data
-        else:
-            self.history = []
+        self.repository = None
+        self.history = self._load_history(db_path)
         
         # S'assurer que les variables d'environnement sont chargées
         ensure_env_loaded()
         
         logger.info(f"AIOptimizer initialized with {len(self.history)} history entries")
     
+    def _load_history(self, db_path: Optional[str]) -> ColumnarHistory:
+        """Charge l'historique d'écoute depuis SQLite ou, à défaut, depuis le JSON.
+        
+        L'historique est conservé en colonnes (ColumnarHistory): identifiants
+        entiers pour artistes/albums/titres, timestamps int64, indicateurs
+        compactés. Il reste utilisable comme une liste de dictionnaires.
+        
+        Args:
+            db_path: Chemin vers musique.db (None pour lire directement le JSON)
+            
+        Returns:
+            Historique des écoutes (plus récentes en premier, comme chk-roon.json)
+        """
+        # Base ignorée si les trackers ont écrit le JSON depuis la dernière migration
+        repository = open_repository(db_path, HISTORY_SOURCES + (str(self.history_path),)) if db_path else None
+        if repository and repository.has_plays():
+            # Conservé pour les comptages pré-agrégés (tables rollup_*)
+            self.repository = repository
+            start = int((datetime.now() - timedelta(days=HISTORY_WINDOW_DAYS)).timestamp())
+            return ColumnarHistory.from_plays(repository.iter_plays(start=start, with_details=True))
+        
+        # Format attendu: {"tracks": [...]} mais supporte aussi [...] pour compatibilité.
+        # Lecture en continu (journal ou JSON): pas de liste complète de dictionnaires.
+        if not self.history_path.exists() and not HistoryLog.for_json(str(self.history_path)).exists():
+            return ColumnarHistory.from_plays([])
+        try:
+            return ColumnarHistory.from_plays(iter_history_file(str(self.history_path)))
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON decode error in {self.history_path}: {e}")
+            return ColumnarHistory.from_plays([])
+    
     def _load_json(self, path: Path) -> Any:
         """Charge un fichier JSON.
         
@@ -260,35 +315,16 @@ class AIOptimizer:
                 'active_days': 0
             }
         
-        # Filtrer les entrées des X derniers jours
+        # Histogrammes des X derniers jours: agrégats SQLite ou historique en colonnes
         cutoff_date = datetime.now() - timedelta(days=days)
-        recent_tracks = []
-        
-        for track in self.history:
-            try:
-                # Support pour timestamp ou date string
-                if 'timestamp' in track:
-                    track_date = datetime.fromtimestamp(track['timestamp'])
-                elif 'date' in track:
-                    # Format: "2026-01-17 18:21"
-                    track_date = datetime.strptime(track['date'], '%Y-%m-%d %H:%M')
-                else:
-                    continue
-                    
-                if track_date >= cutoff_date:
-                    recent_tracks.append({
-                        'timestamp': track.get('timestamp'),
-                        'datetime': track_date,
-                        'hour': track_date.hour,
-                        'weekday': track_date.weekday(),  # 0=Monday, 6=Sunday
-                        'artist': track.get('artist', 'Unknown'),
-                        'title': track.get('title', 'Unknown')
-                    })
-            except (ValueError, KeyError) as e:
-                logger.debug(f"Skipping track due to date parsing error: {e}")
-                continue
+        if self.repository is not None:
+            counts = self.repository.play_counts_by_hour(since=int(cutoff_date.timestamp()))
+            hour_counts, weekday_counts, actual_days, hour_order = self._histograms_from_counts(counts)
+        else:
+            hour_counts, weekday_counts, actual_days, hour_order = self._recent_histograms(cutoff_date)
         
-        if not recent_tracks:
+        total_tracks = int(hour_counts.sum())
+        if total_tracks == 0:
             logger.warning("No recent tracks found in the specified period")
             return {
                 'peak_hours': [],
@@ -302,48 +338,26 @@ class AIOptimizer:
                 'active_days': 0
             }
         
-        # Analyser les heures d'activité
-        hour_counts = defaultdict(int)
-        weekday_counts = defaultdict(int)
-        daily_tracks = defaultdict(int)
-        
-        for track in recent_tracks:
-            hour_counts[track['hour']] += 1
-            weekday_counts[track['weekday']] += 1
-            # Grouper par date uniquement (YYYY-MM-DD)
-            day_key = track['datetime'].strftime('%Y-%m-%d')
-            daily_tracks[day_key] += 1
-        
-        # Calculer les peak hours (top 4 heures avec le plus d'activité)
-        sorted_hours = sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)
-        peak_hours = [hour for hour, count in sorted_hours[:4]]
-        
-        # Calculer typical start/end (percentiles)
-        active_hours = []
-        for track in recent_tracks:
-            active_hours.append(track['hour'])
-        
-        if active_hours:
-            active_hours.sort()
-            # 5e percentile pour start, 95e percentile pour end
-            start_idx = max(0, int(len(active_hours) * 0.05))
-            end_idx = min(len(active_hours) - 1, int(len(active_hours) * 0.95))
-            typical_start = active_hours[start_idx]
-            typical_end = active_hours[end_idx]
-        else:
-            typical_start = 6
-            typical_end = 23
+        # Calculer les peak hours (top 4 heures avec le plus d'activité,
+        # égalités départagées par ordre de première apparition)
+        peak_order = np.argsort(-hour_counts[hour_order], kind='stable')[:4]
+        peak_hours = [int(hour) for hour in hour_order[peak_order]]
+        
+        # Calculer typical start/end (percentiles sur l'histogramme des heures)
+        # 5e percentile pour start, 95e percentile pour end
+        start_idx = max(0, int(total_tracks * 0.05))
+        end_idx = min(total_tracks - 1, int(total_tracks * 0.95))
+        typical_start = self._hour_at_rank(hour_counts, start_idx)
+        typical_end = self._hour_at_rank(hour_counts, end_idx)
         
         # Calculer volume quotidien moyen
-        actual_days = len(daily_tracks)
-        total_tracks = len(recent_tracks)
         daily_volume = total_tracks / days if days > 0 else 0
         
         # Distribution par jour de semaine (normaliser en pourcentages)
         weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         weekly_distribution = {}
         for weekday in range(7):
-            count = weekday_counts.get(weekday, 0)
+            count = int(weekday_counts[weekday])
             percentage = (count / total_tracks * 100) if total_tracks > 0 else 0
             weekly_distribution[weekday_names[weekday]] = round(percentage, 1)
         
@@ -372,14 +386,82 @@ class AIOptimizer:
         logger.info(f"Listening patterns analyzed: {total_tracks} tracks over {actual_days} days")
         return result
     
+    def _recent_histograms(self, cutoff_date: datetime) -> Tuple[np.ndarray, np.ndarray, int, np.ndarray]:
+        """Histogrammes des écoutes de l'historique chargé depuis une date.
+        
+        Calcul vectorisé: les heures, jours et jours de semaine locaux sont
+        convertis une seule fois par historique (ColumnarHistory), puis
+        comptés avec np.bincount.
+        
+        Args:
+            cutoff_date: Date minimale incluse
+            
+        Returns:
+            Tuple (écoutes par heure [24], écoutes par jour de semaine [7],
+            nombre de jours actifs, heures dans l'ordre de première apparition)
+        """
+        history = self.history
+        recent = history.between(start=cutoff_date.timestamp())
+        hours = history.hours[recent]
+        return (
+            np.bincount(hours, minlength=24),
+            np.bincount(history.weekdays[recent], minlength=7),
+            len(np.unique(history.local_days[recent])),
+            first_seen_counts(hours)[0],
+        )
+    
+    @staticmethod
+    def _histograms_from_counts(counts: Dict[Tuple[str, int], int]) -> Tuple[np.ndarray, np.ndarray, int, np.ndarray]:
+        """Histogrammes à partir de comptages ("YYYY-MM-DD", heure) pré-agrégés.
+        
+        Args:
+            counts: ("YYYY-MM-DD", heure) → nombre d'écoutes
+            
+        Returns:
+            Même format que _recent_histograms
+        """
+        if not counts:
+            return np.zeros(24, dtype=np.int64), np.zeros(7, dtype=np.int64), 0, np.zeros(0, dtype=np.int64)
+        # Plus récentes en premier, comme chk-roon.json: même départage des heures à égalité
+        keys = sorted(counts, reverse=True)
+        days = np.array([day for day, _ in keys], dtype='datetime64[D]').astype(np.int64)
+        hours = np.array([hour for _, hour in keys], dtype=np.int64)
+        plays = np.fromiter((counts[key] for key in keys), dtype=np.int64, count=len(keys))
+        return (
+            np.bincount(hours, weights=plays, minlength=24).astype(np.int64),
+            np.bincount((days + EPOCH_WEEKDAY) % 7, weights=plays, minlength=7).astype(np.int64),
+            len(np.unique(days)),
+            first_seen_counts(hours)[0],
+        )
+    
+    @staticmethod
+    def _hour_at_rank(hour_counts: np.ndarray, rank: int) -> int:
+        """Heure de l'écoute de rang `rank` dans la liste triée des heures d'écoute.
+        
+        Équivalent à sorted(heures)[rank], sans trier les écoutes: recherche
+        dans l'histogramme cumulé.
+        
+        Args:
+            hour_counts: Écoutes par heure (24 valeurs)
+            rank: Rang (0 = plus petite heure)
+            
+        Returns:
+            Heure (0-23) correspondante
+        """
+        return int(np.searchsorted(np.cumsum(hour_counts), rank, side='right'))
+    
     def analyze_task_performance(self) -> Dict[str, Dict[str, Any]]:
         """Analyse l'efficacité des tâches planifiées.
         
         Analyse l'état du scheduler pour chaque tâche configurée et calcule:
         - Durée moyenne d'exécution
         - Taux de succès
-        - Ratio valeur/coût estimé
-        - Fréquence recommandée
+        - Ratio valeur/coût (mesuré, ou estimé sans historique profilé)
+        - Coûts mesurés par exécution et par jour
+        
+        Avec profile_history (dernières exécutions profilées par le scheduler),
+        les métriques portent sur les exécutions réelles; une exécution est
+        utile si elle a modifié les sorties de la tâche.
         
         Returns:
             Dictionnaire avec les métriques par tâche:
@@ -391,7 +473,12 @@ class AIOptimizer:
                     'last_execution': Timestamp dernière exécution,
                     'last_status': Statut de la dernière exécution,
                     'current_frequency': Fréquence actuelle,
-                    'value_ratio': Ratio valeur/coût estimé (0.0-1.0)
+                    'value_ratio': Ratio valeur/coût (0.0-1.0),
+                    'profiled_runs': Exécutions profilées analysées,
+                    'useful_rate': Part d'exécutions ayant modifié les sorties (None: inconnu),
+                    'avg_cpu_seconds', 'avg_peak_rss_mb', 'avg_io_bytes', 'avg_http_calls':
+                        Coûts moyens par exécution (None sans mesure),
+                    'daily_cpu_seconds', 'daily_http_calls': Coûts par jour à la fréquence actuelle
                 }
             }
         """
@@ -410,37 +497,83 @@ class AIOptimizer:
             last_status = task_state.get('last_status', 'unknown')
             last_execution = task_state.get('last_execution')
             
-            # Calculer le taux de succès (simplifié, basé sur le dernier statut)
-            # Dans une version avancée, on pourrait tracker l'historique des exécutions
-            success_rate = 1.0 if last_status == 'success' else 0.5
-            
-            # Calculer le ratio valeur/coût (heuristique basé sur le type de tâche)
-            value_ratio = self._estimate_value_ratio(
-                task_name, 
-                execution_count, 
-                last_duration,
-                task_config
-            )
-            
             # Fréquence actuelle
             freq_unit = task_config.get('frequency_unit', 'day')
             freq_count = task_config.get('frequency_count', 1)
             current_frequency = f"{freq_count} {freq_unit}(s)"
             
+            costs = self._measured_costs(task_state.get('profile_history') or [],
+                                         RUNS_PER_DAY.get(freq_unit, 1.0) / max(1, freq_count))
+            
+            if costs['profiled_runs']:
+                success_rate = costs.pop('success_rate')
+                avg_duration = costs.pop('avg_duration')
+                value_ratio = round(success_rate * (1.0 if costs['useful_rate'] is None else costs['useful_rate']), 2)
+            else:
+                del costs['success_rate'], costs['avg_duration']
+                # Sans historique: dernier statut et heuristique par type de tâche
+                success_rate = 1.0 if last_status == 'success' else 0.5
+                avg_duration = last_duration
+                value_ratio = self._estimate_value_ratio(
+                    task_name, 
+                    execution_count, 
+                    last_duration,
+                    task_config
+                )
+            
             task_analysis[task_name] = {
-                'avg_duration': last_duration,  # Simplifié: utiliser la dernière durée
+                'avg_duration': avg_duration,
                 'success_rate': success_rate,
                 'execution_count': execution_count,
                 'last_execution': last_execution,
                 'last_status': last_status,
                 'current_frequency': current_frequency,
                 'value_ratio': value_ratio,
-                'enabled': task_config.get('enabled', True)
+                'enabled': task_config.get('enabled', True),
+                **costs
             }
         
         logger.info(f"Task performance analyzed for {len(task_analysis)} tasks")
         return task_analysis
     
+    @staticmethod
+    def _measured_costs(history: List[Dict[str, Any]], runs_per_day: float) -> Dict[str, Any]:
+        """Agrège les exécutions profilées d'une tâche (profile_history du scheduler).
+        
+        Args:
+            history: Exécutions profilées, plus anciennes en premier
+            runs_per_day: Exécutions par jour à la fréquence actuelle
+            
+        Returns:
+            Métriques mesurées (moyennes None si aucune exécution ne les fournit)
+        """
+        def mean(values):
+            values = [v for v in values if v is not None]
+            return round(sum(values) / len(values), 3) if values else None
+        
+        runs = len(history)
+        successes = [run for run in history if run.get('status') == 'success']
+        known = [run for run in successes if run.get('outputs_changed') is not None]
+        io_bytes = [None if run.get('read_bytes') is None else run['read_bytes'] + (run.get('write_bytes') or 0)
+                    for run in history]
+        avg_cpu = mean([None if run.get('cpu_user_seconds') is None
+                        else run['cpu_user_seconds'] + (run.get('cpu_system_seconds') or 0)
+                        for run in history])
+        avg_http = mean([run.get('http_calls') for run in history])
+        
+        return {
+            'profiled_runs': runs,
+            'success_rate': round(len(successes) / runs, 2) if runs else None,
+            'avg_duration': mean([run.get('wall_seconds') for run in history]) or 0,
+            'useful_rate': round(sum(1 for run in known if run['outputs_changed']) / len(known), 2) if known else None,
+            'avg_cpu_seconds': avg_cpu,
+            'avg_peak_rss_mb': mean([run.get('peak_rss_mb') for run in history]),
+            'avg_io_bytes': mean(io_bytes),
+            'avg_http_calls': avg_http,
+            'daily_cpu_seconds': None if avg_cpu is None else round(avg_cpu * runs_per_day, 2),
+            'daily_http_calls': None if avg_http is None else round(avg_http * runs_per_day, 1),
+        }
+    
     def _estimate_value_ratio(self, task_name: str, exec_count: int, 
                              duration: float, config: Dict[str, Any]) -> float:
         """Estime le ratio valeur/coût pour une tâche.
@@ -654,6 +787,12 @@ Répondez en français, en 2 phrases maximum, en expliquant l'impact sur la perf
             task_config = self.config['scheduled_tasks'][task_name]
             current_freq = f"{task_config['frequency_count']} {task_config['frequency_unit']}"
             
+            # Coûts mesurés: espacer une tâche dont les exécutions modifient rarement les sorties
+            cost_recommendation = self._cost_frequency_recommendation(task_name, perf, task_config)
+            if cost_recommendation:
+                recommendations.append(cost_recommendation)
+                continue
+            
             # Logique d'optimisation par tâche
             if task_name == 'generate_haiku':
                 # Ajuster selon volume d'écoute
@@ -703,6 +842,45 @@ Répondez en français, en 2 phrases maximum, en expliquant l'impact sur la perf
         logger.info(f"Generated {len(recommendations)} recommendations")
         return recommendations
     
+    def _cost_frequency_recommendation(self, task_name: str, perf: Dict[str, Any],
+                                       task_config: Dict[str, Any]) -> Optional[Recommendation]:
+        """Recommande d'espacer une tâche d'après ses coûts mesurés.
+        
+        Args:
+            task_name: Nom de la tâche
+            perf: Métriques de analyze_task_performance
+            task_config: Configuration de la tâche
+            
+        Returns:
+            Recommandation (fréquence doublée), ou None si l'historique profilé
+            est insuffisant ou si les exécutions sont assez souvent utiles
+        """
+        useful_rate = perf.get('useful_rate')
+        if perf.get('profiled_runs', 0) < COST_MIN_PROFILED_RUNS or useful_rate is None \
+                or useful_rate > COST_USEFUL_RATE_MAX:
+            return None
+        
+        count, unit = task_config['frequency_count'], task_config['frequency_unit']
+        costs = [f"{perf['avg_duration']:.1f}s"]
+        if perf.get('avg_cpu_seconds') is not None:
+            costs.append(f"{perf['avg_cpu_seconds']:.1f}s CPU")
+        if perf.get('avg_http_calls'):
+            costs.append(f"{perf['avg_http_calls']:.0f} requêtes HTTP")
+        daily = [f"{perf['daily_cpu_seconds']:.0f}s CPU"] if perf.get('daily_cpu_seconds') is not None else []
+        if perf.get('daily_http_calls'):
+            daily.append(f"{perf['daily_http_calls']:.0f} requêtes HTTP")
+        
+        return Recommendation(
+            type='task_frequency',
+            current_value={'task': task_name, 'frequency': f"{count} {unit}"},
+            recommended_value={'task': task_name, 'frequency': f"{count * 2} {unit}"},
+            justification=(f"Sur {perf['profiled_runs']} exécutions mesurées, {useful_rate:.0%} ont modifié "
+                           f"les sorties; chaque exécution coûte {', '.join(costs)} en moyenne"),
+            confidence=round(0.6 + 0.3 * (1 - useful_rate), 2),
+            estimated_impact="💰 -50% ressources" + (f" (aujourd'hui {', '.join(daily)} par jour)" if daily else ""),
+            category='cost'
+        )
+    
     def apply_recommendations(self, recommendations: List[Recommendation], 
                             auto_apply: bool = False) -> Dict[str, Any]:
         """Applique ou présente les recommandations à l'utilisateur.
@@ -889,6 +1067,17 @@ Répondez en français, en 2 phrases maximum, en expliquant l'impact sur la perf
                 f"  Durée: {perf['avg_duration']:.1f}s",
                 f"  Ratio valeur/coût: {perf['value_ratio']:.2f}",
             ])
+            if perf.get('profiled_runs'):
+                useful_rate = perf['useful_rate']
+                lines.extend([
+                    f"  Exécutions profilées: {perf['profiled_runs']} "
+                    f"(succès {perf['success_rate']:.0%}, utiles "
+                    f"{'n/a' if useful_rate is None else format(useful_rate, '.0%')})",
+                    f"  Coût moyen: CPU {perf['avg_cpu_seconds'] or 0:.1f}s, "
+                    f"mémoire {perf['avg_peak_rss_mb'] or 0:.0f} Mo, "
+                    f"E/S {(perf['avg_io_bytes'] or 0) / 1e6:.1f} Mo, "
+                    f"HTTP {perf['avg_http_calls'] or 0:.0f}",
+                ])
         
         lines.extend([
             "",
@@ -956,12 +1145,14 @@ def main():
     config_path = project_root / "data" / "config" / "roon-config.json"
     state_path = project_root / "data" / "config" / "scheduler-state.json"
     history_path = project_root / "data" / "history" / "chk-roon.json"
+    db_path = project_root / "data" / "musique.db"
     
     # Créer l'optimiseur
     optimizer = AIOptimizer(
         config_path=str(config_path),
         state_path=str(state_path),
-        history_path=str(history_path)
+        history_path=str(history_path),
+        db_path=str(db_path)
     )
     
     # Générer et afficher le rapport
@@ -4,22 +4,33 @@ Ce module centralise toutes les interactions avec l'API Spotify:
 - Authentification OAuth 2.0 Client Credentials Flow
 - Recherche d'images d'artistes
 - Recherche d'images d'albums avec validation et scoring
-- Gestion du cache et des tokens
+- Gestion du cache et des tokens (en mémoire ou persistant SQLite)
 - Retry automatique avec exponential backoff
+- Client concurrent (SpotifyClient): limiteur à jetons partagé, respect de
+  Retry-After, fusion des recherches en cours, connexions HTTP réutilisées
+- Rafraîchissement en lots (endpoints multi-ID /artists et /albums) des
+  entités dont l'identifiant Spotify est déjà connu
 
-Version: 1.0.0
-Date: 24 janvier 2026
+Version: 1.1.0
+Date: 28 janvier 2026
 Auteur: Patrick Ostertag
 """
 
+import atexit
 import base64
 import json
 import logging
+import sqlite3
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
 
 # Import des constantes et utilitaires
 import sys
@@ -29,13 +40,24 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from constants import (
     SPOTIFY_TOKEN_URL,
     SPOTIFY_SEARCH_URL,
+    SPOTIFY_ARTISTS_URL,
+    SPOTIFY_ALBUMS_URL,
+    SPOTIFY_ARTISTS_BATCH_SIZE,
+    SPOTIFY_ALBUMS_BATCH_SIZE,
     SPOTIFY_TOKEN_REFRESH_MARGIN,
     SPOTIFY_ARTIST_SEARCH_LIMIT,
     SPOTIFY_ALBUM_SEARCH_LIMIT,
     SPOTIFY_MIN_SCORE_PRIMARY,
     SPOTIFY_MIN_SCORE_FALLBACK,
+    SPOTIFY_CACHE_FILENAME,
+    SPOTIFY_CACHE_HIT_TTL,
+    SPOTIFY_CACHE_MISS_TTL,
+    SPOTIFY_CACHE_MAX_ENTRIES,
+    SPOTIFY_RATE_LIMIT,
+    SPOTIFY_MAX_WORKERS,
     DEFAULT_HTTP_TIMEOUT,
     DEFAULT_RETRY_COUNT,
+    DEFAULT_RETRY_DELAY,
     DEFAULT_RATE_LIMIT_DELAY,
     ERROR_MISSING_SPOTIFY_CREDENTIALS,
     ERROR_TOKEN_RETRIEVAL
@@ -51,6 +73,10 @@ from services.metadata_cleaner import (
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
+# Emplacement par défaut du cache persistant (data/cache/ à la racine du projet)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_SPOTIFY_CACHE_PATH = os.path.join(PROJECT_ROOT, "data", "cache", SPOTIFY_CACHE_FILENAME)
+
 
 class SpotifyCache:
     """Classe de gestion du cache pour Spotify (tokens et résultats de recherche).
@@ -60,10 +86,18 @@ class SpotifyCache:
     - Images d'artistes
     - Images d'albums
     
+    Une valeur None enregistrée est un résultat négatif (rien trouvé sur
+    Spotify): get_*(..., default=CACHE_MISS) permet de la distinguer d'une
+    clé absente et d'éviter une nouvelle recherche.
+    
     Attributes:
         token_cache: Cache du token Spotify avec timestamp d'expiration
         artist_images: Cache des URLs d'images d'artistes
         album_images: Cache des URLs d'images d'albums
+        artist_ids: Identifiants Spotify des artistes déjà trouvés
+        album_ids: Identifiants Spotify des albums déjà trouvés
+        hits: Nombre de lectures servies par le cache
+        misses: Nombre de lectures absentes (ou expirées) du cache
     """
     
     def __init__(self):
@@ -74,6 +108,10 @@ class SpotifyCache:
         }
         self.artist_images = {}
         self.album_images = {}
+        self.artist_ids = {}
+        self.album_ids = {}
+        self.hits = 0
+        self.misses = 0
     
     def get_token(self) -> Optional[str]:
         """Récupère le token en cache s'il est encore valide.
@@ -96,16 +134,18 @@ class SpotifyCache:
         self.token_cache["access_token"] = token
         self.token_cache["expires_at"] = time.time() + expires_in
     
-    def get_artist_image(self, artist_name: str) -> Optional[str]:
+    def get_artist_image(self, artist_name: str, default=None) -> Optional[str]:
         """Récupère l'URL de l'image d'un artiste depuis le cache.
         
         Args:
             artist_name: Nom de l'artiste.
+            default: Valeur retournée si l'artiste est absent du cache.
             
         Returns:
-            URL de l'image ou None si absent du cache.
+            URL de l'image, None si l'artiste est connu sans image,
+            ou default si absent du cache.
         """
-        return self.artist_images.get(artist_name)
+        return self._lookup(self.artist_images, artist_name, default)
     
     def set_artist_image(self, artist_name: str, url: Optional[str]):
         """Enregistre l'URL de l'image d'un artiste dans le cache.
@@ -116,18 +156,20 @@ class SpotifyCache:
         """
         self.artist_images[artist_name] = url
     
-    def get_album_image(self, artist_name: str, album_name: str) -> Optional[str]:
+    def get_album_image(self, artist_name: str, album_name: str, default=None) -> Optional[str]:
         """Récupère l'URL de l'image d'un album depuis le cache.
         
         Args:
             artist_name: Nom de l'artiste.
             album_name: Nom de l'album.
+            default: Valeur retournée si l'album est absent du cache.
             
         Returns:
-            URL de l'image ou None si absent du cache.
+            URL de l'image, None si l'album est connu sans image,
+            ou default si absent du cache.
         """
         cache_key = f"{artist_name}|{album_name}"
-        return self.album_images.get(cache_key)
+        return self._lookup(self.album_images, cache_key, default)
     
     def set_album_image(self, artist_name: str, album_name: str, url: Optional[str]):
         """Enregistre l'URL de l'image d'un album dans le cache.
@@ -139,11 +181,319 @@ class SpotifyCache:
         """
         cache_key = f"{artist_name}|{album_name}"
         self.album_images[cache_key] = url
+    
+    def get_artist_id(self, artist_name: str) -> Optional[str]:
+        """Identifiant Spotify d'un artiste déjà trouvé par une recherche.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            
+        Returns:
+            Identifiant Spotify ou None si inconnu.
+        """
+        return self.artist_ids.get(artist_name)
+    
+    def set_artist_id(self, artist_name: str, spotify_id: str):
+        """Enregistre l'identifiant Spotify d'un artiste.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            spotify_id: Identifiant Spotify.
+        """
+        self.artist_ids[artist_name] = spotify_id
+    
+    def get_album_id(self, artist_name: str, album_name: str) -> Optional[str]:
+        """Identifiant Spotify d'un album déjà trouvé par une recherche.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            album_name: Nom de l'album.
+            
+        Returns:
+            Identifiant Spotify ou None si inconnu.
+        """
+        return self.album_ids.get(f"{artist_name}|{album_name}")
+    
+    def set_album_id(self, artist_name: str, album_name: str, spotify_id: str):
+        """Enregistre l'identifiant Spotify d'un album.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            album_name: Nom de l'album.
+            spotify_id: Identifiant Spotify.
+        """
+        self.album_ids[f"{artist_name}|{album_name}"] = spotify_id
+    
+    def stats(self) -> dict:
+        """Statistiques d'utilisation du cache.
+        
+        Returns:
+            Dictionnaire avec hits, misses, entries et hit_rate (0.0 à 1.0).
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.artist_images) + len(self.album_images),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+    
+    def _lookup(self, images: dict, key: str, default):
+        """Lecture d'un dictionnaire d'images avec comptage hit/miss."""
+        if key in images:
+            self.hits += 1
+            return images[key]
+        self.misses += 1
+        return default
+
+
+class PersistentSpotifyCache(SpotifyCache):
+    """Cache Spotify persistant dans une base SQLite locale.
+    
+    Même API get_*/set_* que SpotifyCache, mais les résultats survivent d'une
+    exécution à l'autre: une nouvelle passe d'enrichissement sur un historique
+    inchangé ne fait plus aucun appel réseau (token compris, tant qu'il est
+    valide).
+    
+    - Les résultats trouvés expirent après hit_ttl, les résultats négatifs
+      (None) après miss_ttl, plus court, pour retenter les artistes et albums
+      ajoutés entre-temps sur Spotify.
+    - Au-delà de max_entries, les images les moins récemment lues sont
+      supprimées (LRU).
+    - Les identifiants Spotify des artistes et albums trouvés n'expirent
+      pas: un rafraîchissement ultérieur passe par les endpoints multi-ID
+      sans nouvelle recherche approximative.
+    - Les accès sont protégés par un verrou: une instance peut être partagée
+      entre threads.
+    
+    Attributes:
+        db_path: Chemin du fichier SQLite.
+        hit_ttl: Durée de vie (secondes) d'un résultat trouvé.
+        miss_ttl: Durée de vie (secondes) d'un résultat négatif.
+        max_entries: Nombre maximal d'images conservées.
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        hit_ttl: int = SPOTIFY_CACHE_HIT_TTL,
+        miss_ttl: int = SPOTIFY_CACHE_MISS_TTL,
+        max_entries: int = SPOTIFY_CACHE_MAX_ENTRIES
+    ):
+        """Ouvre (ou crée) le cache persistant.
+        
+        Args:
+            db_path: Chemin du fichier SQLite (défaut: data/cache/spotify-cache.db,
+                ou la variable d'environnement SPOTIFY_CACHE_PATH).
+            hit_ttl: Durée de vie d'un résultat trouvé, en secondes.
+            miss_ttl: Durée de vie d'un résultat négatif, en secondes.
+            max_entries: Nombre maximal d'images conservées.
+        """
+        super().__init__()
+        self.db_path = db_path or os.getenv("SPOTIFY_CACHE_PATH") or DEFAULT_SPOTIFY_CACHE_PATH
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=DEFAULT_HTTP_TIMEOUT, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS spotify_cache ("
+                "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT, "
+                "stored_at REAL NOT NULL, last_access REAL NOT NULL, "
+                "PRIMARY KEY (kind, key))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_spotify_cache_last_access "
+                "ON spotify_cache (last_access)"
+            )
+            self._entries = self._conn.execute(
+                "SELECT COUNT(*) FROM spotify_cache WHERE kind IN ('artist', 'album')"
+            ).fetchone()[0]
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM spotify_cache WHERE kind = 'token' AND key = 'access_token'"
+            ).fetchone()
+        if row:
+            # Pour le token, stored_at contient l'instant d'expiration
+            self.token_cache["access_token"], self.token_cache["expires_at"] = row
+    
+    def set_token(self, token: str, expires_in: int = 3600):
+        """Enregistre un nouveau token (mémoire et disque).
+        
+        Args:
+            token: Token d'accès Spotify.
+            expires_in: Durée de validité en secondes (défaut: 3600).
+        """
+        super().set_token(token, expires_in)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO spotify_cache VALUES ('token', 'access_token', ?, ?, ?)",
+                (token, self.token_cache["expires_at"], time.time())
+            )
+    
+    def get_artist_image(self, artist_name: str, default=None) -> Optional[str]:
+        """Récupère l'URL de l'image d'un artiste (entrées expirées ignorées).
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            default: Valeur retournée si l'artiste est absent ou expiré.
+            
+        Returns:
+            URL de l'image, None si l'artiste est connu sans image,
+            ou default si absent du cache.
+        """
+        return self._get("artist", artist_name, default)
+    
+    def set_artist_image(self, artist_name: str, url: Optional[str]):
+        """Enregistre l'URL de l'image d'un artiste.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            url: URL de l'image ou None si non trouvée.
+        """
+        self._set("artist", artist_name, url)
+    
+    def get_album_image(self, artist_name: str, album_name: str, default=None) -> Optional[str]:
+        """Récupère l'URL de l'image d'un album (entrées expirées ignorées).
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            album_name: Nom de l'album.
+            default: Valeur retournée si l'album est absent ou expiré.
+            
+        Returns:
+            URL de l'image, None si l'album est connu sans image,
+            ou default si absent du cache.
+        """
+        return self._get("album", f"{artist_name}|{album_name}", default)
+    
+    def set_album_image(self, artist_name: str, album_name: str, url: Optional[str]):
+        """Enregistre l'URL de l'image d'un album.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            album_name: Nom de l'album.
+            url: URL de l'image ou None si non trouvée.
+        """
+        self._set("album", f"{artist_name}|{album_name}", url)
+    
+    def get_artist_id(self, artist_name: str) -> Optional[str]:
+        """Identifiant Spotify persistant d'un artiste (None si inconnu)."""
+        return self._get_id("artist_id", artist_name)
+    
+    def set_artist_id(self, artist_name: str, spotify_id: str):
+        """Enregistre l'identifiant Spotify d'un artiste (sans expiration)."""
+        self._set_id("artist_id", artist_name, spotify_id)
+    
+    def get_album_id(self, artist_name: str, album_name: str) -> Optional[str]:
+        """Identifiant Spotify persistant d'un album (None si inconnu)."""
+        return self._get_id("album_id", f"{artist_name}|{album_name}")
+    
+    def set_album_id(self, artist_name: str, album_name: str, spotify_id: str):
+        """Enregistre l'identifiant Spotify d'un album (sans expiration)."""
+        self._set_id("album_id", f"{artist_name}|{album_name}", spotify_id)
+    
+    def stats(self) -> dict:
+        """Statistiques d'utilisation du cache.
+        
+        Returns:
+            Dictionnaire avec hits, misses, entries et hit_rate (0.0 à 1.0).
+        """
+        stats = super().stats()
+        stats["entries"] = self._entries
+        return stats
+    
+    def close(self):
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            self._conn.close()
+    
+    def _get_id(self, kind: str, key: str) -> Optional[str]:
+        """Lecture d'un identifiant Spotify (pas de TTL ni de comptage)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM spotify_cache WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _set_id(self, kind: str, key: str, spotify_id: str):
+        """Écriture d'un identifiant Spotify, hors éviction LRU."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO spotify_cache VALUES (?, ?, ?, ?, ?)",
+                (kind, key, spotify_id, now, now)
+            )
+    
+    def _get(self, kind: str, key: str, default):
+        """Lecture d'une entrée non expirée, avec mise à jour de l'accès LRU."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM spotify_cache WHERE kind = ? AND key = ?",
+                (kind, key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            value, stored_at = row
+            ttl = self.hit_ttl if value is not None else self.miss_ttl
+            if now - stored_at > ttl:
+                self.misses += 1
+                return default
+            self._conn.execute(
+                "UPDATE spotify_cache SET last_access = ? WHERE kind = ? AND key = ?",
+                (now, kind, key)
+            )
+            self.hits += 1
+            return value
+    
+    def _set(self, kind: str, key: str, value: Optional[str]):
+        """Écriture d'une entrée puis éviction LRU si le cache est plein."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE spotify_cache SET value = ?, stored_at = ?, last_access = ? "
+                "WHERE kind = ? AND key = ?",
+                (value, now, now, kind, key)
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO spotify_cache VALUES (?, ?, ?, ?, ?)",
+                    (kind, key, value, now, now)
+                )
+                self._entries += 1
+            if self._entries > self.max_entries:
+                excess = self._entries - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM spotify_cache WHERE rowid IN ("
+                    "SELECT rowid FROM spotify_cache WHERE kind IN ('artist', 'album') "
+                    "ORDER BY last_access LIMIT ?)",
+                    (excess,)
+                )
+                self._entries -= excess
 
 
 # Instance globale du cache (peut être remplacée par injection de dépendance)
 _default_cache = SpotifyCache()
 
+# Marqueur "absent du cache", distinct d'un résultat négatif (None) en cache
+CACHE_MISS = object()
+
+
+class SpotifyLookupError(Exception):
+    """Échec d'une recherche Spotify (erreur réseau ou HTTP après les tentatives).
+    
+    Distingue une erreur, qui ne doit pas être mise en cache, d'un résultat
+    négatif (aucune correspondance), mis en cache pour miss_ttl.
+    """
+
 
 def get_spotify_token(
     client_id: Optional[str] = None,
@@ -247,13 +597,12 @@ def search_spotify_artist_image(
     if cache is None:
         cache = _default_cache
     
-    # Vérifier le cache
-    cached_url = cache.get_artist_image(artist_name)
-    if cached_url is not None:
+    # Vérifier le cache (un None en cache est un résultat négatif encore valide)
+    cached_url = cache.get_artist_image(artist_name, default=CACHE_MISS)
+    if cached_url is not CACHE_MISS:
         return cached_url
     
     if not token:
-        cache.set_artist_image(artist_name, None)
         return None
     
     # Nettoyer le nom de l'artiste
@@ -305,7 +654,7 @@ def search_spotify_artist_image(
                 continue
             break
     
-    cache.set_artist_image(artist_name, None)
+    # Erreur: pas de mise en cache, la recherche sera retentée au prochain passage
     return None
 
 
@@ -341,34 +690,37 @@ def search_spotify_album_image(
     if cache is None:
         cache = _default_cache
     
-    # Vérifier le cache
-    cached_url = cache.get_album_image(artist_name, album_name)
-    if cached_url is not None:
+    # Vérifier le cache (un None en cache est un résultat négatif encore valide)
+    cached_url = cache.get_album_image(artist_name, album_name, default=CACHE_MISS)
+    if cached_url is not CACHE_MISS:
         return cached_url
     
     if not token:
-        cache.set_album_image(artist_name, album_name, None)
         return None
     
     # Nettoyer les métadonnées
     cleaned_artist = clean_artist_name(artist_name)
     cleaned_album = clean_album_name(album_name)
     
-    # Tentative 1: Recherche avec artiste + album
-    result = _search_album_with_artist(
-        token, cleaned_artist, cleaned_album, 
-        SPOTIFY_MIN_SCORE_PRIMARY, max_retries
-    )
-    
-    if result:
-        cache.set_album_image(artist_name, album_name, result)
-        return result
-    
-    # Tentative 2: Recherche par album uniquement (fallback pour Various Artists)
-    result = _search_album_only(
-        token, cleaned_artist, cleaned_album,
-        SPOTIFY_MIN_SCORE_FALLBACK, max_retries
-    )
+    try:
+        # Tentative 1: Recherche avec artiste + album
+        result = _search_album_with_artist(
+            token, cleaned_artist, cleaned_album, 
+            SPOTIFY_MIN_SCORE_PRIMARY, max_retries, raise_on_error=True
+        )
+        
+        if result:
+            cache.set_album_image(artist_name, album_name, result)
+            return result
+        
+        # Tentative 2: Recherche par album uniquement (fallback pour Various Artists)
+        result = _search_album_only(
+            token, cleaned_artist, cleaned_album,
+            SPOTIFY_MIN_SCORE_FALLBACK, max_retries, raise_on_error=True
+        )
+    except SpotifyLookupError:
+        # Erreur: pas de mise en cache, la recherche sera retentée au prochain passage
+        return None
     
     cache.set_album_image(artist_name, album_name, result)
     return result
@@ -379,7 +731,8 @@ def _search_album_with_artist(
     artist: str,
     album: str,
     min_score: int,
-    max_retries: int
+    max_retries: int,
+    raise_on_error: bool = False
 ) -> Optional[str]:
     """Recherche interne d'album avec artiste (méthode primaire).
     
@@ -389,6 +742,8 @@ def _search_album_with_artist(
         album: Nom de l'album nettoyé.
         min_score: Score minimum requis pour validation.
         max_retries: Nombre de tentatives.
+        raise_on_error: Si True, lève SpotifyLookupError en cas d'erreur
+            au lieu de retourner None.
         
     Returns:
         URL de l'image ou None.
@@ -432,6 +787,8 @@ def _search_album_with_artist(
                 continue
             break
     
+    if raise_on_error:
+        raise SpotifyLookupError(f"{artist} - {album}")
     return None
 
 
@@ -440,7 +797,8 @@ def _search_album_only(
     artist: str,
     album: str,
     min_score: int,
-    max_retries: int
+    max_retries: int,
+    raise_on_error: bool = False
 ) -> Optional[str]:
     """Recherche interne d'album sans artiste (fallback).
     
@@ -450,6 +808,8 @@ def _search_album_only(
         album: Nom de l'album nettoyé.
         min_score: Score minimum requis.
         max_retries: Nombre de tentatives.
+        raise_on_error: Si True, lève SpotifyLookupError en cas d'erreur
+            au lieu de retourner None.
         
     Returns:
         URL de l'image ou None.
@@ -487,6 +847,8 @@ def _search_album_only(
             logger.error(f"Erreur recherche album (fallback): {e}")
             break
     
+    if raise_on_error:
+        raise SpotifyLookupError(album)
     return None
 
 
@@ -507,8 +869,29 @@ def _find_best_album_match(
     Returns:
         URL de l'image du meilleur album ou None.
     """
+    best_album = _find_best_album(artist, album, albums, min_score)
+    return best_album["images"][0]["url"] if best_album else None
+
+
+def _find_best_album(
+    artist: str,
+    album: str,
+    albums: list,
+    min_score: int
+) -> Optional[dict]:
+    """Comme _find_best_album_match, mais retourne l'album Spotify retenu.
+    
+    Args:
+        artist: Nom de l'artiste recherché.
+        album: Nom de l'album recherché.
+        albums: Liste des albums retournés par Spotify.
+        min_score: Score minimum pour validation.
+        
+    Returns:
+        Album Spotify (avec au moins une image) ou None.
+    """
     best_score = 0
-    best_url = None
+    best_album = None
     
     for album_item in albums:
         # Validation de l'artiste
@@ -526,12 +909,520 @@ def _find_best_album_match(
         
         if score > best_score:
             best_score = score
-            images = album_item.get("images", [])
-            if images:
-                best_url = images[0]["url"]  # Prendre la plus grande image
+            if album_item.get("images"):
+                best_album = album_item  # Sa première image est la plus grande
     
     # Retourner seulement si score >= seuil
     if best_score >= min_score:
-        return best_url
+        return best_album
     
     return None
+
+
+# ============================================================================
+# Client concurrent pour l'enrichissement en masse
+# ============================================================================
+
+class TokenBucket:
+    """Limiteur de débit à jetons, partagé entre threads.
+    
+    Chaque requête consomme un jeton; les jetons se régénèrent à rate par
+    seconde jusqu'à capacity. pause() suspend toutes les requêtes (réponse
+    429 avec Retry-After) et vide le seau pour éviter une rafale à la reprise.
+    
+    Attributes:
+        rate: Jetons régénérés par seconde.
+        capacity: Nombre maximal de jetons (taille de rafale).
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Crée un seau plein.
+        
+        Args:
+            rate: Requêtes autorisées par seconde.
+            capacity: Taille de rafale (défaut: rate).
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    elapsed = max(0.0, now - self._updated)
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Suspend toutes les acquisitions pendant seconds secondes.
+        
+        Args:
+            seconds: Durée de la pause (valeur de Retry-After).
+        """
+        with self._lock:
+            resume_at = time.monotonic() + seconds
+            if resume_at > self._paused_until:
+                self._paused_until = resume_at
+                self._updated = resume_at
+                self._tokens = 0.0
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    """Délai demandé par l'en-tête Retry-After (secondes), défaut si absent ou illisible."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return float(DEFAULT_RATE_LIMIT_DELAY)
+
+
+class SpotifyClient:
+    """Client Spotify concurrent pour l'enrichissement d'images en masse.
+    
+    Les recherches sont exécutées par un pool de threads et partagent:
+    - une session HTTP (connexions keep-alive réutilisées),
+    - un limiteur à jetons (le débit est borné par le quota, pas par les
+      allers-retours successifs),
+    - le token et le cache (SpotifyCache ou PersistentSpotifyCache).
+    
+    Une réponse 429 suspend toutes les requêtes pendant la durée indiquée par
+    Retry-After. Plusieurs demandes simultanées pour la même clé partagent une
+    seule requête.
+    
+    Examples:
+        >>> with SpotifyClient(cache=PersistentSpotifyCache()) as client:
+        ...     futures = [client.submit_artist_image(name) for name in artists]
+        ...     images = [future.result() for future in futures]
+    """
+    
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        cache: Optional[SpotifyCache] = None,
+        rate: float = SPOTIFY_RATE_LIMIT,
+        max_workers: int = SPOTIFY_MAX_WORKERS,
+        max_retries: int = DEFAULT_RETRY_COUNT,
+        session: Optional[requests.Session] = None
+    ):
+        """Initialise le client (aucun appel réseau).
+        
+        Args:
+            client_id: ID client Spotify (défaut: variable SPOTIFY_CLIENT_ID).
+            client_secret: Secret client Spotify (défaut: SPOTIFY_CLIENT_SECRET).
+            cache: Cache des tokens et images (défaut: cache global en mémoire).
+            rate: Requêtes par seconde autorisées (limiteur partagé).
+            max_workers: Nombre de recherches simultanées.
+            max_retries: Tentatives par requête (429, 401, erreurs réseau et 5xx).
+            session: Session HTTP à utiliser (défaut: nouvelle session).
+        """
+        self.client_id = client_id or os.getenv("SPOTIFY_CLIENT_ID")
+        self.client_secret = client_secret or os.getenv("SPOTIFY_CLIENT_SECRET")
+        self.cache = cache if cache is not None else _default_cache
+        self.max_retries = max_retries
+        self.limiter = TokenBucket(rate)
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        self.request_count = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spotify")
+        self._inflight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._token_lock = threading.Lock()
+    
+    def __enter__(self) -> 'SpotifyClient':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Attend les recherches en cours puis libère threads et connexions (idempotent)."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+    
+    def get_token(self, refresh: bool = False) -> Optional[str]:
+        """Token d'accès (cache, sinon Client Credentials Flow).
+        
+        Args:
+            refresh: Ignore le token en cache (après une réponse 401).
+            
+        Returns:
+            Token valide, ou None si l'authentification échoue.
+        """
+        with self._token_lock:
+            token = None if refresh else self.cache.get_token()
+            if token:
+                return token
+            if not self.client_id or not self.client_secret:
+                logger.warning(ERROR_MISSING_SPOTIFY_CREDENTIALS)
+                return None
+            try:
+                response = self.session.post(
+                    SPOTIFY_TOKEN_URL,
+                    data={"grant_type": "client_credentials"},
+                    auth=(self.client_id, self.client_secret),
+                    timeout=DEFAULT_HTTP_TIMEOUT
+                )
+                self._count_request()
+                response.raise_for_status()
+                payload = response.json()
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"{ERROR_TOKEN_RETRIEVAL}: {e}")
+                return None
+            access_token = payload.get("access_token")
+            if access_token:
+                self.cache.set_token(access_token, payload.get("expires_in", 3600))
+            return access_token
+    
+    def submit_artist_image(self, artist_name: str) -> Future:
+        """Lance (ou rejoint) la recherche de l'image d'un artiste.
+        
+        Args:
+            artist_name: Nom de l'artiste tel qu'il apparaît dans l'historique.
+            
+        Returns:
+            Future dont le résultat est l'URL de l'image ou None.
+        """
+        return self._submit(
+            ("artist", artist_name),
+            lambda: self.cache.get_artist_image(artist_name, default=CACHE_MISS),
+            lambda: self._resolve_artist_image(artist_name)
+        )
+    
+    def submit_album_image(self, artist_name: str, album_name: str) -> Future:
+        """Lance (ou rejoint) la recherche de la couverture d'un album.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            album_name: Nom de l'album.
+            
+        Returns:
+            Future dont le résultat est l'URL de l'image ou None.
+        """
+        return self._submit(
+            ("album", artist_name, album_name),
+            lambda: self.cache.get_album_image(artist_name, album_name, default=CACHE_MISS),
+            lambda: self._resolve_album_image(artist_name, album_name)
+        )
+    
+    def artist_image(self, artist_name: str) -> Optional[str]:
+        """Image d'un artiste (appel bloquant)."""
+        return self.submit_artist_image(artist_name).result()
+    
+    def album_image(self, artist_name: str, album_name: str) -> Optional[str]:
+        """Couverture d'un album (appel bloquant)."""
+        return self.submit_album_image(artist_name, album_name).result()
+    
+    def _submit(self, key: tuple, cached: Callable, resolve: Callable) -> Future:
+        """Résultat en cache, recherche déjà en cours pour la clé, ou nouvelle recherche."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            value = cached()
+            if value is not CACHE_MISS:
+                future = Future()
+                future.set_result(value)
+                return future
+            future = self._executor.submit(resolve)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+    
+    def _forget(self, key: tuple):
+        """Retire une recherche terminée (son résultat est désormais en cache)."""
+        with self._lock:
+            self._inflight.pop(key, None)
+    
+    def _count_request(self):
+        with self._lock:
+            self.request_count += 1
+    
+    def _get_json(self, url: str, params: dict) -> dict:
+        """GET limité et authentifié, avec gestion de 429/Retry-After, 401 et 5xx.
+        
+        Raises:
+            SpotifyLookupError: Si toutes les tentatives échouent ou sans token.
+        """
+        refresh = False
+        for attempt in range(self.max_retries):
+            token = self.get_token(refresh=refresh)
+            if not token:
+                break
+            refresh = False
+            self.limiter.acquire()
+            try:
+                response = self.session.get(
+                    url, params=params,
+                    headers={"Authorization": f"Bearer {token}"},
+                    timeout=DEFAULT_HTTP_TIMEOUT
+                )
+            except requests.RequestException as e:
+                logger.warning(f"Erreur réseau Spotify ({attempt + 1}/{self.max_retries}): {e}")
+                time.sleep(DEFAULT_RETRY_DELAY * 2 ** attempt)
+                continue
+            finally:
+                self._count_request()
+            
+            if response.status_code == 429:
+                delay = _retry_after_seconds(response.headers.get("Retry-After"))
+                logger.warning(f"Rate limit (429), pause de {delay:.0f}s pour toutes les requêtes")
+                self.limiter.pause(delay)
+                continue
+            if response.status_code == 401:
+                logger.warning(f"Token expiré (401), tentative {attempt + 1}/{self.max_retries}")
+                refresh = True
+                continue
+            if response.status_code >= 500:
+                time.sleep(DEFAULT_RETRY_DELAY * 2 ** attempt)
+                continue
+            if response.status_code != 200:
+                logger.error(f"Erreur HTTP {response.status_code} pour {url}")
+                break
+            return response.json()
+        raise SpotifyLookupError(url)
+    
+    def _resolve_artist_image(self, artist_name: str) -> Optional[str]:
+        """Recherche réseau de l'image d'un artiste (mise en cache, erreurs exclues)."""
+        cleaned_artist = clean_artist_name(artist_name)
+        try:
+            data = self._get_json(SPOTIFY_SEARCH_URL, {
+                "q": f"artist:{cleaned_artist}",
+                "type": "artist",
+                "limit": SPOTIFY_ARTIST_SEARCH_LIMIT
+            })
+        except SpotifyLookupError:
+            return None
+        items = data.get("artists", {}).get("items", [])
+        if items and items[0].get("id"):
+            self.cache.set_artist_id(artist_name, items[0]["id"])
+        image_url = items[0]["images"][0]["url"] if items and items[0].get("images") else None
+        self.cache.set_artist_image(artist_name, image_url)
+        return image_url
+    
+    def _resolve_album_image(self, artist_name: str, album_name: str) -> Optional[str]:
+        """Recherche réseau d'une couverture (mise en cache, erreurs exclues)."""
+        try:
+            best_album = self._search_album(artist_name, album_name)
+        except SpotifyLookupError:
+            return None
+        return best_album["images"][0]["url"] if best_album else None
+    
+    def _search_album(self, artist_name: str, album_name: str) -> Optional[dict]:
+        """Recherche d'un album: artiste + album, puis album seul (scoring).
+        
+        L'identifiant et la couverture de l'album retenu sont mis en cache,
+        ainsi que l'absence de résultat.
+        
+        Raises:
+            SpotifyLookupError: En cas d'erreur réseau ou HTTP.
+        """
+        cleaned_artist = clean_artist_name(artist_name)
+        cleaned_album = clean_album_name(album_name)
+        searches = [
+            (f"artist:{cleaned_artist} album:{cleaned_album}", SPOTIFY_MIN_SCORE_PRIMARY),
+            (cleaned_album, SPOTIFY_MIN_SCORE_FALLBACK),
+        ]
+        best_album = None
+        for query, min_score in searches:
+            data = self._get_json(SPOTIFY_SEARCH_URL, {
+                "q": query,
+                "type": "album",
+                "limit": SPOTIFY_ALBUM_SEARCH_LIMIT
+            })
+            albums = data.get("albums", {}).get("items", [])
+            best_album = _find_best_album(cleaned_artist, cleaned_album, albums, min_score)
+            if best_album:
+                break
+        if best_album and best_album.get("id"):
+            self.cache.set_album_id(artist_name, album_name, best_album["id"])
+        self.cache.set_album_image(artist_name, album_name, best_album["images"][0]["url"] if best_album else None)
+        return best_album
+    
+    def album_details(self, artist_name: str, album_name: str) -> Optional[dict]:
+        """Album Spotify complet (URL, date de sortie, images...) d'un album.
+        
+        Si l'identifiant de l'album est déjà connu, il est relu directement
+        (endpoint /albums); sinon une recherche avec scoring est faite et
+        l'identifiant trouvé est mémorisé.
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            album_name: Nom de l'album.
+            
+        Returns:
+            Objet album Spotify, ou None si non trouvé ou en cas d'erreur.
+        """
+        spotify_id = self.cache.get_album_id(artist_name, album_name)
+        if spotify_id:
+            album = self.get_albums([spotify_id]).get(spotify_id)
+            if album:
+                return album
+        try:
+            return self._search_album(artist_name, album_name)
+        except SpotifyLookupError:
+            return None
+    
+    def track_album(self, artist_name: str, track_title: str) -> Optional[str]:
+        """Nom de l'album d'une piste (recherche artiste + titre, puis titre seul).
+        
+        Args:
+            artist_name: Nom de l'artiste.
+            track_title: Titre de la piste.
+            
+        Returns:
+            Nom de l'album, ou None si non trouvé ou en cas d'erreur.
+        """
+        try:
+            for query in (f"track:{track_title} artist:{artist_name}", f"track:{track_title}"):
+                data = self._get_json(SPOTIFY_SEARCH_URL, {"q": query, "type": "track", "limit": 1})
+                items = data.get("tracks", {}).get("items", [])
+                if items and items[0].get("album"):
+                    return items[0]["album"]["name"]
+        except SpotifyLookupError:
+            pass
+        return None
+    
+    def get_artists(self, spotify_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Artistes Spotify par identifiant, via l'endpoint multi-ID.
+        
+        Une requête par lot de SPOTIFY_ARTISTS_BATCH_SIZE identifiants, lots
+        exécutés en parallèle (limiteur partagé).
+        
+        Args:
+            spotify_ids: Identifiants Spotify (doublons ignorés).
+            
+        Returns:
+            Identifiant → objet artiste (images, genres, popularité...), ou
+            None si Spotify ne le connaît plus. Les lots en erreur sont absents.
+        """
+        return self._get_several(SPOTIFY_ARTISTS_URL, "artists", spotify_ids, SPOTIFY_ARTISTS_BATCH_SIZE)
+    
+    def get_albums(self, spotify_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Albums Spotify par identifiant, via l'endpoint multi-ID.
+        
+        Args:
+            spotify_ids: Identifiants Spotify (doublons ignorés).
+            
+        Returns:
+            Identifiant → objet album (images, date de sortie, label...), ou
+            None si Spotify ne le connaît plus. Les lots en erreur sont absents.
+        """
+        return self._get_several(SPOTIFY_ALBUMS_URL, "albums", spotify_ids, SPOTIFY_ALBUMS_BATCH_SIZE)
+    
+    def refresh_artist_images(self, artist_names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Rafraîchit les images d'artistes, en lots pour les identifiants connus.
+        
+        Les artistes dont l'identifiant Spotify est connu sont relus par lots
+        de 50; les autres (ou ceux dont le lot a échoué) passent par une
+        recherche, qui enregistre leur identifiant pour la fois suivante.
+        
+        Args:
+            artist_names: Noms des artistes.
+            
+        Returns:
+            Nom → URL de l'image (None si aucune).
+        """
+        return self._refresh(
+            list(dict.fromkeys(artist_names)),
+            self.cache.get_artist_id,
+            self.get_artists,
+            lambda name, url: self.cache.set_artist_image(name, url),
+            self._resolve_artist_image
+        )
+    
+    def refresh_album_images(self, albums: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """Rafraîchit les couvertures d'albums, en lots pour les identifiants connus.
+        
+        Args:
+            albums: Couples (artiste, album).
+            
+        Returns:
+            (artiste, album) → URL de la couverture (None si aucune).
+        """
+        return self._refresh(
+            [tuple(key) for key in dict.fromkeys(albums)],
+            lambda key: self.cache.get_album_id(*key),
+            self.get_albums,
+            lambda key, url: self.cache.set_album_image(*key, url),
+            lambda key: self._resolve_album_image(*key)
+        )
+    
+    def _refresh(self, keys: List, id_of: Callable, fetch: Callable, store: Callable,
+                 search: Callable) -> Dict:
+        """Rafraîchissement commun: lots multi-ID, puis recherche pour le reste."""
+        known = {key: id_of(key) for key in keys}
+        items = fetch(spotify_id for spotify_id in known.values() if spotify_id)
+        
+        results = {}
+        for key, spotify_id in known.items():
+            item = items.get(spotify_id)
+            if item is not None:
+                # Identifiant inconnu de Spotify (item None): nouvelle recherche
+                url = item["images"][0]["url"] if item.get("images") else None
+                store(key, url)
+                results[key] = url
+        
+        searches = {key: self._executor.submit(search, key) for key in keys if key not in results}
+        results.update({key: future.result() for key, future in searches.items()})
+        return {key: results[key] for key in keys}
+    
+    def _get_several(self, url: str, field: str, spotify_ids: Iterable[str],
+                     batch_size: int) -> Dict[str, Optional[dict]]:
+        """Lecture par lots d'un endpoint multi-ID (/artists, /albums)."""
+        unique_ids = list(dict.fromkeys(spotify_ids))
+        batches = [unique_ids[i:i + batch_size] for i in range(0, len(unique_ids), batch_size)]
+        futures = [
+            self._executor.submit(self._get_json, url, {"ids": ",".join(batch)})
+            for batch in batches
+        ]
+        items = {}
+        for batch, future in zip(batches, futures):
+            try:
+                objects = future.result().get(field, [])
+            except SpotifyLookupError:
+                continue
+            # Spotify renvoie les objets dans l'ordre des identifiants (null si inconnu)
+            items.update(zip(batch, objects))
+        return items
+
+
+# Client partagé par tout le processus (token, cache, connexions, limiteur)
+_shared_client: Optional[SpotifyClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> SpotifyClient:
+    """Client Spotify unique du processus.
+    
+    Tous les scripts (chk-last-fm.py, complete-images-roon.py,
+    fix-radio-tracks.py, Read-discogs-ia.py) passent par ce client: un seul
+    token, un seul cache persistant, un seul pool de connexions et un seul
+    limiteur de débit par processus. Les identifiants sont lus dans
+    l'environnement (SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET) à la
+    première utilisation; le client est fermé à la sortie du processus.
+    
+    Returns:
+        SpotifyClient partagé, sur un PersistentSpotifyCache.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = SpotifyClient(cache=PersistentSpotifyCache())
+            atexit.register(_shared_client.close)
+        return _shared_client
@@ -206,6 +206,103 @@ class TestAIOptimizerInit:
             history_path=str(history_path)
         )
         assert opt.history == []
+    
+    def test_init_with_unmigrated_database(self, sample_config, sample_state, sample_history, temp_dir):
+        """Test de repli sur le JSON quand la base SQLite est absente."""
+        opt = AIOptimizer(
+            config_path=str(sample_config),
+            state_path=str(sample_state),
+            history_path=str(sample_history),
+            db_path=str(temp_dir / "data" / "absent.db")
+        )
+        assert len(opt.history) > 0
+    
+    def test_init_with_sqlite_history(self, sample_config, sample_state, temp_dir):
+        """Test de chargement de l'historique récent depuis SQLite."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from models.schema import Base, Artist, Album, Track, ListeningHistory
+        
+        db_path = temp_dir / "data" / "musique.db"
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        artist = Artist(name="Nina Simone")
+        album = Album(title="Pastel Blues")
+        session.add_all([artist, album])
+        session.flush()
+        track = Track(album_id=album.id, artist_id=artist.id, title="Sinnerman")
+        session.add(track)
+        session.flush()
+        now = datetime.now()
+        for days_ago in (1, 2, 200):
+            play_time = now - timedelta(days=days_ago)
+            session.add(ListeningHistory(
+                track_id=track.id,
+                timestamp=int(play_time.timestamp()),
+                date=play_time.strftime('%Y-%m-%d %H:%M'),
+                source='roon'
+            ))
+        session.commit()
+        session.close()
+        engine.dispose()
+        
+        opt = AIOptimizer(
+            config_path=str(sample_config),
+            state_path=str(sample_state),
+            history_path=str(temp_dir / "data" / "history" / "nonexistent.json"),
+            db_path=str(db_path)
+        )
+        
+        # Seules les écoutes de la fenêtre HISTORY_WINDOW_DAYS sont chargées
+        assert len(opt.history) == 2
+        assert opt.history[0]['artist'] == "Nina Simone"
+        assert opt.history[0]['timestamp'] > opt.history[1]['timestamp']
+        assert opt.analyze_listening_patterns(days=30)['total_tracks'] == 2
+
+
+    def test_patterns_from_rollups_match_json(self, sample_config, sample_state, sample_history, temp_dir):
+        """Les patterns calculés depuis les agrégats SQLite sont ceux du calcul sur le JSON."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from models.schema import Base, Artist, Album, Track, ListeningHistory
+        
+        with open(sample_history, 'r') as f:
+            history = json.load(f)['tracks']
+        
+        db_path = temp_dir / "data" / "musique.db"
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        album = Album(title="Album")
+        session.add(album)
+        session.flush()
+        tracks = {}
+        for play in history:
+            if play['title'] not in tracks:
+                tracks[play['title']] = Track(album_id=album.id, title=play['title'])
+                session.add(tracks[play['title']])
+        session.flush()
+        for play in history:
+            session.add(ListeningHistory(
+                track_id=tracks[play['title']].id,
+                timestamp=play['timestamp'],
+                date=play['date'],
+                source=play['source']
+            ))
+        session.commit()
+        session.close()
+        engine.dispose()
+        
+        from_json = AIOptimizer(str(sample_config), str(sample_state), str(sample_history))
+        from_db = AIOptimizer(str(sample_config), str(sample_state), str(sample_history),
+                              db_path=str(db_path))
+        assert from_db.repository is not None
+        
+        for days in (7, 30):
+            expected = from_json.analyze_listening_patterns(days=days)
+            actual = from_db.analyze_listening_patterns(days=days)
+            assert actual == expected
 
 
 class TestAnalyzeListeningPatterns:
@@ -342,6 +439,67 @@ class TestAnalyzeListeningPatterns:
         assert patterns['daily_volume'] != 20.0  # Valeur incorrecte avec l'ancien calcul
 
 
+def scalar_listening_patterns(history, days):
+    """Implémentation de référence (boucle par écoute, avant vectorisation)."""
+    cutoff_date = datetime.now() - timedelta(days=days)
+    hour_counts, weekday_counts, daily_tracks = {}, {}, set()
+    hours = []
+    for track in history:
+        track_date = datetime.fromtimestamp(track['timestamp'])
+        if track_date < cutoff_date:
+            continue
+        hour_counts[track_date.hour] = hour_counts.get(track_date.hour, 0) + 1
+        weekday_counts[track_date.weekday()] = weekday_counts.get(track_date.weekday(), 0) + 1
+        daily_tracks.add(track_date.strftime('%Y-%m-%d'))
+        hours.append(track_date.hour)
+    hours.sort()
+    total = len(hours)
+    daily_volume = total / days
+    names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    return {
+        'peak_hours': [h for h, _ in sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)[:4]],
+        'typical_start': hours[max(0, int(total * 0.05))],
+        'typical_end': hours[min(total - 1, int(total * 0.95))],
+        'daily_volume': round(daily_volume, 1),
+        'weekly_distribution': {
+            names[w]: round(weekday_counts.get(w, 0) / total * 100, 1) for w in range(7)
+        },
+        'activity_score': round(0.6 * min(1.0, daily_volume / 50.0) + 0.4 * len(daily_tracks) / days, 2),
+        'analysis_period_days': days,
+        'total_tracks': total,
+        'active_days': len(daily_tracks),
+    }
+
+
+class TestVectorisedPatterns:
+    """Le calcul vectorisé donne exactement les résultats de la boucle par écoute."""
+    
+    def test_matches_scalar_on_fixture(self, optimizer, sample_history):
+        """Mêmes résultats que la référence sur l'historique de test."""
+        with open(sample_history, 'r') as f:
+            history = json.load(f)['tracks']
+        for days in (1, 7, 30):
+            assert optimizer.analyze_listening_patterns(days=days) == scalar_listening_patterns(history, days)
+    
+    def test_matches_scalar_with_ties(self, sample_config, sample_state, temp_dir):
+        """Départage des heures à égalité identique (ordre de première apparition)."""
+        import random
+        rng = random.Random(42)
+        now = int(datetime.now().timestamp())
+        history = [
+            {"timestamp": now - rng.randrange(0, 40 * 86400), "artist": "A", "title": "T", "album": "B"}
+            for _ in range(300)
+        ]
+        history_path = temp_dir / "data" / "history" / "random.json"
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, 'w') as f:
+            json.dump({"tracks": history}, f)
+        
+        opt = AIOptimizer(str(sample_config), str(sample_state), str(history_path))
+        for days in (3, 30):
+            assert opt.analyze_listening_patterns(days=days) == scalar_listening_patterns(history, days)
+
+
 class TestAnalyzeTaskPerformance:
     """Tests d'analyse de la performance des tâches."""
     
@@ -385,6 +543,47 @@ class TestAnalyzeTaskPerformance:
             value_ratio = metrics['value_ratio']
             assert 0.0 <= value_ratio <= 1.0
 
+    def test_measured_costs_from_profile_history(self, optimizer):
+        """Historique profilé: taux de succès, durée, utilité et coûts journaliers mesurés."""
+        runs = [{"status": "success", "wall_seconds": 4.0, "cpu_user_seconds": 1.5, "cpu_system_seconds": 0.5,
+                 "peak_rss_mb": 80.0, "read_bytes": 1000, "write_bytes": 500, "http_calls": 10,
+                 "outputs_changed": i == 0} for i in range(4)]
+        runs.append({"status": "error", "wall_seconds": 2.0, "outputs_changed": None})
+        optimizer.state["analyze_listening_patterns"]["profile_history"] = runs
+        
+        perf = optimizer.analyze_task_performance()["analyze_listening_patterns"]
+        
+        assert perf["profiled_runs"] == 5
+        assert perf["success_rate"] == 0.8
+        assert perf["avg_duration"] == 3.6
+        assert perf["useful_rate"] == 0.25
+        assert perf["value_ratio"] == 0.2
+        assert (perf["avg_cpu_seconds"], perf["avg_http_calls"], perf["avg_io_bytes"]) == (2.0, 10, 1500)
+        # Toutes les 6 heures: 4 exécutions par jour
+        assert (perf["daily_cpu_seconds"], perf["daily_http_calls"]) == (8.0, 40.0)
+    
+    def test_cost_recommendation_for_rarely_useful_task(self, optimizer, monkeypatch):
+        """Sorties rarement modifiées: fréquence doublée, justifiée par les coûts mesurés."""
+        monkeypatch.setattr('services.ai_optimizer.ask_for_ia', lambda *args, **kwargs: "")
+        optimizer.state["analyze_listening_patterns"]["profile_history"] = [
+            {"status": "success", "wall_seconds": 3.0, "cpu_user_seconds": 2.0, "cpu_system_seconds": 0.0,
+             "http_calls": 0, "outputs_changed": i == 0} for i in range(6)
+        ]
+        
+        recommendations = [r for r in optimizer.generate_recommendations()
+                           if r.current_value.get('task') == 'analyze_listening_patterns']
+        
+        assert len(recommendations) == 1
+        assert recommendations[0].recommended_value['frequency'] == "12 hour"
+        assert recommendations[0].category == 'cost'
+        assert "6 exécutions mesurées, 17%" in recommendations[0].justification
+        
+        # Sorties modifiées à chaque exécution: pas de recommandation
+        for run in optimizer.state["analyze_listening_patterns"]["profile_history"]:
+            run["outputs_changed"] = True
+        assert not [r for r in optimizer.generate_recommendations()
+                    if r.current_value.get('task') == 'analyze_listening_patterns']
+
 
 class TestDetectAnomalies:
     """Tests de détection d'anomalies."""
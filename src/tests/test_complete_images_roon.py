@@ -0,0 +1,146 @@
+"""
+Tests unitaires pour la file de travail dédupliquée de complete-images-roon.py
+
+Vérifie que l'historique est réduit aux clés distinctes dont une image
+manque, que chaque clé n'est recherchée qu'une fois, que les résultats sont
+reportés sur toutes les pistes concernées et que le rapport --dry-run compte
+correctement les recherches évitées. Vérifie aussi la relecture en continu
+des seules pistes à compléter.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import importlib.util
+import json
+import os
+from collections import Counter
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import pytest
+
+from services.spotify_service import PersistentSpotifyCache
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+spec = importlib.util.spec_from_file_location(
+    "complete_images_roon",
+    os.path.join(PROJECT_ROOT, "src", "enrichment", "complete-images-roon.py")
+)
+complete_images_roon = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(complete_images_roon)
+
+
+class FakeClient:
+    """Client Spotify simulé: compte les recherches par clé."""
+
+    def __init__(self):
+        self.lookups = Counter()
+
+    def _done(self, value):
+        future = Future()
+        future.set_result(value)
+        return future
+
+    def submit_artist_image(self, artist):
+        self.lookups[('artist', artist)] += 1
+        return self._done(f"https://artist/{artist}.jpg")
+
+    def submit_album_image(self, artist, album):
+        self.lookups[('album', artist, album)] += 1
+        return self._done(None if album == "Introuvable" else f"https://album/{album}.jpg")
+
+
+@pytest.fixture
+def tracks():
+    """Historique où de nombreuses pistes partagent artiste et album."""
+    tracks = []
+    for i in range(30):
+        tracks.append({
+            'artist': "Nina Simone",
+            'album': ("Pastel Blues", "Introuvable", "Little Girl Blue")[i % 3],
+            'artist_spotify_image': None,
+            'album_spotify_image': "https://deja.jpg" if i % 3 == 2 else None,
+            'album_lastfm_image': None,
+        })
+    tracks.append({'artist': "Miles Davis", 'album': "Kind of Blue", 'artist_spotify_image': "https://miles.jpg",
+                   'album_spotify_image': None, 'album_lastfm_image': "https://lastfm.jpg"})
+    return tracks
+
+
+class TestWorkQueue:
+    """Tests de la réduction aux clés distinctes et du report des résultats."""
+
+    def test_build_work_queue(self, tracks):
+        """Une entrée par clé distincte, avec les pistes concernées."""
+        queue = complete_images_roon.build_work_queue(tracks)
+        assert list(queue['artist_spotify_image']) == ["Nina Simone"]
+        assert len(queue['artist_spotify_image']["Nina Simone"]) == 30
+        assert list(queue['album_spotify_image']) == [
+            ("Nina Simone", "Pastel Blues"), ("Nina Simone", "Introuvable"), ("Miles Davis", "Kind of Blue")
+        ]
+        assert len(queue['album_lastfm_image']) == 3
+
+    def test_each_key_resolved_once(self, tracks):
+        """Chaque clé est recherchée une seule fois, puis reportée sur toutes ses pistes."""
+        queue = complete_images_roon.build_work_queue(tracks)
+        client = FakeClient()
+        with patch.object(complete_images_roon, 'search_lastfm_album_image',
+                          side_effect=lambda artist, album: f"https://lastfm/{album}.png") as lastfm:
+            results = complete_images_roon.resolve_work_queue(queue, client)
+        completed = complete_images_roon.apply_results(tracks, queue, results)
+
+        assert set(client.lookups.values()) == {1}
+        assert lastfm.call_count == 3
+        assert completed == {'artist_spotify_image': 30, 'album_spotify_image': 11, 'album_lastfm_image': 30}
+        assert all(t['artist_spotify_image'] for t in tracks)
+        assert [t['album_spotify_image'] for t in tracks[:3]] == [
+            "https://album/Pastel Blues.jpg", None, "https://deja.jpg"
+        ]
+
+    def test_without_spotify_client(self, tracks):
+        """Sans token Spotify, seules les recherches Last.fm sont faites."""
+        queue = complete_images_roon.build_work_queue(tracks)
+        with patch.object(complete_images_roon, 'search_lastfm_album_image', return_value=None):
+            results = complete_images_roon.resolve_work_queue(queue, None)
+        assert results['artist_spotify_image'] == {}
+        assert complete_images_roon.apply_results(tracks, queue, results) == {
+            'artist_spotify_image': 0, 'album_spotify_image': 0, 'album_lastfm_image': 0
+        }
+
+    def test_load_rows_streams_needed_rows(self, tracks, tmp_path):
+        """Relecture: seules les pistes qui recevront une image, clé inchangée."""
+        path = tmp_path / "chk-roon.json"
+        path.write_text(json.dumps({'tracks': tracks}), encoding='utf-8')
+        queue = complete_images_roon.build_work_queue(complete_images_roon.iter_history_file(str(path)))
+        results = {'artist_spotify_image': {}, 'album_lastfm_image': {},
+                   'album_spotify_image': {("Nina Simone", "Pastel Blues"): "https://album/pastel.jpg"}}
+
+        tracks[3]['album'] = "Autre album"
+        path.write_text(json.dumps({'tracks': tracks}), encoding='utf-8')
+        rows = complete_images_roon.load_rows(str(path), queue, results)
+
+        assert sorted(rows) == [i for i in range(0, 30, 3) if i != 3]
+        changed = set()
+        assert complete_images_roon.apply_results(rows, queue, results, changed)['album_spotify_image'] == 9
+        assert changed == set(rows)
+
+
+class TestDryRunReport:
+    """Tests du rapport de recherches évitées."""
+
+    def test_counts_saved_lookups(self, tracks, tmp_path):
+        """Pistes, clés distinctes, clés déjà en cache et recherches évitées."""
+        cache = PersistentSpotifyCache(str(tmp_path / "spotify-cache.db"))
+        cache.set_album_image("Nina Simone", "Introuvable", None)
+        queue = complete_images_roon.build_work_queue(tracks)
+
+        report = complete_images_roon.dry_run_report(queue, cache)
+        cache.close()
+
+        assert report['artist_spotify_image'] == {'rows': 30, 'keys': 1, 'cached': 0, 'lookups': 1, 'saved': 29}
+        assert report['album_spotify_image'] == {'rows': 21, 'keys': 3, 'cached': 1, 'lookups': 2, 'saved': 19}
+        assert report['album_lastfm_image']['saved'] == 27
@@ -0,0 +1,109 @@
+"""
+Tests unitaires pour la fabrique de moteurs SQLite (src/models/database.py)
+
+Vérifie l'application du profil de réglages (WAL, synchronous, busy_timeout...)
+et le partage d'un moteur unique par base.
+
+Version: 1.0.0
+Date: 27 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from src.models import database
+from src.models.database import SQLITE_PRAGMAS, create_sqlite_engine, get_engine, dispose_engines
+from src.models.schema import Base
+
+
+@pytest.fixture(autouse=True)
+def clean_engines():
+    """Ferme les moteurs mis en cache après chaque test."""
+    yield
+    dispose_engines()
+
+
+def read_pragma(engine, name):
+    """Lit la valeur courante d'un PRAGMA."""
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+class TestProfile:
+    """Tests du profil de réglages."""
+
+    def test_tuned_file_engine(self, tmp_path):
+        """Le profil est appliqué à chaque connexion d'une base fichier."""
+        engine = get_engine(str(tmp_path / "musique.db"))
+
+        assert read_pragma(engine, "journal_mode") == "wal"
+        assert read_pragma(engine, "synchronous") == 1  # NORMAL
+        assert read_pragma(engine, "busy_timeout") == SQLITE_PRAGMAS['busy_timeout']
+        assert read_pragma(engine, "cache_size") == SQLITE_PRAGMAS['cache_size']
+        assert read_pragma(engine, "temp_store") == 2  # MEMORY
+
+    def test_untuned_engine_keeps_defaults(self, tmp_path):
+        """Sans profil, SQLite garde ses réglages par défaut."""
+        engine = create_sqlite_engine(str(tmp_path / "brut.db"), tuned=False)
+        try:
+            assert read_pragma(engine, "journal_mode") == "delete"
+            assert read_pragma(engine, "synchronous") == 2  # FULL
+        finally:
+            engine.dispose()
+
+    def test_memory_engine_shares_connection(self):
+        """Une base en mémoire reste visible d'une connexion à l'autre."""
+        engine = get_engine(':memory:')
+        Base.metadata.create_all(engine)
+
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO artists (name, created_at, updated_at) "
+                              "VALUES ('Nina Simone', 0, 0)"))
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM artists")).scalar() == 1
+        assert read_pragma(engine, "busy_timeout") == SQLITE_PRAGMAS['busy_timeout']
+
+
+class TestEngineCache:
+    """Tests du partage des moteurs."""
+
+    def test_same_path_same_engine(self, tmp_path):
+        """Un chemin (relatif ou absolu) correspond à un seul moteur partagé."""
+        path = tmp_path / "musique.db"
+        assert get_engine(str(path)) is get_engine(str(path))
+        assert get_engine(str(path)) is not get_engine(str(path), tuned=False)
+        assert get_engine(str(path)) is not get_engine(str(tmp_path / "autre.db"))
+
+    def test_concurrent_get_engine(self, tmp_path):
+        """Des appels concurrents obtiennent le même moteur."""
+        path = str(tmp_path / "musique.db")
+        engines = []
+        threads = [threading.Thread(target=lambda: engines.append(get_engine(path))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(engine) for engine in engines}) == 1
+
+    def test_dispose_engines(self, tmp_path):
+        """dispose_engines() vide le cache."""
+        get_engine(str(tmp_path / "musique.db"))
+        dispose_engines()
+        assert database._engines == {}
+
+    def test_reader_during_write_transaction(self, tmp_path):
+        """En WAL, un lecteur n'est pas bloqué par une transaction d'écriture ouverte."""
+        engine = get_engine(str(tmp_path / "musique.db"))
+        Base.metadata.create_all(engine)
+
+        with engine.connect() as writer:
+            writer.execute(text("BEGIN IMMEDIATE"))
+            writer.execute(text("INSERT INTO artists (name, created_at, updated_at) "
+                                "VALUES ('Brian Eno', 0, 0)"))
+            with engine.connect() as reader:
+                assert reader.execute(text("SELECT count(*) FROM artists")).scalar() == 0
+            writer.execute(text("COMMIT"))
@@ -0,0 +1,255 @@
+"""
+Tests unitaires pour le journal d'historique en ajout seul (src/models/history_log.py)
+
+Vérifie l'ordre de lecture (chronologique et inverse), les remplacements et
+suppressions par clé, la récupération après une ligne tronquée, le
+compactage (rejouable sans effet), l'export identique à json.dump, la
+conversion depuis chk-roon.json et l'enregistrement des scripts de
+maintenance (journal si présent, sinon réécriture atomique du JSON).
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+from src.models.history_log import (
+    HistoryLog,
+    convert_json,
+    load_history_file,
+    save_history,
+    write_json_export,
+)
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_play(timestamp, artist="Nina Simone", title=None, album="Pastel Blues"):
+    """Écoute au format chk-roon.json."""
+    return {
+        'timestamp': timestamp,
+        'date': f"2026-01-{1 + timestamp % 28:02d} 12:00",
+        'artist': artist,
+        'title': title or f"Titre {timestamp}",
+        'album': album,
+        'loved': False,
+        'artist_spotify_image': None,
+        'album_spotify_image': "https://i.scdn.co/image/été.jpg",
+        'source': "roon",
+    }
+
+
+def write_history(path, plays, **meta):
+    """Historique JSON au format d'origine (plus récentes en premier)."""
+    data = dict(meta, tracks=plays)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    return data
+
+
+@pytest.fixture
+def log(tmp_path):
+    """Journal vide, petits segments, sans fsync."""
+    log = HistoryLog(str(tmp_path / "chk-roon.log"), segment_bytes=2048, compact_segments=0, durable=False)
+    log.create({'username': "patrick"})
+    return log
+
+
+class TestAppendAndRead:
+    """Tests des ajouts et de l'ordre de lecture."""
+
+    def test_read_order(self, log):
+        """Ordre chronologique, ou inverse, quel que soit l'ordre d'ajout."""
+        for timestamp in (30, 10, 20):
+            log.append(make_play(timestamp))
+        assert [p['timestamp'] for p in log.iter_plays()] == [10, 20, 30]
+        assert [p['timestamp'] for p in log.iter_plays(newest_first=True)] == [30, 20, 10]
+
+    def test_replace_and_delete(self, log):
+        """Même clé: la dernière version gagne; une suppression retire l'écoute."""
+        plays = [make_play(t) for t in range(5)]
+        log.extend(plays)
+        log.append(dict(plays[2], loved=True))
+        log.delete([plays[3]])
+        result = list(log.iter_plays())
+        assert [p['timestamp'] for p in result] == [0, 1, 2, 4]
+        assert result[2]['loved'] is True
+        assert log.count() == 4
+
+    def test_segments_rotate(self, log):
+        """Les ajouts ouvrent de nouveaux segments au-delà de segment_bytes."""
+        for timestamp in range(40):
+            log.append(make_play(timestamp))
+        assert len(log.segments()) > 1
+        assert [p['timestamp'] for p in log.iter_plays()] == list(range(40))
+
+    def test_append_requires_log(self, tmp_path):
+        """Ajout dans un journal non créé → FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            HistoryLog(str(tmp_path / "absent.log")).append(make_play(1))
+
+
+class TestCrashRecovery:
+    """Tests de la résistance aux écritures interrompues."""
+
+    def test_torn_line_ignored_then_repaired(self, log):
+        """Ligne incomplète: ignorée à la lecture, tronquée avant l'ajout suivant."""
+        log.extend(make_play(t) for t in range(3))
+        segment = log.segments()[-1]
+        with open(segment, 'ab') as f:
+            f.write(b'{"timestamp": 99, "artist": "Nina')
+
+        assert [p['timestamp'] for p in log.iter_plays()] == [0, 1, 2]
+        assert [p['timestamp'] for p in log.iter_plays(newest_first=True)] == [2, 1, 0]
+
+        reopened = HistoryLog(log.path, durable=False, compact_segments=0)
+        reopened.append(make_play(3))
+        assert [p['timestamp'] for p in reopened.iter_plays()] == [0, 1, 2, 3]
+        with open(segment, 'rb') as f:
+            assert [json.loads(line)['timestamp'] for line in f] == [0, 1, 2, 3]
+        assert reopened.skipped_lines == 0
+
+    def test_compaction_replay_is_idempotent(self, log):
+        """Segment rejoué après compactage (arrêt avant suppression): aucun effet."""
+        plays = [make_play(t) for t in range(6)]
+        log.extend(plays)
+        log.delete(plays[:2])
+        segment = log.segments()[0]
+        with open(segment, 'rb') as f:
+            content = f.read()
+
+        assert log.compact() == 4
+        assert log.segments() == []
+        with open(segment, 'wb') as f:
+            f.write(content)
+
+        assert [p['timestamp'] for p in log.iter_plays()] == [2, 3, 4, 5]
+        assert log.compact() == 4
+
+    def test_automatic_compaction(self, tmp_path):
+        """Au-delà de compact_segments, l'ajout compacte le journal."""
+        log = HistoryLog(str(tmp_path / "chk-roon.log"), segment_bytes=512, compact_segments=3, durable=False)
+        log.create()
+        for timestamp in range(30):
+            log.append(make_play(timestamp))
+        assert len(log.segments()) <= 3
+        assert [p['timestamp'] for p in log.iter_plays()] == list(range(30))
+
+
+class TestConversion:
+    """Tests de la conversion et de l'export au format JSON d'origine."""
+
+    def test_export_identical_to_json_dump(self, tmp_path):
+        """Conversion puis export: fichier identique octet pour octet."""
+        source = tmp_path / "chk-roon.json"
+        plays = [make_play(t, artist="Françoise Hardy") for t in range(20, 0, -1)]
+        plays.insert(5, make_play(15, title="Même seconde"))
+        write_history(source, plays, username="patrick")
+        expected = source.read_bytes()
+
+        log = convert_json(str(source))
+        assert log.meta == {'username': "patrick"}
+        exported = tmp_path / "export.json"
+        assert write_json_export(log, str(exported)) == 21
+        assert exported.read_bytes() == expected
+        assert load_history_file(str(source)) == json.loads(expected)
+
+    def test_export_empty(self, tmp_path):
+        """Journal vide: même rendu que json.dump d'une liste vide."""
+        source = tmp_path / "chk-roon.json"
+        write_history(source, [])
+        log = convert_json(str(source))
+        write_json_export(log, str(source))
+        assert source.read_text(encoding='utf-8') == json.dumps({'tracks': []}, indent=4)
+
+    def test_existing_log_kept(self, tmp_path):
+        """Journal déjà présent: pas de conversion sans overwrite."""
+        source = tmp_path / "chk-roon.json"
+        write_history(source, [make_play(1)])
+        convert_json(str(source)).append(make_play(2))
+        with pytest.raises(FileExistsError):
+            convert_json(str(source))
+        assert convert_json(str(source), overwrite=True).count() == 1
+
+    def test_cli(self, tmp_path, capsys):
+        """convert (refusé pour chk-roon.json), compact puis export avec le script de maintenance."""
+        spec = importlib.util.spec_from_file_location(
+            "convert_history_log", os.path.join(PROJECT_ROOT, "src", "maintenance", "convert-history-log.py")
+        )
+        cli = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cli)
+        roon = tmp_path / "chk-roon.json"
+        write_history(roon, [make_play(1)])
+        assert cli.main(['convert', '--json', str(roon)]) == 1
+        assert not HistoryLog.for_json(str(roon)).exists()
+
+        source = tmp_path / "chk-last-fm.json"
+        write_history(source, [make_play(t) for t in (3, 2, 1)])
+        expected = source.read_bytes()
+
+        assert cli.main(['compact', '--json', str(source)]) == 1
+        assert cli.main(['convert', '--json', str(source)]) == 0
+        assert cli.main(['convert', '--json', str(source)]) == 1
+        assert cli.main(['compact', '--json', str(source)]) == 0
+        assert cli.main(['export', '--json', str(source), '--output', str(tmp_path / "out.json")]) == 0
+        assert (tmp_path / "out.json").read_bytes() == expected
+        assert "3 écoutes exportées" in capsys.readouterr().out
+
+
+class TestSaveHistory:
+    """Tests de l'enregistrement utilisé par les scripts de maintenance."""
+
+    def test_json_rewritten_without_log(self, tmp_path):
+        """Sans journal: réécriture atomique du JSON complet."""
+        source = tmp_path / "chk-roon.json"
+        data = write_history(source, [make_play(2), make_play(1)])
+        data['tracks'].pop()
+        assert save_history(str(source), data, deleted=[make_play(1)]) == 'json'
+        assert load_history_file(str(source)) == data
+        assert not os.path.exists(f"{source}.tmp")
+
+    def test_log_receives_changes_only(self, tmp_path):
+        """Avec journal: modifications ajoutées au journal, JSON réexporté."""
+        source = tmp_path / "chk-roon.json"
+        write_history(source, [make_play(t) for t in (3, 2, 1)])
+        before = source.read_bytes()
+        convert_json(str(source))
+
+        data = load_history_file(str(source))
+        original = dict(data['tracks'][0])
+        data['tracks'][0]['artist'] = "Nina Simone & Orchestra"
+        assert save_history(str(source), data, updated=[data['tracks'][0]], deleted=[original, data['tracks'][2]]) == 'log'
+
+        reloaded = load_history_file(str(source))
+        assert [(p['timestamp'], p['artist']) for p in reloaded['tracks']] == [
+            (3, "Nina Simone & Orchestra"), (2, "Nina Simone")
+        ]
+        # Lecteurs du fichier complet (GUI, migration): même contenu que le journal
+        assert source.read_bytes() != before
+        with open(source, encoding='utf-8') as f:
+            assert json.load(f) == reloaded
+
+    def test_remove_duplicates_after_new_play(self, tmp_path):
+        """Une écoute ajoutée entre détection et suppression n'est pas retirée."""
+        spec = importlib.util.spec_from_file_location(
+            "remove_consecutive_duplicates",
+            os.path.join(PROJECT_ROOT, "src", "maintenance", "remove-consecutive-duplicates.py")
+        )
+        cli = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cli)
+        source = tmp_path / "chk-roon.json"
+        plays = [make_play(3, title="Sinnerman"), make_play(2, title="Sinnerman"), make_play(1)]
+        write_history(source, plays)
+        _, duplicates = cli.find_consecutive_duplicates(plays)
+        assert [dup['index'] for dup in duplicates] == [1]
+
+        # Le tracker ajoute une écoute en tête: les indices sont décalés
+        write_history(source, [make_play(4)] + plays)
+        assert cli.save_tracks({}, duplicates, str(source)) is True
+        assert [p['timestamp'] for p in load_history_file(str(source))['tracks']] == [4, 3, 2, 1]
@@ -0,0 +1,298 @@
+"""
+Tests unitaires pour l'historique en colonnes (src/models/history_store.py)
+
+Vérifie la reconstruction des écoutes au format chk-roon.json, les filtres
+vectorisés (dates, heures et jours locaux, source, favoris), l'ordre des
+pistes les plus écoutées (identique à Counter.most_common) et le gain mémoire
+par rapport à une liste de dictionnaires.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import gc
+import json
+import os
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.models.history_store import (
+    ColumnarHistory,
+    as_history,
+    enable_history_cache,
+    first_seen_counts,
+    history_version,
+    load_history,
+    local_time_offsets,
+)
+
+
+BASE_TIMESTAMP = 1769000000
+
+
+def make_play(offset, artist="Nina Simone", title="Sinnerman", album="Pastel Blues",
+              source='roon', loved=False, **extra):
+    """Écoute au format chk-roon.json."""
+    timestamp = BASE_TIMESTAMP + offset
+    play = {
+        'timestamp': timestamp,
+        'date': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M'),
+        'artist': artist,
+        'title': title,
+        'album': album,
+        'loved': loved,
+        'source': source,
+        'artist_spotify_image': None,
+        'album_spotify_image': None,
+        'album_lastfm_image': None,
+    }
+    play.update(extra)
+    return play
+
+
+@pytest.fixture
+def plays():
+    """Écoutes variées (plus récentes en premier, comme chk-roon.json)."""
+    return [
+        make_play(7200, title="Feeling Good", album="I Put a Spell on You", loved=True,
+                  album_spotify_image="https://i.scdn.co/image/spell"),
+        make_play(3600, artist="Miles Davis", title="So What", album="Kind of Blue", source='lastfm',
+                  ai_info="Album modal de 1959."),
+        make_play(1800),
+        make_play(0, artist="Miles Davis", title="So What", album="Kind of Blue", source='lastfm'),
+        make_play(-86400 * 3, album=None),
+    ]
+
+
+class TestColumnarHistory:
+    """Tests de la construction et de l'interface séquence."""
+
+    def test_round_trip(self, plays):
+        """Les écoutes reconstruites sont identiques aux originales."""
+        history = ColumnarHistory.from_plays(plays)
+        assert len(history) == len(plays)
+        for original, rebuilt in zip(plays, history):
+            expected = dict(original, album=original['album'] or '')
+            assert rebuilt == expected
+
+    def test_sequence_access(self, plays):
+        """Index négatifs, tranches et comparaison avec une liste."""
+        history = ColumnarHistory.from_plays(plays)
+        assert history[-1]['timestamp'] == plays[-1]['timestamp']
+        assert [p['title'] for p in history[:2]] == ["Feeling Good", "So What"]
+        assert history[:2] == plays[:2]
+        with pytest.raises(IndexError):
+            history[len(plays)]
+
+    def test_empty(self):
+        """Un historique vide est faux et égal à une liste vide."""
+        history = ColumnarHistory.from_plays([])
+        assert not history
+        assert history == []
+        assert len(history.hours) == 0
+
+    def test_date_only_and_invalid_plays(self):
+        """Date seule interprétée en heure locale; écoutes sans date ignorées."""
+        history = ColumnarHistory.from_plays([
+            {'date': "2026-01-21 18:30", 'artist': "A", 'title': "T", 'album': "B"},
+            {'artist': "Sans date"},
+            {'date': "invalide", 'artist': "C"},
+        ])
+        assert len(history) == 1
+        assert history[0]['date'] == "2026-01-21 18:30"
+        assert int(history.hours[0]) == 18
+
+    def test_interning(self, plays):
+        """Les chaînes répétées ne sont stockées qu'une fois."""
+        history = ColumnarHistory.from_plays(plays)
+        assert history.artists.values.count("Miles Davis") == 1
+        assert history.artist_ids[1] == history.artist_ids[3]
+        assert history.track_ids[1] == history.track_ids[3]
+        assert history.track_ids[2] != history.track_ids[0]
+
+    def test_as_history(self, plays):
+        """as_history ne recopie pas un historique déjà en colonnes."""
+        history = as_history(plays)
+        assert as_history(history) is history
+
+
+class TestFilters:
+    """Tests des filtres vectorisés."""
+
+    def test_between(self, plays):
+        """Plage [start, end[ sur les timestamps."""
+        history = ColumnarHistory.from_plays(plays)
+        mask = history.between(start=BASE_TIMESTAMP, end=BASE_TIMESTAMP + 3600)
+        assert mask.tolist() == [False, False, True, True, False]
+        assert history.between().all()
+
+    def test_local_time_columns(self):
+        """Heures, jours et jours de semaine identiques à datetime.fromtimestamp."""
+        timestamps = np.arange(BASE_TIMESTAMP - 86400 * 400, BASE_TIMESTAMP, 3547 * 7, dtype=np.int64)
+        history = ColumnarHistory.from_plays(
+            {'timestamp': int(ts), 'artist': "A", 'title': "T", 'album': "B"} for ts in timestamps
+        )
+        moments = [datetime.fromtimestamp(int(ts)) for ts in timestamps]
+        assert history.hours.tolist() == [m.hour for m in moments]
+        assert history.weekdays.tolist() == [m.weekday() for m in moments]
+        days = history.local_days.astype('datetime64[D]').astype(str).tolist()
+        assert days == [m.strftime('%Y-%m-%d') for m in moments]
+
+    def test_offsets_match_localtime(self):
+        """Les décalages horaires suivent time.localtime, changements d'heure compris."""
+        timestamps = np.arange(1711846800 - 7200, 1711846800 + 7200, 600, dtype=np.int64)
+        offsets = local_time_offsets(timestamps)
+        for ts, offset in zip(timestamps, offsets):
+            moment = datetime.fromtimestamp(int(ts))
+            expected = int((moment - datetime(1970, 1, 1)).total_seconds()) - int(ts)
+            assert offset == expected
+
+    def test_hour_and_weekday_masks(self, plays):
+        """Masques horaires et jours de semaine."""
+        history = ColumnarHistory.from_plays(plays)
+        hours = [datetime.fromtimestamp(p['timestamp']).hour for p in plays]
+        assert history.hour_mask([hours[0]]).tolist() == [h == hours[0] for h in hours]
+        weekdays = [datetime.fromtimestamp(p['timestamp']).weekday() for p in plays]
+        assert history.weekday_mask([5, 6]).tolist() == [w >= 5 for w in weekdays]
+
+    def test_source_and_loved(self, plays):
+        """Indicateurs compactés (favori, source)."""
+        history = ColumnarHistory.from_plays(plays)
+        assert history.loved.tolist() == [True, False, False, False, False]
+        assert history.source_mask('lastfm').tolist() == [False, True, False, True, False]
+        assert not history.source_mask('inconnue').any()
+
+    def test_take_keeps_local_columns(self, plays):
+        """Un sous-ensemble conserve les colonnes locales déjà calculées."""
+        history = ColumnarHistory.from_plays(plays)
+        subset = history.take(history.source_mask('roon'))
+        assert subset.hours.tolist() == history.hours[history.source_mask('roon')].tolist()
+        assert [p['artist'] for p in subset] == ["Nina Simone"] * 3
+
+    def test_sorted_by_time(self, plays):
+        """Tri chronologique croissant."""
+        history = ColumnarHistory.from_plays(plays).sorted_by_time()
+        assert history.timestamps.tolist() == sorted(p['timestamp'] for p in plays)
+
+
+class TestCounting:
+    """Tests des comptages dans l'ordre de Counter."""
+
+    def test_first_seen_counts(self):
+        """Valeurs dans l'ordre de première apparition."""
+        values, first, counts = first_seen_counts(np.array([5, 3, 5, 9, 3, 5]))
+        assert values.tolist() == [5, 3, 9]
+        assert first.tolist() == [0, 1, 3]
+        assert counts.tolist() == [3, 2, 1]
+
+    def test_most_frequent_tracks_matches_counter(self):
+        """Même ordre que Counter.most_common, égalités comprises."""
+        rng = np.random.default_rng(7)
+        plays = [
+            make_play(int(i) * 60, artist=f"Artiste {a}", title=f"Titre {t}", album=f"Album {a}")
+            for i, (a, t) in enumerate(zip(rng.integers(0, 5, 400), rng.integers(0, 30, 400)))
+        ]
+        history = ColumnarHistory.from_plays(plays)
+        mask = history.hour_mask(range(12, 24))
+
+        counter = Counter(
+            f"{p['artist']}||{p['title']}||{p['album']}"
+            for p, keep in zip(plays, mask) if keep
+        )
+        expected = [key for key, _ in counter.most_common(10)]
+        result = [
+            f"{p['artist']}||{p['title']}||{p['album']}"
+            for p in history.to_dicts(history.most_frequent_tracks(mask, 10))
+        ]
+        assert result == expected
+
+
+class TestLoadHistory:
+    """Tests du chargement depuis JSON."""
+
+    def test_load_json(self, plays, tmp_path):
+        """Chargement de chk-roon.json avec filtre de début."""
+        json_path = tmp_path / "chk-roon.json"
+        json_path.write_text(json.dumps({'tracks': plays}), encoding='utf-8')
+        history = load_history(db_path=str(tmp_path / "absente.db"), json_path=str(json_path),
+                               start=BASE_TIMESTAMP)
+        assert len(history) == 4
+
+    def test_missing_json(self, tmp_path):
+        """Fichier JSON absent et base non migrée → FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            load_history(db_path=str(tmp_path / "absente.db"), json_path=str(tmp_path / "absent.json"))
+
+    def test_cache_invalidated_by_change(self, plays, tmp_path):
+        """Cache activé: même objet tant que le fichier ne change pas, rechargé ensuite."""
+        json_path = tmp_path / "chk-roon.json"
+        json_path.write_text(json.dumps({'tracks': plays}), encoding='utf-8')
+        kwargs = dict(db_path=str(tmp_path / "absente.db"), json_path=str(json_path))
+        enable_history_cache()
+        try:
+            first = load_history(**kwargs)
+            assert load_history(**kwargs) is first
+            json_path.write_text(json.dumps({'tracks': plays[:2]}), encoding='utf-8')
+            assert len(load_history(**kwargs)) == 2
+        finally:
+            enable_history_cache(False)
+        assert load_history(**kwargs) is not load_history(**kwargs)
+
+
+    def test_history_version(self, tmp_path):
+        """Empreinte modifiée par une réécriture de même taille et par les autres sources de la base."""
+        history_dir = tmp_path / "history"
+        history_dir.mkdir()
+        roon = history_dir / "chk-roon.json"
+        roon.write_text('{"tracks": [{"album": "Low"}]}', encoding='utf-8')
+        db_path = str(tmp_path / "musique.db")
+        before = history_version(db_path, [str(roon)])
+
+        stat = roon.stat()
+        roon.write_text('{"tracks": [{"album": "Lox"}]}', encoding='utf-8')
+        os.utime(roon, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        after_edit = history_version(db_path, [str(roon)])
+        assert after_edit != before
+
+        (history_dir / "chk-last-fm.json").write_text('{"tracks": []}', encoding='utf-8')
+        assert history_version(db_path, [str(roon)]) != after_edit
+
+
+class TestMemory:
+    """Test de l'empreinte mémoire."""
+
+    def test_at_least_five_times_smaller(self):
+        """L'historique en colonnes occupe au moins 5x moins qu'une liste de dictionnaires."""
+        plays = [
+            make_play(
+                i * 180,
+                artist=f"Artiste {i % 300}",
+                title=f"Titre de la piste {i % 4000}",
+                album=f"Album {(i % 4000) % 800}",
+                source=('roon', 'lastfm')[i % 2],
+                artist_spotify_image=f"https://i.scdn.co/image/{i % 300:040d}",
+                album_spotify_image=f"https://i.scdn.co/image/{(i % 4000) % 800:040d}",
+            )
+            for i in range(20000)
+        ]
+        text = json.dumps({'tracks': plays})
+        del plays
+
+        def retained(loader):
+            gc.collect()
+            tracemalloc.start()
+            result = loader()
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return result, current
+
+        _, dicts_bytes = retained(lambda: json.loads(text)['tracks'])
+        history, columns_bytes = retained(lambda: ColumnarHistory.from_plays(json.loads(text)['tracks']))
+        assert len(history) == 20000
+        assert dicts_bytes >= 5 * columns_bytes
@@ -0,0 +1,169 @@
+"""
+Tests unitaires pour la lecture et l'écriture en continu (src/models/json_stream.py)
+
+Vérifie que les écoutes et albums lus au fil du fichier sont identiques à
+json.load (quelle que soit la taille des blocs), que les fichiers tronqués
+sont signalés, que l'écriture est identique octet pour octet à json.dump,
+et que la mémoire reste bornée pendant un parcours filtré.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+from src.models.json_stream import (
+    iter_collection,
+    iter_json_array,
+    iter_tracks,
+    read_json_meta,
+    write_json_stream,
+)
+
+
+def make_play(i):
+    """Écoute au format chk-roon.json (accents, valeurs imbriquées, nombres variés)."""
+    return {
+        'timestamp': 1769000000 - i * 180,
+        'date': "2026-01-21 12:00",
+        'artist': f"Françoise Hardy {i % 13}",
+        'title': f"Tous les garçons et les filles \"{i}\"",
+        'album': "Été 68 — Remastered",
+        'loved': i % 5 == 0,
+        'album_spotify_image': None if i % 3 else f"https://i.scdn.co/image/{i:040d}",
+        'ai_info': {'genres': ["yé-yé", "pop"], 'score': i / 7},
+        'source': "roon",
+    }
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+@pytest.fixture
+def history(tmp_path):
+    """chk-roon.json avec des champs avant et après 'tracks'."""
+    path = tmp_path / "chk-roon.json"
+    data = {'username': "patrick", 'tracks': [make_play(i) for i in range(200)], 'stats': {'total': 200}}
+    write_json(path, data)
+    return path, data
+
+
+class TestReading:
+    """Tests de la lecture en continu."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 65536])
+    def test_same_as_json_load(self, history, chunk_size):
+        """Mêmes écoutes, même ordre, quelle que soit la taille des blocs."""
+        path, data = history
+        assert list(iter_tracks(str(path), chunk_size=chunk_size)) == data['tracks']
+
+    def test_meta_without_tracks(self, history):
+        """Champs hors 'tracks', dans l'ordre du fichier."""
+        path, _ = history
+        assert read_json_meta(str(path), chunk_size=50) == {'username': "patrick", 'stats': {'total': 200}}
+
+    def test_top_level_list(self, tmp_path):
+        """Collection (liste de premier niveau) et nombres coupés entre deux blocs."""
+        albums = [{'release_id': i, 'Titre': f"Album {i}"} for i in range(50)]
+        write_json(tmp_path / "discogs-collection.json", albums)
+        numbers = tmp_path / "numbers.json"
+        numbers.write_text("[123456, -7.5e3, true, null]", encoding='utf-8')
+
+        assert list(iter_collection(str(tmp_path / "discogs-collection.json"), chunk_size=5)) == albums
+        assert list(iter_json_array(str(numbers), chunk_size=3)) == [123456, -7500.0, True, None]
+        assert read_json_meta(str(numbers)) == {}
+
+    def test_missing_or_empty_list(self, tmp_path):
+        """Objet sans 'tracks' ou liste vide: aucun élément."""
+        write_json(tmp_path / "a.json", {'username': "patrick"})
+        write_json(tmp_path / "b.json", {'tracks': []})
+        assert list(iter_tracks(str(tmp_path / "a.json"))) == []
+        assert list(iter_tracks(str(tmp_path / "b.json"))) == []
+
+    def test_truncated_file(self, history):
+        """Fichier tronqué: les écoutes complètes sont rendues, puis JSONDecodeError."""
+        path, data = history
+        content = path.read_text(encoding='utf-8')
+        path.write_text(content[:len(content) // 2], encoding='utf-8')
+
+        read = []
+        with pytest.raises(json.JSONDecodeError):
+            for play in iter_tracks(str(path), chunk_size=256):
+                read.append(play)
+        assert 0 < len(read) < len(data['tracks'])
+        assert read == data['tracks'][:len(read)]
+
+    def test_trailing_garbage(self, tmp_path):
+        """Données après la valeur JSON → JSONDecodeError."""
+        path = tmp_path / "bad.json"
+        path.write_text('{"tracks": [1]} x', encoding='utf-8')
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_tracks(str(path)))
+
+    def test_bounded_memory(self, tmp_path):
+        """Parcours filtré: pic mémoire bien inférieur à celui de json.load."""
+        path = tmp_path / "chk-roon.json"
+        write_json(path, {'tracks': [make_play(i) for i in range(20000)]})
+
+        def peak(function):
+            tracemalloc.start()
+            function()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak_bytes
+
+        def load():
+            with open(path, 'r', encoding='utf-8') as f:
+                return sum(1 for t in json.load(f)['tracks'] if t['loved'])
+
+        streamed = peak(lambda: sum(1 for t in iter_tracks(str(path)) if t['loved']))
+        assert streamed * 10 < peak(load)
+
+
+class TestWriting:
+    """Tests de l'écriture en continu."""
+
+    def test_identical_to_json_dump(self, history, tmp_path):
+        """Objet avec 'tracks' au milieu, depuis un itérateur: mêmes octets."""
+        path, data = history
+        output = tmp_path / "out.json"
+        streamed = dict(data, tracks=iter_tracks(str(path)))
+        assert write_json_stream(str(output), streamed) == 200
+        assert output.read_bytes() == path.read_bytes()
+
+    @pytest.mark.parametrize("data", [{'tracks': []}, {}, [], [{'release_id': 1}, 2, "trois"]])
+    def test_edge_cases(self, tmp_path, data):
+        """Listes vides, objet vide et liste de premier niveau."""
+        output = tmp_path / "out.json"
+        write_json_stream(str(output), data)
+        assert output.read_text(encoding='utf-8') == json.dumps(data, indent=4, ensure_ascii=False)
+
+    def test_rewrite_in_place(self, history):
+        """Réécriture filtrée d'un fichier depuis sa propre lecture."""
+        path, data = history
+        meta = read_json_meta(str(path))
+        kept = write_json_stream(str(path), dict(meta, tracks=(t for t in iter_tracks(str(path)) if t['loved'])))
+
+        expected = dict(data, tracks=[t for t in data['tracks'] if t['loved']])
+        assert kept == 40
+        assert json.loads(path.read_text(encoding='utf-8')) == expected
+
+    def test_failure_keeps_file(self, history):
+        """Erreur pendant l'écriture: fichier d'origine intact, pas de fichier temporaire."""
+        path, _ = history
+        before = path.read_bytes()
+
+        def failing():
+            yield make_play(1)
+            raise OSError("disque plein")
+
+        with pytest.raises(OSError):
+            write_json_stream(str(path), {'tracks': failing()})
+        assert path.read_bytes() == before
+        assert not path.with_name("chk-roon.json.tmp").exists()
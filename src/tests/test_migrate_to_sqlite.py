@@ -0,0 +1,399 @@
+"""
+Tests unitaires pour le script de migration migrate_to_sqlite.py
+
+Ce module teste l'import en masse des fichiers JSON (collection Discogs,
+historique Roon) vers SQLite: tables de correspondance d'identifiants,
+insertions par lots, déduplication et idempotence.
+
+Version: 1.0.0
+Date: 27 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import json
+import os
+import sys
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Ajouter le répertoire racine au path
+PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
+sys.path.insert(0, PROJECT_ROOT)
+
+spec = importlib.util.spec_from_file_location(
+    "migrate_to_sqlite",
+    os.path.join(PROJECT_ROOT, "src", "maintenance", "migrate_to_sqlite.py")
+)
+migrate = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(migrate)
+
+from src.models.schema import (
+    Base,
+    Artist,
+    Album,
+    Track,
+    ListeningHistory,
+    Image,
+    Metadata,
+    SyncState,
+    album_artist,
+)
+
+
+@pytest.fixture
+def session():
+    """Session sur une base SQLite en mémoire."""
+    engine = create_engine('sqlite:///:memory:', echo=False)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def json_files(tmp_path):
+    """Crée des fichiers JSON minimaux (Discogs, BOF, Roon)."""
+    discogs = [
+        {
+            "release_id": 101,
+            "Titre": "Blade Runner",
+            "Artiste": ["Vangelis"],
+            "Année": 1994,
+            "Labels": ["Atlantic"],
+            "Support": "CD",
+            "Pochette": "https://discogs/cover-101.jpg",
+            "Resume": "Bande originale culte.",
+            "Spotify_URL": "https://open.spotify.com/album/xyz",
+            "Spotify_Cover_URL": "https://spotify/cover-101.jpg",
+        },
+        {
+            "release_id": 102,
+            "Titre": "Nightclubbing",
+            "Artiste": ["Grace Jones"],
+            "Année": "1981",
+            "Support": "Vinyle",
+            "Pochette": "",
+            "Resume": "",
+        },
+    ]
+    soundtracks = [
+        {"film_title": "Blade Runner", "album_title": "blade runner", "year": "1982", "director": "Ridley Scott"},
+    ]
+    roon = {
+        "tracks": [
+            {
+                "timestamp": 1700000000, "date": "2023-11-14 23:13", "artist": "Vangelis",
+                "title": "Main Titles", "album": "Blade Runner", "loved": True,
+                "artist_spotify_image": "https://spotify/vangelis.jpg",
+                "album_spotify_image": "https://spotify/cover-101.jpg",
+                "album_lastfm_image": "https://lastfm/br.jpg", "source": "roon",
+                "ai_info": "Composée en 1982.",
+            },
+            {
+                "timestamp": 1700000300, "artist": "Vangelis", "title": "Main Titles",
+                "album": "Blade Runner", "loved": False, "source": "roon",
+            },
+            # Doublon exact (même piste, même timestamp)
+            {
+                "timestamp": 1700000300, "artist": "Vangelis", "title": "Main Titles",
+                "album": "Blade Runner", "loved": False, "source": "roon",
+            },
+            {
+                "timestamp": 1700000600, "date": "2023-11-14 23:23", "artist": "Kraftwerk",
+                "title": "Computer Love", "album": "Computer World", "loved": False,
+                "source": "lastfm",
+            },
+        ]
+    }
+
+    paths = {
+        'discogs': tmp_path / "discogs-collection.json",
+        'soundtrack': tmp_path / "soundtrack.json",
+        'roon': tmp_path / "chk-roon.json",
+    }
+    paths['discogs'].write_text(json.dumps(discogs, ensure_ascii=False), encoding='utf-8')
+    paths['soundtrack'].write_text(json.dumps(soundtracks), encoding='utf-8')
+    paths['roon'].write_text(json.dumps(roon), encoding='utf-8')
+    return {key: str(value) for key, value in paths.items()}
+
+
+def run_full_migration(session, json_files, dry_run=False):
+    """Exécute les deux phases de migration."""
+    discogs_stats = migrate.migrate_discogs_collection(
+        session, dry_run, json_path=json_files['discogs'], soundtrack_path=json_files['soundtrack']
+    )
+    roon_stats = migrate.migrate_roon_history(session, dry_run, json_path=json_files['roon'])
+    return discogs_stats, roon_stats
+
+
+class TestDiscogsMigration:
+    """Tests de la phase 1 (collection Discogs)."""
+
+    def test_albums_artists_and_links(self, session, json_files):
+        """Les albums, artistes et liens album_artist sont créés."""
+        stats = migrate.migrate_discogs_collection(
+            session, json_path=json_files['discogs'], soundtrack_path=json_files['soundtrack']
+        )
+
+        assert stats['albums'] == 2
+        assert stats['artists'] == 2
+        assert stats['album_artists'] == 2
+
+        album = session.query(Album).filter_by(discogs_id='101').one()
+        assert album.title == "Blade Runner"
+        assert album.year == 1994
+        assert album.discogs_url == "https://www.discogs.com/release/101"
+        assert [artist.name for artist in album.artists] == ["Vangelis"]
+        assert session.query(Album).filter_by(discogs_id='102').one().year == 1981
+
+    def test_images_and_metadata(self, session, json_files):
+        """Pochettes Discogs/Spotify et métadonnées BOF sont importées."""
+        migrate.migrate_discogs_collection(
+            session, json_path=json_files['discogs'], soundtrack_path=json_files['soundtrack']
+        )
+
+        album = session.query(Album).filter_by(discogs_id='101').one()
+        sources = sorted(image.source for image in album.images)
+        assert sources == ['discogs', 'spotify']
+
+        metadata = album.album_metadata
+        assert metadata.resume == "Bande originale culte."
+        assert metadata.is_soundtrack is True
+        assert metadata.film_year == 1982
+        assert metadata.film_director == "Ridley Scott"
+
+        # Pas de résumé ni de BOF → pas de ligne metadata
+        assert session.query(Metadata).count() == 1
+
+    def test_rerun_is_idempotent(self, session, json_files):
+        """Une seconde exécution n'importe aucun doublon."""
+        migrate.migrate_discogs_collection(
+            session, json_path=json_files['discogs'], soundtrack_path=json_files['soundtrack']
+        )
+        stats = migrate.migrate_discogs_collection(
+            session, json_path=json_files['discogs'], soundtrack_path=json_files['soundtrack']
+        )
+
+        assert stats['albums'] == 0
+        assert stats['rows'] == 0
+        assert session.query(Album).count() == 2
+
+    def test_missing_file(self, session, tmp_path):
+        """Un fichier absent retourne des statistiques vides."""
+        stats = migrate.migrate_discogs_collection(session, json_path=str(tmp_path / "absent.json"))
+        assert stats == {}
+
+
+class TestRoonMigration:
+    """Tests de la phase 2 (historique Roon)."""
+
+    def test_history_reuses_collection_albums(self, session, json_files):
+        """Les écoutes sont rattachées aux albums déjà importés depuis Discogs."""
+        _, stats = run_full_migration(session, json_files)
+
+        assert session.query(Album).count() == 3  # 2 Discogs + Computer World
+        assert stats['albums'] == 1
+        assert stats['tracks'] == 2
+        assert stats['listening_history'] == 3  # doublon exact ignoré
+
+        track = session.query(Track).filter_by(title="Main Titles").one()
+        assert track.album.discogs_id == '101'
+        assert len(track.listening_history) == 2
+
+    def test_history_fields(self, session, json_files):
+        """Date, source et loved sont conservés; la date manquante est calculée."""
+        run_full_migration(session, json_files)
+
+        plays = session.query(ListeningHistory).order_by(ListeningHistory.timestamp).all()
+        assert plays[0].loved is True
+        assert plays[0].date == "2023-11-14 23:13"
+        assert plays[1].date  # calculée depuis le timestamp
+        assert plays[2].source == "lastfm"
+
+    def test_history_denormalized_keys(self, session, json_files):
+        """Chaque écoute porte l'artiste et l'album de sa piste."""
+        run_full_migration(session, json_files)
+
+        for play in session.query(ListeningHistory).all():
+            assert play.artist_id == play.track.artist_id
+            assert play.album_id == play.track.album_id
+
+    def test_backfill_and_obsolete_index(self, tmp_path, json_files):
+        """Une base existante est complétée: clés d'écoute renseignées, ancien index supprimé."""
+        _, db_session = migrate.create_database(str(tmp_path / "musique.db"))
+        run_full_migration(db_session, json_files)
+        db_session.execute(text("UPDATE listening_history SET artist_id = NULL, album_id = NULL"))
+        db_session.execute(text("CREATE INDEX ix_listening_history_source ON listening_history (source)"))
+        db_session.commit()
+
+        migrate.create_database(str(tmp_path / "musique.db"))[1].close()
+
+        assert db_session.query(ListeningHistory).filter(ListeningHistory.album_id.is_(None)).count() == 0
+        indexes = db_session.execute(text("PRAGMA index_list(listening_history)")).fetchall()
+        assert 'ix_listening_history_source' not in {row[1] for row in indexes}
+        db_session.close()
+
+    def test_images_and_ai_info(self, session, json_files):
+        """Images artiste/album dédupliquées et ai_info complétée."""
+        run_full_migration(session, json_files)
+
+        vangelis = session.query(Artist).filter_by(name="Vangelis").one()
+        assert [image.image_type for image in vangelis.images] == ['artist_image']
+
+        album = session.query(Album).filter_by(discogs_id='101').one()
+        # discogs + spotify (Phase 1) + lastfm (Phase 2), pas de doublon spotify
+        assert sorted(image.source for image in album.images) == ['discogs', 'lastfm', 'spotify']
+        assert album.album_metadata.ai_info == "Composée en 1982."
+        assert album.album_metadata.resume == "Bande originale culte."
+
+    def test_rerun_is_idempotent(self, session, json_files):
+        """Une seconde exécution ne duplique ni pistes ni écoutes."""
+        run_full_migration(session, json_files)
+        _, stats = run_full_migration(session, json_files)
+
+        assert stats['tracks'] == 0
+        assert stats['images'] == 0
+        assert session.query(ListeningHistory).count() == 3
+        assert session.query(album_artist).count() == 3
+
+    def test_reads_history_log(self, session, json_files):
+        """Historique converti en journal: les modifications du journal sont migrées."""
+        from src.models.history_log import HistoryLog, convert_json, load_history_file
+        convert_json(json_files['roon'])
+        newest = load_history_file(json_files['roon'])['tracks'][0]
+        HistoryLog.for_json(json_files['roon']).append(dict(newest, timestamp=newest['timestamp'] + 600))
+
+        _, stats = run_full_migration(session, json_files)
+
+        assert stats['listening_history'] == 4
+        assert session.query(ListeningHistory).count() == 4
+
+    def test_small_batches(self, session, json_files, monkeypatch):
+        """Les insertions par lots couvrent toutes les lignes."""
+        monkeypatch.setattr(migrate, 'BATCH_SIZE', 1)
+        run_full_migration(session, json_files)
+
+        assert session.query(ListeningHistory).count() == 3
+        assert session.query(Track).count() == 2
+
+
+def append_plays(path, plays):
+    """Ajoute des écoutes au fichier chk-roon.json de test."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['tracks'].extend(plays)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+class TestIncrementalSync:
+    """Tests de la synchronisation incrémentale (high-water mark)."""
+
+    def test_high_water_mark_recorded_per_source(self, session, json_files):
+        """Le dernier timestamp importé est mémorisé pour chaque source."""
+        run_full_migration(session, json_files)
+
+        marks = migrate.load_high_water_marks(session)
+        assert marks == {'roon': 1700000300, 'lastfm': 1700000600}
+        assert session.get(SyncState, 'roon').rows_imported == 2
+
+    def test_only_newer_plays_are_processed(self, session, json_files):
+        """Une seconde synchronisation ne traite que les nouvelles écoutes."""
+        run_full_migration(session, json_files)
+        append_plays(json_files['roon'], [
+            {"timestamp": 1700000900, "artist": "Vangelis", "title": "Love Theme",
+             "album": "Blade Runner", "source": "roon"},
+        ])
+
+        stats = migrate.migrate_roon_history(session, json_path=json_files['roon'])
+
+        assert stats['listening_history'] == 1
+        assert stats['skipped'] == 4
+        assert stats['tracks'] == 1
+        assert session.query(ListeningHistory).count() == 4
+        assert migrate.load_high_water_marks(session)['roon'] == 1700000900
+
+    def test_marks_are_independent_per_source(self, session, json_files):
+        """Une écoute lastfm plus ancienne que le marqueur roon reste importée."""
+        migrate.migrate_roon_history(session, json_path=json_files['roon'])
+        append_plays(json_files['roon'], [
+            {"timestamp": 1700000650, "artist": "Kraftwerk", "title": "Numbers",
+             "album": "Computer World", "source": "lastfm"},
+            {"timestamp": 1700000100, "artist": "Vangelis", "title": "Late", "album": "Blade Runner",
+             "source": "roon"},
+        ])
+
+        stats = migrate.migrate_roon_history(session, json_path=json_files['roon'])
+
+        assert stats['listening_history'] == 1
+        assert session.query(Track).filter_by(title="Late").count() == 0
+
+    def test_full_reimport_is_idempotent_upsert(self, session, json_files):
+        """--full retraite tout l'historique et met à jour loved sans doublon."""
+        run_full_migration(session, json_files)
+        with open(json_files['roon'], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['tracks'][3]['loved'] = True
+        with open(json_files['roon'], 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        stats = migrate.migrate_roon_history(session, json_path=json_files['roon'], full=True)
+
+        assert stats['skipped'] == 0
+        assert session.query(ListeningHistory).count() == 3
+        computer_love = session.query(ListeningHistory).filter_by(timestamp=1700000600).one()
+        assert computer_love.loved is True
+
+    def test_since_overrides_marks(self, session, json_files):
+        """--since ne traite que les écoutes à partir du timestamp donné."""
+        stats = migrate.migrate_roon_history(session, json_path=json_files['roon'], since=1700000300)
+
+        assert stats['listening_history'] == 2
+        assert stats['skipped'] == 1
+        assert migrate.load_high_water_marks(session)['roon'] == 1700000300
+
+    def test_marks_never_move_backwards(self, session, json_files):
+        """Un import --since plus ancien ne fait pas reculer le marqueur."""
+        migrate.migrate_roon_history(session, json_path=json_files['roon'])
+        migrate.migrate_roon_history(session, json_path=json_files['roon'], since=1700000000)
+
+        assert migrate.load_high_water_marks(session)['lastfm'] == 1700000600
+
+    def test_parse_since_formats(self):
+        """--since accepte un timestamp ou une date."""
+        assert migrate.parse_since("1700000000") == 1700000000
+        assert migrate.parse_since("2023-11-14") < migrate.parse_since("2023-11-14 23:13")
+        with pytest.raises(migrate.argparse.ArgumentTypeError):
+            migrate.parse_since("hier")
+
+
+class TestDryRunAndReport:
+    """Tests du mode simulation et du rapport de débit."""
+
+    def test_dry_run_leaves_database_empty(self, session, json_files):
+        """En dry-run, les statistiques sont calculées mais rien n'est conservé."""
+        discogs_stats, roon_stats = run_full_migration(session, json_files, dry_run=True)
+        session.rollback()
+
+        assert discogs_stats['albums'] == 2
+        assert roon_stats['listening_history'] == 3
+        assert session.query(Album).count() == 0
+        assert session.query(ListeningHistory).count() == 0
+
+    def test_throughput_stats(self, session, json_files, capsys):
+        """Chaque phase retourne lignes et durée; le rapport affiche le débit."""
+        discogs_stats, roon_stats = run_full_migration(session, json_files)
+
+        assert discogs_stats['rows'] == sum(
+            discogs_stats[key] for key in ('artists', 'albums', 'album_artists', 'images', 'metadata')
+        )
+        assert roon_stats['seconds'] >= 0
+
+        migrate.print_throughput_report({'Discogs': discogs_stats, 'Roon': roon_stats})
+        output = capsys.readouterr().out
+        assert "Débit de migration" in output
+        assert "lignes/s" in output
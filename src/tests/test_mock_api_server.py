@@ -0,0 +1,167 @@
+"""
+Tests unitaires pour le serveur de simulation des APIs (src/utils/mock_api_server.py)
+
+Vérifie que le client Spotify, les recherches Last.fm et la lecture de la
+collection Discogs fonctionnent contre le serveur local, que les fixtures
+sont servies en priorité, que les 429 injectés (Retry-After) et les erreurs
+500 sont respectés, et que les URLs de base des APIs se configurent par
+variables d'environnement.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import requests
+
+from services import spotify_service
+from services.spotify_service import SpotifyCache, SpotifyClient, TokenBucket
+from utils.mock_api_server import FaultProfile, MockApiServer
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_script(name, *path):
+    """Charge un script (nom avec tirets) comme module."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, "src", *path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def server():
+    """Serveur sans latence ni erreurs, sur un port libre."""
+    with MockApiServer(port=0, seed=1) as server:
+        yield server
+
+
+def point_spotify_at(monkeypatch, server):
+    """Redirige le service Spotify vers le serveur local."""
+    env = server.environment()
+    monkeypatch.setattr(spotify_service, 'SPOTIFY_TOKEN_URL', f"{env['SPOTIFY_ACCOUNTS_BASE_URL']}/api/token")
+    for name in ('search', 'artists', 'albums'):
+        monkeypatch.setattr(spotify_service, f"SPOTIFY_{name.upper()}_URL", f"{env['SPOTIFY_API_BASE_URL']}/{name}")
+
+
+class TestSpotify:
+    """Tests du client Spotify contre le serveur local."""
+
+    def test_search_and_bulk_refresh(self, server, monkeypatch):
+        """Token, recherches puis relecture par identifiants."""
+        point_spotify_at(monkeypatch, server)
+        with SpotifyClient("id", "secret", SpotifyCache(), rate=1000) as client:
+            artist_image = client.artist_image("Nina Simone")
+            album = client.album_details("Nina Simone", "Pastel Blues")
+            refreshed = client.refresh_album_images([("Nina Simone", "Pastel Blues")])
+
+        assert artist_image.startswith("https://i.scdn.co/image/mock-")
+        assert album['name'] == "Pastel Blues"
+        assert refreshed[("Nina Simone", "Pastel Blues")] == album['images'][0]['url']
+        assert server.stats['spotify'] == {200: 4}
+
+    def test_rate_limit_honoured(self, monkeypatch):
+        """Les 429 injectés sont suivis d'une pause Retry-After puis d'un succès."""
+        profile = FaultProfile(rate_limit_rate=0.5, retry_after=0)
+        with MockApiServer(port=0, profile=profile, seed=4) as server:
+            point_spotify_at(monkeypatch, server)
+            cache = SpotifyCache()
+            cache.token_cache = {"access_token": "jeton", "expires_at": 10 ** 10}
+            with SpotifyClient("id", "secret", cache, rate=1000, max_retries=20) as client:
+                images = [client.artist_image(f"Artiste {n}") for n in range(10)]
+
+        assert all(images)
+        assert server.stats['spotify'][429] > 0
+
+    def test_server_errors_not_cached(self, monkeypatch):
+        """Erreurs 500 permanentes: pas d'image, et l'échec n'est pas mis en cache."""
+        with MockApiServer(port=0, profile=FaultProfile(error_rate=1.0)) as server:
+            point_spotify_at(monkeypatch, server)
+            monkeypatch.setattr(spotify_service.time, 'sleep', lambda seconds: None)
+            cache = SpotifyCache()
+            cache.token_cache = {"access_token": "jeton", "expires_at": 10 ** 10}
+            with SpotifyClient("id", "secret", cache, rate=1000, max_retries=2) as client:
+                assert client.artist_image("Nina Simone") is None
+        assert cache.get_artist_image("Nina Simone", spotify_service.CACHE_MISS) is spotify_service.CACHE_MISS
+        assert server.stats['spotify'] == {500: 2}
+
+
+class TestFixtures:
+    """Tests des réponses enregistrées."""
+
+    def test_fixture_served_first(self, tmp_path):
+        """Une fixture correspondante remplace la réponse synthétique."""
+        fixtures = tmp_path / "fixtures.json"
+        fixtures.write_text(json.dumps({"routes": [{
+            "method": "GET",
+            "path": "/spotify/v1/search",
+            "query": {"q": "artist:Nina Simone", "type": "artist"},
+            "body": {"artists": {"items": []}},
+        }]}), encoding='utf-8')
+        with MockApiServer(port=0, fixtures_path=str(fixtures)) as server:
+            url = f"{server.base_url}/spotify/v1/search"
+            recorded = requests.get(url, params={"q": "artist:Nina Simone", "type": "artist", "limit": 1}).json()
+            synthetic = requests.get(url, params={"q": "artist:Miles Davis", "type": "artist"}).json()
+
+        assert recorded == {"artists": {"items": []}}
+        assert synthetic['artists']['items'][0]['name'] == "Miles Davis"
+
+    def test_missing_fixtures_file(self, tmp_path):
+        """Fichier de fixtures absent hors mode enregistrement → FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            MockApiServer(port=0, fixtures_path=str(tmp_path / "absent.json"))
+
+
+class TestScripts:
+    """Tests des scripts redirigés vers le serveur local."""
+
+    def test_discogs_collection(self, server, monkeypatch):
+        """Pagination complète de la collection et détails d'une release."""
+        server.synthetic.discogs_releases = 230
+        read_discogs = load_script("read_discogs_ia", "collection", "Read-discogs-ia.py")
+        monkeypatch.setattr(read_discogs, 'DISCOGS_API_BASE_URL', server.environment()['DISCOGS_API_BASE_URL'])
+        monkeypatch.setattr(read_discogs, 'discogs_limiter', TokenBucket(1000))
+
+        releases = read_discogs.get_all_releases("collectionneur", "cle")
+        details = read_discogs.get_release_details(releases[0]['basic_information']['id'], "cle")
+
+        assert len(releases) == 230
+        assert details['images'][0]['uri'].endswith(".jpg")
+        assert server.stats['discogs'] == {200: 4, 404: 1}
+
+    def test_lastfm_album_image(self, server, monkeypatch):
+        """Recherche de couverture Last.fm (plus grande image)."""
+        complete_images_roon = load_script("complete_images_roon_mock", "enrichment", "complete-images-roon.py")
+        monkeypatch.setattr(complete_images_roon, 'LASTFM_API_URL', server.environment()['LASTFM_API_URL'])
+        monkeypatch.setattr(complete_images_roon, 'API_KEY', "cle")
+
+        image = complete_images_roon.search_lastfm_album_image("Nina Simone", "Pastel Blues")
+        assert "/300x300/" in image
+
+
+class TestConfiguration:
+    """Tests de la configuration des URLs de base."""
+
+    def test_environment_overrides_constants(self, server):
+        """Les variables d'environnement du serveur redirigent src/constants.py."""
+        env = dict(os.environ, **server.environment())
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import constants; print(constants.SPOTIFY_TOKEN_URL, constants.SPOTIFY_SEARCH_URL, "
+             "constants.LASTFM_API_URL, constants.DISCOGS_API_BASE_URL)"],
+            cwd=os.path.join(PROJECT_ROOT, "src"), env=env, capture_output=True, text=True, check=True
+        ).stdout.split()
+        assert output == [
+            f"{server.base_url}/spotify/accounts/api/token",
+            f"{server.base_url}/spotify/v1/search",
+            f"{server.base_url}/lastfm/2.0/",
+            f"{server.base_url}/discogs",
+        ]
@@ -0,0 +1,102 @@
+"""
+Tests de non-régression des plans de requête SQLite (EXPLAIN QUERY PLAN)
+
+Les requêtes analytiques du repository (top artistes, timeline quotidienne,
+distribution horaire) doivent être servies uniquement par les index couvrants
+de listening_history: aucun accès à la table elle-même, aucun parcours complet.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import pytest
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects import sqlite
+
+from src.models.database import create_sqlite_engine
+from src.models.schema import Base, Artist, Album, ListeningHistory
+from src.models.repository import MusicRepository
+
+
+START = 1769000000
+END = START + 86400
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Base vide avec le schéma complet (le plan ne dépend que des index)."""
+    engine = create_sqlite_engine(':memory:')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, stmt):
+    """Retourne les lignes 'detail' de EXPLAIN QUERY PLAN pour une requête."""
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def assert_index_only(plan):
+    """Chaque accès à listening_history passe par un index couvrant."""
+    history_steps = [step for step in plan if 'listening_history' in step]
+    assert history_steps, plan
+    for step in history_steps:
+        assert 'COVERING INDEX' in step, plan
+
+
+FILTERS = [
+    {},
+    {'start': START, 'end': END},
+    {'source': 'roon'},
+    {'start': START, 'end': END, 'source': 'lastfm'},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_top_artists_index_only(engine, filters):
+    """Top artistes: agrégation sur artist_id sans lire la table."""
+    stmt = MusicRepository._top_stmt(
+        ListeningHistory.artist_id, Artist.id, Artist.name, filters.get('start'),
+        filters.get('end'), filters.get('source'), 10,
+    )
+    assert_index_only(query_plan(engine, stmt))
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_top_albums_index_only(engine, filters):
+    """Top albums: agrégation sur album_id sans lire la table."""
+    stmt = MusicRepository._top_stmt(
+        ListeningHistory.album_id, Album.id, Album.title, filters.get('start'),
+        filters.get('end'), filters.get('source'), 10,
+    )
+    assert_index_only(query_plan(engine, stmt))
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_per_day_timeline_index_only(engine, filters):
+    """Timeline quotidienne servie par un index couvrant."""
+    stmt = MusicRepository._per_day_stmt(filters.get('start'), filters.get('end'), filters.get('source'))
+    assert_index_only(query_plan(engine, stmt))
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_per_hour_index_only(engine, filters):
+    """Distribution horaire servie par un index couvrant."""
+    stmt = MusicRepository._per_hour_stmt(filters.get('start'), filters.get('end'), filters.get('source'))
+    assert_index_only(query_plan(engine, stmt))
+
+
+def test_loved_count_index_only(engine):
+    """Comptage des coups de cœur sur une période sans lire la table."""
+    stmt = (
+        select(func.count())
+        .select_from(ListeningHistory)
+        .where(ListeningHistory.timestamp >= START, ListeningHistory.loved.is_(True))
+    )
+    assert_index_only(query_plan(engine, stmt))
+
@@ -0,0 +1,340 @@
+"""
+Tests unitaires pour la synchronisation Discogs en pipeline (Read-discogs-ia.py)
+
+Vérifie que toutes les releases absentes sont ajoutées, que chaque étape
+respecte la concurrence de son API, que les 429 Discogs sont réessayés
+(Retry-After, nombre de tentatives borné, délai maximal par requête),
+qu'une synchronisation interrompue reprend sans refaire les étapes déjà
+terminées, et que l'écriture groupée de discogs-collection.json est
+atomique et produit exactement le même fichier qu'avant.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from services.spotify_service import TokenBucket
+from utils.mock_api_server import FaultProfile, MockApiServer
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+spec = importlib.util.spec_from_file_location(
+    "read_discogs_ia",
+    os.path.join(PROJECT_ROOT, "src", "collection", "Read-discogs-ia.py")
+)
+read_discogs = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(read_discogs)
+
+RELEASE_COUNT = 35
+PER_PAGE = 10
+
+
+def basic_information(release_id):
+    """Informations de base d'une release simulée."""
+    return {
+        'id': release_id,
+        'title': f"Album {release_id}",
+        'year': 1960 + release_id % 40,
+        'artists': [{'name': f"Artiste {release_id % 7} (2)"}],
+        'labels': [{'name': "Blue Note"}],
+        'formats': [{'name': "Vinyl", 'qty': 1}],
+    }
+
+
+class FakeApis:
+    """APIs simulées: comptent les appels et la concurrence par API."""
+
+    def __init__(self, failing_resume=()):
+        self.calls = Counter()
+        self.active = Counter()
+        self.max_active = Counter()
+        self.failing_resume = set(failing_resume)
+        self._lock = threading.Lock()
+
+    def _call(self, api, key):
+        with self._lock:
+            self.calls[(api, key)] += 1
+            self.active[api] += 1
+            self.max_active[api] = max(self.max_active[api], self.active[api])
+        time.sleep(0.005)
+        with self._lock:
+            self.active[api] -= 1
+
+    def get_collection(self, username, api_key, page=1):
+        self._call('discogs', f"page {page}")
+        first = (page - 1) * PER_PAGE
+        ids = range(first + 1, min(first + PER_PAGE, RELEASE_COUNT) + 1)
+        return {
+            'pagination': {'page': page, 'pages': -(-RELEASE_COUNT // PER_PAGE), 'items': RELEASE_COUNT},
+            'releases': [{'basic_information': basic_information(i)} for i in ids],
+        }
+
+    def get_release_details(self, release_id, api_key):
+        self._call('discogs', release_id)
+        return {'images': [{'uri': f"https://i.discogs.com/{release_id}.jpg"}]}
+
+    def spotify_search_album(self, artist, album):
+        self._call('spotify', album)
+        return f"https://open.spotify.com/album/{album}", 2020, f"https://i.scdn.co/{album}.jpg"
+
+    def askForResume(self, artist, album, annee):
+        self._call('ai', album)
+        if album in self.failing_resume:
+            raise RuntimeError("API IA indisponible")
+        return f"Résumé de {album} ({annee})"
+
+
+@pytest.fixture
+def apis(monkeypatch):
+    """Remplace les appels réseau du script par les APIs simulées."""
+    fake = FakeApis()
+    for name in ('get_collection', 'get_release_details', 'spotify_search_album', 'askForResume'):
+        monkeypatch.setattr(read_discogs, name, getattr(fake, name))
+    return fake
+
+
+def make_sync(tmp_path, **kwargs):
+    """Synchronisation sur des fichiers temporaires."""
+    options = dict(discogs_workers=2, spotify_workers=3, ai_workers=2, window=6)
+    options.update(kwargs)
+    return read_discogs.DiscogsSync(
+        "collectionneur", "cle",
+        collection_path=str(tmp_path / "discogs-collection.json"),
+        checkpoint_path=str(tmp_path / "discogs-sync-checkpoint.json"),
+        **options
+    )
+
+
+class TestDiscogsSync:
+    """Tests du pipeline de synchronisation."""
+
+    def test_adds_missing_releases(self, apis, tmp_path):
+        """Releases absentes ajoutées une fois, releases existantes ignorées."""
+        existing = [{'release_id': i, 'Titre': f"Album {i}"} for i in range(1, 6)]
+        (tmp_path / "discogs-collection.json").write_text(json.dumps(existing), encoding='utf-8')
+        sync = make_sync(tmp_path)
+
+        stats = sync.run()
+
+        albums = read_discogs.lire_albums(sync.collection_path)
+        assert stats == {'total': 35, 'existing': 5, 'added': 30, 'failed': 0, 'resumed_stages': 0}
+        assert sorted(a['release_id'] for a in albums) == list(range(1, 36))
+        album = next(a for a in albums if a['release_id'] == 12)
+        assert album['Artiste'] == ["Artiste 5"]
+        assert album['Pochette'] == "https://i.discogs.com/12.jpg"
+        assert album['Resume'] == "Résumé de Album 12 (1972)"
+        assert album['Spotify_Date'] == 2020
+        assert album['Support'] == "Vinyle"
+        assert set(apis.calls.values()) == {1}
+        assert not os.path.exists(sync.checkpoint_path)
+
+    def test_concurrency_per_api(self, apis, tmp_path):
+        """Chaque API reste sous sa propre limite de requêtes simultanées."""
+        make_sync(tmp_path).run()
+        assert 1 < apis.max_active['ai'] <= 2
+        assert apis.max_active['discogs'] <= 2
+        assert apis.max_active['spotify'] <= 3
+
+    def test_resume_after_failure(self, apis, tmp_path):
+        """Une étape en erreur est refaite seule à l'exécution suivante."""
+        apis.failing_resume = {"Album 7"}
+        sync = make_sync(tmp_path)
+        stats = sync.run()
+
+        assert stats['failed'] == 1 and stats['added'] == 34
+        checkpoint = json.loads((tmp_path / "discogs-sync-checkpoint.json").read_text(encoding='utf-8'))
+        assert set(checkpoint['partial']['7']) == {'details', 'spotify'}
+
+        apis.failing_resume = set()
+        apis.calls.clear()
+        stats = make_sync(tmp_path).run()
+
+        assert stats == {'total': 35, 'existing': 34, 'added': 1, 'failed': 0, 'resumed_stages': 2}
+        assert apis.calls[('ai', "Album 7")] == 1
+        assert apis.calls[('discogs', 7)] == 0
+        assert apis.calls[('spotify', "Album 7")] == 0
+        assert len(read_discogs.lire_albums(sync.collection_path)) == 35
+        assert not os.path.exists(sync.checkpoint_path)
+
+    def test_failed_page_keeps_checkpoint(self, apis, tmp_path, monkeypatch):
+        """Une page de la collection en erreur: comptée en échec, point de reprise gardé."""
+        def get_collection(username, api_key, page=1):
+            return None if page == 3 else FakeApis.get_collection(apis, username, api_key, page)
+
+        monkeypatch.setattr(read_discogs, 'get_collection', get_collection)
+        sync = make_sync(tmp_path)
+        stats = sync.run()
+
+        assert stats['total'] == 25 and stats['added'] == 25
+        assert stats['failed'] == 1
+        assert os.path.exists(sync.checkpoint_path)
+
+        monkeypatch.setattr(read_discogs, 'get_collection', apis.get_collection)
+        stats = make_sync(tmp_path).run()
+        assert stats == {'total': 35, 'existing': 25, 'added': 10, 'failed': 0, 'resumed_stages': 0}
+        assert not os.path.exists(sync.checkpoint_path)
+
+    def test_checkpoint_of_other_user_ignored(self, apis, tmp_path):
+        """Un point de reprise d'un autre utilisateur Discogs n'est pas repris."""
+        (tmp_path / "discogs-sync-checkpoint.json").write_text(json.dumps({
+            'username': "autre", 'partial': {'3': {'details': "x", 'spotify': [None, None, None], 'resume': "y"}}
+        }), encoding='utf-8')
+        stats = make_sync(tmp_path).run()
+        assert stats['resumed_stages'] == 0
+        assert apis.calls[('ai', "Album 3")] == 1
+
+
+def make_album(release_id):
+    """Album au format de discogs-collection.json (caractères accentués compris)."""
+    return read_discogs.nouvel_album(
+        release_id, f"Été {release_id}", ["Françoise Hardy"], 1968, ["Vogue"], "Vinyle",
+        f"https://i.discogs.com/{release_id}.jpg", "Résumé « complet »", None, None, None
+    )
+
+
+class TestCollectionWriter:
+    """Tests de l'écriture groupée de la collection."""
+
+    def test_byte_compatible(self, tmp_path):
+        """Même contenu octet pour octet que l'écriture album par album."""
+        legacy = tmp_path / "legacy.json"
+        batched = tmp_path / "batched.json"
+        for release_id in range(1, 6):
+            album = make_album(release_id)
+            assert read_discogs.ajouter_album(
+                album['release_id'], album['Titre'], album['Artiste'], album['Année'], album['Labels'],
+                album['Support'], album['Pochette'], album['Resume'], fichier=str(legacy)
+            )
+        with read_discogs.CollectionWriter(str(batched), batch_size=2) as writer:
+            for release_id in range(1, 6):
+                writer.ajouter(make_album(release_id))
+        expected = json.dumps([make_album(i) for i in range(1, 6)], indent=4, ensure_ascii=False)
+        assert legacy.read_bytes() == batched.read_bytes() == expected.encode('utf-8')
+
+    def test_writes_per_batch(self, tmp_path, monkeypatch):
+        """Une réécriture par lot de batch_size albums, plus une à la fin."""
+        replaced = []
+        real_replace = os.replace
+        monkeypatch.setattr(read_discogs.os, 'replace', lambda src, dst: (replaced.append(dst), real_replace(src, dst)))
+        path = tmp_path / "discogs-collection.json"
+        with read_discogs.CollectionWriter(str(path), batch_size=20) as writer:
+            for release_id in range(45):
+                writer.ajouter(make_album(release_id))
+            assert not writer.ajouter(make_album(3))
+            assert len(replaced) == 2
+        assert len(replaced) == 3
+        assert len(read_discogs.lire_albums(str(path))) == 45
+        assert not os.path.exists(f"{path}.tmp")
+
+    def test_failed_write_keeps_previous_file(self, tmp_path, monkeypatch):
+        """Écriture interrompue: l'ancienne collection reste intacte, l'album reste en attente."""
+        path = tmp_path / "discogs-collection.json"
+        with read_discogs.CollectionWriter(str(path), batch_size=1) as writer:
+            writer.ajouter(make_album(1))
+        before = path.read_bytes()
+
+        def broken_dump(*args, **kwargs):
+            raise OSError("disque plein")
+
+        writer = read_discogs.CollectionWriter(str(path), batch_size=1)
+        monkeypatch.setattr(read_discogs.json, 'dump', broken_dump)
+        writer.ajouter(make_album(2))
+        assert path.read_bytes() == before
+        assert [a['release_id'] for a in writer.pending] == [2]
+
+        monkeypatch.undo()
+        assert writer.flush()
+        assert [a['release_id'] for a in read_discogs.lire_albums(str(path))] == [1, 2]
+
+    def test_interrupted_sync_keeps_unwritten_albums(self, apis, tmp_path):
+        """Albums terminés mais pas encore écrits: repris sans aucun appel API."""
+        apis.failing_resume = {"Album 30"}
+        sync = make_sync(tmp_path, write_batch_size=100)
+        written = []
+        original_flush = read_discogs.CollectionWriter.flush
+
+        def crash_on_final_flush(writer):
+            written.append(len(writer.pending))
+            raise KeyboardInterrupt
+
+        read_discogs.CollectionWriter.flush = crash_on_final_flush
+        try:
+            with pytest.raises(KeyboardInterrupt):
+                sync.run()
+        finally:
+            read_discogs.CollectionWriter.flush = original_flush
+
+        assert written == [34]
+        assert not os.path.exists(sync.collection_path)
+        checkpoint = json.loads((tmp_path / "discogs-sync-checkpoint.json").read_text(encoding='utf-8'))
+        assert len(checkpoint['partial']) == 35
+
+        apis.failing_resume = set()
+        apis.calls.clear()
+        stats = make_sync(tmp_path).run()
+        assert stats['added'] == 35 and stats['resumed_stages'] == 104
+        assert sum(apis.calls.values()) == 4 + 1  # pages de la collection + résumé de l'album 30
+
+
+class TestDiscogsRateLimit:
+    """Tests des 429 Discogs contre le serveur de simulation."""
+
+    def test_rate_limited_pages_retried(self, monkeypatch):
+        """Les pages refusées (429) sont réessayées: la collection est complète."""
+        profile = FaultProfile(rate_limit_rate=0.4, retry_after=0)
+        with MockApiServer(port=0, profile=profile, discogs_releases=430, seed=2) as server:
+            monkeypatch.setattr(read_discogs, 'DISCOGS_API_BASE_URL', server.environment()['DISCOGS_API_BASE_URL'])
+            monkeypatch.setattr(read_discogs, 'discogs_limiter', TokenBucket(1000))
+            monkeypatch.setattr(read_discogs, 'DISCOGS_RATE_LIMIT_PAUSE', 0)
+            monkeypatch.setattr(read_discogs, 'DISCOGS_MAX_RETRIES', 20)
+            releases = read_discogs.get_all_releases("collectionneur", "cle")
+
+        assert len(releases) == 430
+        assert server.stats['discogs'][429] > 0
+
+    def test_retries_bounded_and_retry_after_honoured(self, monkeypatch):
+        """429 permanents: pause Retry-After à chaque tentative, puis abandon (None)."""
+        pauses = []
+        limiter = TokenBucket(1000)
+        monkeypatch.setattr(limiter, 'pause', pauses.append)
+        profile = FaultProfile(rate_limit_rate=1.0, retry_after=0)
+        with MockApiServer(port=0, profile=profile, discogs_releases=10, seed=2) as server:
+            monkeypatch.setattr(read_discogs, 'DISCOGS_API_BASE_URL', server.environment()['DISCOGS_API_BASE_URL'])
+            monkeypatch.setattr(read_discogs, 'discogs_limiter', limiter)
+            assert read_discogs.get_release_details(1, "cle") is None
+
+        assert server.stats['discogs'][429] == read_discogs.DISCOGS_MAX_RETRIES
+        assert pauses == [0.0] * read_discogs.DISCOGS_MAX_RETRIES
+
+    def test_network_timeout_retried(self, monkeypatch):
+        """Requêtes envoyées avec un délai maximal; une erreur réseau est réessayée."""
+        calls = []
+
+        class Response:
+            status_code = 200
+            headers = {}
+
+            def json(self):
+                return {'id': 1}
+
+        def fake_get(url, headers=None, timeout=None):
+            calls.append(timeout)
+            if len(calls) == 1:
+                raise read_discogs.requests.Timeout("délai dépassé")
+            return Response()
+
+        monkeypatch.setattr(read_discogs.requests, 'get', fake_get)
+        monkeypatch.setattr(read_discogs, 'discogs_limiter', TokenBucket(1000))
+        monkeypatch.setattr(read_discogs, 'DEFAULT_RETRY_DELAY', 0)
+        assert read_discogs.get_release_details(1, "cle") == {'id': 1}
+        assert calls == [read_discogs.DEFAULT_HTTP_TIMEOUT] * 2
@@ -0,0 +1,291 @@
+"""
+Tests unitaires pour la couche d'accès aux données (src/models/repository.py)
+
+Ce module teste les requêtes paginées et filtrées sur l'historique d'écoute
+et la collection, ainsi que le format des dictionnaires retournés
+(compatibles chk-roon.json et discogs-collection.json).
+
+Version: 1.0.0
+Date: 27 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models.schema import (
+    Base,
+    Artist,
+    Album,
+    Track,
+    ListeningHistory,
+    Image,
+    Metadata,
+)
+from src.models.repository import COLLECTION_SOURCES, MusicRepository, is_current, open_repository
+
+
+BASE_TIMESTAMP = 1769000000
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Base SQLite peuplée: 2 albums, 3 pistes, 6 écoutes."""
+    path = tmp_path / "musique.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    bowie = Artist(name="David Bowie")
+    eno = Artist(name="Brian Eno")
+    heroes = Album(title='"Heroes"', year=1977, support="Vinyle", discogs_id="1001")
+    heroes.artists.extend([bowie, eno])
+    low = Album(title="Low", year=1977, support="CD")
+    low.artists.append(bowie)
+    session.add_all([bowie, eno, heroes, low])
+    session.flush()
+
+    title_track = Track(album_id=heroes.id, artist_id=bowie.id, title="Heroes")
+    neukoln = Track(album_id=heroes.id, artist_id=eno.id, title="Neuköln")
+    warszawa = Track(album_id=low.id, artist_id=bowie.id, title="Warszawa")
+    session.add_all([title_track, neukoln, warszawa])
+    session.flush()
+
+    plays = [
+        (title_track, 0, 'roon', True),
+        (neukoln, 300, 'roon', False),
+        (warszawa, 600, 'lastfm', False),
+        (title_track, 900, 'lastfm', True),
+        (neukoln, 1200, 'roon', False),
+        (warszawa, 1500, 'roon', False),
+    ]
+    for track, offset, source, loved in plays:
+        session.add(ListeningHistory(
+            track_id=track.id,
+            timestamp=BASE_TIMESTAMP + offset,
+            date=f"2026-01-21 {offset // 300:02d}:00",
+            source=source,
+            loved=loved,
+        ))
+
+    session.add_all([
+        Image(url="https://spotify/bowie.jpg", image_type='artist_image', source='spotify', artist_id=bowie.id),
+        Image(url="https://spotify/heroes.jpg", image_type='album_cover', source='spotify', album_id=heroes.id),
+        Image(url="https://discogs/heroes.jpg", image_type='album_cover', source='discogs', album_id=heroes.id),
+        Metadata(album_id=heroes.id, ai_info="Trilogie berlinoise.", resume="Résumé complet."),
+    ])
+    session.commit()
+    session.close()
+    engine.dispose()
+    return str(path)
+
+
+@pytest.fixture
+def repository(db_path):
+    """Repository ouvert sur la base de test."""
+    return open_repository(db_path)
+
+
+class TestOpenRepository:
+    """Tests d'ouverture du repository."""
+
+    def test_missing_database(self, tmp_path):
+        """Une base absente retourne None (repli JSON côté appelant)."""
+        assert open_repository(str(tmp_path / "absent.db")) is None
+
+    def test_unmigrated_database(self, tmp_path):
+        """Une base sans tables retourne None."""
+        path = tmp_path / "vide.db"
+        create_engine(f"sqlite:///{path}").connect().close()
+        assert open_repository(str(path)) is None
+
+    def test_empty_history(self, tmp_path):
+        """Une base migrée mais vide n'a pas d'écoutes."""
+        path = tmp_path / "empty.db"
+        Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+        repository = open_repository(str(path))
+        assert isinstance(repository, MusicRepository)
+        assert repository.has_plays() is False
+
+    def test_populated_database(self, repository):
+        """Une base peuplée est détectée."""
+        assert repository.has_plays() is True
+
+    def test_stale_database(self, db_path, tmp_path):
+        """Un historique écrit après la migration fait ignorer la base."""
+        history = tmp_path / "history"
+        history.mkdir()
+        json_path = history / "chk-roon.json"
+        json_path.write_text('{"tracks": []}')
+        db_written = os.stat(db_path).st_mtime_ns
+        os.utime(json_path, ns=(db_written + 10**9, db_written + 10**9))
+
+        assert is_current(db_path) is False
+        assert open_repository(db_path) is None
+        # La collection n'a pas changé: la base reste utilisable pour elle
+        assert is_current(db_path, COLLECTION_SOURCES) is True
+        assert open_repository(db_path, sources=COLLECTION_SOURCES) is not None
+
+    def test_stale_journal_segment(self, db_path, tmp_path):
+        """Un segment de journal plus récent que la base compte aussi."""
+        log_dir = tmp_path / "history" / "chk-roon.log"
+        log_dir.mkdir(parents=True)
+        segment = log_dir / "segment-000001.jsonl"
+        segment.write_text("")
+        db_written = os.stat(db_path).st_mtime_ns
+        os.utime(segment, ns=(db_written + 10**9, db_written + 10**9))
+
+        assert is_current(db_path) is False
+
+    def test_migrated_after_history(self, db_path, tmp_path):
+        """Une base migrée après la dernière écriture de l'historique est lue."""
+        history = tmp_path / "history"
+        history.mkdir()
+        json_path = history / "chk-roon.json"
+        json_path.write_text('{"tracks": []}')
+        db_written = os.stat(db_path).st_mtime_ns
+        os.utime(json_path, ns=(db_written - 10**9, db_written - 10**9))
+
+        assert is_current(db_path) is True
+        assert open_repository(db_path) is not None
+
+
+class TestPlays:
+    """Tests des requêtes sur l'historique d'écoute."""
+
+    def test_json_compatible_format(self, repository):
+        """Les écoutes ont le format chk-roon.json, plus récentes en premier."""
+        plays = repository.get_plays()
+
+        assert len(plays) == 6
+        assert plays[0] == {
+            'timestamp': BASE_TIMESTAMP + 1500,
+            'date': "2026-01-21 05:00",
+            'artist': "David Bowie",
+            'title': "Warszawa",
+            'album': "Low",
+            'loved': False,
+            'source': 'roon',
+        }
+        assert [p['timestamp'] for p in plays] == sorted((p['timestamp'] for p in plays), reverse=True)
+
+    def test_track_artist_on_multi_artist_album(self, repository):
+        """L'artiste d'une écoute est l'interprète de la piste, pas le premier artiste de l'album."""
+        plays = repository.get_plays(artist="Brian Eno")
+
+        assert {p['title'] for p in plays} == {"Neuköln"}
+        assert len(plays) == 2
+
+    def test_filters(self, repository):
+        """Filtres source, loved et plage de dates combinables."""
+        assert len(repository.get_plays(source='lastfm')) == 2
+        assert len(repository.get_plays(loved=True)) == 2
+        assert len(repository.get_plays(source='roon', loved=False)) == 3
+
+        window = repository.get_plays(start=BASE_TIMESTAMP + 300, end=BASE_TIMESTAMP + 1200)
+        assert [p['timestamp'] - BASE_TIMESTAMP for p in window] == [900, 600, 300]
+
+    def test_pagination(self, repository):
+        """limit/offset et ordre chronologique."""
+        first_page = repository.get_plays(limit=4)
+        second_page = repository.get_plays(limit=4, offset=4)
+
+        assert len(first_page) == 4
+        assert len(second_page) == 2
+        assert first_page[-1]['timestamp'] > second_page[0]['timestamp']
+
+        oldest = repository.get_plays(limit=1, newest_first=False)
+        assert oldest[0]['timestamp'] == BASE_TIMESTAMP
+
+    def test_iter_plays_matches_get_plays(self, repository):
+        """Le parcours par pages retourne exactement les mêmes écoutes."""
+        for newest_first in (True, False):
+            expected = repository.get_plays(newest_first=newest_first)
+            iterated = list(repository.iter_plays(newest_first=newest_first, page_size=4))
+            assert iterated == expected
+
+        assert len(list(repository.iter_plays(source='roon', page_size=1))) == 4
+
+    def test_counts(self, repository):
+        """Comptages globaux, filtrés et par source."""
+        assert repository.count_plays() == 6
+        assert repository.count_plays(artist="David Bowie") == 4
+        assert repository.count_plays(loved=True, source='roon') == 1
+        assert repository.count_plays_by_source() == {'roon': 4, 'lastfm': 2}
+        assert repository.count_plays_by_source(start=BASE_TIMESTAMP + 900) == {'roon': 2, 'lastfm': 1}
+
+    def test_details(self, repository):
+        """with_details ajoute images et ai_info."""
+        play = repository.get_plays(artist="David Bowie", loved=True, limit=1, with_details=True)[0]
+
+        assert play['title'] == "Heroes"
+        assert play['artist_spotify_image'] == "https://spotify/bowie.jpg"
+        assert play['album_spotify_image'] == "https://spotify/heroes.jpg"
+        assert play['album_lastfm_image'] is None
+        assert play['ai_info'] == "Trilogie berlinoise."
+
+
+class TestAlbums:
+    """Tests des requêtes sur la collection."""
+
+    def test_collection_format(self, repository):
+        """Les albums ont le format discogs-collection.json."""
+        albums = repository.get_albums()
+
+        assert albums == [{
+            'release_id': 1001,
+            'Titre': '"Heroes"',
+            'Artiste': ["David Bowie", "Brian Eno"],
+            'Année': 1977,
+            'Support': "Vinyle",
+            'Pochette': "https://discogs/heroes.jpg",
+            'Resume': "Résumé complet.",
+            'Spotify_URL': None,
+            'Spotify_Cover_URL': "https://spotify/heroes.jpg",
+        }]
+
+    def test_album_filters(self, repository):
+        """Filtres artiste/support et albums hors collection."""
+        assert repository.count_albums() == 1
+        assert repository.count_albums(collection_only=False) == 2
+
+        titles = [a['Titre'] for a in repository.get_albums(artist="David Bowie", collection_only=False)]
+        assert titles == ['"Heroes"', "Low"]
+        assert repository.get_albums(support="CD") == []
+        assert len(repository.get_albums(collection_only=False, limit=1, offset=1)) == 1
+
+
+class TestAnalytics:
+    """Tests des agrégations sur l'historique (colonnes dénormalisées)."""
+
+    def test_denormalized_keys(self, db_path):
+        """Les écoutes insérées via l'ORM héritent de l'artiste et de l'album de la piste."""
+        engine = create_engine(f"sqlite:///{db_path}")
+        try:
+            session = sessionmaker(bind=engine)()
+            assert session.query(ListeningHistory).filter(ListeningHistory.artist_id.is_(None)).count() == 0
+            assert session.query(ListeningHistory).filter(ListeningHistory.album_id.is_(None)).count() == 0
+            session.close()
+        finally:
+            engine.dispose()
+
+    def test_top_artists_and_albums(self, repository):
+        """Classements par artiste de piste et par album."""
+        assert repository.top_artists() == [("David Bowie", 4), ("Brian Eno", 2)]
+        assert repository.top_artists(source='lastfm') == [("David Bowie", 2)]
+        assert repository.top_artists(limit=1) == [("David Bowie", 4)]
+        assert repository.top_albums() == [('"Heroes"', 4), ("Low", 2)]
+        assert repository.top_albums(start=BASE_TIMESTAMP + 1000) == [('"Heroes"', 1), ("Low", 1)]
+
+    def test_timelines(self, repository):
+        """Timeline quotidienne et distribution horaire."""
+        days = repository.plays_per_day()
+        assert sum(plays for _, plays in days) == 6
+        assert [day for day, _ in days] == sorted(day for day, _ in days)
+
+        hours = repository.plays_per_hour(source='roon')
+        assert sum(hours.values()) == 4
+        assert all(0 <= hour < 24 for hour in hours)
@@ -0,0 +1,205 @@
+"""
+Tests unitaires pour les tables d'agrégats d'écoutes (rollup_*)
+
+Vérifie la maintenance incrémentale par triggers (insertion, suppression,
+modification, UPSERT de la migration), la reconstruction complète et le
+contrôle de cohérence avec l'historique brut.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.models.schema import Base, Artist, Album, Track, ListeningHistory
+from src.models.rollups import check_rollups, ensure_rollups, rebuild_rollups
+from src.models.repository import MusicRepository
+
+
+BASE_TIMESTAMP = 1769000000
+
+
+def local_key(timestamp):
+    """(jour, heure) locaux d'un timestamp, comme les agrégats."""
+    moment = datetime.fromtimestamp(timestamp)
+    return moment.strftime('%Y-%m-%d'), moment.hour
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Base avec un artiste, deux albums et trois pistes (sans écoutes)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'musique.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Artist.__table__), [{'id': 1, 'name': "Nick Drake"}])
+        conn.execute(insert(Album.__table__), [
+            {'id': 1, 'title': "Pink Moon"},
+            {'id': 2, 'title': "Bryter Layter"},
+        ])
+        conn.execute(insert(Track.__table__), [
+            {'id': 1, 'album_id': 1, 'artist_id': 1, 'title': "Pink Moon"},
+            {'id': 2, 'album_id': 1, 'artist_id': 1, 'title': "Place to Be"},
+            {'id': 3, 'album_id': 2, 'artist_id': None, 'title': "Fly"},
+        ])
+    yield engine
+    engine.dispose()
+
+
+def add_plays(engine, plays):
+    """Insère des écoutes (track_id, décalage en secondes, source) sans artist_id/album_id."""
+    with engine.begin() as conn:
+        conn.execute(insert(ListeningHistory.__table__), [
+            {
+                'track_id': track_id,
+                'timestamp': BASE_TIMESTAMP + offset,
+                'date': "2026-01-21 12:00",
+                'source': source,
+            }
+            for track_id, offset, source in plays
+        ])
+
+
+def rollup(engine, table):
+    """Contenu d'une table d'agrégats."""
+    with engine.connect() as conn:
+        return {tuple(row[:-1]): row[-1] for row in conn.execute(text(f"SELECT * FROM {table}"))}
+
+
+PLAYS = [
+    (1, 0, 'roon'),
+    (2, 60, 'roon'),
+    (3, 120, 'lastfm'),
+    (1, 3 * 3600, 'roon'),
+    (2, 2 * 86400, 'lastfm'),
+]
+
+
+class TestTriggers:
+    """Tests de la maintenance incrémentale."""
+
+    def test_insert_updates_all_rollups(self, engine):
+        """Chaque insertion incrémente les quatre agrégats."""
+        add_plays(engine, PLAYS)
+        day, hour = local_key(BASE_TIMESTAMP)
+
+        expected_daily = {}
+        for _, offset, source in PLAYS:
+            key = (local_key(BASE_TIMESTAMP + offset)[0], source)
+            expected_daily[key] = expected_daily.get(key, 0) + 1
+        assert rollup(engine, 'rollup_daily') == expected_daily
+        assert rollup(engine, 'rollup_hourly')[(day, hour, 'roon')] == 2
+        # La piste sans interprète n'apparaît pas dans l'agrégat par artiste
+        assert sum(rollup(engine, 'rollup_artist_daily').values()) == 4
+        # artist_id/album_id absents de la ligne: relus depuis tracks
+        assert rollup(engine, 'rollup_album_daily')[(day, 2, 'lastfm')] == 1
+        assert all(count == 0 for count in check_rollups(engine).values())
+
+    def test_delete_and_update(self, engine):
+        """Suppressions et déplacements d'écoutes gardent les agrégats exacts."""
+        add_plays(engine, PLAYS)
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM listening_history WHERE track_id = 3"))
+            conn.execute(text("UPDATE listening_history SET source = 'lastfm', timestamp = timestamp + 86400 "
+                              "WHERE track_id = 1"))
+
+        day, _ = local_key(BASE_TIMESTAMP)
+        assert (day, 2, 'lastfm') not in rollup(engine, 'rollup_album_daily')
+        assert sum(rollup(engine, 'rollup_daily').values()) == 4
+        assert all(count == 0 for count in check_rollups(engine).values())
+
+    def test_upsert_does_not_double_count(self, engine):
+        """Le ré-import (ON CONFLICT DO UPDATE de la migration) ne compte pas deux fois."""
+        add_plays(engine, PLAYS)
+        stmt = sqlite_insert(ListeningHistory.__table__).values(
+            track_id=1, timestamp=BASE_TIMESTAMP, date="2026-01-21 12:00", source='roon', loved=True
+        )
+        with engine.begin() as conn:
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=['track_id', 'timestamp'], set_={'loved': stmt.excluded.loved}
+            ))
+
+        assert sum(rollup(engine, 'rollup_daily').values()) == 5
+
+
+class TestRebuildAndCheck:
+    """Tests de la reconstruction et du contrôle de cohérence."""
+
+    def test_check_detects_drift_and_rebuild_repairs(self, engine):
+        """Une altération manuelle est détectée puis corrigée."""
+        add_plays(engine, PLAYS)
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE rollup_hourly SET plays = plays + 5"))
+            conn.execute(text("DELETE FROM rollup_artist_daily"))
+
+        mismatches = check_rollups(engine)
+        assert mismatches['rollup_hourly'] > 0
+        assert mismatches['rollup_artist_daily'] > 0
+        assert mismatches['rollup_daily'] == 0
+
+        counts = rebuild_rollups(engine)
+        assert counts['rollup_daily'] == len(rollup(engine, 'rollup_daily'))
+        assert all(count == 0 for count in check_rollups(engine).values())
+
+    def test_ensure_on_database_without_rollups(self, engine):
+        """Une base antérieure aux agrégats les reçoit (tables + triggers), puis reconstruction."""
+        add_plays(engine, PLAYS)
+        with engine.begin() as conn:
+            for table in ('rollup_daily', 'rollup_hourly', 'rollup_artist_daily', 'rollup_album_daily'):
+                conn.execute(text(f"DROP TABLE {table}"))
+            for trigger in ('trg_rollups_insert', 'trg_rollups_delete', 'trg_rollups_update'):
+                conn.execute(text(f"DROP TRIGGER {trigger}"))
+
+        assert ensure_rollups(engine) is True
+        assert ensure_rollups(engine) is False
+        rebuild_rollups(engine)
+        add_plays(engine, [(2, 5 * 86400, 'roon')])
+
+        assert sum(rollup(engine, 'rollup_daily').values()) == 6
+        assert all(count == 0 for count in check_rollups(engine).values())
+
+
+class TestRepositoryRollups:
+    """Tests des lectures du repository sur les agrégats."""
+
+    def test_daily_counts(self, engine):
+        """Comptages quotidiens, toutes sources ou filtrés."""
+        add_plays(engine, PLAYS)
+        repository = MusicRepository(engine)
+
+        daily = repository.daily_play_counts()
+        assert sum(daily.values()) == 5
+        assert list(daily) == sorted(daily)
+        assert sum(repository.daily_play_counts(source='lastfm').values()) == 2
+
+    def test_counts_by_hour_are_exact_from_any_instant(self, engine):
+        """Un instant en milieu d'heure est respecté (heure entamée lue sur l'historique brut)."""
+        add_plays(engine, PLAYS)
+        repository = MusicRepository(engine)
+
+        assert sum(repository.play_counts_by_hour().values()) == 5
+        for since_offset in (0, 30, 60, 61, 3600, 3 * 3600 + 1):
+            since = BASE_TIMESTAMP + since_offset
+            expected = {}
+            for _, offset, _ in PLAYS:
+                if BASE_TIMESTAMP + offset >= since:
+                    key = local_key(BASE_TIMESTAMP + offset)
+                    expected[key] = expected.get(key, 0) + 1
+            assert repository.play_counts_by_hour(since=since) == expected
+
+        assert sum(repository.play_counts_by_hour(source='roon').values()) == 3
+
+    def test_fallback_without_rollup_tables(self, engine):
+        """Sans tables d'agrégats, les comptages sont calculés sur l'historique brut."""
+        add_plays(engine, PLAYS)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE rollup_daily"))
+        repository = MusicRepository(engine)
+
+        assert repository.has_rollups() is False
+        assert sum(repository.daily_play_counts().values()) == 5
+        assert sum(repository.play_counts_by_hour(since=BASE_TIMESTAMP + 1).values()) == 4
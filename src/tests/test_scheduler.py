@@ -5,15 +5,23 @@ Ce fichier teste les fonctionnalités du TaskScheduler incluant:
 - Vérification des tâches planifiées
 - Exécution des tâches
 - Gestion de l'état et de la configuration
+- Exécution parallèle limitée par classe de ressource
+- Exécution en processus de travail préchauffés (mode warm)
+- Dépendances entre tâches et empreintes des entrées
+- Profilage des exécutions
+- Journal par tâche, heartbeats, annulation et délais par tâche
 
-Version: 1.0.0
-Date: 25 janvier 2026
+Version: 1.5.0
+Date: 28 janvier 2026
 """
 
 import pytest
 import json
 import os
 import sys
+import threading
+import time
+from collections import Counter
 from pathlib import Path
 from datetime import datetime, timedelta
 import tempfile
@@ -22,7 +30,9 @@ import shutil
 # Ajouter le répertoire src au path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.scheduler import TaskScheduler, TASKS_CONFIG, DEFAULT_TASK_CONFIG
+from utils import scheduler as scheduler_module
+from utils import task_runner
+from utils.scheduler import TaskScheduler, TASKS_CONFIG, DEFAULT_TASK_CONFIG, dependency_order
 
 
 @pytest.fixture
@@ -298,5 +308,416 @@ class TestTaskSchedulerPersistence:
         assert state["analyze_listening_patterns"]["execution_count"] == 99
 
 
+class FakeTasks:
+    """Remplace les sous-processus des tâches: durée par tâche, concurrence par classe."""
+    
+    DURATIONS = {
+        "read_discogs": 0.6,
+        "analyze_listening_patterns": 0.1,
+        "generate_playlist": 0.1,
+        "generate_soundtrack": 0.1,
+        "generate_haiku": 0.2,
+        "ai_optimize_system": 0.2,
+    }
+    
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.scripts = {str(scheduler.project_root / info["script"]): name for name, info in TASKS_CONFIG.items()}
+        self.lock = threading.Lock()
+        self.active = Counter()
+        self.max_active = Counter()
+        self.finished = []
+        self.effects = {}
+        self.release = threading.Event()
+        self.release.set()
+    
+    def _work(self, task_name):
+        resource_class = TASKS_CONFIG[task_name]["resource_class"]
+        with self.lock:
+            self.active[resource_class] += 1
+            self.max_active[resource_class] = max(self.max_active[resource_class], self.active[resource_class])
+        time.sleep(self.DURATIONS[task_name])
+        self.release.wait(5)
+        if task_name in self.effects:
+            self.effects[task_name]()
+        with self.lock:
+            self.active[resource_class] -= 1
+            self.finished.append(task_name)
+    
+    def run(self, cmd, cwd=None, timeout=None, on_output=None, cancel_event=None):
+        task_name = next(self.scripts[part] for part in cmd if part in self.scripts)
+        self._work(task_name)
+        if on_output:
+            on_output("stdout", f"{task_name} done")
+        return {"returncode": 0, "stderr": ""}
+    
+    def run_ai_optimizer(self, task_name):
+        self._work(task_name)
+        return 0
+
+
+@pytest.fixture
+def fake_tasks(scheduler, monkeypatch):
+    """Scripts présents, exécutions simulées."""
+    for info in TASKS_CONFIG.values():
+        script = scheduler.project_root / info["script"]
+        script.parent.mkdir(parents=True, exist_ok=True)
+        script.write_text("", encoding='utf-8')
+    fake = FakeTasks(scheduler)
+    # Exécutions simulées au niveau du sous-processus
+    monkeypatch.setattr(scheduler_module, "DEFAULT_EXECUTION_MODE", "subprocess")
+    monkeypatch.setattr(scheduler_module, "run_process", fake.run)
+    monkeypatch.setattr(scheduler, "_run_ai_optimizer", fake.run_ai_optimizer)
+    monkeypatch.setattr(scheduler_module, "DISPATCH_POLL_SECONDS", 0.01)
+    return fake
+
+
+class TestTaskSchedulerParallel:
+    """Tests de l'exécution parallèle par classe de ressource."""
+    
+    def test_due_tasks_run_in_parallel(self, scheduler, fake_tasks, test_state_path):
+        """Toutes les tâches dues s'exécutent, en parallèle, sous les limites de leur classe."""
+        started = time.perf_counter()
+        results = scheduler.check_and_execute_tasks()
+        elapsed = time.perf_counter() - started
+        
+        assert set(results) == set(TASKS_CONFIG)
+        assert all(success for success, _ in results.values())
+        assert fake_tasks.max_active["network"] == 1
+        assert fake_tasks.max_active["ai"] == 1
+        assert fake_tasks.max_active["cpu"] == 2
+        assert elapsed < sum(FakeTasks.DURATIONS.values())
+        
+        # La synchronisation Discogs (lente) ne retarde pas les tâches locales
+        assert fake_tasks.finished.index("analyze_listening_patterns") < fake_tasks.finished.index("read_discogs")
+        
+        state = json.loads(test_state_path.read_text(encoding='utf-8'))
+        for task_name in TASKS_CONFIG:
+            assert state[task_name]["execution_count"] == 1
+            assert state[task_name]["last_status"] == "success"
+            assert scheduler.config["scheduled_tasks"][task_name]["last_execution"] is not None
+        assert not scheduler.check_and_execute_tasks()
+    
+    def test_task_not_run_twice(self, scheduler, fake_tasks):
+        """Une tâche en cours n'est pas relancée; son statut l'indique."""
+        fake_tasks.release.clear()
+        worker = threading.Thread(target=scheduler.execute_task, args=("read_discogs", True))
+        worker.start()
+        while not fake_tasks.active["network"]:
+            time.sleep(0.01)
+        
+        assert scheduler.get_task_status("read_discogs")["running"]
+        success, message = scheduler.execute_task("read_discogs", manual=True)
+        assert not success and "already running" in message
+        assert scheduler.run_tasks(["read_discogs"])["read_discogs"][0] is False
+        
+        fake_tasks.release.set()
+        worker.join()
+        assert not scheduler.get_task_status("read_discogs")["running"]
+        assert scheduler.state["read_discogs"]["execution_count"] == 1
+    
+    def test_manual_run_holds_resource_slot(self, scheduler, fake_tasks):
+        """Une exécution manuelle occupe le créneau de sa classe: les autres tâches IA attendent."""
+        fake_tasks.release.clear()
+        worker = threading.Thread(target=scheduler.execute_task, args=("generate_haiku", True))
+        worker.start()
+        while not fake_tasks.active["ai"]:
+            time.sleep(0.01)
+        threading.Timer(0.3, fake_tasks.release.set).start()
+        
+        results = scheduler.run_tasks(["ai_optimize_system", "analyze_listening_patterns"])
+        worker.join()
+        
+        assert all(success for success, _ in results.values())
+        assert fake_tasks.max_active["ai"] == 1
+        assert fake_tasks.finished.index("generate_haiku") < fake_tasks.finished.index("ai_optimize_system")
+    
+    def test_resource_classes(self, scheduler):
+        """Classes déclarées, playlist IA comptée comme tâche IA, limites configurables."""
+        assert scheduler.get_resource_class("read_discogs") == "network"
+        assert scheduler.get_resource_class("generate_playlist") == "cpu"
+        scheduler.config["scheduled_tasks"]["generate_playlist"]["playlist_type"] = "ai_generated"
+        assert scheduler.get_resource_class("generate_playlist") == "ai"
+        
+        custom = TaskScheduler(scheduler.config_path, scheduler.state_path, resource_limits={"cpu": 4})
+        assert custom.resource_limits == {"network": 1, "ai": 1, "cpu": 4}
+
+
+class TestTaskSchedulerDependencies:
+    """Tests des dépendances entre tâches et des empreintes des entrées."""
+    
+    def test_dependency_order(self, monkeypatch):
+        """Producteurs d'abord, ordre d'origine sinon; cycle refusé."""
+        assert dependency_order(["generate_soundtrack", "analyze_listening_patterns", "read_discogs"]) == [
+            "read_discogs", "generate_soundtrack", "analyze_listening_patterns"
+        ]
+        assert len(dependency_order(TASKS_CONFIG)) == len(TASKS_CONFIG)
+        
+        monkeypatch.setitem(TASKS_CONFIG, "read_discogs", dict(TASKS_CONFIG["read_discogs"], depends_on=["generate_soundtrack"]))
+        with pytest.raises(ValueError):
+            dependency_order(["read_discogs", "generate_soundtrack"])
+    
+    def test_dependents_wait_for_producer(self, scheduler, fake_tasks):
+        """Dépendants lancés après la fin du producteur, tâches indépendantes en parallèle."""
+        results = scheduler.run_tasks(["generate_soundtrack", "generate_playlist", "read_discogs",
+                                       "analyze_listening_patterns"])
+        
+        assert all(success for success, _ in results.values())
+        finished = fake_tasks.finished
+        assert finished.index("read_discogs") < finished.index("generate_soundtrack")
+        assert finished.index("read_discogs") < finished.index("generate_playlist")
+        assert finished.index("analyze_listening_patterns") < finished.index("read_discogs")
+    
+    def test_unchanged_inputs_skipped(self, scheduler, fake_tasks, temp_dir):
+        """Tâche due mais entrées inchangées: ignorée; modification ou sortie absente: relancée."""
+        history = temp_dir / "data" / "history" / "chk-roon.json"
+        history.parent.mkdir(parents=True, exist_ok=True)
+        history.write_text('{"tracks": []}', encoding='utf-8')
+        
+        assert scheduler.execute_task("analyze_listening_patterns")[0]
+        assert scheduler.state["analyze_listening_patterns"]["input_fingerprint"]
+        task_config = scheduler.config["scheduled_tasks"]["analyze_listening_patterns"]
+        task_config["last_execution"] = (datetime.now() - timedelta(days=2)).isoformat()
+        
+        should_run, reason = scheduler.should_execute("analyze_listening_patterns")
+        assert not should_run and "unchanged" in reason
+        assert scheduler.get_task_status("analyze_listening_patterns")["inputs_unchanged"]
+        assert "analyze_listening_patterns" not in scheduler.check_and_execute_tasks()
+        
+        history.write_text('{"tracks": [{"timestamp": 1}]}', encoding='utf-8')
+        assert scheduler.should_execute("analyze_listening_patterns")[0]
+        assert scheduler.execute_task("analyze_listening_patterns")[0]
+        task_config["last_execution"] = (datetime.now() - timedelta(days=2)).isoformat()
+        assert not scheduler.should_execute("analyze_listening_patterns")[0]
+        
+        shutil.rmtree(temp_dir / "output" / "reports")
+        assert scheduler.should_execute("analyze_listening_patterns")[0]
+    
+    def test_producer_triggers_changed_dependents(self, scheduler, fake_tasks, temp_dir):
+        """Collection modifiée par read_discogs: dépendants déterministes relancés aussitôt."""
+        collection = temp_dir / "data" / "collection" / "discogs-collection.json"
+        collection.parent.mkdir(parents=True, exist_ok=True)
+        fake_tasks.effects["read_discogs"] = lambda: collection.write_text("[]", encoding='utf-8')
+        
+        # Dépendants déjà exécutés avec la collection absente, pas encore dus
+        for task_name in ("generate_playlist", "generate_soundtrack", "generate_haiku"):
+            scheduler.state[task_name]["last_status"] = "success"
+            scheduler.state[task_name]["input_fingerprint"] = scheduler.compute_input_fingerprint(task_name)
+            scheduler.config["scheduled_tasks"][task_name]["last_execution"] = datetime.now().isoformat()
+        scheduler.config["scheduled_tasks"]["generate_soundtrack"]["enabled"] = False
+        
+        results = scheduler.run_tasks(["read_discogs"])
+        assert set(results) == {"read_discogs", "generate_playlist"}
+        assert fake_tasks.finished == ["read_discogs", "generate_playlist"]
+        
+        # Collection inchangée: aucun dépendant relancé
+        del fake_tasks.effects["read_discogs"]
+        assert set(scheduler.run_tasks(["read_discogs"])) == {"read_discogs"}
+
+
+def write_task_script(scheduler, task_name, content):
+    script = scheduler.project_root / TASKS_CONFIG[task_name]["script"]
+    script.parent.mkdir(parents=True, exist_ok=True)
+    script.write_text(content, encoding='utf-8')
+
+
+class TestTaskSchedulerWarmMode:
+    """Tests de l'exécution dans les processus de travail préchauffés."""
+    
+    @pytest.fixture
+    def warm_scheduler(self, scheduler, monkeypatch):
+        """Scheduler dont le pool ne précharge rien (démarrage rapide)."""
+        monkeypatch.setattr(task_runner, "PRELOAD_MODULES", ())
+        yield scheduler
+        scheduler.shutdown()
+    
+    def test_warm_runs_record_startup_saved(self, warm_scheduler, test_state_path):
+        """Deux exécutions: même processus, arguments transmis, démarrage évité enregistré."""
+        write_task_script(warm_scheduler, "generate_playlist", (
+            "import os, sys\n"
+            "RUNS = []\n"
+            "def main():\n"
+            "    RUNS.append(sys.argv[1:])\n"
+            "    with open('output/reports/runs.txt', 'w') as f:\n"
+            "        f.write(f'{len(RUNS)} {os.getpid()} {sys.argv[2]}')\n"
+        ))
+        
+        for _ in range(2):
+            success, message = warm_scheduler.execute_task("generate_playlist", manual=True)
+            assert success, message
+        
+        runs, pid, algorithm = (warm_scheduler.project_root / "output" / "reports" / "runs.txt").read_text().split()
+        assert (runs, algorithm) == ("2", "top_sessions")
+        assert int(pid) != os.getpid()
+        state = json.loads(test_state_path.read_text(encoding='utf-8'))["generate_playlist"]
+        assert state["execution_mode"] == "warm"
+        assert state["last_startup_saved_seconds"] > 0
+        assert state["startup_saved_total_seconds"] >= state["last_startup_saved_seconds"]
+        assert warm_scheduler.get_task_status("generate_playlist")["execution_mode"] == "warm"
+    
+    def test_warm_failure_and_subprocess_override(self, warm_scheduler):
+        """Échec d'un script en mode warm (fin de la trace); mode subprocess configurable par tâche."""
+        write_task_script(warm_scheduler, "generate_soundtrack",
+                          "def main():\n    raise RuntimeError('collection introuvable')\n")
+        success, message = warm_scheduler.execute_task("generate_soundtrack", manual=True)
+        assert not success
+        assert "RuntimeError: collection introuvable" in message
+        assert warm_scheduler.state["generate_soundtrack"]["last_status"] == "error"
+        
+        warm_scheduler.config["scheduled_tasks"]["generate_soundtrack"]["execution_mode"] = "subprocess"
+        assert warm_scheduler.get_execution_mode("generate_soundtrack") == "subprocess"
+        warm_scheduler.config["scheduled_tasks"]["generate_soundtrack"]["execution_mode"] = "thread"
+        assert warm_scheduler.get_execution_mode("generate_soundtrack") == "warm"
+
+
+class TestTaskSchedulerProfiling:
+    """Tests du profilage des exécutions (last_profile, profile_history)."""
+    
+    def test_profile_history_rolling(self, scheduler, fake_tasks, temp_dir, monkeypatch):
+        """Historique limité aux N dernières exécutions; sorties modifiées ou non par exécution."""
+        monkeypatch.setattr(scheduler_module, "PROFILE_HISTORY_SIZE", 3)
+        collection = temp_dir / "data" / "collection" / "discogs-collection.json"
+        collection.parent.mkdir(parents=True, exist_ok=True)
+        runs = []
+        
+        def sync():
+            runs.append(1)
+            collection.write_text(f"[{min(len(runs), 2)}]", encoding='utf-8')
+        
+        fake_tasks.effects["read_discogs"] = sync
+        for _ in range(4):
+            assert scheduler.execute_task("read_discogs", manual=True)[0]
+        
+        history = scheduler.state["read_discogs"]["profile_history"]
+        assert [run["outputs_changed"] for run in history] == [True, False, False]
+        assert all(run["status"] == "success" and run["wall_seconds"] > 0 for run in history)
+        assert scheduler.get_task_status("read_discogs")["last_profile"]["wall_seconds"] > 0
+    
+    def test_subprocess_run_profiled(self, scheduler, monkeypatch):
+        """Sous-processus: CPU, mémoire et octets écrits mesurés dans le script, même en échec."""
+        monkeypatch.setattr(scheduler_module, "DEFAULT_EXECUTION_MODE", "subprocess")
+        script = (
+            "import sys\n"
+            "with open('output/reports/patterns.txt', 'w') as f:\n"
+            "    f.write('x' * 200000)\n"
+            "sys.exit({})\n"
+        )
+        write_task_script(scheduler, "analyze_listening_patterns", script.format(0))
+        
+        assert scheduler.execute_task("analyze_listening_patterns", manual=True)[0]
+        profile = scheduler.state["analyze_listening_patterns"]["last_profile"]
+        assert profile["write_bytes"] >= 200000
+        assert profile["peak_rss_mb"] > 0
+        assert profile["cpu_user_seconds"] + profile["cpu_system_seconds"] > 0
+        assert profile["http_calls"] == 0
+        assert scheduler.state["analyze_listening_patterns"]["profile_history"][-1]["outputs_changed"] is True
+        
+        write_task_script(scheduler, "analyze_listening_patterns", script.format(3))
+        assert not scheduler.execute_task("analyze_listening_patterns", manual=True)[0]
+        failed = scheduler.state["analyze_listening_patterns"]["profile_history"][-1]
+        assert failed["status"] == "error" and failed["write_bytes"] >= 200000
+
+
+LONG_TASK_SCRIPT = (
+    "import time\n"
+    "for step in range(300):\n"
+    "    print(f'étape {step}')\n"
+    "    time.sleep(0.1)\n"
+)
+
+
+class TestTaskSchedulerMonitoring:
+    """Tests du journal par tâche, des heartbeats, de l'annulation et des délais."""
+    
+    @pytest.fixture
+    def live_scheduler(self, scheduler, monkeypatch):
+        """Sous-processus réels, heartbeats rapprochés."""
+        monkeypatch.setattr(scheduler_module, "DEFAULT_EXECUTION_MODE", "subprocess")
+        monkeypatch.setattr(scheduler_module, "HEARTBEAT_SECONDS", 0.2)
+        yield scheduler
+        scheduler.shutdown()
+    
+    def start(self, scheduler, task_name):
+        """Lance une tâche dans un thread et attend ses premières lignes de sortie."""
+        outcome = {}
+        worker = threading.Thread(
+            target=lambda: outcome.update(result=scheduler.execute_task(task_name, manual=True))
+        )
+        worker.start()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            progress = scheduler.get_task_status(task_name)["progress"]
+            if progress and progress["output_lines"] and progress["heartbeat"]:
+                return worker, outcome
+            time.sleep(0.05)
+        pytest.fail("task produced no output")
+    
+    def test_output_written_to_task_log(self, live_scheduler):
+        """Sortie dans le journal de la tâche; message d'erreur: dernières lignes et chemin du journal."""
+        write_task_script(live_scheduler, "generate_soundtrack", (
+            "import sys\n"
+            "print('albums lus: 12')\n"
+            "for i in range(100):\n"
+            "    print(f'erreur {i}', file=sys.stderr)\n"
+            "sys.exit(2)\n"
+        ))
+        success, message = live_scheduler.execute_task("generate_soundtrack", manual=True)
+        
+        assert not success
+        assert "erreur 99" in message and "erreur 79" not in message
+        assert "output/task-logs/generate_soundtrack.log" in message
+        log = live_scheduler.get_log_path("generate_soundtrack").read_text(encoding='utf-8')
+        assert "generate_soundtrack started (manual, subprocess" in log
+        assert "albums lus: 12" in log and "[stderr] erreur 0" in log
+        assert "generate_soundtrack error" in log
+        assert "progress" not in live_scheduler.state["generate_soundtrack"]
+    
+    def test_cancel_running_task(self, live_scheduler):
+        """Annulation: progression visible, tâche arrêtée, reportée à sa prochaine échéance."""
+        write_task_script(live_scheduler, "generate_soundtrack", LONG_TASK_SCRIPT)
+        worker, outcome = self.start(live_scheduler, "generate_soundtrack")
+        
+        status = live_scheduler.get_task_status("generate_soundtrack")
+        assert status["running"] and status["progress"]["last_line"].startswith("étape")
+        assert live_scheduler.cancel_task("generate_soundtrack")[0]
+        worker.join(15)
+        
+        success, message = outcome["result"]
+        assert not success and "cancelled" in message
+        assert live_scheduler.state["generate_soundtrack"]["last_status"] == "cancelled"
+        assert not live_scheduler.should_execute("generate_soundtrack")[0]
+        assert live_scheduler.get_task_status("generate_soundtrack")["progress"] is None
+        assert not live_scheduler.cancel_task("generate_soundtrack")[0]
+    
+    def test_cancel_from_other_process(self, live_scheduler, test_config_path, test_state_path):
+        """Autre instance (GUI): progression lue dans l'état, annulation appliquée au heartbeat."""
+        write_task_script(live_scheduler, "generate_soundtrack", LONG_TASK_SCRIPT)
+        worker, outcome = self.start(live_scheduler, "generate_soundtrack")
+        
+        gui = TaskScheduler(test_config_path, test_state_path)
+        assert gui.get_task_status("generate_soundtrack")["running"]
+        assert gui.cancel_task("generate_soundtrack")[0]
+        worker.join(15)
+        
+        assert "cancelled" in outcome["result"][1]
+        assert not live_scheduler._cancel_marker("generate_soundtrack").exists()
+    
+    def test_task_timeout(self, live_scheduler):
+        """Délai configuré par tâche; valeur invalide refusée."""
+        write_task_script(live_scheduler, "generate_soundtrack", LONG_TASK_SCRIPT)
+        success, message = live_scheduler.update_task_config("generate_soundtrack", True, 7, "day",
+                                                             timeout_minutes=0.02)
+        assert success, message
+        assert live_scheduler.get_timeout("generate_soundtrack") == pytest.approx(1.2)
+        
+        started = time.monotonic()
+        success, message = live_scheduler.execute_task("generate_soundtrack", manual=True)
+        assert not success and "timeout" in message
+        assert time.monotonic() - started < 10
+        
+        assert not live_scheduler.update_task_config("generate_soundtrack", True, 7, "day", timeout_minutes=0)[0]
+        assert live_scheduler.get_timeout("analyze_listening_patterns") == scheduler_module.TASK_TIMEOUT_SECONDS
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
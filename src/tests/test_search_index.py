@@ -0,0 +1,124 @@
+"""
+Tests unitaires pour l'index de recherche plein texte (src/models/search_index.py)
+
+Vérifie le repli des accents, la recherche par préfixe, la recherche dans les
+champs secondaires (labels, résumé, pistes) et la conservation de l'ordre.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import time
+
+import pytest
+
+from src.models.search_index import SearchIndex, build_match_query
+
+
+ALBUMS = [
+    {'Titre': "Kind of Blue", 'Artiste': ["Miles Davis"], 'Labels': ["Columbia"], 'Resume': "Album modal."},
+    {'Titre': "La Môme", 'Artiste': ["Various"], 'Labels': ["EMI"], 'Resume': "Bande originale d'Édith Piaf."},
+    {'Titre': "Blue Train", 'Artiste': ["John Coltrane"], 'Labels': ["Blue Note"], 'Resume': None},
+    {'Titre': '"Heroes"', 'Artiste': ["David Bowie", "Brian Eno"], 'Labels': [], 'Resume': ""},
+]
+
+PLAYS = [
+    {'artist': "David Bowie", 'title': "Neuköln", 'album': '"Heroes"'},
+    {'artist': "Miles Davis", 'title': "So What", 'album': "Kind of Blue"},
+    {'artist': "Céline Dion", 'title': "Pour que tu m'aimes encore", 'album': "D'eux"},
+]
+
+
+@pytest.fixture
+def album_index():
+    """Index de la collection avec les pistes écoutées."""
+    return SearchIndex.for_albums(ALBUMS, PLAYS)
+
+
+class TestMatchQuery:
+    """Tests de la traduction des saisies utilisateur."""
+
+    def test_words_become_prefixes(self):
+        """Chaque mot devient un préfixe entre guillemets."""
+        assert build_match_query("Miles  dav") == '"Miles"* "dav"*'
+
+    def test_operators_are_neutralised(self):
+        """Ponctuation et opérateurs FTS5 ne produisent pas d'erreur de syntaxe."""
+        assert build_match_query('"Heroes" AND (NEAR*') == '"Heroes"* "AND"* "NEAR"*'
+        assert build_match_query("  -- ") is None
+        assert build_match_query("") is None
+
+
+class TestAlbumSearch:
+    """Tests de la recherche dans la collection."""
+
+    def test_empty_term_returns_everything(self, album_index):
+        """Terme vide → tous les albums, dans l'ordre."""
+        assert album_index.search("") == [0, 1, 2, 3]
+        assert album_index.search("", limit=2) == [0, 1]
+
+    def test_case_and_accent_folding(self, album_index):
+        """Casse et accents ignorés, dans les deux sens."""
+        assert album_index.search("MOME") == [1]
+        assert album_index.search("môme") == [1]
+        assert album_index.search("edith") == [1]
+
+    def test_prefix_and_multiple_words(self, album_index):
+        """Préfixes et ET logique entre les mots, ordre d'origine conservé."""
+        assert album_index.search("dav") == [0, 3]
+        assert album_index.search("blue") == [0, 2]
+        assert album_index.search("blue colu") == [0]
+        assert album_index.search("blue col") == [0, 2]  # Columbia, Coltrane
+        assert album_index.search("blue zzz") == []
+
+    def test_secondary_fields(self, album_index):
+        """Labels, résumé et titres des pistes écoutées sont indexés."""
+        assert album_index.search("columbia") == [0]
+        assert album_index.search("modal") == [0]
+        assert album_index.search("neukoln") == [3]
+        assert album_index.search("so what") == [0]
+
+    def test_user_punctuation(self, album_index):
+        """Les guillemets saisis n'empêchent pas la recherche."""
+        assert album_index.search('"Heroes"') == [3]
+
+
+class TestPlaySearch:
+    """Tests de la recherche dans le journal d'écoute."""
+
+    def test_artist_title_album(self):
+        """Recherche sur artiste, titre et album."""
+        index = SearchIndex.for_plays(PLAYS)
+
+        assert index.search("celine") == [2]
+        assert index.search("aimes") == [2]
+        assert index.search("eux") == [2]
+        assert index.search("heroes bowie") == [0]
+        assert index.size == 3
+
+    def test_incremental_add(self):
+        """Les documents ajoutés ensuite prennent les positions suivantes."""
+        index = SearchIndex.for_plays(PLAYS[:1])
+        index.add_documents(PLAYS[1:])
+
+        assert index.search("miles") == [1]
+        index.close()
+
+
+def test_latency_is_flat_on_large_collection():
+    """La recherche reste de l'ordre de la milliseconde sur 50 000 albums."""
+    albums = [
+        {'Titre': f"Album {i} volume {i % 97}", 'Artiste': [f"Artiste {i % 1000}"],
+         'Labels': [f"Label {i % 50}"], 'Resume': "Un résumé générique."}
+        for i in range(50000)
+    ]
+    albums.append({'Titre': "Ésotérique", 'Artiste': ["Zéphyr"], 'Labels': [], 'Resume': ""})
+    index = SearchIndex.for_albums(albums)
+
+    started = time.perf_counter()
+    for _ in range(20):
+        assert index.search("zephyr esot") == [50000]
+    elapsed = (time.perf_counter() - started) / 20
+
+    assert elapsed < 0.02
@@ -0,0 +1,152 @@
+"""
+Tests unitaires pour le découpage en sessions d'écoute (src/models/sessions.py)
+
+Vérifie que le découpage vectorisé donne les sessions de l'ancienne boucle
+Python, l'ordre des sessions les plus longues, les co-occurrences et
+transitions d'artistes, et qu'un rapport complet ne trie et ne découpe
+l'historique qu'une seule fois.
+
+Version: 1.0.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import importlib.util
+import os
+import random
+from collections import Counter, defaultdict
+from itertools import combinations
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.models.history_store import ColumnarHistory
+from src.models.sessions import SessionIndex, key_transitions
+
+
+BASE_TIMESTAMP = 1769000000
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_script(name, filename):
+    """Charge un script d'analyse (nom avec tirets) comme module."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, "src", "analysis", filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def loop_sessions(plays, gap_minutes=30):
+    """Référence: découpage écoute par écoute (ancienne implémentation)."""
+    ordered = sorted(plays, key=lambda t: t['timestamp'])
+    sessions = [[ordered[0]]] if ordered else []
+    for previous, current in zip(ordered, ordered[1:]):
+        if (current['timestamp'] - previous['timestamp']) / 60 <= gap_minutes:
+            sessions[-1].append(current)
+        else:
+            sessions.append([current])
+    return sessions
+
+
+@pytest.fixture
+def plays():
+    """Écoutes aléatoires (ordre non chronologique, doublons de timestamp)."""
+    rng = random.Random(3)
+    plays = []
+    timestamp = BASE_TIMESTAMP
+    for i in range(600):
+        timestamp += rng.choice((60, 240, 1800, 1801, 5000, 0))
+        artist = f"Artiste {rng.randrange(12)}"
+        plays.append({
+            'timestamp': timestamp,
+            'artist': artist,
+            'title': f"Titre {rng.randrange(40)}",
+            'album': f"Album de {artist}",
+            'source': 'roon',
+        })
+    rng.shuffle(plays)
+    return plays
+
+
+class TestSessionIndex:
+    """Tests du découpage vectorisé."""
+
+    @pytest.mark.parametrize("gap_minutes", [5, 30, 90])
+    def test_matches_loop(self, plays, gap_minutes):
+        """Mêmes sessions (mêmes écoutes, même ordre) que la boucle de référence."""
+        history = ColumnarHistory.from_plays(plays)
+        sessions = history.sessions(gap_minutes)
+        expected = loop_sessions(plays, gap_minutes)
+        assert len(sessions) == len(expected)
+        for positions, session in zip(sessions, expected):
+            assert [plays[p] for p in positions] == session
+
+    def test_longest_order(self, plays):
+        """Même ordre que sorted(sessions, key=len, reverse=True)."""
+        history = ColumnarHistory.from_plays(plays)
+        sessions = history.sessions()
+        expected = sorted(loop_sessions(plays), key=len, reverse=True)[:10]
+        longest = [[plays[p] for p in sessions.positions(n)] for n in sessions.longest(10)]
+        assert longest == expected
+
+    def test_empty_and_single(self):
+        """Historique vide: aucune session; une écoute: une session."""
+        assert len(ColumnarHistory.from_plays([]).sessions()) == 0
+        single = ColumnarHistory.from_plays([{'timestamp': BASE_TIMESTAMP, 'artist': "A"}])
+        assert single.sessions().lengths.tolist() == [1]
+
+    def test_cached(self, plays):
+        """L'index est mis en cache par écart."""
+        history = ColumnarHistory.from_plays(plays)
+        assert history.sessions() is history.sessions(30)
+        assert history.sessions(10) is not history.sessions(30)
+
+    def test_pair_counts(self, plays):
+        """Nombre de sessions partagées par chaque paire d'artistes."""
+        history = ColumnarHistory.from_plays(plays)
+        expected = Counter()
+        for session in loop_sessions(plays):
+            artists = sorted({history.artists.values.index(t['artist']) for t in session})
+            expected.update(combinations(artists, 2))
+        assert history.sessions().pair_counts(history.artist_ids) == expected
+
+    def test_key_transitions(self, plays):
+        """Transitions entre artistes consécutifs, dans l'ordre de première apparition."""
+        history = ColumnarHistory.from_plays(plays)
+        ordered = sorted(plays, key=lambda t: t['timestamp'])
+        expected = defaultdict(dict)
+        for current, following in zip(ordered, ordered[1:]):
+            if current['artist'] != following['artist']:
+                counts = expected[current['artist']]
+                counts[following['artist']] = counts.get(following['artist'], 0) + 1
+
+        names = history.artists.values
+        result = {
+            names[a]: {names[b]: count for b, count in nexts.items()}
+            for a, nexts in key_transitions(history.artist_ids, history.time_order).items()
+        }
+        assert list(result.items()) == [(k, v) for k, v in expected.items()]
+        assert all(list(result[k]) == list(expected[k]) for k in expected)
+
+
+class TestSharedAcrossRun:
+    """Un rapport et les playlists d'une exécution partagent tri et sessions."""
+
+    def test_report_sorts_and_sessionises_once(self, plays):
+        """generate_report + playlists: un seul tri, un seul découpage."""
+        patterns = load_script("analyze_listening_patterns", "analyze-listening-patterns.py")
+        playlists = load_script("generate_playlist", "generate-playlist.py")
+        history = ColumnarHistory.from_plays(plays)
+
+        with patch.object(ColumnarHistory, '_sort_by_time', autospec=True,
+                          side_effect=lambda self: np.argsort(self.timestamps, kind='stable')) as sort, \
+             patch.object(SessionIndex, 'build', wraps=SessionIndex.build) as build:
+            report = patterns.generate_report(history)
+            playlists.generate_top_sessions_playlist(history, 25)
+            playlists.generate_artist_correlations_playlist(history, 25)
+            playlists.generate_artist_flow_playlist(history, 25)
+
+        assert "SESSIONS D'ÉCOUTE" in report
+        assert sort.call_count == 1
+        assert build.call_count == 1
@@ -5,7 +5,10 @@ Ces tests vérifient toutes les fonctionnalités du service Spotify:
 - Recherche d'images d'artistes
 - Recherche d'images d'albums avec validation et scoring
 - Gestion des erreurs et retry logic
-- Mécanismes de cache
+- Mécanismes de cache (en mémoire et persistant SQLite)
+- Client concurrent (limiteur, Retry-After, fusion des recherches en cours)
+- Rafraîchissement en lots via les endpoints multi-ID
+- Client partagé par processus (un token, un cache, une résolution par clé)
 
 Version: 1.0.0
 Date: 26 janvier 2026
@@ -18,12 +21,18 @@ import time
 from unittest.mock import Mock, patch, MagicMock
 from urllib.error import HTTPError, URLError
 import io
+import threading
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pytest
+import requests
 from services.spotify_service import (
     SpotifyCache,
+    PersistentSpotifyCache,
+    SpotifyClient,
+    TokenBucket,
+    get_shared_client,
     get_spotify_token,
     search_spotify_artist_image,
     search_spotify_album_image,
@@ -802,5 +811,408 @@ class TestEdgeCasesAndBoundaryConditions:
         assert mock_urlopen.call_count == 3
 
 
+# ============================================================================
+# Tests pour PersistentSpotifyCache
+# ============================================================================
+
+def json_response(payload):
+    """Réponse urlopen simulée contenant un document JSON."""
+    response = MagicMock()
+    response.read.return_value = json.dumps(payload).encode('utf-8')
+    response.__enter__.return_value = response
+    return response
+
+
+@pytest.fixture
+def persistent_cache(tmp_path):
+    """Cache persistant dans un fichier temporaire."""
+    cache = PersistentSpotifyCache(str(tmp_path / "spotify-cache.db"))
+    yield cache
+    cache.close()
+
+
+class TestPersistentSpotifyCache:
+    """Tests du cache SQLite (TTL, cache négatif, LRU, compteurs)."""
+    
+    def test_survives_reopen(self, tmp_path):
+        """Images et token sont relus par une nouvelle instance."""
+        path = str(tmp_path / "spotify-cache.db")
+        cache = PersistentSpotifyCache(path)
+        cache.set_token("token_persistant", 3600)
+        cache.set_artist_image("Nina Simone", "https://nina.jpg")
+        cache.set_album_image("Nina Simone", "Pastel Blues", None)
+        cache.close()
+        
+        reopened = PersistentSpotifyCache(path)
+        assert reopened.get_token() == "token_persistant"
+        assert reopened.get_artist_image("Nina Simone") == "https://nina.jpg"
+        assert reopened.get_album_image("Nina Simone", "Pastel Blues", default="absent") is None
+        assert reopened.stats()["entries"] == 2
+        reopened.close()
+    
+    def test_negative_entry_distinct_from_missing(self, persistent_cache):
+        """Un None en cache est distinct d'une clé absente."""
+        persistent_cache.set_artist_image("Inconnu", None)
+        assert persistent_cache.get_artist_image("Inconnu", default="absent") is None
+        assert persistent_cache.get_artist_image("Autre", default="absent") == "absent"
+    
+    def test_separate_ttls(self, tmp_path):
+        """Les résultats négatifs expirent avant les résultats trouvés."""
+        cache = PersistentSpotifyCache(str(tmp_path / "cache.db"), hit_ttl=1000, miss_ttl=10)
+        with patch('services.spotify_service.time.time', return_value=1000.0):
+            cache.set_artist_image("Trouvé", "https://found.jpg")
+            cache.set_artist_image("Absent", None)
+        with patch('services.spotify_service.time.time', return_value=1100.0):
+            assert cache.get_artist_image("Trouvé") == "https://found.jpg"
+            assert cache.get_artist_image("Absent", default="expiré") == "expiré"
+        with patch('services.spotify_service.time.time', return_value=2500.0):
+            assert cache.get_artist_image("Trouvé", default="expiré") == "expiré"
+        cache.close()
+    
+    def test_lru_eviction(self, tmp_path):
+        """Au-delà de max_entries, les entrées les moins récemment lues sont supprimées."""
+        cache = PersistentSpotifyCache(str(tmp_path / "cache.db"), max_entries=3)
+        for i, name in enumerate(["A", "B", "C"]):
+            with patch('services.spotify_service.time.time', return_value=1000.0 + i):
+                cache.set_artist_image(name, f"https://{name}.jpg")
+        with patch('services.spotify_service.time.time', return_value=1010.0):
+            cache.get_artist_image("A")
+        with patch('services.spotify_service.time.time', return_value=1020.0):
+            cache.set_artist_image("D", "https://D.jpg")
+        
+        assert cache.stats()["entries"] == 3
+        with patch('services.spotify_service.time.time', return_value=1030.0):
+            assert cache.get_artist_image("B", default="évincé") == "évincé"
+            assert cache.get_artist_image("A") == "https://A.jpg"
+        cache.close()
+    
+    def test_hit_miss_counters(self, persistent_cache):
+        """Compteurs hits/misses et taux de succès."""
+        persistent_cache.set_artist_image("Nina Simone", "https://nina.jpg")
+        persistent_cache.get_artist_image("Nina Simone")
+        persistent_cache.get_artist_image("Nina Simone")
+        persistent_cache.get_album_image("Nina Simone", "Inconnu")
+        stats = persistent_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["hit_rate"] == pytest.approx(0.667)
+    
+    @patch('urllib.request.urlopen')
+    def test_rerun_makes_no_network_calls(self, mock_urlopen, tmp_path, valid_token,
+                                          mock_artist_search_response):
+        """Un second passage sur les mêmes artistes et albums n'appelle plus Spotify."""
+        path = str(tmp_path / "spotify-cache.db")
+        mock_urlopen.side_effect = lambda req, timeout: json_response(
+            mock_artist_search_response if "type=artist" in req.full_url else {"albums": {"items": []}}
+        )
+        
+        first = PersistentSpotifyCache(path)
+        search_spotify_artist_image(valid_token, "Nina Simone", cache=first)
+        search_spotify_album_image(valid_token, "Nina Simone", "Album Introuvable", cache=first)
+        first.close()
+        assert mock_urlopen.call_count == 3
+        
+        mock_urlopen.reset_mock()
+        second = PersistentSpotifyCache(path)
+        artist = search_spotify_artist_image(valid_token, "Nina Simone", cache=second)
+        album = search_spotify_album_image(valid_token, "Nina Simone", "Album Introuvable", cache=second)
+        second.close()
+        assert artist == "https://i.scdn.co/image/artist_image.jpg"
+        assert album is None
+        assert mock_urlopen.call_count == 0
+    
+    @patch('urllib.request.urlopen')
+    def test_errors_not_cached(self, mock_urlopen, persistent_cache, valid_token):
+        """Une erreur HTTP n'est pas mise en cache comme résultat négatif."""
+        mock_urlopen.side_effect = HTTPError('url', 500, 'Server Error', {}, io.BytesIO(b''))
+        assert search_spotify_artist_image(valid_token, "Nina Simone", cache=persistent_cache) is None
+        assert search_spotify_album_image(valid_token, "Nina Simone", "Pastel Blues",
+                                          max_retries=1, cache=persistent_cache) is None
+        assert persistent_cache.get_artist_image("Nina Simone", default="absent") == "absent"
+        assert persistent_cache.get_album_image("Nina Simone", "Pastel Blues", default="absent") == "absent"
+
+
+# ============================================================================
+# Tests pour SpotifyClient (client concurrent)
+# ============================================================================
+
+class FakeResponse:
+    """Réponse requests simulée."""
+    
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._payload = payload or {}
+    
+    def json(self):
+        return self._payload
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+
+class FakeSession:
+    """Session HTTP simulée: latence fixe, réponses scriptées, comptage des appels."""
+    
+    def __init__(self, responder, latency=0.0):
+        self.responder = responder
+        self.latency = latency
+        self.calls = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+    
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self.lock:
+            self.calls.append(params.get("q") or url)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        return self.responder(params)
+    
+    def post(self, url, data=None, auth=None, timeout=None):
+        with self.lock:
+            self.calls.append(url)
+        return FakeResponse(payload={"access_token": "token_client", "expires_in": 3600})
+    
+    def mount(self, prefix, adapter):
+        pass
+    
+    def close(self):
+        pass
+
+
+def artist_payload(params):
+    """Réponse de recherche d'artiste avec une image dérivée de la requête."""
+    name = params["q"].split(":", 1)[1]
+    return FakeResponse(payload={"artists": {"items": [{"name": name, "images": [{"url": f"https://{name}.jpg"}]}]}})
+
+
+def make_client(responder, latency=0.0, **kwargs):
+    """Client Spotify sur une session simulée, avec token déjà en cache."""
+    cache = SpotifyCache()
+    cache.set_token("token_client", 3600)
+    return SpotifyClient("id", "secret", cache=cache, session=FakeSession(responder, latency), **kwargs)
+
+
+class TestTokenBucket:
+    """Tests du limiteur à jetons."""
+    
+    def test_rate_bounds_throughput(self):
+        """Au-delà de la rafale, les acquisitions suivent le débit."""
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+    
+    def test_pause_blocks_all_acquisitions(self):
+        """pause() suspend les acquisitions pendant la durée demandée."""
+        bucket = TokenBucket(rate=1000)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+
+
+class TestSpotifyClient:
+    """Tests du client concurrent."""
+    
+    def test_concurrent_lookups(self):
+        """Les recherches distinctes s'exécutent en parallèle."""
+        client = make_client(artist_payload, latency=0.05, rate=1000, max_workers=8)
+        started = time.monotonic()
+        futures = [client.submit_artist_image(f"Artiste {i}") for i in range(16)]
+        images = [future.result() for future in futures]
+        elapsed = time.monotonic() - started
+        client.close()
+        
+        assert images == [f"https://Artiste {i}.jpg" for i in range(16)]
+        assert client.session.max_active > 1
+        assert elapsed < 16 * 0.05 / 2
+    
+    def test_inflight_deduplication(self):
+        """Des demandes simultanées pour la même clé partagent une requête."""
+        client = make_client(artist_payload, latency=0.05, rate=1000)
+        futures = [client.submit_artist_image("Nina Simone") for _ in range(20)]
+        assert {future.result() for future in futures} == {"https://Nina Simone.jpg"}
+        assert client.artist_image("Nina Simone") == "https://Nina Simone.jpg"
+        client.close()
+        assert len(client.session.calls) == 1
+    
+    def test_retry_after_honoured(self):
+        """Une réponse 429 suspend le limiteur pendant Retry-After puis réessaie."""
+        responses = [FakeResponse(429, headers={"Retry-After": "0.2"})]
+        
+        def responder(params):
+            return responses.pop() if responses else artist_payload(params)
+        
+        client = make_client(responder, rate=1000)
+        started = time.monotonic()
+        assert client.artist_image("Nina Simone") == "https://Nina Simone.jpg"
+        assert time.monotonic() - started >= 0.19
+        client.close()
+        assert client.request_count == 2
+    
+    def test_negative_cached_errors_not(self):
+        """Aucun résultat: mis en cache; erreur HTTP: non mise en cache."""
+        def responder(params):
+            if "Erreur" in params["q"]:
+                return FakeResponse(404)
+            return FakeResponse(payload={"albums": {"items": []}})
+        
+        client = make_client(responder, rate=1000)
+        assert client.album_image("Nina Simone", "Introuvable") is None
+        assert client.album_image("Erreur", "Album") is None
+        client.close()
+        assert client.cache.get_album_image("Nina Simone", "Introuvable", default="absent") is None
+        assert client.cache.get_album_image("Erreur", "Album", default="absent") == "absent"
+    
+    def test_album_fallback_and_scoring(self):
+        """Recherche artiste + album, puis album seul avec validation de l'artiste."""
+        def responder(params):
+            if params["q"].startswith("artist:"):
+                return FakeResponse(payload={"albums": {"items": []}})
+            return FakeResponse(payload={"albums": {"items": [{
+                "name": "Little Girl Blue",
+                "artists": [{"name": "Nina Simone"}],
+                "images": [{"url": "https://fallback.jpg"}]
+            }]}})
+        
+        client = make_client(responder, rate=1000)
+        assert client.album_image("Nina Simone", "Little Girl Blue") == "https://fallback.jpg"
+        client.close()
+        assert len(client.session.calls) == 2
+
+
+class TestBulkRefresh:
+    """Tests du rafraîchissement par lots (endpoints multi-ID)."""
+    
+    @staticmethod
+    def responder(params):
+        """Recherche: un résultat avec identifiant; multi-ID: objets dans l'ordre des ids."""
+        if "ids" in params:
+            ids = params["ids"].split(",")
+            field = "albums" if ids[0].startswith("alb") else "artists"
+            objects = [None if spotify_id.endswith("-gone") else {"id": spotify_id, "images": [{"url": f"https://new/{spotify_id}.jpg"}]}
+                       for spotify_id in ids]
+            return FakeResponse(payload={field: objects})
+        if params["type"] == "artist":
+            name = params["q"].split(":", 1)[1]
+            return FakeResponse(payload={"artists": {"items": [
+                {"id": f"art-{name}", "name": name, "images": [{"url": f"https://{name}.jpg"}]}
+            ]}})
+        album = params["q"].split("album:")[-1]
+        return FakeResponse(payload={"albums": {"items": [
+            {"id": f"alb-{album}", "name": album, "artists": [{"name": "Nina Simone"}],
+             "images": [{"url": f"https://{album}.jpg"}]}
+        ]}})
+    
+    def test_search_records_ids(self):
+        """Les recherches enregistrent les identifiants Spotify trouvés."""
+        client = make_client(self.responder, rate=1000)
+        client.artist_image("Nina Simone")
+        client.album_image("Nina Simone", "Pastel Blues")
+        client.close()
+        assert client.cache.get_artist_id("Nina Simone") == "art-Nina Simone"
+        assert client.cache.get_album_id("Nina Simone", "Pastel Blues") == "alb-Pastel Blues"
+    
+    def test_known_ids_use_batches(self):
+        """120 artistes et 45 albums connus: 3 + 3 requêtes au lieu de 165 recherches."""
+        client = make_client(self.responder, rate=1000)
+        artists = [f"Artiste {i}" for i in range(120)]
+        albums = [("Nina Simone", f"Album {i}") for i in range(45)]
+        for name in artists:
+            client.cache.set_artist_id(name, f"art{name.split()[-1]}")
+        for artist, album in albums:
+            client.cache.set_album_id(artist, album, f"alb{album.split()[-1]}")
+        
+        artist_images = client.refresh_artist_images(artists)
+        album_images = client.refresh_album_images(albums)
+        client.close()
+        
+        assert len(client.session.calls) == 6
+        assert artist_images["Artiste 7"] == "https://new/art7.jpg"
+        assert album_images[("Nina Simone", "Album 44")] == "https://new/alb44.jpg"
+        assert client.cache.get_artist_image("Artiste 7") == "https://new/art7.jpg"
+    
+    def test_unknown_or_stale_ids_fall_back_to_search(self):
+        """Sans identifiant (ou identifiant disparu), recherche puis mémorisation de l'identifiant."""
+        client = make_client(self.responder, rate=1000)
+        client.cache.set_artist_id("Disparu", "art-gone")
+        images = client.refresh_artist_images(["Nouveau", "Disparu"])
+        client.close()
+        
+        assert images == {"Nouveau": "https://Nouveau.jpg", "Disparu": "https://Disparu.jpg"}
+        assert client.cache.get_artist_id("Nouveau") == "art-Nouveau"
+        assert client.cache.get_artist_id("Disparu") == "art-Disparu"
+    
+    def test_ids_persist_and_never_expire(self, tmp_path):
+        """Les identifiants survivent à la réouverture et ne sont pas évincés."""
+        path = str(tmp_path / "spotify-cache.db")
+        cache = PersistentSpotifyCache(path, max_entries=1)
+        cache.set_artist_id("Nina Simone", "art-1")
+        cache.set_album_id("Nina Simone", "Pastel Blues", "alb-1")
+        cache.set_artist_image("A", "https://a.jpg")
+        cache.set_artist_image("B", "https://b.jpg")
+        cache.close()
+        
+        reopened = PersistentSpotifyCache(path, hit_ttl=0, max_entries=1)
+        assert reopened.get_artist_id("Nina Simone") == "art-1"
+        assert reopened.get_album_id("Nina Simone", "Pastel Blues") == "alb-1"
+        assert reopened.stats()["entries"] == 1
+        reopened.close()
+
+
+class TestSharedClient:
+    """Tests du client partagé et des recherches utilisées par les scripts."""
+    
+    @pytest.fixture
+    def shared(self, tmp_path, monkeypatch):
+        """Client partagé neuf, sur une session simulée et un cache temporaire."""
+        import services.spotify_service as spotify_service
+        session = FakeSession(TestBulkRefresh.responder)
+        monkeypatch.setattr(spotify_service, "_shared_client", None)
+        monkeypatch.setattr(spotify_service.requests, "Session", lambda: session)
+        monkeypatch.setenv("SPOTIFY_CACHE_PATH", str(tmp_path / "spotify-cache.db"))
+        monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+        monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+        yield session
+        if spotify_service._shared_client is not None:
+            spotify_service._shared_client.close()
+            spotify_service._shared_client.cache.close()
+    
+    def test_one_token_and_one_lookup_per_process(self, shared):
+        """Quatre consommateurs d'un même cycle: un token, une recherche par artiste."""
+        for _ in range(4):
+            client = get_shared_client()
+            client.get_token()
+            client.artist_image("Nina Simone")
+        assert get_shared_client() is client
+        assert shared.calls == ["https://accounts.spotify.com/api/token", "artist:Nina Simone"]
+    
+    def test_album_details_uses_known_id(self, shared):
+        """Après une recherche, l'album est relu par identifiant (sans recherche)."""
+        client = get_shared_client()
+        first = client.album_details("Nina Simone", "Pastel Blues")
+        second = client.album_details("Nina Simone", "Pastel Blues")
+        assert first["id"] == second["id"] == "alb-Pastel Blues"
+        assert shared.calls[-1] == "https://api.spotify.com/v1/albums"
+    
+    def test_track_album_fallback(self):
+        """Recherche artiste + titre, puis titre seul."""
+        def responder(params):
+            if "artist:" in params["q"]:
+                return FakeResponse(payload={"tracks": {"items": []}})
+            return FakeResponse(payload={"tracks": {"items": [{"album": {"name": "Pastel Blues"}}]}})
+        
+        client = make_client(responder, rate=1000)
+        assert client.track_album("Nina Simone", "Sinnerman") == "Pastel Blues"
+        client.close()
+        assert len(client.session.calls) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--cov=services.spotify_service", "--cov-report=term-missing"])
@@ -0,0 +1,390 @@
+"""
+Tests unitaires pour l'exécution des tâches en processus préchauffés (src/utils/task_runner.py)
+
+Vérifie qu'un script exécuté par run_entry se comporte comme un
+sous-processus (sys.argv, répertoire courant, codes de retour, sortie
+d'erreur), que son module reste chargé d'une exécution à l'autre (et est
+rechargé s'il change), et que le pool réutilise ses processus de travail,
+mesure le démarrage évité, et remplace un processus qui dépasse son délai,
+s'arrête, ou a été lancé avant une modification du .env. Vérifie aussi les mesures de ressources (ResourceProbe,
+profiled_command): requêtes HTTP comptées par processus et par thread,
+octets écrits, mesures d'un sous-processus écrites même en échec; et la
+sortie transmise ligne par ligne pendant l'exécution, l'annulation
+(interruption puis arrêt forcé) et le délai maximal, en processus de
+travail comme en sous-processus.
+
+Version: 1.2.0
+Date: 28 janvier 2026
+Auteur: Patrick Ostertag
+"""
+
+import http.server
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from utils import task_runner
+from utils.task_runner import (ResourceProbe, TaskCancelled, WarmWorkerPool, profiled_command, read_profile,
+                               run_entry, run_process)
+
+
+COUNTER_SCRIPT = """
+import os
+import sys
+
+RUNS = 0
+
+def main():
+    global RUNS
+    RUNS += 1
+    print(f"run {RUNS}", file=sys.stderr)
+    with open("result.txt", "w") as f:
+        f.write(f"{RUNS} {' '.join(sys.argv[1:])} {os.getpid()}")
+    return 0
+"""
+
+
+def write_script(directory, name, content):
+    path = directory / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def read_result(directory):
+    runs, *rest = (directory / "result.txt").read_text(encoding='utf-8').split()
+    return int(runs), rest
+
+
+STREAMING_SCRIPT = """
+import sys
+import time
+
+def main():
+    print("début")
+    time.sleep(1)
+    print("fin", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
+"""
+
+CANCELLABLE_SCRIPT = """
+import time
+
+def main():
+    try:
+        print("attente")
+        time.sleep(30)
+    finally:
+        with open("cleanup.txt", "w") as f:
+            f.write("ok")
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+class Collector:
+    """on_output qui note chaque ligne et son heure d'arrivée."""
+
+    def __init__(self, cancel_after=None):
+        self.lines = []
+        self.cancel_event = threading.Event()
+        self.cancel_after = cancel_after
+
+    def __call__(self, stream, line):
+        self.lines.append((stream, line, time.monotonic()))
+        if line == self.cancel_after:
+            self.cancel_event.set()
+
+
+class TestRunEntry:
+    """Tests de l'exécution dans le processus courant."""
+
+    def test_argv_cwd_and_module_kept(self, tmp_path):
+        """Arguments et répertoire de l'exécution, restaurés ensuite; module gardé entre deux exécutions."""
+        script = write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT)
+        argv, cwd = list(sys.argv), os.getcwd()
+
+        first = run_entry(script, ["--max-tracks", "25"], cwd=str(tmp_path))
+        second = run_entry(script, [], cwd=str(tmp_path))
+
+        assert (first["returncode"], first["cached"]) == (0, False)
+        assert (second["returncode"], second["cached"]) == (0, True)
+        assert first["stderr"] == "run 1\n"
+        assert read_result(tmp_path)[0] == 2
+        assert (sys.argv, os.getcwd()) == (argv, cwd)
+
+    def test_module_reloaded_when_changed(self, tmp_path):
+        """Script modifié: module rechargé (compteur remis à zéro)."""
+        script = write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT)
+        run_entry(script, cwd=str(tmp_path))
+        write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT + "\n# modifié\n")
+        assert run_entry(script, cwd=str(tmp_path))["cached"] is False
+        assert read_result(tmp_path)[0] == 1
+
+    @pytest.mark.parametrize("body, returncode, output", [
+        ("return 2", 2, ""),
+        ("sys.exit(3)", 3, ""),
+        ("sys.exit('Configuration absente')", 1, "Configuration absente"),
+        ("raise ValueError('données invalides')", 1, "ValueError: données invalides"),
+    ])
+    def test_return_codes(self, tmp_path, body, returncode, output):
+        """Valeur de main(), SystemExit et exception: mêmes codes qu'un sous-processus."""
+        script = write_script(tmp_path, f"exit-{returncode}.py", f"import sys\n\ndef main():\n    {body}\n")
+        result = run_entry(script)
+        assert result["returncode"] == returncode
+        assert output in result["stderr"]
+
+    def test_output_lines(self, tmp_path):
+        """Lignes transmises à l'écriture (dernière ligne non terminée comprise)."""
+        script = write_script(tmp_path, "lines.py",
+                              "import sys\n\ndef main():\n    print('a')\n    sys.stderr.write('b\\nc')\n")
+        collector = Collector()
+        assert run_entry(script, on_output=collector)["stderr"] == "b\nc"
+        assert [line[:2] for line in collector.lines] == [("stdout", "a"), ("stderr", "b"), ("stderr", "c")]
+
+    def test_script_without_entry(self, tmp_path):
+        """Script sans main(): exécuté comme __main__ à chaque fois."""
+        script = write_script(tmp_path, "top-level.py", COUNTER_SCRIPT + "\nif __name__ == '__main__':\n    main()\n")
+        for _ in range(2):
+            assert run_entry(script, ["a"], entry=None, cwd=str(tmp_path))["returncode"] == 0
+        assert read_result(tmp_path) == (1, ["a", str(os.getpid())])
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Pool sans préchargement (démarrage rapide des tests)."""
+    pool = WarmWorkerPool(tmp_path, size=1, preload=())
+    yield pool
+    pool.close()
+
+
+class TestWarmWorkerPool:
+    """Tests du pool de processus de travail."""
+
+    def test_worker_reused_and_startup_saved(self, pool, tmp_path):
+        """Deuxième exécution dans le même processus: démarrage et chargement évités."""
+        script = write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT)
+
+        first = pool.run(script, ["x"])
+        _, (_, first_pid) = read_result(tmp_path)
+        second = pool.run(script, ["y"])
+        runs, (arg, second_pid) = read_result(tmp_path)
+
+        assert first["returncode"] == second["returncode"] == 0
+        assert (runs, arg) == (2, "y")
+        assert first_pid == second_pid != str(os.getpid())
+        assert first["startup_paid_seconds"] > 0 and first["startup_saved_seconds"] == 0
+        assert second["startup_paid_seconds"] == 0
+        assert second["startup_saved_seconds"] >= pool.startup_seconds > 0
+
+    def test_timeout_replaces_worker(self, pool, tmp_path):
+        """Délai dépassé: TimeoutExpired, processus tué puis remplacé."""
+        slow = write_script(tmp_path, "slow.py", "import time\n\ndef main():\n    time.sleep(30)\n")
+        script = write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT)
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            pool.run(slow, timeout=0.5)
+        assert pool.run(script)["returncode"] == 0
+        assert len(pool.startup_samples) == 2
+
+    def test_worker_exit(self, pool, tmp_path):
+        """Processus arrêté par le script (os._exit): échec signalé, pool toujours utilisable."""
+        crash = write_script(tmp_path, "crash.py", "import os\n\ndef main():\n    os._exit(7)\n")
+        script = write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT)
+
+        result = pool.run(crash)
+        assert result["returncode"] == 7
+        assert "exited unexpectedly" in result["stderr"]
+        assert pool.run(script)["returncode"] == 0
+
+    def test_output_streamed(self, pool, tmp_path):
+        """Sortie reçue pendant l'exécution, pas seulement à la fin."""
+        script = write_script(tmp_path, "stream.py", STREAMING_SCRIPT)
+        collector = Collector()
+        result = pool.run(script, on_output=collector)
+        finished = time.monotonic()
+
+        assert [line[:2] for line in collector.lines] == [("stdout", "début"), ("stderr", "fin")]
+        assert finished - collector.lines[0][2] >= 0.8
+        assert result["stderr"] == "fin\n"
+
+    def test_cancel_interrupts_script(self, pool, tmp_path):
+        """Annulation: KeyboardInterrupt dans le script (finally exécuté), processus de travail réutilisé."""
+        script = write_script(tmp_path, "wait.py", CANCELLABLE_SCRIPT)
+        collector = Collector(cancel_after="attente")
+        started = time.monotonic()
+
+        with pytest.raises(TaskCancelled):
+            pool.run(script, on_output=collector, cancel_event=collector.cancel_event)
+        assert time.monotonic() - started < 10
+        assert (tmp_path / "cleanup.txt").read_text() == "ok"
+        assert pool.run(write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT))["returncode"] == 0
+        assert len(pool.startup_samples) == 1
+
+    def test_env_loaded_before_preload(self, pool, tmp_path):
+        """Le .env du projet est chargé dans le processus avant les imports préchargés."""
+        (tmp_path / "data" / "config").mkdir(parents=True)
+        (tmp_path / "data" / "config" / ".env").write_text("MUSIQUE_TEST_API_URL=http://127.0.0.1:9\n")
+        script = write_script(tmp_path, "env.py", "import os\n\ndef main():\n    print(os.getenv('MUSIQUE_TEST_API_URL'))\n")
+        collector = Collector()
+
+        assert pool.run(script, on_output=collector)["returncode"] == 0
+        assert [line[:2] for line in collector.lines] == [("stdout", "http://127.0.0.1:9")]
+
+    def test_env_change_replaces_workers(self, pool, tmp_path):
+        """.env modifié: le processus de travail est remplacé et lit les nouvelles valeurs."""
+        env_file = tmp_path / "data" / "config" / ".env"
+        env_file.parent.mkdir(parents=True)
+        env_file.write_text("MUSIQUE_TEST_TOKEN=ancien\n")
+        script = write_script(tmp_path, "token.py", "import os\n\nTOKEN = os.getenv('MUSIQUE_TEST_TOKEN')\n\n"
+                                                    "def main():\n    print(TOKEN)\n")
+        collector = Collector()
+
+        pool.run(script, on_output=collector)
+        pool.run(script, on_output=collector)
+        assert len(pool.startup_samples) == 1
+        env_file.write_text("MUSIQUE_TEST_TOKEN=nouveau\n")
+        pool.run(script, on_output=collector)
+
+        assert [line[1] for line in collector.lines] == ["ancien", "ancien", "nouveau"]
+        assert len(pool.startup_samples) == 2
+
+    def test_closed_pool(self, pool, tmp_path):
+        """Pool fermé: plus d'exécution."""
+        pool.close()
+        with pytest.raises(RuntimeError):
+            pool.run(write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT))
+
+
+@pytest.fixture
+def http_url():
+    """Serveur HTTP local (réponses vides)."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+class TestResourceProbe:
+    """Tests des mesures de ressources."""
+
+    def test_process_scope(self, tmp_path, http_url):
+        """Processus: requêtes HTTP de tous les threads, octets écrits, CPU et pic mémoire."""
+        probe = ResourceProbe().start()
+        for _ in range(2):
+            urllib.request.urlopen(http_url).close()
+        thread = threading.Thread(target=lambda: urllib.request.urlopen(http_url).close())
+        thread.start()
+        thread.join()
+        (tmp_path / "data.bin").write_bytes(b"x" * 100000)
+        sum(i * i for i in range(200000))
+        profile = probe.stop()
+
+        assert profile["http_calls"] == 3
+        assert profile["write_bytes"] >= 100000
+        assert profile["cpu_user_seconds"] + profile["cpu_system_seconds"] > 0
+        assert profile["peak_rss_mb"] > 0
+
+    def test_thread_scope(self, http_url):
+        """Thread: requêtes des autres threads non comptées, pas de pic mémoire."""
+        probe = ResourceProbe(scope="thread").start()
+        urllib.request.urlopen(http_url).close()
+        thread = threading.Thread(target=lambda: urllib.request.urlopen(http_url).close())
+        thread.start()
+        thread.join()
+        profile = probe.stop()
+
+        assert profile["http_calls"] == 1
+        assert profile["peak_rss_mb"] is None
+
+    def test_run_entry_profile(self, tmp_path):
+        """Exécution dans le processus courant: mesures jointes au résultat."""
+        script = write_script(tmp_path, "count-runs.py", COUNTER_SCRIPT)
+        profile = run_entry(script, cwd=str(tmp_path))["profile"]
+        assert profile["write_bytes"] > 0 and profile["http_calls"] == 0
+        assert run_entry(script, cwd=str(tmp_path), profile=False)["profile"] is None
+
+    @pytest.mark.parametrize("exit_code", [0, 3])
+    def test_profiled_command(self, tmp_path, http_url, exit_code):
+        """Script lancé en sous-processus: arguments transmis, mesures écrites à la sortie, même en échec."""
+        script = write_script(tmp_path, "fetch.py", (
+            "import sys, urllib.request\n"
+            "for url in sys.argv[1:]:\n"
+            "    urllib.request.urlopen(url).close()\n"
+            f"sys.exit({exit_code})\n"
+        ))
+        profile_path = str(tmp_path / "profile.json")
+        result = subprocess.run(profiled_command([sys.executable, script, http_url, http_url], profile_path))
+
+        assert result.returncode == exit_code
+        assert read_profile(profile_path)["http_calls"] == 2
+        assert read_profile(str(tmp_path / "absent.json")) is None
+
+
+class TestRunProcess:
+    """Tests de l'exécution en sous-processus avec sortie en continu."""
+
+    def test_output_streamed(self, tmp_path):
+        """Lignes reçues au fil de l'exécution; fin de la sortie d'erreur conservée."""
+        script = write_script(tmp_path, "stream.py", STREAMING_SCRIPT)
+        collector = Collector()
+        result = run_process([sys.executable, script], on_output=collector)
+        finished = time.monotonic()
+
+        assert result == {"returncode": 0, "stderr": "fin\n"}
+        assert [line[:2] for line in collector.lines] == [("stdout", "début"), ("stderr", "fin")]
+        assert finished - collector.lines[0][2] >= 0.8
+
+    def test_cancel_interrupts_script(self, tmp_path):
+        """Annulation: SIGINT, le script nettoie avant de s'arrêter."""
+        script = write_script(tmp_path, "wait.py", CANCELLABLE_SCRIPT)
+        collector = Collector(cancel_after="attente")
+        started = time.monotonic()
+
+        with pytest.raises(TaskCancelled) as excinfo:
+            run_process([sys.executable, script], cwd=str(tmp_path), on_output=collector,
+                        cancel_event=collector.cancel_event)
+        assert time.monotonic() - started < 10
+        assert "KeyboardInterrupt" in excinfo.value.stderr
+        assert (tmp_path / "cleanup.txt").read_text() == "ok"
+
+    def test_cancel_kills_unresponsive_script(self, tmp_path, monkeypatch):
+        """Script qui ignore SIGINT: tué après le délai de grâce."""
+        monkeypatch.setattr(task_runner, "CANCEL_GRACE_SECONDS", 0.5)
+        script = write_script(tmp_path, "stubborn.py", (
+            "import signal, time\n"
+            "signal.signal(signal.SIGINT, signal.SIG_IGN)\n"
+            "print('attente')\n"
+            "time.sleep(30)\n"
+        ))
+        collector = Collector(cancel_after="attente")
+        started = time.monotonic()
+
+        with pytest.raises(TaskCancelled):
+            run_process([sys.executable, script], on_output=collector, cancel_event=collector.cancel_event)
+        assert time.monotonic() - started < 10
+
+    def test_timeout(self, tmp_path):
+        """Délai dépassé: TimeoutExpired, processus tué."""
+        script = write_script(tmp_path, "slow.py", "import time\ntime.sleep(30)\n")
+        started = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            run_process([sys.executable, script], timeout=0.5)
+        assert time.monotonic() - started < 10
@@ -38,18 +38,22 @@ import certifi
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
 import json
+import sys
 import urllib.request
 import urllib.parse
-import base64
-import time
 
 # Déterminer le répertoire racine du projet (2 niveaux au-dessus de ce script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
-# Charger les variables d'environnement depuis le fichier .env
+# Charger les variables d'environnement (avant constants: URLs des API lues à l'import)
 load_dotenv(os.path.join(PROJECT_ROOT, "data", "config", ".env"))
 
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+from constants import LASTFM_API_URL, LASTFM_HISTORY_FILENAME
+from services.spotify_service import get_shared_client
+from models.history_log import HistoryLog, iter_history_file, play_key, save_history
+
 # Si Python n'a pas de cafile configuré, pointer vers le bundle de certifi
 os.environ.setdefault("SSL_CERT_FILE", certifi.where())
 
@@ -58,102 +62,12 @@ API_KEY = os.getenv("API_KEY")
 API_SECRET = os.getenv("API_SECRET")
 USERNAME = os.getenv("LASTFM_USERNAME")
 LIMIT = int(os.getenv("LASTFM_LIMIT", 200))  # Limite par défaut à 200 si non spécifiée
-SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 
 # Initialisation de la connexion à Last.fm
 network = pylast.LastFMNetwork(api_key=API_KEY, api_secret=API_SECRET)
 
-# Cache pour les URLs Spotify et Last.fm (artiste et album)
-cache_artist_images_spotify = {}
-cache_album_images_spotify = {}
+# Cache pour les URLs Last.fm (les images Spotify passent par le client partagé)
 cache_album_images_lastfm = {}
-spotify_token_cache = {"access_token": None, "expires_at": 0}
-
-
-def get_spotify_token():
-    """Récupère un token Spotify via le client credentials flow, avec mise en cache."""
-    # Réutilise le token tant qu'il est valide pour limiter les requêtes réseau
-    if spotify_token_cache["access_token"] and time.time() < spotify_token_cache["expires_at"] - 60:
-        return spotify_token_cache["access_token"]
-
-    if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
-        print("SPOTIFY_CLIENT_ID ou SPOTIFY_CLIENT_SECRET manquant dans l'environnement")
-        return None
-
-    token_url = "https://accounts.spotify.com/api/token"
-    data = urllib.parse.urlencode({"grant_type": "client_credentials"}).encode("utf-8")
-    credentials = f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode("utf-8")
-    auth_header = base64.b64encode(credentials).decode("utf-8")
-    req = urllib.request.Request(token_url, data=data, method="POST")
-    req.add_header("Authorization", f"Basic {auth_header}")
-    req.add_header("Content-Type", "application/x-www-form-urlencoded")
-
-    try:
-        with urllib.request.urlopen(req) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-        spotify_token_cache["access_token"] = payload.get("access_token")
-        expires_in = payload.get("expires_in", 3600)
-        spotify_token_cache["expires_at"] = time.time() + expires_in
-        return spotify_token_cache["access_token"]
-    except Exception as exc:
-        print(f"Erreur lors de la récupération du token Spotify: {exc}")
-        return None
-
-
-def search_spotify_artist_image(token, artist_name):
-    """Recherche l'image principale de l'artiste sur Spotify avec cache local."""
-    # Premier passage: on sert le cache si disponible, sinon on déclenche une seule requête
-    if artist_name in cache_artist_images_spotify:
-        return cache_artist_images_spotify[artist_name]
-
-    if not token:
-        cache_artist_images_spotify[artist_name] = None
-        return None
-
-    query = urllib.parse.quote(f"artist:{artist_name}")
-    url = f"https://api.spotify.com/v1/search?q={query}&type=artist&limit=1"
-    req = urllib.request.Request(url)
-    req.add_header("Authorization", f"Bearer {token}")
-
-    try:
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        items = data.get("artists", {}).get("items", [])
-        image_url = items[0]["images"][0]["url"] if items and items[0].get("images") else None
-        cache_artist_images_spotify[artist_name] = image_url
-        return image_url
-    except Exception:
-        cache_artist_images_spotify[artist_name] = None
-        return None
-
-
-def search_spotify_album_image(token, artist_name, album_name):
-    """Recherche l'image de l'album sur Spotify avec cache local."""
-    # La clé combine artiste et album pour isoler les réutilisations
-    cache_key = (artist_name, album_name)
-    if cache_key in cache_album_images_spotify:
-        return cache_album_images_spotify[cache_key]
-
-    if not token:
-        cache_album_images_spotify[cache_key] = None
-        return None
-
-    query = urllib.parse.quote(f"album:{album_name} artist:{artist_name}")
-    url = f"https://api.spotify.com/v1/search?q={query}&type=album&limit=1"
-    req = urllib.request.Request(url)
-    req.add_header("Authorization", f"Bearer {token}")
-
-    try:
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        items = data.get("albums", {}).get("items", [])
-        image_url = items[0]["images"][0]["url"] if items and items[0].get("images") else None
-        cache_album_images_spotify[cache_key] = image_url
-        return image_url
-    except Exception:
-        cache_album_images_spotify[cache_key] = None
-        return None
 
 
 def search_lastfm_album_image(artist_name, album_name):
@@ -170,7 +84,7 @@ def search_lastfm_album_image(artist_name, album_name):
         artist_encoded = urllib.parse.quote(artist_name)
         album_encoded = urllib.parse.quote(album_name)
         url = (
-            f"https://ws.audioscrobbler.com/2.0/?method=album.getinfo"
+            f"{LASTFM_API_URL}?method=album.getinfo"
             f"&api_key={API_KEY}&artist={artist_encoded}&album={album_encoded}&format=json"
         )
         with urllib.request.urlopen(url) as response:
@@ -211,8 +125,9 @@ if recent_tracks:
     print("--- Liste des lectures ---")
 
 # Parcours des pistes et collecte des données
-# On récupère un token unique pour la session afin de limiter les appels d'authentification
-spotify_token = get_spotify_token()
+# Client Spotify partagé du processus (token, cache persistant, limiteur de débit)
+spotify = get_shared_client()
+spotify_token = spotify.get_token()
 
 # Parcours des pistes et collecte des données
 for track_item in recent_tracks:
@@ -223,12 +138,12 @@ for track_item in recent_tracks:
     loved = getattr(track_item, 'loved', False)
     
     # Récupération des images
-    artist_spotify_image = search_spotify_artist_image(spotify_token, artist)
+    artist_spotify_image = spotify.artist_image(artist) if spotify_token else None
     
     album_spotify_image = None
     album_lastfm_image = None
     if album != "Album inconnu":
-        album_spotify_image = search_spotify_album_image(spotify_token, artist, album)
+        album_spotify_image = spotify.album_image(artist, album) if spotify_token else None
         album_lastfm_image = search_lastfm_album_image(artist, album)
     
     # Conversion du timestamp en date lisible
@@ -256,13 +171,21 @@ for track_item in recent_tracks:
         "album_lastfm_image": album_lastfm_image
     })
 
-# Sauvegarde des données dans un fichier JSON
-with open(os.path.join(PROJECT_ROOT, "data", "history", "chk-last-fm.json"), "w", encoding="utf-8") as f:
-    json.dump({
-        "username": USERNAME,
-        "month": start_of_month.strftime('%B %Y'),
-        "tracks": tracks_data
-    }, f, ensure_ascii=False, indent=4)
+# Sauvegarde des données: réécriture atomique du JSON (fichier temporaire
+# renommé), ou ajouts/suppressions dans le journal s'il a été converti
+# (le JSON est alors réexporté)
+history_file = os.path.join(PROJECT_ROOT, "data", "history", LASTFM_HISTORY_FILENAME)
+previous_tracks = {}
+if os.path.exists(history_file) or HistoryLog.for_json(history_file).exists():
+    previous_tracks = {play_key(track): track for track in iter_history_file(history_file)}
+current_keys = {play_key(track) for track in tracks_data}
+save_history(
+    history_file,
+    {"username": USERNAME, "month": start_of_month.strftime('%B %Y'), "tracks": tracks_data},
+    updated=[track for track in tracks_data if previous_tracks.get(play_key(track)) != track],
+    # Le fichier ne contient que le mois courant: les autres écoutes sont retirées
+    deleted=[track for key, track in previous_tracks.items() if key not in current_keys],
+)
 
 # Message de confirmation
 print(f"\nDonnées sauvegardées dans chk-last-fm.json")
\ No newline at end of file
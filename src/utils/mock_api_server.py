@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""Serveur local simulant les APIs Spotify, Last.fm et Discogs.
+
+Ce serveur remplace les APIs externes pour les tests de charge et les
+benchmarks hors ligne des scripts d'enrichissement (complete-images-roon,
+chk-last-fm, fix-radio-tracks) et de synchronisation Discogs
+(Read-discogs-ia). Les scripts y sont redirigés par les variables
+d'environnement lues par src/constants.py.
+
+Fonctionnalités principales:
+    - Réponses enregistrées (fixtures JSON), servies en priorité
+    - Réponses synthétiques déterministes pour toute autre requête
+    - Mode enregistrement: les requêtes sans fixture sont relayées vers
+      l'API réelle et la réponse est ajoutée au fichier de fixtures
+    - Latence configurable (fixe + gigue aléatoire)
+    - Injection de HTTP 429 (avec en-tête Retry-After): aléatoire et/ou
+      par dépassement d'un quota de requêtes par seconde
+    - Injection d'erreurs HTTP 500 à un taux donné
+    - Compteurs par API et par code HTTP (GET /_stats)
+
+Routes simulées (préfixe = API):
+    POST /spotify/accounts/api/token
+    GET  /spotify/v1/search?q=...&type=artist|album|track
+    GET  /spotify/v1/artists?ids=...      GET /spotify/v1/albums?ids=...
+    GET  /lastfm/2.0/?method=album.getinfo&artist=...&album=...
+    GET  /discogs/users/{user}/collection/folders/0/releases?page=...&per_page=...
+    GET  /discogs/releases/{id}
+
+Format des fixtures:
+    {
+        "routes": [
+            {
+                "method": "GET",
+                "path": "/spotify/v1/search",
+                "query": {"q": "artist:Nina Simone", "type": "artist"},
+                "status": 200,
+                "body": {...}
+            }
+        ]
+    }
+    Une fixture s'applique si la méthode et le chemin sont identiques et si
+    chaque paramètre de "query" est présent avec la même valeur.
+
+Exemple d'utilisation:
+    $ python3 src/utils/mock_api_server.py --port 8765 --latency 80 --jitter 40 \\
+          --rate-limit-rate 0.02 --error-rate 0.01
+    $ eval "$(python3 src/utils/mock_api_server.py --print-env --port 8765)"
+    $ python3 src/enrichment/complete-images-roon.py
+
+    >>> with MockApiServer(port=0, profile=FaultProfile(latency=0.05)) as server:
+    ...     os.environ.update(server.environment())
+
+Auteur: Patrick Ostertag
+Version: 1.0.0
+Date: 28 janvier 2026
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# APIs simulées: préfixe de route → URL réelle (mode enregistrement)
+UPSTREAM_URLS = {
+    "spotify/accounts": "https://accounts.spotify.com",
+    "spotify/v1": "https://api.spotify.com/v1",
+    "lastfm/2.0": "https://ws.audioscrobbler.com/2.0",
+    "discogs": "https://api.discogs.com",
+}
+
+# Paramètres jamais écrits dans les fixtures enregistrées
+SECRET_PARAMS = {"api_key", "token", "key", "secret"}
+
+# Nombre de releases de la collection Discogs synthétique par défaut
+DEFAULT_DISCOGS_RELEASES = 250
+
+
+@dataclass
+class FaultProfile:
+    """Comportement simulé d'une API (latence et erreurs).
+
+    Attributes:
+        latency: Délai fixe ajouté à chaque réponse (secondes).
+        jitter: Délai aléatoire supplémentaire, entre 0 et jitter (secondes).
+        rate_limit_rate: Probabilité de répondre 429 à une requête.
+        error_rate: Probabilité de répondre 500 à une requête.
+        quota: Requêtes acceptées par seconde avant de répondre 429 (0 = illimité).
+        retry_after: Valeur de l'en-tête Retry-After des réponses 429 (secondes).
+        miss_rate: Proportion des recherches synthétiques sans résultat
+            (déterministe: une même requête donne toujours le même résultat).
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limit_rate: float = 0.0
+    error_rate: float = 0.0
+    quota: float = 0.0
+    retry_after: int = 1
+    miss_rate: float = 0.0
+
+
+def _digest(*parts: str) -> str:
+    """Empreinte stable d'une clé (identifiants et résultats synthétiques)."""
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _query_field(query: str, field: str) -> Optional[str]:
+    """Valeur d'un filtre de recherche Spotify (ex: artist:Nina Simone album:...)."""
+    marker = f"{field}:"
+    start = query.find(marker)
+    if start < 0:
+        return None
+    value = query[start + len(marker):]
+    for other in ("artist:", "album:", "track:"):
+        end = value.find(f" {other}")
+        if end >= 0:
+            value = value[:end]
+    return value.strip()
+
+
+class SyntheticApis:
+    """Réponses synthétiques déterministes des trois APIs.
+
+    Les objets Spotify créés par une recherche sont mémorisés par
+    identifiant, afin que les endpoints multi-ID (/artists, /albums) les
+    retrouvent; un identifiant inconnu est renvoyé comme null (identifiant
+    obsolète).
+    """
+
+    def __init__(self, miss_rate: float = 0.0, discogs_releases: int = DEFAULT_DISCOGS_RELEASES):
+        """Initialise les données synthétiques.
+
+        Args:
+            miss_rate: Proportion des recherches sans résultat.
+            discogs_releases: Taille de la collection Discogs simulée.
+        """
+        self.miss_rate = miss_rate
+        self.discogs_releases = discogs_releases
+        self.spotify_objects: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _missing(self, *key: str) -> bool:
+        """Recherche sans résultat (décision stable pour une même clé)."""
+        return int(_digest("miss", *key)[:8], 16) / 0xFFFFFFFF < self.miss_rate
+
+    def _remember(self, item: dict) -> dict:
+        with self._lock:
+            self.spotify_objects[item["id"]] = item
+        return item
+
+    def spotify_artist(self, name: str) -> dict:
+        """Objet artiste Spotify."""
+        spotify_id = _digest("artist", name.lower())[:22]
+        return self._remember({
+            "id": spotify_id,
+            "type": "artist",
+            "name": name,
+            "images": [{"url": f"https://i.scdn.co/image/mock-{spotify_id}", "height": 640, "width": 640}],
+            "external_urls": {"spotify": f"https://open.spotify.com/artist/{spotify_id}"},
+        })
+
+    def spotify_album(self, artist: str, album: str) -> dict:
+        """Objet album Spotify (année dérivée de la clé)."""
+        spotify_id = _digest("album", artist.lower(), album.lower())[:22]
+        year = 1950 + int(spotify_id[:4], 16) % 75
+        return self._remember({
+            "id": spotify_id,
+            "type": "album",
+            "name": album,
+            "artists": [{"name": artist}],
+            "release_date": f"{year}-01-01",
+            "images": [{"url": f"https://i.scdn.co/image/mock-{spotify_id}", "height": 640, "width": 640}],
+            "external_urls": {"spotify": f"https://open.spotify.com/album/{spotify_id}"},
+        })
+
+    def spotify_search(self, params: Dict[str, str]) -> dict:
+        """Résultats de /v1/search pour un type artist, album ou track."""
+        query = params.get("q", "")
+        kind = params.get("type", "artist")
+        items: List[dict] = []
+        if kind == "artist":
+            name = _query_field(query, "artist") or query
+            if not self._missing("artist", name.lower()):
+                items = [self.spotify_artist(name)]
+        elif kind == "album":
+            album = _query_field(query, "album") or query
+            artist = _query_field(query, "artist")
+            if artist is None:
+                # Recherche par album seul: reprendre l'artiste d'une recherche précédente
+                with self._lock:
+                    known = [o for o in self.spotify_objects.values()
+                             if o["type"] == "album" and o["name"].lower() == album.lower()]
+                items = known[:1]
+            elif not self._missing("album", artist.lower(), album.lower()):
+                items = [self.spotify_album(artist, album)]
+        elif kind == "track":
+            title = _query_field(query, "track") or query
+            artist = _query_field(query, "artist") or "Various Artists"
+            if not self._missing("track", artist.lower(), title.lower()):
+                items = [{"name": title, "artists": [{"name": artist}],
+                          "album": self.spotify_album(artist, f"{title} (Album)")}]
+        return {f"{kind}s": {"items": items, "total": len(items)}}
+
+    def spotify_several(self, kind: str, ids: str) -> dict:
+        """Réponse des endpoints multi-ID (null pour un identifiant inconnu)."""
+        with self._lock:
+            return {kind: [self.spotify_objects.get(i) for i in ids.split(",") if i]}
+
+    def lastfm_album(self, artist: str, album: str) -> dict:
+        """Réponse de album.getinfo (erreur 6 si album introuvable)."""
+        if self._missing("lastfm", artist.lower(), album.lower()):
+            return {"error": 6, "message": "Album not found"}
+        key = _digest("lastfm", artist.lower(), album.lower())[:32]
+        return {"album": {
+            "name": album,
+            "artist": artist,
+            "image": [
+                {"#text": f"https://lastfm.freetls.fastly.net/i/u/{size}/{key}.png", "size": name}
+                for size, name in (("34s", "small"), ("64s", "medium"), ("174s", "large"), ("300x300", "extralarge"))
+            ],
+        }}
+
+    def discogs_basic_information(self, release_id: int) -> dict:
+        """Informations de base d'une release de la collection simulée."""
+        number = release_id % 100000
+        return {
+            "id": release_id,
+            "title": f"Album {number}",
+            "year": 1950 + number % 75,
+            "artists": [{"name": f"Artiste {number % 400}"}],
+            "labels": [{"name": f"Label {number % 60}"}],
+            "formats": [{"name": ("Vinyl", "CD")[number % 2], "qty": "1"}],
+            "genres": ["Jazz"],
+            "styles": ["Modal"],
+        }
+
+    def discogs_collection(self, username: str, page: int, per_page: int) -> Optional[dict]:
+        """Une page de la collection simulée (None au-delà de la dernière page)."""
+        pages = max(1, -(-self.discogs_releases // per_page))
+        if page < 1 or page > pages:
+            return None
+        first = (page - 1) * per_page
+        ids = range(100000 + first, 100000 + min(first + per_page, self.discogs_releases))
+        return {
+            "pagination": {"page": page, "pages": pages, "per_page": per_page, "items": self.discogs_releases},
+            "releases": [{"id": i, "basic_information": self.discogs_basic_information(i)} for i in ids],
+        }
+
+    def discogs_release(self, release_id: int) -> dict:
+        """Détails complets d'une release."""
+        details = self.discogs_basic_information(release_id)
+        details.update({
+            "images": [{"type": "primary", "uri": f"https://i.discogs.com/mock/{release_id}.jpg"}],
+            "tracklist": [{"position": f"A{n}", "title": f"Titre {n}", "duration": "4:10"} for n in range(1, 9)],
+            "extraartists": [],
+        })
+        return details
+
+
+class MockApiServer:
+    """Serveur HTTP local multi-thread simulant Spotify, Last.fm et Discogs.
+
+    Attributes:
+        profile: Profil de latence et d'erreurs par défaut.
+        profiles: Profils spécifiques par API ('spotify', 'lastfm', 'discogs').
+        fixtures: Réponses enregistrées.
+        stats: Compteurs {api: {code HTTP: nombre}}.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        profile: Optional[FaultProfile] = None,
+        profiles: Optional[Dict[str, FaultProfile]] = None,
+        fixtures_path: Optional[str] = None,
+        record: bool = False,
+        discogs_releases: int = DEFAULT_DISCOGS_RELEASES,
+        seed: Optional[int] = None
+    ):
+        """Prépare le serveur (démarré par start() ou serve_forever()).
+
+        Args:
+            host: Adresse d'écoute.
+            port: Port d'écoute (0 = port libre choisi par le système).
+            profile: Profil par défaut de toutes les APIs.
+            profiles: Profils spécifiques par API.
+            fixtures_path: Fichier JSON de réponses enregistrées.
+            record: Relayer vers l'API réelle les requêtes sans fixture et
+                enregistrer les réponses dans fixtures_path.
+            discogs_releases: Taille de la collection Discogs simulée.
+            seed: Graine des tirages aléatoires (exécutions reproductibles).
+        """
+        self.profile = profile or FaultProfile()
+        self.profiles = profiles or {}
+        self.fixtures_path = fixtures_path
+        self.record = record
+        self.fixtures: List[dict] = []
+        if fixtures_path:
+            try:
+                with open(fixtures_path, "r", encoding="utf-8") as f:
+                    self.fixtures = json.load(f).get("routes", [])
+            except FileNotFoundError:
+                if not record:
+                    raise
+        self.synthetic = SyntheticApis(self.profile.miss_rate, discogs_releases)
+        self.stats: Dict[str, Dict[int, int]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Tuple[float, int]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        """URL racine du serveur (port effectif)."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> Dict[str, str]:
+        """Variables d'environnement redirigeant les scripts vers ce serveur.
+
+        Returns:
+            Dict[str, str]: Variables lues par src/constants.py.
+        """
+        return {
+            "SPOTIFY_ACCOUNTS_BASE_URL": f"{self.base_url}/spotify/accounts",
+            "SPOTIFY_API_BASE_URL": f"{self.base_url}/spotify/v1",
+            "LASTFM_API_URL": f"{self.base_url}/lastfm/2.0/",
+            "DISCOGS_API_BASE_URL": f"{self.base_url}/discogs",
+        }
+
+    def start(self) -> "MockApiServer":
+        """Démarre le serveur dans un thread d'arrière-plan."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur et libère le port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "MockApiServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def serve_forever(self):
+        """Sert les requêtes jusqu'à interruption (Ctrl+C)."""
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    # ===== Traitement des requêtes =====
+
+    def _profile_for(self, api: str) -> FaultProfile:
+        return self.profiles.get(api, self.profile)
+
+    def _count(self, api: str, status: int):
+        with self._lock:
+            per_api = self.stats.setdefault(api, {})
+            per_api[status] = per_api.get(status, 0) + 1
+
+    def _over_quota(self, api: str, quota: float) -> bool:
+        """Fenêtre d'une seconde par API: True si le quota est dépassé."""
+        if quota <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            started, count = self._windows.get(api, (now, 0))
+            if now - started >= 1.0:
+                started, count = now, 0
+            count += 1
+            self._windows[api] = (started, count)
+        return count > quota
+
+    def _inject_fault(self, api: str) -> Optional[Tuple[int, dict, Dict[str, str]]]:
+        """Latence simulée puis, éventuellement, réponse 429 ou 500."""
+        profile = self._profile_for(api)
+        with self._lock:
+            delay = profile.latency + self._random.uniform(0, profile.jitter)
+            draw_429 = self._random.random()
+            draw_500 = self._random.random()
+        if delay > 0:
+            time.sleep(delay)
+        if draw_429 < profile.rate_limit_rate or self._over_quota(api, profile.quota):
+            return 429, {"error": {"status": 429, "message": "API rate limit exceeded"}}, {
+                "Retry-After": str(profile.retry_after)
+            }
+        if draw_500 < profile.error_rate:
+            return 500, {"error": {"status": 500, "message": "Server error"}}, {}
+        return None
+
+    def _match_fixture(self, method: str, path: str, params: Dict[str, str]) -> Optional[dict]:
+        for fixture in self.fixtures:
+            if fixture.get("method", "GET") != method or fixture.get("path") != path:
+                continue
+            if all(params.get(k) == v for k, v in fixture.get("query", {}).items()):
+                return fixture
+        return None
+
+    def _record_fixture(self, method: str, path: str, params: Dict[str, str],
+                        headers: Dict[str, str], body: bytes) -> Optional[Tuple[int, dict]]:
+        """Relaie la requête vers l'API réelle et enregistre la réponse."""
+        import requests  # Dépendance requise uniquement en mode enregistrement
+
+        prefix = next((p for p in UPSTREAM_URLS if path.startswith(f"/{p}")), None)
+        if prefix is None:
+            return None
+        url = UPSTREAM_URLS[prefix] + path[len(prefix) + 1:]
+        forwarded = {k: v for k, v in headers.items() if k.lower() in ("authorization", "user-agent", "content-type")}
+        response = requests.request(method, url, params=params, headers=forwarded, data=body or None, timeout=30)
+        try:
+            payload = response.json()
+        except ValueError:
+            return None
+        fixture = {
+            "method": method,
+            "path": path,
+            "query": {k: v for k, v in params.items() if k not in SECRET_PARAMS},
+            "status": response.status_code,
+            "body": payload,
+        }
+        with self._lock:
+            self.fixtures.append(fixture)
+            with open(self.fixtures_path, "w", encoding="utf-8") as f:
+                json.dump({"routes": self.fixtures}, f, indent=2, ensure_ascii=False)
+        return response.status_code, payload
+
+    def _synthesize(self, method: str, path: str, params: Dict[str, str]) -> Tuple[int, Optional[dict]]:
+        """Réponse synthétique d'une route connue (404 sinon)."""
+        parts = [p for p in path.split("/") if p]
+        if method == "POST" and path == "/spotify/accounts/api/token":
+            return 200, {"access_token": f"mock-{_digest(str(time.time()))[:16]}",
+                         "token_type": "Bearer", "expires_in": 3600}
+        if method != "GET":
+            return 405, None
+        if path == "/spotify/v1/search":
+            return 200, self.synthetic.spotify_search(params)
+        if path in ("/spotify/v1/artists", "/spotify/v1/albums"):
+            return 200, self.synthetic.spotify_several(parts[-1], params.get("ids", ""))
+        if path.rstrip("/") == "/lastfm/2.0" and params.get("method") == "album.getinfo":
+            return 200, self.synthetic.lastfm_album(params.get("artist", ""), params.get("album", ""))
+        if len(parts) == 7 and parts[:2] == ["discogs", "users"] and parts[3:] == [
+                "collection", "folders", "0", "releases"]:
+            page = self.synthetic.discogs_collection(
+                parts[2], int(params.get("page", 1)), int(params.get("per_page", 50))
+            )
+            return (200, page) if page else (404, {"message": "Page outside of valid range."})
+        if len(parts) == 3 and parts[:2] == ["discogs", "releases"] and parts[2].isdigit():
+            return 200, self.synthetic.discogs_release(int(parts[2]))
+        return 404, {"message": "The requested resource was not found."}
+
+    def handle(self, method: str, target: str, headers: Dict[str, str],
+               body: bytes = b"") -> Tuple[int, Optional[dict], Dict[str, str]]:
+        """Réponse à une requête (fixture, enregistrement ou synthèse).
+
+        Args:
+            method: Méthode HTTP.
+            target: Chemin et paramètres de la requête.
+            headers: En-têtes de la requête.
+            body: Corps de la requête (formulaire du token Spotify).
+
+        Returns:
+            Tuple (code HTTP, corps JSON, en-têtes supplémentaires).
+        """
+        split = urlsplit(target)
+        path = split.path
+        params = dict(parse_qsl(split.query))
+        if path == "/_stats":
+            with self._lock:
+                return 200, {api: dict(codes) for api, codes in self.stats.items()}, {}
+        api = path.strip("/").split("/", 1)[0]
+
+        fault = self._inject_fault(api)
+        if fault:
+            status, payload, extra = fault
+        else:
+            extra = {}
+            fixture = self._match_fixture(method, path, params)
+            if fixture:
+                status, payload = fixture.get("status", 200), fixture.get("body")
+            else:
+                recorded = self._record_fixture(method, path, params, headers, body) if self.record else None
+                status, payload = recorded or self._synthesize(method, path, params)
+        self._count(api, status)
+        return status, payload, extra
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, payload, extra = server.handle(self.command, self.path, dict(self.headers), body)
+                data = json.dumps(payload if payload is not None else {}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Serveur local simulant Spotify, Last.fm et Discogs")
+    parser.add_argument('--host', default="127.0.0.1", help="Adresse d'écoute (défaut: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port d'écoute (défaut: 8765)")
+    parser.add_argument('--latency', type=float, default=0, help="Latence fixe en ms (défaut: 0)")
+    parser.add_argument('--jitter', type=float, default=0, help="Gigue aléatoire maximale en ms (défaut: 0)")
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help="Probabilité de réponse 429 (0-1)")
+    parser.add_argument('--quota', type=float, default=0, help="Requêtes/seconde par API avant 429 (0 = illimité)")
+    parser.add_argument('--retry-after', type=int, default=1, help="En-tête Retry-After des 429 (secondes)")
+    parser.add_argument('--error-rate', type=float, default=0, help="Probabilité de réponse 500 (0-1)")
+    parser.add_argument('--miss-rate', type=float, default=0, help="Proportion de recherches sans résultat (0-1)")
+    parser.add_argument('--discogs-releases', type=int, default=DEFAULT_DISCOGS_RELEASES,
+                        help=f"Taille de la collection Discogs simulée (défaut: {DEFAULT_DISCOGS_RELEASES})")
+    parser.add_argument('--fixtures', help="Fichier JSON de réponses enregistrées")
+    parser.add_argument('--record', action='store_true',
+                        help="Relayer vers les APIs réelles les requêtes sans fixture et les enregistrer")
+    parser.add_argument('--seed', type=int, help="Graine des tirages aléatoires")
+    parser.add_argument('--print-env', action='store_true', help="Afficher les variables export et quitter")
+    args = parser.parse_args()
+
+    if args.record and not args.fixtures:
+        parser.error("--record nécessite --fixtures")
+
+    profile = FaultProfile(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        quota=args.quota,
+        retry_after=args.retry_after,
+        miss_rate=args.miss_rate,
+    )
+    server = MockApiServer(args.host, args.port, profile, fixtures_path=args.fixtures, record=args.record,
+                           discogs_releases=args.discogs_releases, seed=args.seed)
+
+    if args.print_env:
+        server.httpd.server_close()
+        for name, value in server.environment().items():
+            print(f"export {name}={value}")
+        return 0
+
+    print("=" * 70)
+    print(f"🧪 Serveur de simulation des APIs sur {server.base_url}")
+    print("=" * 70)
+    print(f"   Latence: {args.latency:.0f} ms (+ gigue ≤ {args.jitter:.0f} ms)")
+    print(f"   429: {args.rate_limit_rate:.1%} aléatoire, quota {args.quota or '∞'} req/s, "
+          f"Retry-After {args.retry_after}s")
+    print(f"   500: {args.error_rate:.1%}   Recherches sans résultat: {args.miss_rate:.1%}")
+    if args.fixtures:
+        print(f"   📼 Fixtures: {args.fixtures} ({len(server.fixtures)} réponses"
+              f"{', enregistrement actif' if args.record else ''})")
+    print("\n📋 Variables à exporter avant de lancer un script:")
+    for name, value in server.environment().items():
+        print(f"   export {name}={value}")
+    print("\n⏹️  Ctrl+C pour arrêter")
+
+    server.serve_forever()
+    print(f"\n📊 Requêtes servies: {json.dumps(server.stats, indent=2)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,12 +12,69 @@ Fonctionnalités principales:
     - Logging des succès/erreurs avec détails
     - Exécution manuelle de tâches
     - Statut en temps réel de toutes les tâches
+    - Exécution parallèle des tâches dues, limitée par classe de ressource
+    - Exécution des scripts dans des processus de travail préchauffés
+    - Dépendances entre tâches et déclenchement sur modification des données
+    - Journal par tâche en temps réel, heartbeats, annulation et délais par tâche
 
 Architecture:
     Le scheduler est conçu pour être intégré dans le tracker Roon qui tourne
     en continu. Il vérifie périodiquement si des tâches doivent être exécutées
     et les lance en fonction de leur configuration.
 
+Exécution parallèle:
+    Chaque tâche déclare une classe de ressource (resource_class dans
+    TASKS_CONFIG): "network" (APIs externes limitées en débit), "ai" (API IA)
+    ou "cpu" (calculs et fichiers locaux). Les tâches dues sont lancées par un
+    pool de threads; chaque classe a sa propre limite de tâches simultanées
+    (RESOURCE_CLASS_LIMITS): une synchronisation Discogs lente ne retarde plus
+    l'analyse des écoutes, tandis que deux tâches IA restent sérialisées.
+    Les limites valent aussi pour les exécutions manuelles (GUI). L'état et
+    la configuration sont mis à jour sous verrou et écrits atomiquement
+    (fichier temporaire renommé); une tâche ne peut pas tourner deux fois
+    en même temps.
+
+Modes d'exécution:
+    "warm" (défaut): le script est exécuté par un processus de travail
+    persistant (WarmWorkerPool, src/utils/task_runner.py) dont les
+    dépendances sont déjà importées, en appelant sa fonction d'entrée
+    (entry dans TASKS_CONFIG); les caches du processus (moteurs SQLite,
+    historiques chargés) servent aux tâches suivantes. "subprocess": un
+    interpréteur neuf par exécution. Le mode se choisit par tâche
+    (execution_mode dans scheduled_tasks). Le démarrage évité est enregistré
+    dans l'état de chaque tâche.
+
+Dépendances et données:
+    Chaque tâche déclare les fichiers qu'elle lit (inputs) et produit
+    (outputs), et les tâches dont elle dépend (depends_on). Une tâche due
+    n'est pas exécutée si l'empreinte de ses entrées (taille et date de
+    modification des fichiers, arguments) est identique à celle de sa
+    dernière exécution réussie et que ses sorties existent: la fréquence
+    devient un intervalle maximal de vérification. Dans run_tasks, une tâche
+    attend la fin de ses producteurs (generate_soundtrack après read_discogs),
+    et un producteur terminé déclenche aussitôt ses dépendants dont les
+    entrées ont changé, même s'ils n'étaient pas encore dus. Les tâches sans
+    entrées déclarées (APIs externes) ou non déterministes
+    (skip_if_unchanged: False) restent planifiées par fréquence.
+
+Profilage:
+    Chaque exécution mesure temps réel, CPU utilisateur/système, pic de
+    mémoire résidente, octets lus/écrits et requêtes HTTP sortantes
+    (ResourceProbe, src/utils/task_runner.py), et note si les sorties de la
+    tâche ont changé. L'historique glissant (profile_history) sert à
+    l'optimiseur IA pour recommander les fréquences d'après les coûts réels.
+
+Suivi et annulation:
+    La sortie des scripts est écrite ligne par ligne, pendant l'exécution,
+    dans un journal par tâche (output/task-logs/<tâche>.log, avec rotation);
+    seule la fin de la sortie d'erreur est gardée pour le message d'erreur.
+    Toutes les HEARTBEAT_SECONDS, l'état de la tâche en cours (progress:
+    durée écoulée, lignes écrites, dernière ligne) est enregistré dans
+    scheduler-state.json, lisible par la GUI. cancel_task() arrête une tâche
+    en cours (SIGINT, puis arrêt forcé); depuis un autre processus (GUI), la
+    demande passe par un fichier <tâche>.cancel lu au heartbeat suivant.
+    Le délai maximal se configure par tâche (timeout_minutes).
+
 Tâches gérées:
     - analyze_listening_patterns: Analyse des patterns d'écoute
     - generate_haiku: Génération de haïkus pour albums
@@ -32,7 +89,8 @@ Configuration (dans roon-config.json):
                 "frequency_unit": "hour"|"day"|"month"|"year",
                 "frequency_count": int,
                 "last_execution": ISO8601 timestamp|null,
-                "description": str
+                "description": str,
+                "timeout_minutes": int  # optionnel, défaut TASK_TIMEOUT_SECONDS
             }
         }
     }
@@ -41,39 +99,75 @@ Configuration (dans roon-config.json):
     {
         "task_name": {
             "last_execution": ISO8601 timestamp,
-            "last_status": "success"|"error",
+            "last_status": "success"|"error"|"cancelled",
             "last_error": str|null,
             "execution_count": int,
-            "last_duration_seconds": float
+            "last_duration_seconds": float,
+            "execution_mode": "warm"|"subprocess",
+            "last_startup_saved_seconds": float,
+            "startup_saved_total_seconds": float,
+            "input_fingerprint": str|null,
+            "last_profile": {wall_seconds, cpu_user_seconds, cpu_system_seconds,
+                             peak_rss_mb, read_bytes, write_bytes, http_calls},
+            "profile_history": [  # PROFILE_HISTORY_SIZE dernières exécutions
+                {"timestamp", "status", "outputs_changed", ...mesures}
+            ],
+            "progress": {  # pendant l'exécution seulement
+                "started", "heartbeat", "elapsed_seconds", "output_lines",
+                "last_line", "log_file", "cancel_requested"
+            }
         }
     }
 
+Classes de ressources (limites par défaut, modifiables via resource_limits):
+    network: 1, ai: 1, cpu: 2
+
 Usage:
     # Initialisation
     scheduler = TaskScheduler(config_path, state_path)
     
-    # Vérification et exécution des tâches dues
-    scheduler.check_and_execute_tasks()
+    # Vérification et exécution des tâches dues (en parallèle par classe de ressource)
+    results = scheduler.check_and_execute_tasks()
     
     # Exécution manuelle
     scheduler.execute_task("generate_haiku")
     
     # Obtenir le statut
     status = scheduler.get_task_status("generate_haiku")
+    
+    # Annuler une tâche en cours
+    scheduler.cancel_task("read_discogs")
 
 Auteur: Patrick Ostertag
-Version: 1.0.0
-Date: 25 janvier 2026
+Version: 1.5.0
+Date: 28 janvier 2026
 """
 
+import copy
+import hashlib
 import json
 import os
 import sys
+import time
 import subprocess
 import logging
+import tempfile
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .task_runner import (ResourceProbe, TaskCancelled, WarmWorkerPool, profiled_command,
+                              read_profile, run_process)
+except ImportError:
+    # Exécution directe du module (python3 src/utils/scheduler.py)
+    from task_runner import (ResourceProbe, TaskCancelled, WarmWorkerPool, profiled_command,
+                             read_profile, run_process)
 
 # Configuration du logger
 logging.basicConfig(
@@ -82,34 +176,108 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fichiers lus et produits par les tâches (chemins relatifs à la racine du projet)
+COLLECTION_FILE = "data/collection/discogs-collection.json"
+HISTORY_INPUTS = [
+    "data/history/chk-roon.json",
+    "data/history/chk-roon.log",
+    "data/musique.db",
+    "data/musique.db-wal",
+]
+
 # Configuration des tâches disponibles
 TASKS_CONFIG = {
     "analyze_listening_patterns": {
         "script": "src/analysis/analyze-listening-patterns.py",
-        "description": "Analyze listening patterns and generate insights"
+        "description": "Analyze listening patterns and generate insights",
+        "resource_class": "cpu",
+        "entry": "main",
+        "inputs": HISTORY_INPUTS,
+        "outputs": ["output/reports"]
     },
     "generate_haiku": {
         "script": "src/analysis/generate-haiku.py",
-        "description": "Generate haiku presentations for albums"
+        "description": "Generate haiku presentations for albums",
+        "resource_class": "ai",
+        "entry": None,  # Script sans main(): exécuté comme __main__
+        "inputs": [COLLECTION_FILE, "data/history/chk-roon.json"],
+        "outputs": ["output/haikus"],
+        "depends_on": ["read_discogs"],
+        "skip_if_unchanged": False  # Sélection aléatoire: nouvelle présentation à chaque exécution
     },
     "generate_playlist": {
         "script": "src/analysis/generate-playlist.py",
-        "description": "Generate playlists based on listening patterns"
+        "description": "Generate playlists based on listening patterns",
+        "resource_class": "cpu",
+        "entry": "main",
+        "inputs": HISTORY_INPUTS + [COLLECTION_FILE],
+        "outputs": ["output/playlists"],
+        "depends_on": ["read_discogs"]
     },
     "read_discogs": {
         "script": "src/collection/Read-discogs-ia.py",
-        "description": "Fetch Discogs collection"
+        "description": "Fetch Discogs collection",
+        "resource_class": "network",
+        "entry": "main",
+        "inputs": [],  # API Discogs: planification par fréquence uniquement
+        "outputs": [COLLECTION_FILE, "data/exports/discogs-collection.md"]
     },
     "generate_soundtrack": {
         "script": "src/collection/generate-soundtrack.py",
-        "description": "Cross-reference soundtracks"
+        "description": "Cross-reference soundtracks",
+        "resource_class": "cpu",
+        "entry": "main",
+        "inputs": ["../Cinéma/catalogue.json", COLLECTION_FILE],
+        "outputs": ["data/collection/soundtrack.json"],
+        "depends_on": ["read_discogs"]
     },
     "ai_optimize_system": {
         "script": "src/services/ai_optimizer.py",
-        "description": "AI-powered system optimization with recommendations"
+        "description": "AI-powered system optimization with recommendations",
+        "resource_class": "ai",
+        "inputs": [],
+        "outputs": ["output/reports"]
     }
 }
 
+# Limite de tâches simultanées par classe de ressource
+RESOURCE_CLASS_LIMITS = {
+    "network": 1,   # APIs externes limitées en débit (Discogs, Spotify, Last.fm)
+    "ai": 1,        # API IA (EurIA)
+    "cpu": 2,       # Calculs et fichiers locaux
+}
+DEFAULT_RESOURCE_CLASS = "cpu"
+
+# Durée maximale d'une tâche par défaut (timeout_minutes dans scheduled_tasks)
+TASK_TIMEOUT_SECONDS = 600
+
+# Journaux par tâche (relatifs à la racine du projet), avec rotation
+TASK_LOG_DIR = "output/task-logs"
+TASK_LOG_MAX_BYTES = 1024 * 1024
+TASK_LOG_BACKUP_COUNT = 3
+
+# Intervalle des heartbeats d'une tâche en cours (progress dans l'état)
+HEARTBEAT_SECONDS = 5
+
+# Lignes de la sortie d'erreur reprises dans le message d'erreur (le reste est dans le journal)
+ERROR_OUTPUT_LINES = 20
+
+# Longueur maximale de la dernière ligne affichée dans progress
+PROGRESS_LINE_CHARS = 200
+
+# Modes d'exécution des scripts (execution_mode dans scheduled_tasks)
+EXECUTION_MODES = ("warm", "subprocess")
+DEFAULT_EXECUTION_MODE = "warm"
+
+# Nombre d'exécutions profilées gardées par tâche (profile_history)
+PROFILE_HISTORY_SIZE = 20
+
+# Au-delà, un fichier de sortie est comparé par taille et date plutôt que par contenu
+OUTPUT_HASH_MAX_BYTES = 64 * 1024 * 1024
+
+# Intervalle de vérification des créneaux libres pendant la répartition
+DISPATCH_POLL_SECONDS = 0.5
+
 # Configuration par défaut pour les tâches
 DEFAULT_TASK_CONFIG = {
     "analyze_listening_patterns": {
@@ -161,20 +329,90 @@ DEFAULT_TASK_CONFIG = {
 }
 
 
+def _path_signature(path: Path) -> Any:
+    """Taille et date de modification d'un fichier, ou des fichiers d'un répertoire (None si absent)."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if not path.is_dir():
+        return [stat.st_mtime_ns, stat.st_size]
+    signature = []
+    for child in sorted(path.rglob("*")):
+        try:
+            child_stat = child.stat()
+        except OSError:
+            continue
+        if child.is_file():
+            signature.append([str(child.relative_to(path)), child_stat.st_mtime_ns, child_stat.st_size])
+    return signature
+
+
+def dependency_order(task_names: Iterable[str]) -> List[str]:
+    """Trie des tâches producteurs d'abord (ordre d'origine entre tâches indépendantes).
+
+    Args:
+        task_names: Tâches à trier
+
+    Returns:
+        Tâches, chaque tâche après celles dont elle dépend (parmi task_names)
+
+    Raises:
+        ValueError: Dépendances circulaires
+    """
+    wanted = list(dict.fromkeys(task_names))
+    ordered: List[str] = []
+    visiting = set()
+
+    def visit(task_name: str):
+        if task_name in ordered:
+            return
+        if task_name in visiting:
+            raise ValueError(f"Dependency cycle involving {task_name}")
+        visiting.add(task_name)
+        for dependency in TASKS_CONFIG.get(task_name, {}).get("depends_on", []):
+            if dependency in wanted:
+                visit(dependency)
+        visiting.discard(task_name)
+        ordered.append(task_name)
+
+    for task_name in wanted:
+        visit(task_name)
+    return ordered
+
+
 class TaskScheduler:
     """Gestionnaire de tâches planifiées."""
     
-    def __init__(self, config_path: Path, state_path: Path):
+    def __init__(self, config_path: Path, state_path: Path,
+                 resource_limits: Optional[Dict[str, int]] = None):
         """Initialise le scheduler.
         
         Args:
             config_path: Chemin vers roon-config.json
             state_path: Chemin vers scheduler-state.json
+            resource_limits: Limites de tâches simultanées par classe de
+                ressource (complète RESOURCE_CLASS_LIMITS)
         """
         self.config_path = Path(config_path)
         self.state_path = Path(state_path)
         self.project_root = self.config_path.parent.parent.parent
         
+        # Verrou de l'état et de la configuration (tâches exécutées en parallèle)
+        self._lock = threading.RLock()
+        self._running: Dict[str, str] = {}
+        self.resource_limits = dict(RESOURCE_CLASS_LIMITS)
+        self.resource_limits.update(resource_limits or {})
+        self._slots = {
+            resource_class: threading.BoundedSemaphore(max(1, limit))
+            for resource_class, limit in self.resource_limits.items()
+        }
+        self._worker_pool: Optional[WarmWorkerPool] = None
+        # Exécutions en cours: demande d'annulation, progression, journaux ouverts
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._task_logs: Dict[str, logging.Logger] = {}
+        
         # Créer les répertoires de sortie s'ils n'existent pas
         self._ensure_output_directories()
         
@@ -204,7 +442,7 @@ class TaskScheduler:
             # Vérifier si la section scheduled_tasks existe
             if "scheduled_tasks" not in self.config:
                 logger.info("Adding scheduled_tasks section to config")
-                self.config["scheduled_tasks"] = DEFAULT_TASK_CONFIG
+                self.config["scheduled_tasks"] = copy.deepcopy(DEFAULT_TASK_CONFIG)
                 self._save_config()
             else:
                 # Vérifier que toutes les tâches par défaut sont présentes
@@ -212,7 +450,7 @@ class TaskScheduler:
                 for task_name, task_config in DEFAULT_TASK_CONFIG.items():
                     if task_name not in self.config["scheduled_tasks"]:
                         logger.info(f"Adding missing task config: {task_name}")
-                        self.config["scheduled_tasks"][task_name] = task_config
+                        self.config["scheduled_tasks"][task_name] = copy.deepcopy(task_config)
                         updated = True
                 
                 if updated:
@@ -226,7 +464,7 @@ class TaskScheduler:
                 "port": "9330",
                 "listen_start_hour": 6,
                 "listen_end_hour": 23,
-                "scheduled_tasks": DEFAULT_TASK_CONFIG
+                "scheduled_tasks": copy.deepcopy(DEFAULT_TASK_CONFIG)
             }
             self._save_config()
         except json.JSONDecodeError as e:
@@ -242,27 +480,48 @@ class TaskScheduler:
             logger.info("Creating new state file")
             self.state = {}
             for task_name in TASKS_CONFIG.keys():
-                self.state[task_name] = {
-                    "last_execution": None,
-                    "last_status": None,
-                    "last_error": None,
-                    "execution_count": 0,
-                    "last_duration_seconds": None
-                }
+                self.state[task_name] = self._new_task_state()
             self._save_state()
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in state file: {e}")
             raise
     
+    @staticmethod
+    def _new_task_state() -> Dict[str, Any]:
+        """État initial d'une tâche."""
+        return {
+            "last_execution": None,
+            "last_status": None,
+            "last_error": None,
+            "execution_count": 0,
+            "last_duration_seconds": None,
+            "execution_mode": None,
+            "last_startup_saved_seconds": None,
+            "startup_saved_total_seconds": 0.0,
+            "input_fingerprint": None,
+            "last_profile": None,
+            "profile_history": []
+        }
+    
+    def _write_json(self, path: Path, data: Dict):
+        """Écrit un fichier JSON atomiquement (fichier temporaire renommé), sous verrou.
+        
+        La GUI peut relire le fichier pendant qu'une tâche se termine: elle
+        voit soit l'ancienne version, soit la nouvelle, jamais un fichier partiel.
+        """
+        with self._lock:
+            temp_path = path.with_name(path.name + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, path)
+    
     def _save_config(self):
         """Sauvegarde la configuration."""
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, indent=2, ensure_ascii=False)
+        self._write_json(self.config_path, self.config)
     
     def _save_state(self):
         """Sauvegarde l'état."""
-        with open(self.state_path, 'w', encoding='utf-8') as f:
-            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        self._write_json(self.state_path, self.state)
     
     def _get_next_execution_time(self, task_name: str) -> Optional[datetime]:
         """Calcule la prochaine exécution prévue pour une tâche.
@@ -348,283 +607,781 @@ class TaskScheduler:
         next_execution = last_execution + delta
         
         if now >= next_execution:
+            if self.inputs_unchanged(task_name):
+                return False, "Inputs unchanged since last successful run"
             return True, f"Scheduled time reached (last: {last_execution_str})"
         
         return False, f"Not yet due (next: {next_execution.isoformat()})"
     
+    def get_resource_class(self, task_name: str) -> str:
+        """Classe de ressource d'une tâche (limite de concurrence appliquée).
+
+        Args:
+            task_name: Nom de la tâche
+
+        Returns:
+            "network", "ai" ou "cpu"
+        """
+        resource_class = TASKS_CONFIG.get(task_name, {}).get("resource_class", DEFAULT_RESOURCE_CLASS)
+        # Une playlist générée par IA appelle l'API IA
+        if task_name == "generate_playlist":
+            task_config = self.config["scheduled_tasks"].get(task_name, {})
+            if task_config.get("playlist_type") == "ai_generated":
+                resource_class = "ai"
+        return resource_class if resource_class in self._slots else DEFAULT_RESOURCE_CLASS
+
+    def get_dependencies(self, task_name: str) -> List[str]:
+        """Tâches dont une tâche dépend (depends_on dans TASKS_CONFIG)."""
+        return [name for name in TASKS_CONFIG.get(task_name, {}).get("depends_on", []) if name in TASKS_CONFIG]
+
+    def get_dependents(self, task_name: str) -> List[str]:
+        """Tâches qui dépendent d'une tâche."""
+        return [name for name in TASKS_CONFIG if task_name in self.get_dependencies(name)]
+
+    def compute_input_fingerprint(self, task_name: str) -> Optional[str]:
+        """Empreinte des entrées d'une tâche: fichiers (taille, date de modification) et arguments.
+
+        Args:
+            task_name: Nom de la tâche
+
+        Returns:
+            Empreinte SHA-1, ou None si la tâche ne doit jamais être ignorée
+            (pas d'entrées déclarées, résultat non déterministe)
+        """
+        task_info = TASKS_CONFIG[task_name]
+        if not task_info.get("inputs") or not task_info.get("skip_if_unchanged", True):
+            return None
+        # Une playlist générée par IA diffère à chaque exécution
+        if task_name == "generate_playlist":
+            if self.config["scheduled_tasks"].get(task_name, {}).get("playlist_type") == "ai_generated":
+                return None
+
+        signature = {path: _path_signature(self.project_root / path) for path in task_info["inputs"]}
+        signature["arguments"] = self._task_arguments(task_name)
+        return hashlib.sha1(json.dumps(signature, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def inputs_unchanged(self, task_name: str) -> bool:
+        """True si la dernière exécution a réussi avec les mêmes entrées et que les sorties existent.
+
+        Args:
+            task_name: Nom de la tâche
+
+        Returns:
+            True si la tâche peut être ignorée
+        """
+        fingerprint = self.compute_input_fingerprint(task_name)
+        if fingerprint is None:
+            return False
+        with self._lock:
+            task_state = self.state.get(task_name, {})
+            if task_state.get("last_status") != "success" or task_state.get("input_fingerprint") != fingerprint:
+                return False
+        return all((self.project_root / path).exists() for path in TASKS_CONFIG[task_name].get("outputs", []))
+
+    def get_execution_mode(self, task_name: str) -> str:
+        """Mode d'exécution d'une tâche ("warm" ou "subprocess").
+
+        Args:
+            task_name: Nom de la tâche
+
+        Returns:
+            execution_mode de la configuration de la tâche, sinon DEFAULT_EXECUTION_MODE
+        """
+        task_config = self.config["scheduled_tasks"].get(task_name, {})
+        mode = task_config.get("execution_mode", DEFAULT_EXECUTION_MODE)
+        if mode not in EXECUTION_MODES:
+            logger.warning(f"Unknown execution_mode '{mode}' for {task_name}, using {DEFAULT_EXECUTION_MODE}")
+            mode = DEFAULT_EXECUTION_MODE
+        return mode
+
+    def _get_worker_pool(self) -> WarmWorkerPool:
+        """Pool de processus de travail (créé à la première exécution en mode warm)."""
+        with self._lock:
+            if self._worker_pool is None:
+                self._worker_pool = WarmWorkerPool(
+                    self.project_root, size=max(1, sum(self.resource_limits.values()))
+                )
+            return self._worker_pool
+
+    def shutdown(self):
+        """Arrête les processus de travail (fin du tracker ou de la GUI)."""
+        with self._lock:
+            pool, self._worker_pool = self._worker_pool, None
+        if pool is not None:
+            pool.close()
+        with self._lock:
+            task_logs, self._task_logs = self._task_logs, {}
+        for task_log in task_logs.values():
+            for handler in task_log.handlers:
+                handler.close()
+
+    def get_timeout(self, task_name: str) -> float:
+        """Durée maximale d'une exécution de la tâche.
+
+        Args:
+            task_name: Nom de la tâche
+
+        Returns:
+            timeout_minutes de la configuration de la tâche en secondes, sinon TASK_TIMEOUT_SECONDS
+        """
+        minutes = self.config["scheduled_tasks"].get(task_name, {}).get("timeout_minutes")
+        if minutes is None:
+            return TASK_TIMEOUT_SECONDS
+        if isinstance(minutes, bool) or not isinstance(minutes, (int, float)) or minutes <= 0:
+            logger.warning(f"Invalid timeout_minutes '{minutes}' for {task_name}, using {TASK_TIMEOUT_SECONDS}s")
+            return TASK_TIMEOUT_SECONDS
+        return minutes * 60
+
+    def get_log_path(self, task_name: str) -> Path:
+        """Journal de la sortie des exécutions d'une tâche."""
+        return self.project_root / TASK_LOG_DIR / f"{task_name}.log"
+
+    def _cancel_marker(self, task_name: str) -> Path:
+        """Fichier de demande d'annulation (déposé par un autre processus, lu au heartbeat)."""
+        return self.get_log_path(task_name).with_suffix(".cancel")
+
+    def _task_log(self, task_name: str) -> logging.Logger:
+        """Journal d'une tâche (ouvert à la première exécution)."""
+        with self._lock:
+            task_log = self._task_logs.get(task_name)
+            if task_log is None:
+                path = self.get_log_path(task_name)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(path, maxBytes=TASK_LOG_MAX_BYTES,
+                                              backupCount=TASK_LOG_BACKUP_COUNT, encoding='utf-8')
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                # Hors de la hiérarchie logging: ni propagé au journal du scheduler, ni partagé entre instances
+                task_log = logging.Logger(f"task.{task_name}", logging.INFO)
+                task_log.addHandler(handler)
+                self._task_logs[task_name] = task_log
+            return task_log
+
+    @contextmanager
+    def _monitor(self, task_name: str, start_time: datetime, description: str):
+        """Journal et heartbeats d'une exécution; fournit le callback de sortie du script.
+
+        Args:
+            task_name: Nom de la tâche
+            start_time: Début de l'exécution
+            description: Contexte de l'exécution (journalisé)
+
+        Yields:
+            Fonction (flux, ligne) qui écrit une ligne de sortie dans le journal
+        """
+        task_log = self._task_log(task_name)
+        # Demande d'annulation restée d'une exécution précédente
+        self._cancel_marker(task_name).unlink(missing_ok=True)
+        progress = {
+            "started": start_time.isoformat(),
+            "heartbeat": None,
+            "elapsed_seconds": 0.0,
+            "output_lines": 0,
+            "last_line": None,
+            "log_file": os.path.relpath(self.get_log_path(task_name), self.project_root),
+            "cancel_requested": False
+        }
+        with self._lock:
+            self._progress[task_name] = progress
+        task_log.info(f"--- {task_name} started ({description}) ---")
+
+        def on_output(stream: str, line: str):
+            task_log.info(line if stream == "stdout" else f"[{stream}] {line}")
+            with self._lock:
+                progress["output_lines"] += 1
+                if line.strip():
+                    progress["last_line"] = line.strip()[-PROGRESS_LINE_CHARS:]
+
+        done = threading.Event()
+
+        def beat():
+            self._heartbeat(task_name)
+            while not done.wait(HEARTBEAT_SECONDS):
+                self._heartbeat(task_name)
+
+        heartbeat = threading.Thread(target=beat, name=f"heartbeat-{task_name}", daemon=True)
+        heartbeat.start()
+        try:
+            yield on_output
+        finally:
+            done.set()
+            heartbeat.join()
+            with self._lock:
+                self._progress.pop(task_name, None)
+
+    def _heartbeat(self, task_name: str):
+        """Enregistre la progression d'une tâche en cours; applique une demande d'annulation déposée."""
+        marker = self._cancel_marker(task_name)
+        if marker.exists():
+            marker.unlink(missing_ok=True)
+            logger.info(f"Cancellation of {task_name} requested by another process")
+            self._request_cancel(task_name)
+        with self._lock:
+            progress = self._progress.get(task_name)
+            if progress is None:
+                return
+            now = datetime.now()
+            progress["heartbeat"] = now.isoformat()
+            progress["elapsed_seconds"] = round((now - datetime.fromisoformat(progress["started"])).total_seconds(), 1)
+            event = self._cancel_events.get(task_name)
+            progress["cancel_requested"] = bool(event and event.is_set())
+            self.state.setdefault(task_name, self._new_task_state())["progress"] = dict(progress)
+            self._save_state()
+
+    def _live_progress(self, task_name: str) -> Optional[Dict[str, Any]]:
+        """Progression d'une exécution en cours, ici ou dans un autre processus (heartbeat récent)."""
+        with self._lock:
+            if task_name in self._progress:
+                return dict(self._progress[task_name])
+            progress = self.state.get(task_name, {}).get("progress")
+        if not progress or not progress.get("heartbeat"):
+            return None
+        try:
+            age = (datetime.now() - datetime.fromisoformat(progress["heartbeat"])).total_seconds()
+        except ValueError:
+            return None
+        # Processus arrêté sans terminer l'exécution: progression périmée
+        return progress if age <= 3 * HEARTBEAT_SECONDS else None
+
+    def _request_cancel(self, task_name: str) -> bool:
+        with self._lock:
+            event = self._cancel_events.get(task_name)
+            if event is None:
+                return False
+            event.set()
+            return True
+
+    def cancel_task(self, task_name: str) -> Tuple[bool, str]:
+        """Demande l'annulation d'une tâche en cours.
+
+        La tâche reçoit SIGINT (KeyboardInterrupt dans le script), puis est
+        arrêtée de force si elle ne s'est pas terminée après
+        task_runner.CANCEL_GRACE_SECONDS. Si elle tourne dans un autre
+        processus (tracker), la demande y est appliquée au heartbeat suivant.
+
+        Args:
+            task_name: Nom de la tâche
+
+        Returns:
+            Tuple (success: bool, message: str)
+        """
+        if task_name not in TASKS_CONFIG:
+            return False, f"Task {task_name} not found"
+        if task_name == "ai_optimize_system":
+            # Exécutée dans un thread du scheduler: pas de processus à interrompre
+            return False, f"Task {task_name} cannot be cancelled"
+        if self._request_cancel(task_name):
+            logger.info(f"Cancellation of {task_name} requested")
+            return True, f"Cancellation requested for {task_name}"
+        if self._live_progress(task_name) is None:
+            return False, f"Task {task_name} is not running"
+        marker = self._cancel_marker(task_name)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+        return True, f"Cancellation requested for {task_name} (applied within {HEARTBEAT_SECONDS}s)"
+
+    def _claim(self, task_name: str) -> bool:
+        """Marque une tâche en cours; False si elle tourne déjà."""
+        with self._lock:
+            if task_name in self._running:
+                return False
+            self._running[task_name] = datetime.now().isoformat()
+            self._cancel_events[task_name] = threading.Event()
+            return True
+
+    def _release(self, task_name: str):
+        with self._lock:
+            self._running.pop(task_name, None)
+            self._cancel_events.pop(task_name, None)
+
+    @contextmanager
+    def _resource_slot(self, resource_class: str):
+        """Réserve un créneau de la classe de ressource (attend qu'il se libère)."""
+        slot = self._slots[resource_class]
+        slot.acquire()
+        try:
+            yield
+        finally:
+            slot.release()
+
+    def _record_execution(self, task_name: str, start_time: datetime, success: bool,
+                          error: Optional[str] = None, duration: Optional[float] = None,
+                          execution_mode: Optional[str] = None, startup_saved: Optional[float] = None,
+                          input_fingerprint: Optional[str] = None, profile: Optional[Dict[str, Any]] = None,
+                          outputs_changed: Optional[bool] = None, cancelled: bool = False):
+        """Enregistre le résultat d'une exécution (état, et configuration si succès ou annulation).
+
+        Args:
+            task_name: Nom de la tâche
+            start_time: Début de l'exécution
+            success: Exécution réussie
+            error: Message d'erreur (échec)
+            duration: Durée en secondes (None si inconnue)
+            execution_mode: Mode d'exécution du script (None: non applicable)
+            startup_saved: Démarrage évité en secondes (mode warm)
+            input_fingerprint: Empreinte des entrées lues par l'exécution (conservée si succès)
+            profile: Ressources consommées (ResourceProbe), None si non mesurées
+            outputs_changed: Sorties modifiées par l'exécution (None: inconnu)
+            cancelled: Exécution annulée (la tâche n'est relancée qu'à sa prochaine échéance)
+        """
+        status = "success" if success else "cancelled" if cancelled else "error"
+        self._task_log(task_name).info(
+            f"--- {task_name} {status}" + (f" in {duration:.1f}s" if duration is not None else "")
+            + (f": {error}" if error else "") + " ---"
+        )
+        with self._lock:
+            if success or cancelled:
+                self.config["scheduled_tasks"][task_name]["last_execution"] = start_time.isoformat()
+                self._save_config()
+
+            task_state = self.state.setdefault(task_name, self._new_task_state())
+            self._progress.pop(task_name, None)
+            task_state.pop("progress", None)
+            task_state["last_execution"] = start_time.isoformat()
+            task_state["last_status"] = status
+            task_state["last_error"] = error
+            task_state["execution_count"] = task_state.get("execution_count", 0) + 1
+            if success:
+                task_state["input_fingerprint"] = input_fingerprint
+            if duration is not None:
+                task_state["last_duration_seconds"] = duration
+            if execution_mode is not None:
+                task_state["execution_mode"] = execution_mode
+                task_state["last_startup_saved_seconds"] = round(startup_saved or 0.0, 3)
+                task_state["startup_saved_total_seconds"] = round(
+                    task_state.get("startup_saved_total_seconds", 0.0) + (startup_saved or 0.0), 3
+                )
+
+            profile = dict(profile or {})
+            if duration is not None:
+                # Durée vue par le scheduler (démarrage d'un sous-processus compris)
+                profile["wall_seconds"] = round(duration, 3)
+            task_state["last_profile"] = profile or None
+            history = task_state.get("profile_history") or []
+            history.append(dict(profile, timestamp=start_time.isoformat(),
+                                status=task_state["last_status"], outputs_changed=outputs_changed))
+            task_state["profile_history"] = history[-PROFILE_HISTORY_SIZE:]
+            self._save_state()
+
     def execute_task(self, task_name: str, manual: bool = False) -> Tuple[bool, str]:
         """Exécute une tâche.
-        
+
+        Attend qu'un créneau de sa classe de ressource soit libre; une tâche
+        déjà en cours n'est pas relancée.
+
         Args:
             task_name: Nom de la tâche à exécuter
             manual: Si True, ignore la vérification de planification
-            
+
         Returns:
             Tuple (success: bool, message: str)
         """
         if task_name not in TASKS_CONFIG:
             return False, f"Task {task_name} not found"
-        
+
         if not manual:
             should_run, reason = self.should_execute(task_name)
             if not should_run:
                 return False, f"Task not ready to execute: {reason}"
-        
+
+        if not self._claim(task_name):
+            return False, f"Task {task_name} is already running"
+        try:
+            with self._resource_slot(self.get_resource_class(task_name)):
+                return self._run_task(task_name, manual)
+        finally:
+            self._release(task_name)
+
+    def _run_task(self, task_name: str, manual: bool) -> Tuple[bool, str]:
+        """Exécute une tâche réservée (créneau de ressource déjà obtenu).
+
+        Args:
+            task_name: Nom de la tâche à exécuter
+            manual: Exécution manuelle (journalisation)
+
+        Returns:
+            Tuple (success: bool, message: str)
+        """
         task_info = TASKS_CONFIG[task_name]
         script_path = self.project_root / task_info["script"]
-        
+
         if not script_path.exists():
             error_msg = f"Script not found: {script_path}"
             logger.error(error_msg)
             return False, error_msg
-        
-        logger.info(f"Executing task: {task_name} ({'manual' if manual else 'scheduled'})")
-        
+
+        logger.info(f"Executing task: {task_name} ({'manual' if manual else 'scheduled'}, "
+                    f"{self.get_resource_class(task_name)})")
+
         start_time = datetime.now()
-        
-        try:
-            # Construire la commande avec les arguments spécifiques à la tâche
-            cmd = [sys.executable, str(script_path)]
-            
+        with self._lock:
+            cancel_event = self._cancel_events.get(task_name)
+        if cancel_event is not None and cancel_event.is_set():
+            # Annulée en attendant son créneau de ressource
+            return False, "Task cancelled before start"
+
+        outputs_before = self._output_signature(task_name)
+        mode = self.get_execution_mode(task_name)
+        timeout = self.get_timeout(task_name)
+        description = f"{'manual' if manual else 'scheduled'}, {mode}, timeout {timeout:g}s"
+
+        with self._monitor(task_name, start_time, description) as on_output:
             # Traitement spécial pour ai_optimize_system (exécution directe via import)
             if task_name == "ai_optimize_system":
+                probe = ResourceProbe(scope="thread").start()
                 try:
-                    # Import direct pour éviter subprocess
-                    sys.path.insert(0, str(self.project_root / "src"))
-                    from services.ai_optimizer import AIOptimizer
-                    
-                    # Déterminer les chemins
-                    config_path = self.config_path
-                    state_path = self.state_path
-                    history_path = self.project_root / "data" / "history" / "chk-roon.json"
-                    
-                    # Créer l'optimiseur
-                    optimizer = AIOptimizer(
-                        config_path=str(config_path),
-                        state_path=str(state_path),
-                        history_path=str(history_path)
-                    )
-                    
-                    # Générer le rapport
-                    report_path = optimizer.generate_optimization_report()
-                    logger.info(f"AI optimization report generated: {report_path}")
-                    
-                    # Générer et appliquer les recommandations si configuré
-                    task_config = self.config["scheduled_tasks"].get(task_name, {})
-                    auto_apply = task_config.get("auto_apply", False)
-                    
-                    recommendations = optimizer.generate_recommendations()
-                    if recommendations:
-                        logger.info(f"Generated {len(recommendations)} recommendations")
-                        
-                        # Sauvegarder les recommandations en JSON
-                        output_dir = self.project_root / "output" / "reports"
-                        rec_path = output_dir / f"ai-recommendations-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
-                        with open(rec_path, 'w', encoding='utf-8') as f:
-                            json.dump([r.to_dict() for r in recommendations], f, indent=2, ensure_ascii=False)
-                        logger.info(f"Recommendations saved to: {rec_path}")
-                        
-                        if auto_apply:
-                            result_apply = optimizer.apply_recommendations(recommendations, auto_apply=True)
-                            logger.info(f"Applied {result_apply['applied']} recommendations automatically")
-                    
-                    duration = (datetime.now() - start_time).total_seconds()
-                    
-                    # Succès - mettre à jour la configuration et l'état
-                    self.config["scheduled_tasks"][task_name]["last_execution"] = start_time.isoformat()
-                    self._save_config()
-                    
-                    if task_name not in self.state:
-                        self.state[task_name] = {
-                            "last_execution": None,
-                            "last_status": None,
-                            "last_error": None,
-                            "execution_count": 0,
-                            "last_duration_seconds": None
-                        }
-                    
-                    self.state[task_name]["last_execution"] = start_time.isoformat()
-                    self.state[task_name]["last_status"] = "success"
-                    self.state[task_name]["last_error"] = None
-                    self.state[task_name]["execution_count"] += 1
-                    self.state[task_name]["last_duration_seconds"] = duration
-                    self._save_state()
-                    
-                    return True, f"AI optimization completed in {duration:.1f}s - {len(recommendations)} recommendations generated"
-                    
+                    recommendations = self._run_ai_optimizer(task_name)
                 except Exception as e:
                     error_msg = f"AI optimizer failed: {str(e)}"
                     logger.error(error_msg)
-                    
-                    if task_name not in self.state:
-                        self.state[task_name] = {
-                            "last_execution": None,
-                            "last_status": None,
-                            "last_error": None,
-                            "execution_count": 0,
-                            "last_duration_seconds": None
-                        }
-                    
                     duration = (datetime.now() - start_time).total_seconds()
-                    self.state[task_name]["last_execution"] = start_time.isoformat()
-                    self.state[task_name]["last_status"] = "error"
-                    self.state[task_name]["last_error"] = error_msg
-                    self.state[task_name]["execution_count"] += 1
-                    self.state[task_name]["last_duration_seconds"] = duration
-                    self._save_state()
-                    
+                    self._record_execution(task_name, start_time, False, error_msg, duration, profile=probe.stop())
                     return False, error_msg
-            
-            # Ajouter des arguments spécifiques pour generate_playlist
-            if task_name == "generate_playlist":
-                task_config = self.config["scheduled_tasks"].get(task_name, {})
-                playlist_type = task_config.get("playlist_type", "top_sessions")
-                max_tracks = task_config.get("max_tracks", 25)
-                output_formats = task_config.get("output_formats", ["json", "m3u", "csv", "roon-txt"])
-                ai_prompt = task_config.get("ai_prompt", "")
-                
-                cmd.extend([
-                    "--algorithm", playlist_type,
-                    "--max-tracks", str(max_tracks),
-                    "--formats"
-                ])
-                cmd.extend(output_formats)
-                
-                # Ajouter le prompt IA si l'algorithme est ai_generated
-                if playlist_type == "ai_generated" and ai_prompt:
-                    cmd.extend(["--ai-prompt", ai_prompt])
-            
-            # Exécuter le script Python
-            result = subprocess.run(
-                cmd,
-                cwd=str(self.project_root),
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minutes timeout
-            )
-            
-            duration = (datetime.now() - start_time).total_seconds()
-            
-            if result.returncode == 0:
-                # Succès
-                logger.info(f"Task {task_name} completed successfully in {duration:.1f}s")
-                
-                # Mettre à jour la configuration
-                self.config["scheduled_tasks"][task_name]["last_execution"] = start_time.isoformat()
-                self._save_config()
-                
-                # Mettre à jour l'état
-                if task_name not in self.state:
-                    self.state[task_name] = {
-                        "last_execution": None,
-                        "last_status": None,
-                        "last_error": None,
-                        "execution_count": 0,
-                        "last_duration_seconds": None
-                    }
-                
-                self.state[task_name]["last_execution"] = start_time.isoformat()
-                self.state[task_name]["last_status"] = "success"
-                self.state[task_name]["last_error"] = None
-                self.state[task_name]["execution_count"] += 1
-                self.state[task_name]["last_duration_seconds"] = duration
-                self._save_state()
-                
-                return True, f"Task completed successfully in {duration:.1f}s"
-            else:
-                # Erreur
-                error_msg = f"Task failed with return code {result.returncode}"
-                if result.stderr:
-                    error_msg += f"\nError output: {result.stderr[:500]}"
-                
+
+                duration = (datetime.now() - start_time).total_seconds()
+                self._record_execution(task_name, start_time, True, duration=duration, profile=probe.stop(),
+                                       outputs_changed=self._outputs_changed(task_name, outputs_before))
+                return True, f"AI optimization completed in {duration:.1f}s - {recommendations} recommendations generated"
+
+            # Empreinte prise avant l'exécution: une modification pendant la tâche la relancera
+            fingerprint = self.compute_input_fingerprint(task_name)
+            try:
+                returncode, stderr, startup_saved, profile = self._run_script(
+                    task_name, script_path, mode, timeout, on_output, cancel_event
+                )
+
+                duration = (datetime.now() - start_time).total_seconds()
+
+                if returncode == 0:
+                    logger.info(f"Task {task_name} completed successfully in {duration:.1f}s ({mode}, "
+                                f"{startup_saved:.2f}s startup saved)")
+                    self._record_execution(task_name, start_time, True, duration=duration,
+                                           execution_mode=mode, startup_saved=startup_saved,
+                                           input_fingerprint=fingerprint, profile=profile,
+                                           outputs_changed=self._outputs_changed(task_name, outputs_before))
+                    return True, f"Task completed successfully in {duration:.1f}s"
+
+                error_msg = f"Task failed with return code {returncode}"
+                if stderr:
+                    error_msg += "\nError output: " + "\n".join(stderr.splitlines()[-ERROR_OUTPUT_LINES:])
+                error_msg += f"\nLog: {os.path.relpath(self.get_log_path(task_name), self.project_root)}"
+
                 logger.error(f"Task {task_name} failed: {error_msg}")
-                
-                # Mettre à jour l'état
-                if task_name not in self.state:
-                    self.state[task_name] = {
-                        "last_execution": None,
-                        "last_status": None,
-                        "last_error": None,
-                        "execution_count": 0,
-                        "last_duration_seconds": None
-                    }
-                
-                self.state[task_name]["last_execution"] = start_time.isoformat()
-                self.state[task_name]["last_status"] = "error"
-                self.state[task_name]["last_error"] = error_msg
-                self.state[task_name]["execution_count"] += 1
-                self.state[task_name]["last_duration_seconds"] = duration
-                self._save_state()
-                
+                self._record_execution(task_name, start_time, False, error_msg, duration,
+                                       execution_mode=mode, startup_saved=startup_saved, profile=profile)
                 return False, error_msg
-                
-        except subprocess.TimeoutExpired:
-            error_msg = "Task execution timeout (10 minutes)"
-            logger.error(f"Task {task_name} timed out")
-            
-            if task_name not in self.state:
-                self.state[task_name] = {
-                    "last_execution": None,
-                    "last_status": None,
-                    "last_error": None,
-                    "execution_count": 0,
-                    "last_duration_seconds": None
-                }
-            
-            self.state[task_name]["last_execution"] = start_time.isoformat()
-            self.state[task_name]["last_status"] = "error"
-            self.state[task_name]["last_error"] = error_msg
-            self.state[task_name]["execution_count"] += 1
-            self._save_state()
-            
-            return False, error_msg
-            
+
+            except TaskCancelled:
+                duration = (datetime.now() - start_time).total_seconds()
+                logger.warning(f"Task {task_name} cancelled after {duration:.1f}s")
+                self._record_execution(task_name, start_time, False, "Task cancelled", duration, cancelled=True)
+                return False, f"Task cancelled after {duration:.1f}s"
+
+            except subprocess.TimeoutExpired:
+                error_msg = f"Task execution timeout ({timeout / 60:g} minutes)"
+                logger.error(f"Task {task_name} timed out")
+                duration = (datetime.now() - start_time).total_seconds()
+                self._record_execution(task_name, start_time, False, error_msg, duration)
+                return False, error_msg
+
+            except Exception as e:
+                error_msg = f"Unexpected error: {str(e)}"
+                logger.error(f"Task {task_name} failed with exception: {error_msg}")
+                self._record_execution(task_name, start_time, False, error_msg)
+                return False, error_msg
+
+    def _output_signature(self, task_name: str) -> Optional[Dict[str, Any]]:
+        """Contenu des fichiers produits (SHA-1) et signature des répertoires, None sans sorties déclarées."""
+        outputs = TASKS_CONFIG[task_name].get("outputs")
+        if not outputs:
+            return None
+        signature = {}
+        for output in outputs:
+            path = self.project_root / output
+            if path.is_file() and path.stat().st_size <= OUTPUT_HASH_MAX_BYTES:
+                # Contenu plutôt que date: une réécriture identique ne compte pas comme un changement
+                digest = hashlib.sha1()
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+                signature[output] = digest.hexdigest()
+            else:
+                signature[output] = _path_signature(path)
+        return signature
+
+    def _outputs_changed(self, task_name: str, before: Optional[Dict[str, Any]]) -> Optional[bool]:
+        """True si l'exécution a modifié ses sorties (None sans sorties déclarées)."""
+        if before is None:
+            return None
+        return self._output_signature(task_name) != before
+
+    def _run_script(self, task_name: str, script_path: Path, mode: str,
+                    timeout: float = TASK_TIMEOUT_SECONDS,
+                    on_output: Optional[Callable[[str, str], None]] = None,
+                    cancel_event: Optional[threading.Event] = None) -> Tuple[int, str, float, Optional[Dict[str, Any]]]:
+        """Exécute le script d'une tâche, en sous-processus ou dans un processus de travail.
+
+        Args:
+            task_name: Nom de la tâche
+            script_path: Script Python de la tâche
+            mode: "warm" ou "subprocess"
+            timeout: Durée maximale en secondes
+            on_output: Appelée pour chaque ligne de sortie (flux, ligne), pendant l'exécution
+            cancel_event: Annule l'exécution dès qu'il est positionné
+
+        Returns:
+            Tuple (code de retour, fin de la sortie d'erreur, démarrage évité
+            en secondes, ressources consommées ou None)
+
+        Raises:
+            subprocess.TimeoutExpired: Durée maximale dépassée
+            TaskCancelled: Exécution annulée
+        """
+        cmd = self._build_command(task_name, script_path)
+
+        if mode == "warm":
+            result = self._get_worker_pool().run(
+                script_path, cmd[2:], entry=TASKS_CONFIG[task_name].get("entry"),
+                timeout=timeout, on_output=on_output, cancel_event=cancel_event
+            )
+            return result["returncode"], result["stderr"], result["startup_saved_seconds"], result["profile"]
+
+        with tempfile.TemporaryDirectory(prefix="scheduler-profile-") as directory:
+            profile_path = os.path.join(directory, "profile.json")
+            result = run_process(
+                profiled_command(cmd, profile_path),
+                cwd=str(self.project_root),
+                timeout=timeout,
+                on_output=on_output,
+                cancel_event=cancel_event
+            )
+            return result["returncode"], result["stderr"], 0.0, read_profile(profile_path)
+
+    def _build_command(self, task_name: str, script_path: Path) -> List[str]:
+        """Construit la commande avec les arguments spécifiques à la tâche.
+
+        Args:
+            task_name: Nom de la tâche
+            script_path: Script Python de la tâche
+
+        Returns:
+            Commande (interpréteur, script, arguments)
+        """
+        return [sys.executable, str(script_path)] + self._task_arguments(task_name)
+
+    def _task_arguments(self, task_name: str) -> List[str]:
+        """Arguments du script d'une tâche, d'après sa configuration.
+
+        Args:
+            task_name: Nom de la tâche
+
+        Returns:
+            Arguments (sys.argv[1:] du script)
+        """
+        cmd = []
+
+        # Ajouter des arguments spécifiques pour generate_playlist
+        if task_name == "generate_playlist":
+            task_config = self.config["scheduled_tasks"].get(task_name, {})
+            playlist_type = task_config.get("playlist_type", "top_sessions")
+            max_tracks = task_config.get("max_tracks", 25)
+            output_formats = task_config.get("output_formats", ["json", "m3u", "csv", "roon-txt"])
+            ai_prompt = task_config.get("ai_prompt", "")
+
+            cmd.extend([
+                "--algorithm", playlist_type,
+                "--max-tracks", str(max_tracks),
+                "--formats"
+            ])
+            cmd.extend(output_formats)
+
+            # Ajouter le prompt IA si l'algorithme est ai_generated
+            if playlist_type == "ai_generated" and ai_prompt:
+                cmd.extend(["--ai-prompt", ai_prompt])
+
+        return cmd
+
+    def _run_ai_optimizer(self, task_name: str) -> int:
+        """Exécute l'optimiseur IA dans le processus (rapport et recommandations).
+
+        Args:
+            task_name: Nom de la tâche (ai_optimize_system)
+
+        Returns:
+            Nombre de recommandations générées
+        """
+        # Import direct pour éviter subprocess
+        sys.path.insert(0, str(self.project_root / "src"))
+        from services.ai_optimizer import AIOptimizer
+
+        # Déterminer les chemins
+        history_path = self.project_root / "data" / "history" / "chk-roon.json"
+        db_path = self.project_root / "data" / "musique.db"
+
+        # Créer l'optimiseur
+        optimizer = AIOptimizer(
+            config_path=str(self.config_path),
+            state_path=str(self.state_path),
+            history_path=str(history_path),
+            db_path=str(db_path)
+        )
+
+        # Générer le rapport
+        report_path = optimizer.generate_optimization_report()
+        logger.info(f"AI optimization report generated: {report_path}")
+
+        # Générer et appliquer les recommandations si configuré
+        task_config = self.config["scheduled_tasks"].get(task_name, {})
+        auto_apply = task_config.get("auto_apply", False)
+
+        recommendations = optimizer.generate_recommendations()
+        if recommendations:
+            logger.info(f"Generated {len(recommendations)} recommendations")
+
+            # Sauvegarder les recommandations en JSON
+            output_dir = self.project_root / "output" / "reports"
+            rec_path = output_dir / f"ai-recommendations-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+            with open(rec_path, 'w', encoding='utf-8') as f:
+                json.dump([r.to_dict() for r in recommendations], f, indent=2, ensure_ascii=False)
+            logger.info(f"Recommendations saved to: {rec_path}")
+
+            if auto_apply:
+                result_apply = optimizer.apply_recommendations(recommendations, auto_apply=True)
+                logger.info(f"Applied {result_apply['applied']} recommendations automatically")
+
+        return len(recommendations)
+
+    def run_tasks(self, task_names: Iterable[str], manual: bool = False) -> Dict[str, Tuple[bool, str]]:
+        """Exécute des tâches en parallèle, dans la limite de chaque classe de ressource.
+
+        Une tâche est lancée dès qu'un créneau de sa classe est libre (les
+        créneaux occupés par des exécutions manuelles comptent aussi); les
+        tâches d'une même classe saturée attendent leur tour dans l'ordre.
+        Une tâche attend aussi la fin des tâches dont elle dépend (en attente
+        ou en cours); un producteur terminé avec succès ajoute ses dépendants
+        activés dont les entrées ont changé depuis leur dernière exécution.
+
+        Args:
+            task_names: Tâches à exécuter (sans vérification de planification)
+            manual: Exécution manuelle (journalisation)
+
+        Returns:
+            Dictionnaire tâche → (success, message)
+        """
+        pending = deque(dependency_order(name for name in task_names if name in TASKS_CONFIG))
+        queued = set(pending)
+        results: Dict[str, Tuple[bool, str]] = {}
+        futures = {}
+        max_workers = max(1, sum(self.resource_limits.values()))
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler") as pool:
+            while pending or futures:
+                for _ in range(len(pending)):
+                    task_name = pending.popleft()
+                    if self._waiting_for_producers(task_name, pending):
+                        pending.append(task_name)
+                        continue
+                    resource_class = self.get_resource_class(task_name)
+                    if not self._claim(task_name):
+                        results[task_name] = (False, f"Task {task_name} is already running")
+                        continue
+                    if not self._slots[resource_class].acquire(blocking=False):
+                        self._release(task_name)
+                        pending.append(task_name)
+                        continue
+                    future = pool.submit(self._run_claimed, task_name, resource_class, manual)
+                    futures[future] = task_name
+
+                if futures:
+                    done, _ = wait(futures, timeout=DISPATCH_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task_name = futures.pop(future)
+                        results[task_name] = future.result()
+                        if results[task_name][0]:
+                            for dependent in self._triggered_dependents(task_name, queued):
+                                pending.append(dependent)
+                                queued.add(dependent)
+                elif pending:
+                    # Créneaux ou producteurs occupés par des exécutions lancées ailleurs (GUI)
+                    time.sleep(DISPATCH_POLL_SECONDS)
+
+        return results
+
+    def _waiting_for_producers(self, task_name: str, pending: Iterable[str]) -> bool:
+        """True si une tâche dont elle dépend est en attente ou en cours."""
+        waiting = set(pending)
+        with self._lock:
+            return any(name in waiting or name in self._running for name in self.get_dependencies(task_name))
+
+    def _triggered_dependents(self, producer: str, queued: Iterable[str]) -> List[str]:
+        """Dépendants activés d'un producteur terminé dont les entrées ont changé.
+
+        Args:
+            producer: Tâche terminée avec succès
+            queued: Tâches déjà prévues dans cette exécution
+
+        Returns:
+            Tâches à exécuter maintenant
+        """
+        triggered = []
+        for task_name in self.get_dependents(producer):
+            if task_name in queued:
+                continue
+            if not self.config["scheduled_tasks"].get(task_name, {}).get("enabled", False):
+                continue
+            fingerprint = self.compute_input_fingerprint(task_name)
+            with self._lock:
+                previous = self.state.get(task_name, {}).get("input_fingerprint")
+            if fingerprint is not None and fingerprint != previous:
+                logger.info(f"Task {task_name} triggered: inputs changed after {producer}")
+                triggered.append(task_name)
+        return triggered
+
+    def _run_claimed(self, task_name: str, resource_class: str, manual: bool) -> Tuple[bool, str]:
+        """Exécute une tâche lancée par run_tasks, puis libère sa réservation et son créneau."""
+        try:
+            return self._run_task(task_name, manual)
         except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            logger.error(f"Task {task_name} failed with exception: {error_msg}")
-            
-            if task_name not in self.state:
-                self.state[task_name] = {
-                    "last_execution": None,
-                    "last_status": None,
-                    "last_error": None,
-                    "execution_count": 0,
-                    "last_duration_seconds": None
-                }
-            
-            self.state[task_name]["last_execution"] = start_time.isoformat()
-            self.state[task_name]["last_status"] = "error"
-            self.state[task_name]["last_error"] = error_msg
-            self.state[task_name]["execution_count"] += 1
-            self._save_state()
-            
-            return False, error_msg
-    
-    def check_and_execute_tasks(self):
-        """Vérifie toutes les tâches et exécute celles qui sont dues."""
+            logger.error(f"Task {task_name} failed with exception: {e}")
+            return False, f"Unexpected error: {str(e)}"
+        finally:
+            self._release(task_name)
+            self._slots[resource_class].release()
+
+    def check_and_execute_tasks(self) -> Dict[str, Tuple[bool, str]]:
+        """Vérifie toutes les tâches et exécute en parallèle celles qui sont dues.
+
+        Returns:
+            Dictionnaire tâche exécutée → (success, message)
+        """
         logger.info("Checking scheduled tasks...")
-        
-        executed_count = 0
+
+        due_tasks = []
         for task_name in TASKS_CONFIG.keys():
             should_run, reason = self.should_execute(task_name)
-            
+
             if should_run:
                 logger.info(f"Task {task_name} is due: {reason}")
-                success, message = self.execute_task(task_name, manual=False)
-                
-                if success:
-                    executed_count += 1
-                    logger.info(f"✅ {task_name}: {message}")
-                else:
-                    logger.error(f"❌ {task_name}: {message}")
+                due_tasks.append(task_name)
             else:
                 logger.debug(f"Task {task_name} not due: {reason}")
-        
+
+        results = self.run_tasks(due_tasks)
+
+        executed_count = 0
+        for task_name, (success, message) in results.items():
+            if success:
+                executed_count += 1
+                logger.info(f"✅ {task_name}: {message}")
+            else:
+                logger.error(f"❌ {task_name}: {message}")
+
         if executed_count > 0:
             logger.info(f"Executed {executed_count} task(s)")
         else:
             logger.debug("No tasks were due for execution")
-    
+
+        return results
+
     def get_task_status(self, task_name: str) -> Dict[str, Any]:
         """Retourne le statut complet d'une tâche.
         
@@ -638,9 +1395,11 @@ class TaskScheduler:
             return {"error": "Task not found"}
         
         config = self.config["scheduled_tasks"].get(task_name, {})
-        state = self.state.get(task_name, {})
+        with self._lock:
+            state = dict(self.state.get(task_name, {}))
         
         next_execution = self._get_next_execution_time(task_name)
+        progress = self._live_progress(task_name)
         
         status = {
             "name": task_name,
@@ -653,7 +1412,17 @@ class TaskScheduler:
             "last_status": state.get("last_status"),
             "last_error": state.get("last_error"),
             "execution_count": state.get("execution_count", 0),
-            "last_duration_seconds": state.get("last_duration_seconds")
+            "last_duration_seconds": state.get("last_duration_seconds"),
+            "resource_class": self.get_resource_class(task_name),
+            "running": task_name in self._running or progress is not None,
+            "execution_mode": self.get_execution_mode(task_name),
+            "startup_saved_total_seconds": state.get("startup_saved_total_seconds", 0.0),
+            "depends_on": self.get_dependencies(task_name),
+            "inputs_unchanged": self.inputs_unchanged(task_name),
+            "last_profile": state.get("last_profile"),
+            "timeout_seconds": self.get_timeout(task_name),
+            "log_file": os.path.relpath(self.get_log_path(task_name), self.project_root),
+            "progress": progress
         }
         
         # Ajouter les paramètres spécifiques à generate_playlist
@@ -685,7 +1454,8 @@ class TaskScheduler:
             frequency_count: Nombre d'unités
             frequency_unit: Unité de fréquence (hour, day, month, year)
             **extra_params: Paramètres supplémentaires spécifiques à la tâche
-                           (ex: playlist_type, max_tracks, output_formats pour generate_playlist)
+                           (ex: playlist_type, max_tracks, output_formats pour generate_playlist,
+                           timeout_minutes pour toutes les tâches)
             
         Returns:
             Tuple (success: bool, message: str)
@@ -699,15 +1469,22 @@ class TaskScheduler:
         if frequency_count < 1:
             return False, "frequency_count must be >= 1"
         
-        self.config["scheduled_tasks"][task_name]["enabled"] = enabled
-        self.config["scheduled_tasks"][task_name]["frequency_count"] = frequency_count
-        self.config["scheduled_tasks"][task_name]["frequency_unit"] = frequency_unit
+        timeout_minutes = extra_params.get("timeout_minutes")
+        if timeout_minutes is not None and (isinstance(timeout_minutes, bool)
+                                            or not isinstance(timeout_minutes, (int, float))
+                                            or timeout_minutes <= 0):
+            return False, "timeout_minutes must be > 0"
         
-        # Ajouter les paramètres supplémentaires s'ils existent
-        for key, value in extra_params.items():
-            self.config["scheduled_tasks"][task_name][key] = value
-        
-        self._save_config()
+        with self._lock:
+            self.config["scheduled_tasks"][task_name]["enabled"] = enabled
+            self.config["scheduled_tasks"][task_name]["frequency_count"] = frequency_count
+            self.config["scheduled_tasks"][task_name]["frequency_unit"] = frequency_unit
+            
+            # Ajouter les paramètres supplémentaires s'ils existent
+            for key, value in extra_params.items():
+                self.config["scheduled_tasks"][task_name][key] = value
+            
+            self._save_config()
         
         logger.info(f"Task {task_name} configuration updated")
         return True, "Configuration updated successfully"
@@ -721,6 +1498,7 @@ if __name__ == "__main__":
     parser.add_argument('--check', action='store_true', help='Check and execute due tasks')
     parser.add_argument('--status', action='store_true', help='Show status of all tasks')
     parser.add_argument('--execute', type=str, help='Execute a specific task manually')
+    parser.add_argument('--cancel', type=str, help='Cancel a running task')
     
     args = parser.parse_args()
     
@@ -741,8 +1519,12 @@ if __name__ == "__main__":
             print(f"\n{task_name}:")
             for key, value in status.items():
                 print(f"  {key}: {value}")
+    elif args.cancel:
+        success, message = scheduler.cancel_task(args.cancel)
+        print(f"{'✅' if success else '❌'} {message}")
     elif args.execute:
         success, message = scheduler.execute_task(args.execute, manual=True)
         print(f"{'✅' if success else '❌'} {message}")
     else:
         parser.print_help()
+    scheduler.shutdown()
@@ -0,0 +1,822 @@
+#!/usr/bin/env python3
+"""Exécution des scripts de tâches dans des processus de travail préchauffés.
+
+Chaque tâche planifiée était lancée par subprocess.run([python, script]):
+démarrage d'un interpréteur, puis import de requests, SQLAlchemy, NumPy,
+pylast... et des modules du projet, avant même la première ligne utile.
+Pour des tâches courtes, ce démarrage représente l'essentiel de la durée.
+
+WarmWorkerPool garde des processus de travail persistants, lancés une fois
+avec ces dépendances déjà importées (PRELOAD_MODULES). Une tâche y est
+exécutée en appelant la fonction d'entrée de son script (main()), le module
+du script restant chargé d'une exécution à l'autre (rechargé si le fichier
+change); un script sans fonction d'entrée est exécuté comme __main__
+(runpy). Les caches du processus sont partagés entre les tâches: moteurs
+SQLite (database.get_engine), client Spotify partagé, historiques en
+colonnes (history_store.enable_history_cache). Les processus de travail
+sont remplacés quand la configuration lue à l'import change (.env,
+CONFIG_FILES).
+
+Une tâche garde les garanties d'un sous-processus: sys.argv et le
+répertoire courant propres à l'exécution, code de retour (valeur de main()
+ou SystemExit), sortie d'erreur conservée pour le message d'erreur, et
+délai maximal (le processus de travail qui dépasse est tué, puis remplacé).
+
+Le pool mesure ce qu'il évite: le démarrage d'un processus de travail
+(interpréteur + imports préchargés) et le premier chargement de chaque
+script; startup_saved_seconds donne, pour chaque exécution, le coût de
+démarrage économisé par rapport à un sous-processus.
+
+Chaque exécution est aussi profilée (ResourceProbe): temps CPU utilisateur
+et système, pic de mémoire résidente, octets lus et écrits, requêtes HTTP
+sortantes (clients http.client — requests, urllib — et httpx — pylast —
+enveloppés par install_http_counter). Dans un processus de travail, le pic
+mémoire est remis à zéro avant chaque tâche (/proc/self/clear_refs sous
+Linux). Un script lancé en sous-processus passe par ce module
+(profiled_command), qui écrit ses mesures dans un fichier JSON à la sortie.
+
+La sortie d'une tâche est transmise ligne par ligne pendant l'exécution
+(on_output), depuis un processus de travail comme depuis un sous-processus
+(run_process), pour être journalisée au fil de l'eau. Une exécution peut
+être annulée (cancel_event): le script reçoit SIGINT (KeyboardInterrupt,
+ses blocs finally et handlers atexit s'exécutent), puis est tué s'il ne
+s'est pas arrêté après CANCEL_GRACE_SECONDS; TaskCancelled est levée.
+
+Exemple d'utilisation:
+    >>> from src.utils.task_runner import WarmWorkerPool
+    >>>
+    >>> pool = WarmWorkerPool(project_root, size=2)
+    >>> result = pool.run("src/analysis/analyze-listening-patterns.py", entry="main", timeout=600)
+    >>> result['returncode'], result['startup_saved_seconds']
+    >>> pool.close()
+
+Auteur: Patrick Ostertag
+Version: 1.2.0
+Date: 28 janvier 2026
+"""
+
+import atexit
+import functools
+import importlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import re
+import resource
+import runpy
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Modules importés au démarrage de chaque processus de travail
+PRELOAD_MODULES = (
+    "requests",
+    "dotenv",
+    "pylast",
+    "numpy",
+    "sqlalchemy",
+    "src.models.history_store",
+    "src.models.repository",
+    "services.spotify_service",
+)
+
+# Configuration lue par les scripts (relative à la racine du projet)
+ENV_FILE = os.path.join("data", "config", ".env")
+
+# Fichiers lus à l'import (constants, jetons et URLs des scripts): une
+# modification remplace les processus de travail, qui rechargent tout
+CONFIG_FILES = (ENV_FILE,)
+
+# Taille maximale de la sortie conservée par exécution (fin de la sortie)
+OUTPUT_TAIL_CHARS = 4000
+
+# Délai d'arrêt des processus de travail à la fermeture du pool
+SHUTDOWN_TIMEOUT_SECONDS = 5
+
+# Attente de l'arrêt d'un script annulé avant de le tuer
+CANCEL_GRACE_SECONDS = 5
+
+# Intervalle de vérification du délai et de l'annulation pendant une exécution
+POLL_SECONDS = 0.2
+
+# Option du lanceur profilé (python task_runner.py --profile-output FICHIER script args...)
+PROFILE_OUTPUT_OPTION = "--profile-output"
+
+
+class TaskCancelled(Exception):
+    """Exécution annulée; le script est arrêté (ou tué)."""
+
+    def __init__(self, stderr: str = ""):
+        super().__init__("Task cancelled")
+        self.stderr = stderr
+
+
+class _TailBuffer(io.TextIOBase):
+    """Flux texte qui ne garde que la fin de ce qui y est écrit.
+
+    Avec on_line, chaque ligne complète est aussi transmise dès son écriture.
+    """
+
+    def __init__(self, limit: int = OUTPUT_TAIL_CHARS, on_line: Optional[Callable[[str], None]] = None):
+        self.limit = limit
+        self.text = ""
+        self.on_line = on_line
+        self._partial = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.text = (self.text + text)[-self.limit:]
+        if self.on_line:
+            *lines, self._partial = (self._partial + text).split("\n")
+            for line in lines:
+                self.on_line(line)
+        return len(text)
+
+    def flush_lines(self):
+        """Transmet la dernière ligne si elle n'est pas terminée."""
+        if self.on_line and self._partial:
+            line, self._partial = self._partial, ""
+            self.on_line(line)
+
+    def getvalue(self) -> str:
+        return self.text
+
+
+def _interrupt(pid: int):
+    """Demande l'arrêt d'un processus: SIGINT (KeyboardInterrupt dans le script), terminaison hors POSIX."""
+    try:
+        os.kill(pid, signal.SIGINT if os.name == "posix" else signal.SIGTERM)
+    except OSError:
+        pass
+
+
+# --- Mesure des ressources ---
+
+_http_lock = threading.Lock()
+_http_calls = 0
+_http_calls_by_thread: Dict[int, int] = {}
+_http_counter_installed = False
+
+
+def _count_http_call():
+    global _http_calls
+    ident = threading.get_ident()
+    with _http_lock:
+        _http_calls += 1
+        _http_calls_by_thread[ident] = _http_calls_by_thread.get(ident, 0) + 1
+
+
+def _counted(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        _count_http_call()
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def install_http_counter():
+    """Enveloppe les clients HTTP pour compter les requêtes sortantes (une seule fois par processus).
+
+    http.client.HTTPConnection.putrequest couvre requests (urllib3) et
+    urllib; httpx.Client.send couvre pylast.
+    """
+    global _http_counter_installed
+    with _http_lock:
+        if _http_counter_installed:
+            return
+        _http_counter_installed = True
+
+    import http.client
+    http.client.HTTPConnection.putrequest = _counted(http.client.HTTPConnection.putrequest)
+    try:
+        import httpx
+    except ImportError:
+        return
+    httpx.Client.send = _counted(httpx.Client.send)
+
+
+def _http_count(scope: str) -> int:
+    with _http_lock:
+        if scope == "thread":
+            return _http_calls_by_thread.get(threading.get_ident(), 0)
+        return _http_calls
+
+
+def _read_proc_io(path: str) -> Optional[Dict[str, int]]:
+    """Octets lus et écrits (rchar, wchar) d'un processus ou d'un thread, None hors Linux."""
+    try:
+        with open(path, "r") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {"read": int(fields["rchar"]), "write": int(fields["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    """Remet à zéro le pic de mémoire résidente du processus (Linux >= 4.0)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb(reset: bool) -> float:
+    """Pic de mémoire résidente (Mo): depuis la remise à zéro, sinon depuis le démarrage."""
+    if reset:
+        try:
+            with open("/proc/self/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError):
+            pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+class ResourceProbe:
+    """Ressources consommées entre start() et stop().
+
+    scope "process": tout le processus et ses sous-processus (processus de
+    travail, script lancé en sous-processus). scope "thread": le thread
+    appelant seulement (tâche exécutée dans le scheduler), sans pic mémoire
+    (non attribuable à un thread).
+    """
+
+    def __init__(self, scope: str = "process"):
+        self.scope = scope
+        self._thread_usage = scope == "thread" and hasattr(resource, "RUSAGE_THREAD")
+        self._io_path = "/proc/thread-self/io" if scope == "thread" else "/proc/self/io"
+
+    def _usage(self) -> List[float]:
+        """[utilisateur, système, blocs lus, blocs écrits]"""
+        if self.scope == "thread":
+            who = [resource.RUSAGE_THREAD if self._thread_usage else resource.RUSAGE_SELF]
+        else:
+            who = [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN]
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for target in who:
+            usage = resource.getrusage(target)
+            for i, value in enumerate((usage.ru_utime, usage.ru_stime, usage.ru_inblock, usage.ru_oublock)):
+                totals[i] += value
+        return totals
+
+    def start(self) -> 'ResourceProbe':
+        install_http_counter()
+        self._peak_reset = self.scope == "process" and _reset_peak_rss()
+        self._started = time.perf_counter()
+        self._start_usage = self._usage()
+        self._start_io = _read_proc_io(self._io_path)
+        self._start_http = _http_count(self.scope)
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """Mesures depuis start().
+
+        Returns:
+            Dict: wall_seconds, cpu_user_seconds, cpu_system_seconds,
+                peak_rss_mb (None pour un thread), read_bytes, write_bytes,
+                http_calls
+        """
+        usage = self._usage()
+        delta = [end - start for start, end in zip(self._start_usage, usage)]
+        end_io = _read_proc_io(self._io_path)
+        if self._start_io and end_io:
+            read_bytes = end_io["read"] - self._start_io["read"]
+            write_bytes = end_io["write"] - self._start_io["write"]
+        else:
+            # Sans /proc: blocs de 512 octets effectivement lus/écrits sur disque
+            read_bytes, write_bytes = int(delta[2]) * 512, int(delta[3]) * 512
+        return {
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "cpu_user_seconds": round(delta[0], 3),
+            "cpu_system_seconds": round(delta[1], 3),
+            "peak_rss_mb": None if self.scope == "thread" else round(_peak_rss_mb(self._peak_reset), 1),
+            "read_bytes": read_bytes,
+            "write_bytes": write_bytes,
+            "http_calls": _http_count(self.scope) - self._start_http,
+        }
+
+
+def profiled_command(cmd: Sequence[str], profile_path: str) -> List[str]:
+    """Commande [python, script, args...] lancée à travers ce module, mesures écrites dans profile_path."""
+    return [cmd[0], os.path.abspath(__file__), PROFILE_OUTPUT_OPTION, profile_path] + list(cmd[1:])
+
+
+def read_profile(profile_path: str) -> Optional[Dict[str, Any]]:
+    """Mesures écrites par un script lancé avec profiled_command (None si absentes)."""
+    try:
+        with open(profile_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _run_profiled_script(profile_path: str, script_path: str, argv: Sequence[str]):
+    """Exécute un script comme `python script args`, puis écrit ses mesures à la sortie."""
+    sys.argv = [script_path] + list(argv)
+    sys.path[0] = os.path.dirname(os.path.abspath(script_path))
+    probe = ResourceProbe().start()
+
+    def write_profile():
+        with open(profile_path, "w", encoding="utf-8") as f:
+            json.dump(probe.stop(), f)
+
+    # Enregistré avant le script: exécuté après ses propres handlers atexit
+    atexit.register(write_profile)
+    runpy.run_path(script_path, run_name="__main__")
+
+
+# --- Côté processus de travail ---
+
+# Modules de scripts chargés: chemin → (signature du fichier, module)
+_loaded_scripts: Dict[str, tuple] = {}
+
+
+def _module_name(script_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(script_path))[0]
+    return "_task_" + re.sub(r"\W", "_", stem)
+
+
+def _load_entry(script_path: str, entry: str):
+    """Fonction d'entrée d'un script, chargé une fois par processus (rechargé s'il change).
+
+    Returns:
+        Tuple (fonction, True si le module était déjà chargé)
+    """
+    stat = os.stat(script_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _loaded_scripts.get(script_path)
+    if cached and cached[0] == signature:
+        return getattr(cached[1], entry), True
+
+    name = _module_name(script_path)
+    spec = importlib.util.spec_from_file_location(name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+    _loaded_scripts[script_path] = (signature, module)
+    return getattr(module, entry), False
+
+
+def _exit_code(code: Any, stderr) -> int:
+    """Code de retour équivalent à sys.exit(code) dans un sous-processus."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=stderr)
+    return 1
+
+
+def run_entry(script_path: str, argv: Sequence[str] = (), entry: Optional[str] = "main",
+              cwd: Optional[str] = None, profile: bool = True,
+              on_output: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+    """Exécute un script de tâche dans le processus courant, comme un sous-processus.
+
+    Args:
+        script_path: Script de la tâche.
+        argv: Arguments (sys.argv[1:] pendant l'exécution).
+        entry: Fonction d'entrée du script (None: script exécuté comme __main__).
+        cwd: Répertoire courant pendant l'exécution.
+        profile: Mesurer les ressources consommées (ResourceProbe).
+        on_output: Appelée pour chaque ligne écrite, avec ("stdout"|"stderr", ligne).
+
+    Returns:
+        Dict: returncode, stderr (fin de la sortie d'erreur), load_seconds
+            (chargement du module), run_seconds, cached (module déjà chargé),
+            profile (mesures, None si profile est False).
+    """
+    stdout, stderr = (
+        _TailBuffer(on_line=functools.partial(on_output, stream) if on_output else None)
+        for stream in ("stdout", "stderr")
+    )
+    probe = ResourceProbe().start() if profile else None
+    saved_argv, saved_cwd = sys.argv, os.getcwd()
+    load_seconds = run_seconds = 0.0
+    cached = False
+    started = time.perf_counter()
+    try:
+        sys.argv = [script_path] + list(argv)
+        if cwd:
+            os.chdir(cwd)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                function = None
+                if entry:
+                    function, cached = _load_entry(script_path, entry)
+                load_seconds = time.perf_counter() - started
+                if function is None:
+                    runpy.run_path(script_path, run_name="__main__")
+                    returncode = 0
+                else:
+                    result = function()
+                    returncode = result if isinstance(result, int) else 0
+            except SystemExit as e:
+                returncode = _exit_code(e.code, stderr)
+            except KeyboardInterrupt:
+                # Annulation (SIGINT): code d'un processus interrompu par Ctrl-C
+                print("Task interrupted", file=stderr)
+                returncode = 130
+            except BaseException:
+                traceback.print_exc(file=stderr)
+                returncode = 1
+            finally:
+                stdout.flush_lines()
+                stderr.flush_lines()
+        run_seconds = time.perf_counter() - started - load_seconds
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+    return {
+        "returncode": returncode,
+        "stderr": stderr.getvalue(),
+        "load_seconds": load_seconds,
+        "run_seconds": run_seconds,
+        "cached": cached,
+        "profile": probe.stop() if probe else None,
+    }
+
+
+def _preload(project_root: str, modules: Sequence[str]):
+    """Rend le projet importable et importe les dépendances communes des scripts."""
+    for path in (os.path.join(project_root, "src"), project_root):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    # .env chargé avant constants (importé par spotify_service): URLs des API lues à l'import
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(os.path.join(project_root, ENV_FILE))
+    except ImportError:
+        pass
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Dépendance optionnelle absente: le script l'importera (ou échouera) lui-même
+            pass
+    try:
+        from src.models.history_store import enable_history_cache
+        enable_history_cache()
+    except Exception:
+        pass
+
+
+def _worker_main(conn, project_root: str, modules: Sequence[str]):
+    """Boucle d'un processus de travail: une requête à la fois, jusqu'à None.
+
+    Pendant une exécution, chaque ligne de sortie est envoyée ("output",
+    flux, ligne), puis le résultat ("result", dict). SIGINT n'interrompt que
+    le script en cours (annulation), pas le processus de travail.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _preload(project_root, modules)
+    send_lock = threading.Lock()
+
+    def send_output(stream: str, line: str):
+        # Les threads du script écrivent aussi dans sys.stdout
+        with send_lock:
+            conn.send(("output", stream, line))
+
+    conn.send("ready")
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        try:
+            result = run_entry(on_output=send_output, **request)
+        finally:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+        with send_lock:
+            conn.send(("result", result))
+
+
+# --- Côté scheduler ---
+
+def _config_signature(project_root: str) -> tuple:
+    """Signature (date de modification, taille) des fichiers de CONFIG_FILES."""
+    signature = []
+    for name in CONFIG_FILES:
+        try:
+            stat = os.stat(os.path.join(project_root, name))
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class _Worker:
+    """Processus de travail et sa connexion."""
+
+    def __init__(self, context, project_root: str, modules: Sequence[str]):
+        started = time.perf_counter()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, project_root, tuple(modules)),
+            name="task-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        if self.conn.recv() != "ready":
+            raise RuntimeError("Task worker failed to start")
+        self.startup_seconds = time.perf_counter() - started
+        # Signature de CONFIG_FILES au lancement (voir WarmWorkerPool)
+        self.config_signature: Optional[tuple] = None
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(SHUTDOWN_TIMEOUT_SECONDS)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(SHUTDOWN_TIMEOUT_SECONDS)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(SHUTDOWN_TIMEOUT_SECONDS)
+        self.conn.close()
+
+
+class WarmWorkerPool:
+    """Processus de travail persistants, dépendances préchargées.
+
+    Chaque exécution occupe un processus de travail; un processus libre est
+    réutilisé, sinon un nouveau est lancé. Au-delà de `size` processus
+    libres, les suivants sont arrêtés à la fin de leur exécution.
+
+    Les valeurs lues à l'import (.env: jetons, URLs des API, limiteurs) sont
+    figées dans un processus de travail, et load_dotenv ne remplace pas une
+    variable déjà définie: recharger le seul module du script ne suffit pas.
+    Un processus lancé avant la dernière modification de CONFIG_FILES n'est
+    donc plus réutilisé.
+    """
+
+    def __init__(self, project_root, size: int = 2, preload: Optional[Sequence[str]] = None,
+                 start_method: str = "spawn"):
+        """Initialise le pool (les processus sont lancés à la première exécution).
+
+        Args:
+            project_root: Racine du projet (sys.path des processus de travail).
+            size: Nombre de processus libres gardés.
+            preload: Modules importés au démarrage de chaque processus
+                (défaut: PRELOAD_MODULES).
+            start_method: Méthode multiprocessing ("spawn": aucun état hérité
+                du scheduler, qui tourne avec plusieurs threads).
+        """
+        self.project_root = str(project_root)
+        self.size = max(1, size)
+        self.preload = tuple(PRELOAD_MODULES if preload is None else preload)
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._busy: List[_Worker] = []
+        self._closed = False
+        # Coûts évités, mesurés: démarrage d'un processus, premier chargement par script
+        self.startup_samples: List[float] = []
+        self.cold_load_seconds: Dict[str, float] = {}
+        atexit.register(self.close)
+
+    @property
+    def startup_seconds(self) -> float:
+        """Démarrage moyen d'un processus (interpréteur + imports préchargés)."""
+        return sum(self.startup_samples) / len(self.startup_samples) if self.startup_samples else 0.0
+
+    def _acquire(self):
+        """Processus libre, ou nouveau processus (avec sa durée de démarrage)."""
+        signature = _config_signature(self.project_root)
+        stale = []
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is closed")
+            while self._idle:
+                worker = self._idle.pop()
+                if not worker.alive():
+                    worker.conn.close()
+                elif worker.config_signature != signature:
+                    stale.append(worker)
+                else:
+                    self._busy.append(worker)
+                    break
+            else:
+                worker = None
+        for old in stale:
+            old.stop()
+        if worker is not None:
+            return worker, 0.0
+        worker = _Worker(self._context, self.project_root, self.preload)
+        worker.config_signature = signature
+        with self._lock:
+            self.startup_samples.append(worker.startup_seconds)
+            self._busy.append(worker)
+        return worker, worker.startup_seconds
+
+    def _release(self, worker: _Worker, reusable: bool):
+        with self._lock:
+            if worker in self._busy:
+                self._busy.remove(worker)
+            keep = (reusable and not self._closed and len(self._idle) < self.size
+                    and worker.config_signature == _config_signature(self.project_root))
+            if keep:
+                self._idle.append(worker)
+        if keep:
+            return
+        if reusable:
+            worker.stop()
+        else:
+            worker.kill()
+
+    def run(self, script_path, argv: Sequence[str] = (), entry: Optional[str] = "main",
+            timeout: Optional[float] = None, on_output: Optional[Callable[[str, str], None]] = None,
+            cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Exécute un script dans un processus de travail.
+
+        Args:
+            script_path: Script de la tâche.
+            argv: Arguments du script.
+            entry: Fonction d'entrée (None: script exécuté comme __main__).
+            timeout: Durée maximale en secondes (None: illimitée).
+            on_output: Appelée pour chaque ligne de sortie, avec ("stdout"|"stderr", ligne).
+            cancel_event: Annule l'exécution dès qu'il est positionné.
+
+        Returns:
+            Dict: Résultat de run_entry, plus startup_paid_seconds (démarrage
+                d'un processus pour cette exécution) et startup_saved_seconds
+                (coût de démarrage évité par rapport à un sous-processus).
+
+        Raises:
+            subprocess.TimeoutExpired: Délai dépassé (le processus est tué).
+            TaskCancelled: Exécution annulée (script interrompu, ou processus tué).
+        """
+        script_path = os.path.abspath(str(script_path))
+        worker, startup_paid = self._acquire()
+        request = {"script_path": script_path, "argv": list(argv), "entry": entry, "cwd": self.project_root}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interrupted = None
+        try:
+            worker.conn.send(request)
+            while True:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    self._release(worker, reusable=False)
+                    raise subprocess.TimeoutExpired([script_path] + list(argv), timeout)
+                if cancel_event is not None and cancel_event.is_set():
+                    if interrupted is None:
+                        interrupted = now
+                        _interrupt(worker.process.pid)
+                    elif now - interrupted >= CANCEL_GRACE_SECONDS:
+                        self._release(worker, reusable=False)
+                        raise TaskCancelled()
+                wait = POLL_SECONDS if deadline is None else min(POLL_SECONDS, deadline - now)
+                if not worker.conn.poll(max(0.0, wait)):
+                    continue
+                message = worker.conn.recv()
+                if message[0] == "result":
+                    result = message[1]
+                    break
+                if on_output:
+                    on_output(message[1], message[2])
+        except (EOFError, OSError):
+            # Processus de travail arrêté pendant l'exécution (os._exit, signal...)
+            worker.process.join(SHUTDOWN_TIMEOUT_SECONDS)
+            exitcode = worker.process.exitcode
+            self._release(worker, reusable=False)
+            if interrupted is not None:
+                raise TaskCancelled()
+            return {
+                "returncode": exitcode if exitcode else 1,
+                "stderr": f"Task worker exited unexpectedly (exit code {exitcode})",
+                "load_seconds": 0.0, "run_seconds": 0.0, "cached": False, "profile": None,
+                "startup_paid_seconds": startup_paid, "startup_saved_seconds": 0.0,
+            }
+        self._release(worker, reusable=True)
+        if interrupted is not None and result["returncode"] != 0:
+            raise TaskCancelled(result["stderr"])
+
+        with self._lock:
+            if entry and not result["cached"]:
+                self.cold_load_seconds[script_path] = result["load_seconds"]
+            # Sous-processus: démarrage + chargement complet du script (sauf runpy, rechargé à chaque fois)
+            avoided = self.startup_seconds + (self.cold_load_seconds.get(script_path, 0.0) if entry else 0.0)
+        paid = startup_paid + (result["load_seconds"] if entry else 0.0)
+        result["startup_paid_seconds"] = startup_paid
+        result["startup_saved_seconds"] = max(0.0, avoided - paid)
+        return result
+
+    def close(self):
+        """Arrête tous les processus de travail (libres, puis ceux en cours)."""
+        with self._lock:
+            self._closed = True
+            workers = self._idle + self._busy
+            self._idle, self._busy = [], []
+        for worker in workers:
+            worker.stop()
+
+
+def run_process(cmd: Sequence[str], cwd: Optional[str] = None, timeout: Optional[float] = None,
+                on_output: Optional[Callable[[str, str], None]] = None,
+                cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """Exécute une commande en sous-processus, sortie transmise ligne par ligne.
+
+    Remplace subprocess.run(capture_output=True): la sortie n'est plus
+    gardée en mémoire jusqu'à la fin (seule la fin de la sortie d'erreur
+    est conservée), et l'exécution peut être annulée.
+
+    Args:
+        cmd: Commande ([python, script, args...]).
+        cwd: Répertoire courant du sous-processus.
+        timeout: Durée maximale en secondes (None: illimitée).
+        on_output: Appelée pour chaque ligne (depuis un thread de lecture),
+            avec ("stdout"|"stderr", ligne).
+        cancel_event: Annule l'exécution dès qu'il est positionné.
+
+    Returns:
+        Dict: returncode, stderr (fin de la sortie d'erreur).
+
+    Raises:
+        subprocess.TimeoutExpired: Délai dépassé (le processus est tué).
+        TaskCancelled: Exécution annulée (script interrompu, ou processus tué).
+    """
+    # Sortie non tamponnée: les lignes arrivent au fil de l'exécution
+    env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+    process = subprocess.Popen(
+        list(cmd), cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, encoding="utf-8", errors="replace"
+    )
+    stderr = _TailBuffer()
+
+    def pump(pipe, stream: str):
+        with pipe:
+            for line in pipe:
+                if stream == "stderr":
+                    stderr.write(line)
+                if on_output:
+                    on_output(stream, line.rstrip("\n"))
+
+    readers = [threading.Thread(target=pump, args=(pipe, stream), daemon=True)
+               for pipe, stream in ((process.stdout, "stdout"), (process.stderr, "stderr"))]
+    for reader in readers:
+        reader.start()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    interrupted = None
+    try:
+        while True:
+            try:
+                process.wait(POLL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                process.kill()
+                raise subprocess.TimeoutExpired(list(cmd), timeout)
+            if cancel_event is not None and cancel_event.is_set():
+                if interrupted is None:
+                    interrupted = now
+                    _interrupt(process.pid)
+                elif now - interrupted >= CANCEL_GRACE_SECONDS:
+                    process.kill()
+    finally:
+        process.wait()
+        for reader in readers:
+            # Un processus petit-enfant peut garder les tubes ouverts
+            reader.join(SHUTDOWN_TIMEOUT_SECONDS)
+
+    if interrupted is not None and process.returncode != 0:
+        raise TaskCancelled(stderr.getvalue())
+    return {"returncode": process.returncode, "stderr": stderr.getvalue()}
+
+
+if __name__ == "__main__":
+    # Lanceur profilé: python task_runner.py --profile-output FICHIER script args...
+    if len(sys.argv) < 4 or sys.argv[1] != PROFILE_OUTPUT_OPTION:
+        print(f"Usage: {os.path.basename(__file__)} {PROFILE_OUTPUT_OPTION} FICHIER script [args...]", file=sys.stderr)
+        sys.exit(2)
+    _run_profiled_script(sys.argv[2], sys.argv[3], sys.argv[4:])